@@ -0,0 +1,262 @@
+import os
+import sqlite3
+import sys
+import time
+
+from pathlib import Path
+
+from includes.get_state_dir import get_state_dir
+
+# This module is imported on every TAB of shell completion: it only reads the
+# index, and imports what a refresh needs (requests, YBA calls) inside it.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS completion_universes (
+    name TEXT PRIMARY KEY,
+    universe_uuid TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS completion_databases (
+    universe_name TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (universe_name, name)
+);
+CREATE TABLE IF NOT EXISTS completion_tables (
+    universe_name TEXT NOT NULL,
+    table_id TEXT NOT NULL,
+    keyspace TEXT NOT NULL,
+    qualified_name TEXT NOT NULL,
+    PRIMARY KEY (universe_name, table_id)
+);
+CREATE INDEX IF NOT EXISTS completion_tables_by_id ON completion_tables (table_id);
+CREATE TABLE IF NOT EXISTS completion_refreshes (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    refreshed_at REAL,
+    claimed_at REAL
+);
+"""
+
+# the most candidates offered for one TAB
+COMPLETION_LIMIT = 200
+
+# a background refresh started longer ago than this is assumed to have died
+REFRESH_CLAIM_SECONDS = 600
+
+
+def get_completion_index_ttl() -> float:
+    """
+    Returns the seconds after which completing starts a refresh of the index in the background (env COMPLETION_INDEX_TTL; default 3600; 0 turns it off).
+    """
+    return float(os.getenv("COMPLETION_INDEX_TTL", 3600))
+
+
+def _connect() -> sqlite3.Connection:
+    connection = sqlite3.connect(get_state_dir() / "completion.db", timeout=5)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _prefix_range(prefix: str) -> tuple:
+    # a range on the primary key or index, rather than LIKE, so lookups stay fast on large catalogs
+    return prefix, prefix + "\U0010ffff"
+
+
+def _split_list(incomplete: str) -> tuple:
+    # comma-separated options complete their last item
+    done, _, last = incomplete.rpartition(",")
+    return (done + "," if done else ""), last
+
+
+def refresh_completion_index(customer_uuid: str, concurrency=8) -> dict:
+    """
+    Rebuilds the index from YBA: the names of all universes, and the databases and xCluster-supported tables of each. The topology index is refreshed from the same list of universes.
+
+    :param customer_uuid: str - the customer UUID
+    :param concurrency: int - the most universes read at once; default 8
+    :return: dict - the number of universes, databases and tables indexed, and universes that could not be read
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    from core.internal_rest_apis import (
+        _get_all_ysql_tables_list,
+        _get_database_namespaces,
+        _list_all_universes,
+    )
+    from core.models import parse_tables
+    from core.topology import refresh_topology
+
+    universes = _list_all_universes(customer_uuid)
+    refresh_topology(customer_uuid, universes)
+
+    def read_universe(universe):
+        try:
+            databases = _get_database_namespaces(
+                customer_uuid, universe["universeUUID"]
+            )
+            tables = parse_tables(
+                _get_all_ysql_tables_list(customer_uuid, universe["universeUUID"])
+            )
+        except Exception:
+            return None
+        return (
+            [database["name"] for database in databases],
+            [table for table in tables if not table.is_index],
+        )
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        details = list(executor.map(read_universe, universes))
+
+    database_rows, table_rows, failed = [], [], []
+    for universe, universe_details in zip(universes, details):
+        if universe_details is None:
+            failed.append(universe["name"])
+            continue
+        databases, tables = universe_details
+        database_rows.extend((universe["name"], database) for database in databases)
+        table_rows.extend(
+            (universe["name"], table.table_id, table.keyspace, table.qualified_name)
+            for table in tables
+        )
+
+    with _connect() as connection:
+        connection.execute("DELETE FROM completion_universes")
+        connection.execute("DELETE FROM completion_databases")
+        connection.execute("DELETE FROM completion_tables")
+        connection.executemany(
+            "INSERT OR REPLACE INTO completion_universes VALUES (?, ?)",
+            [(universe["name"], universe["universeUUID"]) for universe in universes],
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO completion_databases VALUES (?, ?)", database_rows
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO completion_tables VALUES (?, ?, ?, ?)", table_rows
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO completion_refreshes VALUES (1, ?, NULL)",
+            (time.time(),),
+        )
+    connection.close()
+
+    return {
+        "universes": len(universes),
+        "databases": len(database_rows),
+        "tables": len(table_rows),
+        "failedUniverses": failed,
+    }
+
+
+def _refresh_if_stale(connection: sqlite3.Connection):
+    ttl = get_completion_index_ttl()
+    if ttl <= 0:
+        return
+    now = time.time()
+    row = connection.execute(
+        "SELECT refreshed_at, claimed_at FROM completion_refreshes WHERE id = 1"
+    ).fetchone()
+    refreshed_at, claimed_at = row if row else (None, None)
+    if refreshed_at is not None and now - refreshed_at < ttl:
+        return
+    if claimed_at is not None and now - claimed_at < REFRESH_CLAIM_SECONDS:
+        return
+
+    with connection:
+        connection.execute(
+            "INSERT INTO completion_refreshes VALUES (1, NULL, ?) "
+            "ON CONFLICT (id) DO UPDATE SET claimed_at = excluded.claimed_at",
+            (now,),
+        )
+    # a detached process, so the TAB is answered from the index as it is
+    import subprocess
+
+    subprocess.Popen(
+        [
+            sys.executable,
+            str(Path(__file__).resolve().parents[1] / "mainapp.py"),
+            "refresh-index",
+            "--quiet",
+        ],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+        # without the completion request, or the child would complete instead of refreshing
+        env={
+            name: value
+            for name, value in os.environ.items()
+            if not (name.startswith("_") and name.endswith("_COMPLETE"))
+        },
+    )
+
+
+def _complete(sql: str, parameters: tuple) -> list:
+    try:
+        connection = _connect()
+        try:
+            rows = connection.execute(sql, parameters + (COMPLETION_LIMIT,)).fetchall()
+            _refresh_if_stale(connection)
+        finally:
+            connection.close()
+    except Exception:
+        # completion must never fail the shell; it just offers nothing
+        return []
+    return rows
+
+
+def complete_universe_names(incomplete: str) -> list:
+    """
+    :param incomplete: str - what has been typed so far
+    :return: list<str> - the indexed universe names starting with it
+    """
+    rows = _complete(
+        "SELECT name FROM completion_universes WHERE name >= ? AND name < ? ORDER BY name LIMIT ?",
+        _prefix_range(incomplete),
+    )
+    return [name for (name,) in rows]
+
+
+def complete_database_names(incomplete: str, universe_name=None) -> list:
+    """
+    Completes the last item of a comma-separated list of database names.
+
+    :param incomplete: str - what has been typed so far
+    :param universe_name: str - only offer the databases of this universe (optional)
+    :return: list<str> - the typed list, completed with each matching database name
+    """
+    done, last = _split_list(incomplete)
+    if universe_name:
+        rows = _complete(
+            "SELECT name FROM completion_databases WHERE universe_name = ? AND name >= ? AND name < ? ORDER BY name LIMIT ?",
+            (universe_name,) + _prefix_range(last),
+        )
+    else:
+        rows = _complete(
+            "SELECT DISTINCT name FROM completion_databases WHERE name >= ? AND name < ? ORDER BY name LIMIT ?",
+            _prefix_range(last),
+        )
+    return [done + name for (name,) in rows]
+
+
+def complete_table_ids(incomplete: str, universe_name=None) -> list:
+    """
+    Completes the last item of a comma-separated list of table IDs.
+
+    :param incomplete: str - what has been typed so far
+    :param universe_name: str - only offer the tables of this universe (optional)
+    :return: list<tuple<str, str>> - the typed list completed with each matching table ID, and the table's database and name
+    """
+    done, last = _split_list(incomplete)
+    if universe_name:
+        rows = _complete(
+            "SELECT table_id, keyspace, qualified_name FROM completion_tables WHERE universe_name = ? AND table_id >= ? AND table_id < ? ORDER BY table_id LIMIT ?",
+            (universe_name,) + _prefix_range(last),
+        )
+    else:
+        rows = _complete(
+            "SELECT table_id, keyspace, qualified_name FROM completion_tables WHERE table_id >= ? AND table_id < ? ORDER BY table_id LIMIT ?",
+            _prefix_range(last),
+        )
+    return [
+        (done + table_id, f"{keyspace}.{qualified_name}")
+        for table_id, keyspace, qualified_name in rows
+    ]
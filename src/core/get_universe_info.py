@@ -1,4 +1,5 @@
 from core.internal_rest_apis import _get_universe_by_name
+from core.topology import lookup_universe_uuid
 
 
 def get_universe_uuid_by_name(customer_uuid: str, universe_name: str) -> str:
@@ -10,6 +11,10 @@ def get_universe_uuid_by_name(customer_uuid: str, universe_name: str) -> str:
     :return: str - the Universe's UUID
     :raises RuntimeError: if the Universe is not found
     """
+    universe_uuid = lookup_universe_uuid(customer_uuid, universe_name)
+    if universe_uuid is not None:
+        return universe_uuid
+
     universe = next(iter(_get_universe_by_name(customer_uuid, universe_name)), None)
     if universe is None:
         raise RuntimeError(
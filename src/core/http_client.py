@@ -0,0 +1,393 @@
+import logging
+import os
+import random
+import requests
+import tabulate
+import threading
+import time
+
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+
+from includes.structured_logging import get_logger
+
+logger = get_logger("http")
+
+# one pooled session for all requests to YBA
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=32))
+
+# status codes worth retrying (for idempotent requests) and that count against YBA's health
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# the most characters of YBA's response body kept in an error message
+ERROR_BODY_LENGTH = 1000
+
+
+def get_http_settings() -> dict:
+    """
+    Returns the HTTP client settings. Each can be set in the environment or in the configuration file passed with --config.
+
+    - YBA_REQUEST_TIMEOUT: seconds to wait for YBA to respond; default 30
+    - YBA_RATE_LIMIT: requests per second to one YBA instance; default 20
+    - YBA_RATE_BURST: requests that can be sent at once before the rate limit applies; default 40
+    - YBA_MAX_RETRIES: retries of a failed GET request; default 3
+    - YBA_RETRY_BACKOFF: seconds of backoff before the first retry (doubling each retry, with jitter); default 0.5
+    - YBA_RETRY_MAX_BACKOFF: the most seconds of backoff before a retry; default 10
+    - YBA_BREAKER_THRESHOLD: consecutive failures after which requests to YBA fail fast; default 5
+    - YBA_BREAKER_COOLDOWN: seconds to fail fast before trying YBA again; default 30
+    """
+    return {
+        "timeout": float(os.getenv("YBA_REQUEST_TIMEOUT", 30)),
+        "rate_limit": float(os.getenv("YBA_RATE_LIMIT", 20)),
+        "rate_burst": float(os.getenv("YBA_RATE_BURST", 40)),
+        "max_retries": int(os.getenv("YBA_MAX_RETRIES", 3)),
+        "retry_backoff": float(os.getenv("YBA_RETRY_BACKOFF", 0.5)),
+        "retry_max_backoff": float(os.getenv("YBA_RETRY_MAX_BACKOFF", 10)),
+        "breaker_threshold": int(os.getenv("YBA_BREAKER_THRESHOLD", 5)),
+        "breaker_cooldown": float(os.getenv("YBA_BREAKER_COOLDOWN", 30)),
+    }
+
+
+class TokenBucket:
+    """
+    Limits requests to a rate, allowing short bursts.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Takes one token, waiting for it if needed.
+
+        :return: float - the seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.burst, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class CircuitBreaker:
+    """
+    Fails fast while YBA is down: after a number of consecutive failures, requests are refused for a cooldown period, then one trial request is let through.
+    """
+
+    def __init__(self, threshold: int, cooldown: float):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_progress = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if (
+                time.monotonic() - self._opened_at >= self.cooldown
+                and not self._trial_in_progress
+            ):
+                self._trial_in_progress = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_in_progress = False
+
+    def record_failure(self) -> bool:
+        """
+        :return: bool - whether this failure opened the breaker
+        """
+        with self._lock:
+            self._failures += 1
+            reopened = self._trial_in_progress
+            self._trial_in_progress = False
+            if reopened or (
+                self._opened_at is None and self._failures >= self.threshold
+            ):
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+
+_instances = {}
+_instances_lock = threading.Lock()
+
+
+def _get_instance(url: str) -> dict:
+    # rate limits, circuit breakers and metrics are kept per YBA instance
+    parts = urlsplit(url)
+    instance_key = f"{parts.scheme}://{parts.netloc}"
+    with _instances_lock:
+        if instance_key not in _instances:
+            settings = get_http_settings()
+            _instances[instance_key] = {
+                "settings": settings,
+                "bucket": TokenBucket(settings["rate_limit"], settings["rate_burst"]),
+                "breaker": CircuitBreaker(
+                    settings["breaker_threshold"], settings["breaker_cooldown"]
+                ),
+                "metrics": {
+                    "requests": 0,
+                    "retries": 0,
+                    "failures": 0,
+                    "fast_failures": 0,
+                    "breaker_opens": 0,
+                    "throttled_seconds": 0.0,
+                    "latency_seconds": 0.0,
+                    "status_codes": {},
+                },
+                "lock": threading.Lock(),
+            }
+        return _instances[instance_key]
+
+
+def _count(instance: dict, **increments):
+    with instance["lock"]:
+        for name, increment in increments.items():
+            instance["metrics"][name] += increment
+
+
+def _send_with_policy(
+    method: str, url: str, send_once, timeout: float, retry: bool
+) -> requests.Response:
+    instance = _get_instance(url)
+    settings = instance["settings"]
+    if timeout is None:
+        timeout = settings["timeout"]
+    max_attempts = 1 + settings["max_retries"] if retry and method == "GET" else 1
+
+    for attempt in range(max_attempts):
+        if not instance["breaker"].allow():
+            _count(instance, fast_failures=1)
+            raise RuntimeError(
+                f"ERROR: YBA at {urlsplit(url).netloc} is failing; not sending {method} requests for up to {settings['breaker_cooldown']:.0f}s"
+            )
+
+        _count(instance, throttled_seconds=instance["bucket"].acquire(), requests=1)
+
+        start_time = time.monotonic()
+        retry_after = None
+        try:
+            response = send_once(timeout)
+        except (requests.ConnectionError, requests.Timeout) as e:
+            error = f"{type(e).__name__}: {e}"
+            status_code = None
+        except BaseException:
+            # any other error (or an interrupt) must still end a trial request, or the breaker never closes
+            if instance["breaker"].record_failure():
+                _count(instance, breaker_opens=1)
+            raise
+        else:
+            status_code = response.status_code
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "yba request",
+                extra={
+                    "fields": {
+                        "method": method,
+                        "path": urlsplit(url).path,
+                        "attempt": attempt + 1,
+                        "status_code": status_code,
+                        "latency_ms": (time.monotonic() - start_time) * 1000,
+                    }
+                },
+            )
+        if status_code is not None:
+            with instance["lock"]:
+                status_codes = instance["metrics"]["status_codes"]
+                status_codes[response.status_code] = (
+                    status_codes.get(response.status_code, 0) + 1
+                )
+            if response.status_code not in RETRY_STATUS_CODES:
+                _count(instance, latency_seconds=time.monotonic() - start_time)
+                instance["breaker"].record_success()
+                return response
+            # YBA's error body says why the request was refused
+            body = response.text.strip()
+            error = f"HTTP {response.status_code}" + (
+                f": {body[:ERROR_BODY_LENGTH]}"
+                + ("..." if len(body) > ERROR_BODY_LENGTH else "")
+                if body
+                else ""
+            )
+            retry_after = response.headers.get("Retry-After")
+
+        _count(instance, latency_seconds=time.monotonic() - start_time, failures=1)
+        if instance["breaker"].record_failure():
+            _count(instance, breaker_opens=1)
+
+        if attempt + 1 < max_attempts:
+            _count(instance, retries=1)
+            backoff = random.uniform(
+                0,
+                min(
+                    settings["retry_max_backoff"],
+                    settings["retry_backoff"] * 2**attempt,
+                ),
+            )
+            if retry_after and retry_after.isdigit():
+                backoff = max(backoff, float(retry_after))
+            time.sleep(backoff)
+
+    raise RuntimeError(
+        f"ERROR: {method} {urlsplit(url).path} failed after {max_attempts} attempt(s): {error}"
+    )
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    """
+    Sends a request to YBA with a timeout, within the instance's rate limit, and through its circuit breaker. GET requests are retried with exponential backoff and jitter on connection errors, timeouts, 429 and 5xx responses.
+
+    Other responses (including 4xx) are returned as they are, so callers see YBA's error body. For a 429 or 5xx that is not retried (or keeps failing), the error holds the start of YBA's response body.
+
+    :param method: str - the HTTP method
+    :param url: str - the URL
+    :param kwargs: passed to requests (e.g. headers, json)
+    :return: requests.Response
+    :raises RuntimeError: if YBA cannot be reached, keeps failing, or its circuit breaker is open
+    """
+    method = method.upper()
+    timeout = kwargs.pop("timeout", None)
+    return _send_with_policy(
+        method,
+        url,
+        lambda timeout: session.request(method, url, timeout=timeout, **kwargs),
+        timeout,
+        retry=True,
+    )
+
+
+def prepare(method: str, url: str, **kwargs) -> requests.PreparedRequest:
+    """
+    Builds a request once, for callers that send the same request many times in a tight loop (see send).
+
+    :param method: str - the HTTP method
+    :param url: str - the URL
+    :param kwargs: passed to requests.Request (e.g. headers, json)
+    :return: requests.PreparedRequest
+    """
+    return session.prepare_request(requests.Request(method.upper(), url, **kwargs))
+
+
+def send(
+    prepared_request: requests.PreparedRequest, timeout=None, retry=True
+) -> requests.Response:
+    """
+    Sends a request built by prepare, on the pooled session, with the same rate limit, circuit breaker and retries as request.
+
+    :param prepared_request: requests.PreparedRequest - the result of prepare
+    :param timeout: float - seconds to wait for YBA to respond; default YBA_REQUEST_TIMEOUT
+    :param retry: bool - whether a failed GET is retried; default True
+    :return: requests.Response
+    :raises RuntimeError: if YBA cannot be reached, keeps failing, or its circuit breaker is open
+    """
+    return _send_with_policy(
+        prepared_request.method,
+        prepared_request.url,
+        lambda timeout: session.send(prepared_request, timeout=timeout),
+        timeout,
+        retry,
+    )
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
+
+
+def put(url: str, **kwargs) -> requests.Response:
+    return request("PUT", url, **kwargs)
+
+
+def delete(url: str, **kwargs) -> requests.Response:
+    return request("DELETE", url, **kwargs)
+
+
+def get_http_metrics() -> dict:
+    """
+    Returns a copy of the request metrics of each YBA instance used by this process.
+    """
+    with _instances_lock:
+        instances = dict(_instances)
+    metrics = {}
+    for instance_key, instance in instances.items():
+        with instance["lock"]:
+            metrics[instance_key] = {
+                **instance["metrics"],
+                "status_codes": dict(instance["metrics"]["status_codes"]),
+            }
+    return metrics
+
+
+def format_http_metrics(metrics: dict) -> str:
+    """
+    Formats the result of get_http_metrics as a table.
+    """
+    rows = [
+        [
+            instance_key,
+            instance_metrics["requests"],
+            instance_metrics["retries"],
+            instance_metrics["failures"],
+            instance_metrics["fast_failures"],
+            instance_metrics["breaker_opens"],
+            instance_metrics["throttled_seconds"],
+            (
+                instance_metrics["latency_seconds"]
+                * 1000
+                / instance_metrics["requests"]
+                if instance_metrics["requests"]
+                else None
+            ),
+            ", ".join(
+                f"{status_code}: {count}"
+                for status_code, count in sorted(
+                    instance_metrics["status_codes"].items()
+                )
+            ),
+        ]
+        for instance_key, instance_metrics in metrics.items()
+    ]
+
+    return tabulate.tabulate(
+        rows,
+        headers=(
+            "YBA",
+            "requests",
+            "retries",
+            "failures",
+            "failed fast",
+            "breaker opens",
+            "throttled (s)",
+            "avg latency (ms)",
+            "status codes",
+        ),
+        tablefmt="rounded_grid",
+        floatfmt=".3f",
+        showindex=False,
+    )
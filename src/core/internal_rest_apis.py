@@ -1,10 +1,14 @@
 import json
-import requests
 
+from core import http_client
 from includes.get_auth_config import get_auth_config
+from includes.overrides import suppress_warnings
 
 auth_config = get_auth_config()
 
+# applied where YBA is called from, so it holds for the CLI, the shell and scripts alike
+suppress_warnings()
+
 
 def _get_universe_by_name(customer_uuid: str, universe_name: str):
     """
@@ -18,7 +22,7 @@ def _get_universe_by_name(customer_uuid: str, universe_name: str):
     :param universe_name: str - the friendly name of the universe to be returned
     :return: json array of UniverseResp
     """
-    return requests.get(
+    return http_client.get(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/universes?name={universe_name}",
         headers=auth_config["API_HEADERS"],
     ).json()
@@ -32,7 +36,7 @@ def _get_universe_by_uuid(customer_uuid: str, universe_uuid: str):
     - https://api-docs.yugabyte.com/docs/yugabyte-platform/73fba4c90fb69-get-a-universe
     """
 
-    return requests.get(
+    return http_client.get(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/universes/{universe_uuid}",
         headers=auth_config["API_HEADERS"],
     ).json()
@@ -48,7 +52,7 @@ def _get_region_metadata(customer_uuid: str, code: str):
     - https://api-docs.yugabyte.com/docs/yugabyte-platform/9b4dd14021261-retrieves-the-region-metadata-for-the-cloud-providers
     """
 
-    return requests.get(
+    return http_client.get(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/providers/region_metadata/{code}",
         headers=auth_config["API_HEADERS"],
     ).json()
@@ -72,7 +76,7 @@ def _get_database_namespaces(
      TRANSACTION_STATUS_TABLE_TYPE).
     :return: json array of NamespaceInfoResp
     """
-    response = requests.get(
+    response = http_client.get(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/universes/{universe_uuid}/namespaces",
         headers=auth_config["API_HEADERS"],
     ).json()
@@ -87,7 +91,7 @@ def _get_session_info():
 
     :return: json of SessionInfo
     """
-    return requests.get(
+    return http_client.get(
         url=f"{auth_config['YBA_URL']}/api/v1/session_info",
         headers=auth_config["API_HEADERS"],
     ).json()
@@ -105,7 +109,7 @@ def _get_session_info():
 #     :param config_type: enum<str> - the config type (of STORAGE, ALERTS, CALLHOME, PASSWORD_POLICY).
 #     :return: json array of CustomerConfig
 #     """
-#     response = requests.get(
+#     response = http_client.get(
 #         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/configs",
 #         headers=auth_config["API_HEADERS"],
 #     ).json()
@@ -124,7 +128,7 @@ def _get_backup_UUID_by_name(customer_uuid: str, config_name: str):
     :param config_type: enum<str> - the config type (of STORAGE, ALERTS, CALLHOME, PASSWORD_POLICY).
     :return: json array of CustomerConfig
     """
-    response = requests.get(
+    response = http_client.get(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/configs",
         headers=auth_config["API_HEADERS"],
     ).json()
@@ -143,12 +147,42 @@ def _get_task_status(customer_uuid: str, task_uuid: str) -> json:
     :param task_uuid: str - the task's UUID
     :return: json<CustomerTaskData>
     """
-    return requests.get(
+    return http_client.get(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/tasks/{task_uuid}",
         headers=auth_config["API_HEADERS"],
     ).json()
 
 
+def _list_customer_tasks(customer_uuid: str) -> list:
+    """
+    Basic function that lists the customer's tasks in YBA, so the status of many tasks can be read with one request.
+
+    See also:
+     - https://api-docs.yugabyte.com/docs/yugabyte-platform/08618836e48aa-customer-task-data
+
+    :param customer_uuid: str - the customer UUID
+    :return: json array of CustomerTaskData
+    """
+    return http_client.get(
+        url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/tasks_list",
+        headers=auth_config["API_HEADERS"],
+    ).json()
+
+
+def _get_task_failure(customer_uuid: str, task_uuid: str):
+    """
+    Basic function that gets the failed subtasks (and their error messages) of a failed task.
+
+    :param customer_uuid: str - the customer UUID
+    :param task_uuid: str - the task's UUID
+    :return: json with a failedSubTasks array
+    """
+    return http_client.get(
+        url=f"{auth_config['YBA_URL']}/api/customers/{customer_uuid}/tasks/{task_uuid}/failed",
+        headers=auth_config["API_HEADERS"],
+    ).json()
+
+
 def _get_all_ysql_tables_list(
     customer_uuid: str,
     universe_uuid: str,
@@ -172,7 +206,7 @@ def _get_all_ysql_tables_list(
     :param dbs_include_list: list<str> - list of database names to include (filter out any not matching); default None
     :return: json array of TableInfoResp (possibly filtered)
     """
-    response = requests.get(
+    response = http_client.get(
         url=(
             f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/universes/{universe_uuid}/tables"
             f"?includeParentTableInfo={str(include_parent_table_info).lower()}"
@@ -205,7 +239,7 @@ def _get_xcluster_configs(customer_uuid, xcluster_config_uuid):
     :param xcluster_config_uuid: str - the xCluster Config UUID
     :return: json of XClusterConfigGetResp
     """
-    return requests.get(
+    return http_client.get(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/xcluster_configs/{xcluster_config_uuid}",
         headers=auth_config["API_HEADERS"],
     ).json()
@@ -223,37 +257,30 @@ def _get_xcluster_dr_configs(customer_uuid: str, xcluster_dr_uuid: str) -> json:
     :param xcluster_dr_uuid: str - the DR config UUID to return
     :return: json of DrConfig
     """
-    return requests.get(
+    return http_client.get(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/dr_configs/{xcluster_dr_uuid}",
         headers=auth_config["API_HEADERS"],
     ).json()
 
 
-def _create_dr_config(
-    customer_uuid: str,
+def _create_dr_config_form_data(
     storage_config_uuid: str,
     source_universe_uuid: str,
     target_universe_uuid: str,
     dbs_include_list=None,
     parallelism=8,
-):
+) -> dict:
     """
-    Creates a new xCluster DR config for given source and target universe and a required storage config.
+    Builds the request body that _create_dr_config sends. It is also used to show the request in a dry run.
 
-    See also:
-     - https://api-docs.yugabyte.com/docs/yugabyte-platform/branches/2.20/d8cf017de217e-create-disaster-recovery-config
-     - https://api-docs.yugabyte.com/docs/yugabyte-platform/64d854c13e51b-ybp-task
-
-    :param customer_uuid: str - the Customer UUID
     :param storage_config_uuid: str - a storage config for backup/restore of data from source to target
     :param source_universe_uuid: str - the source Universe UUID
     :param target_universe_uuid: str - the target Universe UUID
-    :param dbs_include_list: list<str> - list of database names to include (filter out any not matching); default None
+    :param dbs_include_list: list<str> - list of database namespace UUIDs to include; default None
     :param parallelism: int - the number of parallel threads to use during backup/restore bootstrap; default 8
-    :param dry_run: bool - whether to perform as a "dry run"; default False
-    :return: json of YBPTask (it may be passed to wait_for_task)
+    :return: dict of DisasterRecoveryCreateFormData
     """
-    disaster_recovery_create_form_data = {
+    return {
         "bootstrapParams": {
             "backupRequestParams": {
                 "parallelism": parallelism,
@@ -266,7 +293,39 @@ def _create_dr_config(
         "targetUniverseUUID": target_universe_uuid,
     }
 
-    return requests.post(
+
+def _create_dr_config(
+    customer_uuid: str,
+    storage_config_uuid: str,
+    source_universe_uuid: str,
+    target_universe_uuid: str,
+    dbs_include_list=None,
+    parallelism=8,
+):
+    """
+    Creates a new xCluster DR config for given source and target universe and a required storage config.
+
+    See also:
+     - https://api-docs.yugabyte.com/docs/yugabyte-platform/branches/2.20/d8cf017de217e-create-disaster-recovery-config
+     - https://api-docs.yugabyte.com/docs/yugabyte-platform/64d854c13e51b-ybp-task
+
+    :param customer_uuid: str - the Customer UUID
+    :param storage_config_uuid: str - a storage config for backup/restore of data from source to target
+    :param source_universe_uuid: str - the source Universe UUID
+    :param target_universe_uuid: str - the target Universe UUID
+    :param dbs_include_list: list<str> - list of database namespace UUIDs to include; default None
+    :param parallelism: int - the number of parallel threads to use during backup/restore bootstrap; default 8
+    :return: json of YBPTask (it may be passed to wait_for_task)
+    """
+    disaster_recovery_create_form_data = _create_dr_config_form_data(
+        storage_config_uuid,
+        source_universe_uuid,
+        target_universe_uuid,
+        dbs_include_list,
+        parallelism,
+    )
+
+    return http_client.post(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/dr_configs",
         json=disaster_recovery_create_form_data,
         headers=auth_config["API_HEADERS"],
@@ -288,7 +347,7 @@ def _delete_xcluster_dr_config(
     :param is_force_delete: bool - whether to force delete the DR config; default False
     :return: json of YBPTask (it may be passed to wait_for_task)
     """
-    return requests.delete(
+    return http_client.delete(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/dr_configs/{dr_config_uuid}"
         f"?isForceDelete={json.dumps(is_force_delete)}",
         headers=auth_config["API_HEADERS"],
@@ -329,7 +388,7 @@ def _set_tables_in_dr_config(
         "tables": tables_include_set,
     }
 
-    return requests.post(
+    return http_client.post(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/dr_configs/{dr_config_uuid}/set_tables",
         json=disaster_recovery_set_tables_form_data,
         headers=auth_config["API_HEADERS"],
@@ -349,7 +408,7 @@ def _pause_xcluster_config(customer_uuid: str, xcluster_config_uuid: str):
     :return: json of YBPTask (it may be passed to wait_for_task)
     """
     xcluster_replication_edit_form_data = {"status": "Paused"}
-    return requests.put(
+    return http_client.put(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/xcluster_configs/{xcluster_config_uuid}",
         json=xcluster_replication_edit_form_data,
         headers=auth_config["API_HEADERS"],
@@ -369,7 +428,7 @@ def _resume_xcluster_config(customer_uuid: str, xcluster_config_uuid: str):
     :return: json of YBPTask (it may be passed to wait_for_task)
     """
     xcluster_replication_edit_form_data = {"status": "Running"}
-    return requests.put(
+    return http_client.put(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/xcluster_configs/{xcluster_config_uuid}",
         json=xcluster_replication_edit_form_data,
         headers=auth_config["API_HEADERS"],
@@ -400,7 +459,7 @@ def _switchover_xcluster_dr(
         "drReplicaUniverseUuid": dr_replica_universe_uuid,
     }
 
-    return requests.post(
+    return http_client.post(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/dr_configs/{dr_config_uuid}/switchover",
         json=disaster_recovery_switchover_form_data,
         headers=auth_config["API_HEADERS"],
@@ -437,7 +496,7 @@ def _failover_xcluster_dr(
         "namespaceIdSafetimeEpochUsMap": namespace_id_safetime_epoch_us_map,
     }
     # pprint(disaster_recovery_failover_form_data)
-    return requests.post(
+    return http_client.post(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/dr_configs/{dr_config_uuid}/failover",
         json=disaster_recovery_failover_form_data,
         headers=auth_config["API_HEADERS"],
@@ -457,12 +516,27 @@ def _get_xcluster_dr_safetime(customer_uuid: str, dr_config_uuid: str):
     :param dr_config_uuid: str - the DR config UUID to use
     :return: json<DrConfigSafeTimeResp>
     """
-    return requests.get(
+    return http_client.get(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/dr_configs/{dr_config_uuid}/safetime",
         headers=auth_config["API_HEADERS"],
     ).json()
 
 
+def _prepare_xcluster_dr_safetime_request(customer_uuid: str, dr_config_uuid: str):
+    """
+    Builds the request of _get_xcluster_dr_safetime once, to be sent many times with http_client.send (e.g. when sampling safetimes before a failover).
+
+    :param customer_uuid: str - the Customer UUID
+    :param dr_config_uuid: str - the DR config UUID to use
+    :return: requests.PreparedRequest - its response is json<DrConfigSafeTimeResp>
+    """
+    return http_client.prepare(
+        "GET",
+        url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/dr_configs/{dr_config_uuid}/safetime",
+        headers=auth_config["API_HEADERS"],
+    )
+
+
 def _recover_xcluster_dr_config(
     customer_uuid: str, dr_config_uuid: str, dbs_list=None, is_force_delete=False
 ):
@@ -480,7 +554,7 @@ def _recover_xcluster_dr_config(
     :return: json of YBPTask (it may be passed to wait_for_task)
     """
     disaster_recovery_restart_form_data = {"dbs": dbs_list or []}
-    return requests.post(
+    return http_client.post(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/dr_configs/{dr_config_uuid}/restart"
         f"?isForceDelete={json.dumps(is_force_delete)}",
         json=disaster_recovery_restart_form_data,
@@ -497,7 +571,7 @@ def _list_all_universes(customer_uuid: str):
 
     :param customer_uuid: str - the Customer UUID
     """
-    return requests.get(
+    return http_client.get(
         url=f"{auth_config['YBA_URL']}/api/v1/customers/{customer_uuid}/universes",
         headers=auth_config["API_HEADERS"],
     ).json()
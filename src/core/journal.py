@@ -0,0 +1,295 @@
+import json
+import tabulate
+import time
+
+from datetime import datetime, timezone
+
+from core.internal_rest_apis import _get_task_status
+from core.manage_tasks import wait_for_task
+from core.task_tracker import FINISHED_STATUSES, TaskFailedError
+from core.topology import invalidate_topology
+from includes.get_state_dir import get_state_dir
+from includes.structured_logging import get_logger, get_progress_logger, log_context
+
+logger = get_logger("journal")
+progress = get_progress_logger("journal")
+
+# journal states of tasks that need no more following
+# (Unknown: YBA no longer knows the task)
+CLOSED_STATUSES = FINISHED_STATUSES + ("Unknown",)
+
+
+def get_journal_path():
+    return get_state_dir() / "journal.jsonl"
+
+
+def _append_entry(entry: dict):
+    # one write per line keeps concurrent appends from interleaving
+    with open(get_journal_path(), "a") as file:
+        file.write(json.dumps(entry) + "\n")
+
+
+def record_task(
+    customer_uuid: str,
+    operation: str,
+    key: str,
+    task_response,
+    friendly_name="UNKNOWN",
+    dr_config_uuid=None,
+):
+    """
+    Journals a submitted task, so it can be reattached to if the command is interrupted.
+
+    :param customer_uuid: str - the customer UUID
+    :param operation: str - the operation (e.g. setup-dr)
+    :param key: str - what the operation acts on (e.g. the source universe name or DR config UUID)
+    :param task_response: json<YBPTask> - the response of the submitted action
+    :param friendly_name: str - a friendly task name to display in output
+    :param dr_config_uuid: str - the DR config UUID (optional; default is the task's resourceUUID)
+    """
+    _append_entry(
+        {
+            "task_uuid": task_response["taskUUID"],
+            "customer_uuid": customer_uuid,
+            "operation": operation,
+            "key": key,
+            "friendly_name": friendly_name,
+            "dr_config_uuid": dr_config_uuid or task_response.get("resourceUUID"),
+            "submitted_at": datetime.now(timezone.utc).isoformat(),
+            "status": "Submitted",
+        }
+    )
+
+
+def update_task(task_uuid: str, status: str):
+    """
+    Journals a new status for a task.
+    """
+    _append_entry(
+        {
+            "task_uuid": task_uuid,
+            "status": status,
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+
+
+def list_journaled_tasks() -> list:
+    """
+    Returns the journaled tasks with their latest known status, oldest first.
+
+    :return: list<dict> - the journal entries, one per task
+    """
+    tasks = {}
+    journal_path = get_journal_path()
+    if not journal_path.exists():
+        return []
+
+    with open(journal_path) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # a line cut short by an interrupted write
+                continue
+            tasks.setdefault(entry["task_uuid"], {}).update(entry)
+
+    return [task for task in tasks.values() if "operation" in task]
+
+
+def find_in_flight_task(customer_uuid: str, operation: str, key: str):
+    """
+    Returns the journaled task of an operation that is still running in YBA, if any. Tasks found to have finished are marked as such in the journal.
+
+    :param customer_uuid: str - the customer UUID
+    :param operation: str - the operation (e.g. setup-dr)
+    :param key: str - what the operation acts on
+    :return: dict - the journal entry, or None
+    """
+    for task in reversed(list_journaled_tasks()):
+        if (
+            task["customer_uuid"] != customer_uuid
+            or task["operation"] != operation
+            or task["key"] != key
+            or task["status"] in CLOSED_STATUSES
+        ):
+            continue
+
+        status = _get_task_status(customer_uuid, task["task_uuid"]).get(
+            "status", "Unknown"
+        )
+        if status in CLOSED_STATUSES:
+            update_task(task["task_uuid"], status)
+            continue
+        return task
+
+    return None
+
+
+def run_journaled_task(
+    customer_uuid: str,
+    operation: str,
+    key: str,
+    submit,
+    friendly_name="UNKNOWN",
+    dr_config_uuid=None,
+):
+    """
+    Submits a task and waits for it, journaling it first. If the same operation on the same key is still running from an earlier, interrupted invocation, it is reattached to instead of being submitted again.
+
+    :param customer_uuid: str - the customer UUID
+    :param operation: str - the operation (e.g. setup-dr)
+    :param key: str - what the operation acts on (e.g. the source universe name or DR config UUID)
+    :param submit: callable - submits the task and returns its json<YBPTask> response
+    :param friendly_name: str - a friendly task name to display in output
+    :param dr_config_uuid: str - the DR config UUID, if known before submitting (optional)
+    :return: tuple<json<YBPTask>, json<CustomerTaskData>> - the task response and its final status
+    :raises RuntimeError: if the task fails, or its status cannot be read (its journal entry then stays open, so the next run reattaches to it)
+    """
+    with log_context(operation=operation, dr_config_uuid=dr_config_uuid):
+        in_flight_task = find_in_flight_task(customer_uuid, operation, key)
+        if in_flight_task is not None:
+            progress.info(
+                f"Reattaching to '{friendly_name}' (task='{in_flight_task['task_uuid']}') submitted at {in_flight_task['submitted_at']}"
+            )
+            task_response = {
+                "taskUUID": in_flight_task["task_uuid"],
+                "resourceUUID": in_flight_task["dr_config_uuid"],
+            }
+            logger.info(
+                "task reattached",
+                extra={
+                    "fields": {"task_uuid": in_flight_task["task_uuid"], "key": key}
+                },
+            )
+        else:
+            start_time = time.monotonic()
+            task_response = submit()
+            logger.info(
+                "task submitted",
+                extra={
+                    "fields": {
+                        "task_uuid": task_response.get("taskUUID"),
+                        "key": key,
+                        "latency_ms": (time.monotonic() - start_time) * 1000,
+                    }
+                },
+            )
+            if "taskUUID" in task_response:
+                record_task(
+                    customer_uuid,
+                    operation,
+                    key,
+                    task_response,
+                    friendly_name,
+                    dr_config_uuid,
+                )
+
+        try:
+            task_status = wait_for_task(customer_uuid, task_response, friendly_name)
+        except TaskFailedError as e:
+            update_task(task_response["taskUUID"], e.status)
+            raise
+        finally:
+            # DR tasks can add, remove or swap DR links, even when they fail part way
+            invalidate_topology(customer_uuid)
+
+        update_task(task_response["taskUUID"], "Success")
+        return task_response, task_status
+
+
+def follow_journaled_task(customer_uuid: str, task_uuid: str):
+    """
+    Waits for a journaled task to finish, showing its progress.
+
+    :param customer_uuid: str - the customer UUID
+    :param task_uuid: str - the task's UUID (or a unique prefix of it)
+    :return: json of CustomerTaskData (the final task result)
+    :raises RuntimeError: if the task is not in the journal, fails, or its status cannot be read
+    """
+    matches = [
+        task
+        for task in list_journaled_tasks()
+        if task["customer_uuid"] == customer_uuid
+        and task["task_uuid"].startswith(task_uuid)
+    ]
+    if len(matches) != 1:
+        raise RuntimeError(
+            f"ERROR: the task '{task_uuid}' was "
+            + ("not found in the journal." if not matches else "ambiguous.")
+        )
+
+    task = matches[0]
+    try:
+        task_status = wait_for_task(
+            customer_uuid, {"taskUUID": task["task_uuid"]}, task["friendly_name"]
+        )
+    except TaskFailedError as e:
+        update_task(task["task_uuid"], e.status)
+        raise
+    finally:
+        invalidate_topology(customer_uuid)
+
+    update_task(task["task_uuid"], "Success")
+    return task_status
+
+
+def get_journaled_tasks_table(customer_uuid: str, show_all=False, limit=20) -> str:
+    """
+    Returns a table of the journaled tasks for a customer, refreshing the status of unfinished ones from YBA.
+
+    :param customer_uuid: str - the customer UUID
+    :param show_all: bool - include finished tasks; default False
+    :param limit: int - the maximum number of (most recent) tasks shown, and so read from YBA; default 20
+    :return: str - the table
+    """
+    tasks = [
+        task
+        for task in list_journaled_tasks()
+        if task["customer_uuid"] == customer_uuid
+        and (show_all or task["status"] not in CLOSED_STATUSES)
+    ]
+
+    rows = []
+    for task in tasks[-limit:]:
+        status = task["status"]
+        percent = ""
+        if status not in CLOSED_STATUSES:
+            task_status = _get_task_status(customer_uuid, task["task_uuid"])
+            status = task_status.get("status", "Unknown")
+            percent = task_status.get("percent", "")
+            if status in CLOSED_STATUSES:
+                update_task(task["task_uuid"], status)
+        if show_all or status not in CLOSED_STATUSES:
+            rows.append(
+                [
+                    task["submitted_at"],
+                    task["operation"],
+                    task["key"],
+                    task["dr_config_uuid"],
+                    task["task_uuid"],
+                    status,
+                    percent,
+                ]
+            )
+
+    if not rows:
+        return "No journaled tasks."
+
+    return tabulate.tabulate(
+        rows,
+        headers=(
+            "submitted (UTC)",
+            "operation",
+            "for",
+            "DR config",
+            "task",
+            "status",
+            "% complete",
+        ),
+        tablefmt="rounded_grid",
+        floatfmt=".0f",
+        showindex=False,
+    )
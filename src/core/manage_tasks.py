@@ -1,17 +1,24 @@
-import requests
 import time
 
-from core.internal_rest_apis import _get_task_status
-from includes.get_auth_config import get_auth_config
+from core.task_tracker import get_task_tracker
+from includes.structured_logging import (
+    flush_logging,
+    get_logger,
+    get_progress_logger,
+    log_context,
+)
 
-auth_config = get_auth_config()
+logger = get_logger("tasks")
+progress = get_progress_logger("tasks")
 
 
 def wait_for_task(
     customer_uuid: str, task_response, friendly_name="UNKNOWN", sleep_interval=2
 ):
     """
-    Utility function that waits for a given task to complete and updates the console every sleep interval.
+    Utility function that waits for a given task to complete and shows its progress (see get_progress_logger) every sleep interval.
+
+    The task is polled by the task tracker shared by the process, so any number of waiters share a single poll loop.
 
     On success the return will be final task status.
 
@@ -21,42 +28,87 @@ def wait_for_task(
     :param customer_uuid: str - the customer UUID
     :param task_response: json<ActionResponse> - the task response body (json) from the action
     :param friendly_name: str - a friendly task name to display in output (optional, default is UNKNOWN)
-    :param sleep_interval: int - an interval to sleep while task is running (optional, default 15s)
+    :param sleep_interval: int - an interval to sleep while task is running (optional, default 2s)
     :return: json of CustomerTaskData (the final task result)
     :raises RuntimeError: if the task fails or cannot be found
     """
-    if "taskUUID" not in task_response:
-        raise RuntimeError(
-            f"ERROR: failed to process '{friendly_name}' no taskUUID {task_response}"
-        )
-
+    tracker = get_task_tracker(customer_uuid, sleep_interval)
+    future = tracker.track(task_response, friendly_name)
     task_uuid = task_response["taskUUID"]
+    start_time = time.monotonic()
 
-    while True:
-        task_status = _get_task_status(customer_uuid, task_uuid)
-        match task_status["status"]:
-            case "Success":
-                print(f"Task '{friendly_name}': {task_uuid} finished successfully!")
-                return task_status
-            case "Failure":
-                failure_message = f"Task '{friendly_name}': {task_uuid} failed, but could not get the failure messages"
-                action_failed_response = requests.get(
-                    url=f"{auth_config['YBA_URL']}/api/customers/{customer_uuid}/tasks/{task_uuid}/failed",
-                    headers=auth_config["API_HEADERS"],
-                ).json()
-                if "failedSubTasks" in action_failed_response:
-                    errors = [
-                        subtask["errorString"]
-                        for subtask in action_failed_response["failedSubTasks"]
-                    ]
-                    failure_message = (
-                        f"Task '{friendly_name}': {task_uuid} failed with the following errors: "
-                        + "\n".join(errors)
-                    )
-
-                raise RuntimeError(failure_message)
-            case _:
-                print(
-                    f"Waiting for '{friendly_name}' (task='{task_uuid}'): {task_status['percent']:.0f}% complete..."
+    with log_context(task_uuid=task_uuid):
+        for event in tracker.events(task_uuid):
+            logger.info(
+                "task progress",
+                extra={
+                    "fields": {
+                        "task": friendly_name,
+                        "status": event["status"],
+                        "percent": event["percent"],
+                    }
+                },
+            )
+            if event["status"] not in ("Success", "Failure", "Aborted"):
+                progress.info(
+                    f"Waiting for '{friendly_name}' (task='{task_uuid}'): {event['percent']:.0f}% complete..."
                 )
-                time.sleep(sleep_interval)
+
+        try:
+            task_status = future.result()
+        except RuntimeError as e:
+            logger.error(
+                "task failed",
+                extra={
+                    "fields": {
+                        "task": friendly_name,
+                        "error": str(e),
+                        "latency_ms": (time.monotonic() - start_time) * 1000,
+                    }
+                },
+            )
+            raise
+        logger.info(
+            "task finished",
+            extra={
+                "fields": {
+                    "task": friendly_name,
+                    "latency_ms": (time.monotonic() - start_time) * 1000,
+                }
+            },
+        )
+        progress.info(f"Task '{friendly_name}': {task_uuid} finished successfully!")
+    # the caller's result comes after the progress of its task
+    flush_logging()
+    return task_status
+
+
+def wait_for_tasks(customer_uuid: str, task_responses: dict, sleep_interval=2) -> dict:
+    """
+    Utility function that waits for several tasks to complete, polling them together.
+
+    :param customer_uuid: str - the customer UUID
+    :param task_responses: dict<str, json<ActionResponse>> - the task response bodies by friendly name
+    :param sleep_interval: int - an interval to sleep between polls (optional, default 2s)
+    :return: dict<str, json of CustomerTaskData> - the final task results by friendly name
+    :raises RuntimeError: if any task fails; the other tasks are still waited for first
+    """
+    tracker = get_task_tracker(customer_uuid, sleep_interval)
+    futures = {
+        friendly_name: tracker.track(task_response, friendly_name)
+        for friendly_name, task_response in task_responses.items()
+    }
+
+    results = {}
+    failures = []
+    for friendly_name, future in futures.items():
+        try:
+            results[friendly_name] = future.result()
+            progress.info(f"Task '{friendly_name}' finished successfully!")
+        except RuntimeError as e:
+            failures.append(str(e))
+
+    flush_logging()
+    if failures:
+        raise RuntimeError("\n".join(failures))
+    return results
@@ -18,3 +18,28 @@ def center_on_view(latitudes_list, longitudes_list):
     zoom = math.log2(360 / max_range)
 
     return center_latitude, center_longitude, zoom
+
+
+# the golden angle spreads consecutive points evenly around a circle
+GOLDEN_ANGLE = math.pi * (3 - math.sqrt(5))
+
+
+def spread_around(center_longitude, center_latitude, count, radius):
+
+    # deterministic "sunflower" layout of count points within radius of the center
+    # (the same inputs always give the same positions, unlike random jitter)
+    return [
+        (
+            center_longitude
+            + radius * math.sqrt(i / count) * math.cos(i * GOLDEN_ANGLE),
+            center_latitude
+            + radius * math.sqrt(i / count) * math.sin(i * GOLDEN_ANGLE),
+        )
+        for i in range(count)
+    ]
+
+
+def figure_height_for(marker_count, base=450, per_marker=12, maximum=1600):
+
+    # grow the figure with the number of markers drawn, within limits
+    return min(base + per_marker * marker_count, maximum)
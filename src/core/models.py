@@ -0,0 +1,199 @@
+import sys
+
+from dataclasses import dataclass
+
+# The models below keep only the fields this tool reads from YBA's responses.
+# They are slotted (no per-object __dict__) and intern the strings that repeat
+# across many objects (keyspaces, schemas, clouds, regions, AZs, states), so
+# fleet scans and large table catalogs hold a fraction of the parsed json.
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+@dataclass(slots=True, frozen=True)
+class Node:
+    name: str
+    state: str
+    placement_uuid: str
+    cloud: str
+    region: str
+    az: str
+    private_ip: str
+
+    @classmethod
+    def from_json(cls, node: dict) -> "Node":
+        """
+        :param node: json<NodeDetails> - an entry of universeDetails.nodeDetailsSet
+        """
+        cloud_info = node.get("cloudInfo", {})
+        return cls(
+            name=node.get("nodeName"),
+            # no state is not live: callers count and connect to Live nodes only
+            state=_intern(node.get("state")),
+            placement_uuid=_intern(node.get("placementUuid")),
+            cloud=_intern(cloud_info.get("cloud")),
+            region=_intern(cloud_info.get("region")),
+            az=_intern(cloud_info.get("az")),
+            private_ip=cloud_info.get("private_ip"),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class Cluster:
+    uuid: str
+    cluster_type: str
+    num_nodes: int
+    replication_factor: int
+
+    @classmethod
+    def from_json(cls, cluster: dict) -> "Cluster":
+        """
+        :param cluster: json<Cluster> - an entry of universeDetails.clusters
+        """
+        user_intent = cluster["userIntent"]
+        return cls(
+            uuid=_intern(cluster["uuid"]),
+            cluster_type=_intern(cluster["clusterType"]),
+            num_nodes=user_intent["numNodes"],
+            replication_factor=user_intent["replicationFactor"],
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class Universe:
+    universe_uuid: str
+    name: str
+    clusters: tuple
+    nodes: tuple
+    dr_config_uuids_as_source: tuple
+    dr_config_uuids_as_target: tuple
+
+    @classmethod
+    def from_json(cls, universe: dict) -> "Universe":
+        """
+        :param universe: json<UniverseResp>
+        """
+        universe_details = universe.get("universeDetails", {})
+        return cls(
+            universe_uuid=universe["universeUUID"],
+            name=universe["name"],
+            clusters=tuple(
+                Cluster.from_json(cluster)
+                for cluster in universe_details.get("clusters", [])
+            ),
+            nodes=tuple(
+                Node.from_json(node)
+                for node in universe_details.get("nodeDetailsSet", [])
+            ),
+            dr_config_uuids_as_source=tuple(universe.get("drConfigUuidsAsSource", [])),
+            dr_config_uuids_as_target=tuple(universe.get("drConfigUuidsAsTarget", [])),
+        )
+
+    @property
+    def primary_cluster(self):
+        return next(
+            (cluster for cluster in self.clusters if cluster.cluster_type == "PRIMARY"),
+            None,
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class Table:
+    table_id: str
+    table_type: str
+    keyspace: str
+    schema: str
+    name: str
+    is_index: bool
+    size_bytes: float
+
+    @classmethod
+    def from_json(cls, table: dict) -> "Table":
+        """
+        :param table: json<TableInfoResp>
+        """
+        return cls(
+            table_id=table["tableID"],
+            table_type=_intern(table.get("tableType")),
+            keyspace=_intern(table["keySpace"]),
+            schema=_intern(table.get("pgSchemaName")),
+            name=table["tableName"],
+            is_index=table.get("isIndexTable", False),
+            size_bytes=table.get("sizeBytes", 0),
+        )
+
+    @property
+    def qualified_name(self) -> str:
+        return f"{self.schema}.{self.name}"
+
+
+@dataclass(slots=True, frozen=True)
+class DrConfig:
+    uuid: str
+    name: str
+    state: str
+    status: str
+    paused: bool
+    xcluster_config_uuid: str
+    primary_universe_uuid: str
+    dr_replica_universe_uuid: str
+    storage_config_uuid: str
+    tables: tuple
+    primary_universe_state: str
+    dr_replica_universe_state: str
+
+    @classmethod
+    def from_json(cls, dr_config: dict) -> "DrConfig":
+        """
+        :param dr_config: json<DrConfig>
+        """
+        return cls(
+            uuid=dr_config["uuid"],
+            name=dr_config.get("name"),
+            state=_intern(dr_config.get("state")),
+            status=_intern(dr_config.get("status")),
+            paused=dr_config.get("paused"),
+            xcluster_config_uuid=dr_config.get("xclusterConfigUuid"),
+            primary_universe_uuid=dr_config.get("primaryUniverseUuid"),
+            dr_replica_universe_uuid=dr_config.get("drReplicaUniverseUuid"),
+            storage_config_uuid=dr_config.get("bootstrapParams", {})
+            .get("backupRequestParams", {})
+            .get("storageConfigUUID"),
+            tables=tuple(dr_config.get("tables", [])),
+            primary_universe_state=_intern(dr_config.get("primaryUniverseState")),
+            dr_replica_universe_state=_intern(dr_config.get("drReplicaUniverseState")),
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class XClusterTable:
+    table_id: str
+    status: str
+    replication_setup_done: bool
+    is_index: bool
+    errors: tuple
+
+    @classmethod
+    def from_json(cls, table: dict) -> "XClusterTable":
+        """
+        :param table: json<XClusterTableConfig> - an entry of XClusterConfigGetResp.tableDetails
+        """
+        return cls(
+            table_id=table["tableId"],
+            status=_intern(table.get("status")),
+            replication_setup_done=table.get("replicationSetupDone", False),
+            is_index=table.get("indexTable", False),
+            errors=tuple(
+                _intern(error) for error in table.get("replicationStatusErrors") or []
+            ),
+        )
+
+
+def parse_tables(tables_list: list) -> list:
+    """
+    :param tables_list: json array of TableInfoResp
+    :return: list<Table>
+    """
+    return [Table.from_json(table) for table in tables_list]
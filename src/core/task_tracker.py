@@ -0,0 +1,271 @@
+import queue
+import threading
+import time
+
+from concurrent.futures import Future
+
+from core.internal_rest_apis import (
+    _get_task_failure,
+    _get_task_status,
+    _list_customer_tasks,
+)
+
+# task states that end a task
+FINISHED_STATUSES = ("Success", "Failure", "Aborted")
+
+
+class TaskFailedError(RuntimeError):
+    """
+    A task that YBA reported as failed or aborted. Other errors while waiting (e.g. YBA not answering) say nothing about the task itself.
+    """
+
+    def __init__(self, message: str, status: str):
+        super().__init__(message)
+        self.status = status
+
+
+def get_task_failure_message(
+    customer_uuid: str, task_uuid: str, friendly_name="UNKNOWN"
+) -> str:
+    """
+    Returns a message with the errors of a failed task's subtasks.
+
+    :param customer_uuid: str - the customer UUID
+    :param task_uuid: str - the task's UUID
+    :param friendly_name: str - a friendly task name to display in output
+    :return: str - the failure message
+    """
+    failure_message = f"Task '{friendly_name}': {task_uuid} failed, but could not get the failure messages"
+    try:
+        action_failed_response = _get_task_failure(customer_uuid, task_uuid)
+    except Exception:
+        return failure_message
+    if "failedSubTasks" in action_failed_response:
+        errors = [
+            subtask["errorString"]
+            for subtask in action_failed_response["failedSubTasks"]
+        ]
+        failure_message = (
+            f"Task '{friendly_name}': {task_uuid} failed with the following errors: "
+            + "\n".join(errors)
+        )
+    return failure_message
+
+
+class TaskTracker:
+    """
+    Waits on many YBA tasks with a single poll loop.
+
+    Each tracked task gets a Future that resolves to its final CustomerTaskData (or fails with a TaskFailedError holding the subtask errors). Progress events can be read with events(). One background thread polls every tracked task on the same schedule: with several tasks in flight it reads them all from the customer task list in one request, otherwise it gets each task's status. Failure details are only fetched for tasks that fail.
+
+    A failed poll (e.g. while YBA restarts) is retried, backing off up to max_poll_backoff seconds; only after max_poll_errors failed polls in a row do the futures fail, with a RuntimeError.
+    """
+
+    def __init__(
+        self,
+        customer_uuid: str,
+        poll_interval=2,
+        task_list_threshold=3,
+        max_poll_errors=10,
+        max_poll_backoff=30,
+    ):
+        """
+        :param customer_uuid: str - the customer UUID
+        :param poll_interval: float - seconds between polls; default 2
+        :param task_list_threshold: int - the number of tasks in flight from which the customer task list is used; default 3
+        :param max_poll_errors: int - the failed polls in a row after which the tasks fail; default 10
+        :param max_poll_backoff: float - the most seconds between polls after a failed one; default 30
+        """
+        self.customer_uuid = customer_uuid
+        self.poll_interval = poll_interval
+        self.task_list_threshold = task_list_threshold
+        self.max_poll_errors = max_poll_errors
+        self.max_poll_backoff = max_poll_backoff
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def track(self, task_response, friendly_name="UNKNOWN") -> Future:
+        """
+        Registers a task to be polled.
+
+        :param task_response: json<ActionResponse> - the task response body (json) from the action
+        :param friendly_name: str - a friendly task name to display in output
+        :return: Future - resolves to the final CustomerTaskData
+        :raises RuntimeError: if the response has no task UUID
+        """
+        if "taskUUID" not in task_response:
+            raise RuntimeError(
+                f"ERROR: failed to process '{friendly_name}' no taskUUID {task_response}"
+            )
+        task_uuid = task_response["taskUUID"]
+
+        with self._lock:
+            if task_uuid not in self._tasks:
+                self._tasks[task_uuid] = {
+                    "friendly_name": friendly_name,
+                    "future": Future(),
+                    "listeners": [],
+                }
+            future = self._tasks[task_uuid]["future"]
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._poll_loop, name="task-tracker", daemon=True
+                )
+                self._thread.start()
+        return future
+
+    def events(self, task_uuid: str):
+        """
+        Yields the progress events of a tracked task until it finishes. Each event is a dict with the task_uuid, friendly_name, status and percent.
+
+        :param task_uuid: str - the task's UUID (it must be tracked)
+        """
+        listener = queue.Queue()
+        with self._lock:
+            task = self._tasks.get(task_uuid)
+            if task is None:
+                return
+            task["listeners"].append(listener)
+
+        while True:
+            try:
+                event = listener.get(timeout=self.poll_interval)
+            except queue.Empty:
+                # the task may have finished before this listener was registered
+                if task["future"].done():
+                    return
+                continue
+            yield event
+            if event["status"] in FINISHED_STATUSES:
+                return
+
+    def _fetch_statuses(self, task_uuids: list) -> dict:
+        statuses = {}
+        if len(task_uuids) >= self.task_list_threshold:
+            try:
+                statuses = {
+                    task["id"]: task
+                    for task in _list_customer_tasks(self.customer_uuid)
+                    if task.get("id") in task_uuids
+                }
+            except Exception:
+                # the per-task requests below still cover every task
+                statuses = {}
+
+        for task_uuid in task_uuids:
+            if task_uuid not in statuses:
+                statuses[task_uuid] = _get_task_status(self.customer_uuid, task_uuid)
+        return statuses
+
+    def _poll_loop(self):
+        poll_errors = 0
+        while True:
+            with self._lock:
+                task_uuids = list(self._tasks)
+                if not task_uuids:
+                    self._thread = None
+                    return
+
+            try:
+                statuses = self._fetch_statuses(task_uuids)
+            except Exception as poll_error:
+                poll_errors += 1
+                if poll_errors < self.max_poll_errors:
+                    # the tasks keep running in YBA; poll again, less often
+                    time.sleep(
+                        min(
+                            self.poll_interval * 2**poll_errors,
+                            self.max_poll_backoff,
+                        )
+                    )
+                    continue
+                for task_uuid in task_uuids:
+                    self._finish(
+                        task_uuid,
+                        error=RuntimeError(
+                            f"ERROR: failed to get the status of '{self._tasks[task_uuid]['friendly_name']}' (task='{task_uuid}') {poll_errors} times in a row; it may still be running: {poll_error}"
+                        ),
+                    )
+                poll_errors = 0
+                continue
+            poll_errors = 0
+
+            for task_uuid in task_uuids:
+                task = self._tasks[task_uuid]
+                task_status = statuses[task_uuid]
+                status = task_status.get("status")
+                if status is None:
+                    self._finish(
+                        task_uuid,
+                        error=RuntimeError(
+                            f"ERROR: the task '{task['friendly_name']}' (task='{task_uuid}') cannot be found: {task_status}"
+                        ),
+                    )
+                    continue
+
+                event = {
+                    "task_uuid": task_uuid,
+                    "friendly_name": task["friendly_name"],
+                    "status": status,
+                    "percent": task_status.get(
+                        "percent", task_status.get("percentComplete", 0)
+                    ),
+                }
+                for listener in list(task["listeners"]):
+                    listener.put(event)
+
+                if status == "Success":
+                    self._finish(task_uuid, result=task_status)
+                elif status in FINISHED_STATUSES:
+                    self._finish(
+                        task_uuid,
+                        error=TaskFailedError(
+                            get_task_failure_message(
+                                self.customer_uuid, task_uuid, task["friendly_name"]
+                            ),
+                            status,
+                        ),
+                    )
+
+            with self._lock:
+                if not self._tasks:
+                    self._thread = None
+                    return
+            time.sleep(self.poll_interval)
+
+    def _finish(self, task_uuid, result=None, error=None):
+        with self._lock:
+            task = self._tasks.pop(task_uuid)
+        if error is not None:
+            # listeners still waiting need a final event to stop
+            for listener in task["listeners"]:
+                listener.put(
+                    {
+                        "task_uuid": task_uuid,
+                        "friendly_name": task["friendly_name"],
+                        "status": "Failure",
+                        "percent": None,
+                    }
+                )
+            task["future"].set_exception(error)
+        else:
+            task["future"].set_result(result)
+
+
+_task_trackers = {}
+_task_trackers_lock = threading.Lock()
+
+
+def get_task_tracker(customer_uuid: str, poll_interval=2) -> TaskTracker:
+    """
+    Returns the task tracker shared by everything in this process that waits on tasks for a customer.
+
+    :param customer_uuid: str - the customer UUID
+    :param poll_interval: float - seconds between polls, used when the tracker is first created; default 2
+    :return: TaskTracker
+    """
+    with _task_trackers_lock:
+        if customer_uuid not in _task_trackers:
+            _task_trackers[customer_uuid] = TaskTracker(customer_uuid, poll_interval)
+        return _task_trackers[customer_uuid]
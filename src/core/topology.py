@@ -0,0 +1,319 @@
+import os
+import sqlite3
+import threading
+import time
+
+from core.internal_rest_apis import _list_all_universes
+from includes.get_state_dir import get_state_dir
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS universes (
+    customer_uuid TEXT NOT NULL,
+    universe_uuid TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (customer_uuid, universe_uuid)
+);
+CREATE INDEX IF NOT EXISTS universes_by_name ON universes (customer_uuid, name);
+CREATE TABLE IF NOT EXISTS dr_links (
+    customer_uuid TEXT NOT NULL,
+    dr_config_uuid TEXT NOT NULL,
+    universe_uuid TEXT NOT NULL,
+    role TEXT NOT NULL,
+    PRIMARY KEY (customer_uuid, dr_config_uuid, role)
+);
+CREATE INDEX IF NOT EXISTS dr_links_by_universe ON dr_links (customer_uuid, universe_uuid);
+CREATE TABLE IF NOT EXISTS refreshes (
+    customer_uuid TEXT PRIMARY KEY,
+    refreshed_at REAL,
+    claimed_at REAL
+);
+"""
+
+# a refresh claimed by another process longer ago than this is assumed to have died
+REFRESH_CLAIM_SECONDS = 60
+
+_background_refreshes = set()
+_background_refreshes_lock = threading.Lock()
+
+# lookups already answered by this process (e.g. in the shell), until the TTL or an invalidation
+_memo = {}
+_memo_lock = threading.Lock()
+
+
+def get_topology_ttl() -> float:
+    """
+    Returns the seconds after which the index is refreshed (env TOPOLOGY_TTL; default 300).
+    """
+    return float(os.getenv("TOPOLOGY_TTL", 300))
+
+
+def _connect() -> sqlite3.Connection:
+    # WAL lets concurrent commands (e.g. cron jobs) read while one of them refreshes
+    connection = sqlite3.connect(get_state_dir() / "topology.db", timeout=30)
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def refresh_topology(customer_uuid: str, universes=None) -> dict:
+    """
+    Refreshes the index from one list of all universes. Only rows that changed are written.
+
+    :param customer_uuid: str - the customer UUID
+    :param universes: list<json<UniverseResp>> - the universes, if already listed (optional)
+    :return: dict - the number of universes and DR links added/updated and removed
+    """
+    if universes is None:
+        universes = _list_all_universes(customer_uuid)
+
+    listed_universes = {
+        universe["universeUUID"]: universe["name"] for universe in universes
+    }
+    listed_dr_links = {}
+    for universe in universes:
+        for dr_config_uuid in universe.get("drConfigUuidsAsSource", []):
+            listed_dr_links[(dr_config_uuid, "source")] = universe["universeUUID"]
+        for dr_config_uuid in universe.get("drConfigUuidsAsTarget", []):
+            listed_dr_links[(dr_config_uuid, "target")] = universe["universeUUID"]
+
+    with _connect() as connection:
+        indexed_universes = dict(
+            connection.execute(
+                "SELECT universe_uuid, name FROM universes WHERE customer_uuid = ?",
+                (customer_uuid,),
+            )
+        )
+        indexed_dr_links = {
+            (dr_config_uuid, role): universe_uuid
+            for dr_config_uuid, role, universe_uuid in connection.execute(
+                "SELECT dr_config_uuid, role, universe_uuid FROM dr_links WHERE customer_uuid = ?",
+                (customer_uuid,),
+            )
+        }
+
+        upserted_universes = listed_universes.items() - indexed_universes.items()
+        removed_universes = indexed_universes.keys() - listed_universes.keys()
+        upserted_dr_links = listed_dr_links.items() - indexed_dr_links.items()
+        removed_dr_links = indexed_dr_links.keys() - listed_dr_links.keys()
+
+        connection.executemany(
+            "INSERT OR REPLACE INTO universes VALUES (?, ?, ?)",
+            [
+                (customer_uuid, universe_uuid, name)
+                for universe_uuid, name in upserted_universes
+            ],
+        )
+        connection.executemany(
+            "DELETE FROM universes WHERE customer_uuid = ? AND universe_uuid = ?",
+            [(customer_uuid, universe_uuid) for universe_uuid in removed_universes],
+        )
+        connection.executemany(
+            "INSERT OR REPLACE INTO dr_links VALUES (?, ?, ?, ?)",
+            [
+                (customer_uuid, dr_config_uuid, universe_uuid, role)
+                for (dr_config_uuid, role), universe_uuid in upserted_dr_links
+            ],
+        )
+        connection.executemany(
+            "DELETE FROM dr_links WHERE customer_uuid = ? AND dr_config_uuid = ? AND role = ?",
+            [
+                (customer_uuid, dr_config_uuid, role)
+                for dr_config_uuid, role in removed_dr_links
+            ],
+        )
+        connection.execute(
+            "INSERT OR REPLACE INTO refreshes VALUES (?, ?, NULL)",
+            (customer_uuid, time.time()),
+        )
+    connection.close()
+    _forget_lookups(customer_uuid)
+
+    return {
+        "universesUpserted": len(upserted_universes),
+        "universesRemoved": len(removed_universes),
+        "drLinksUpserted": len(upserted_dr_links),
+        "drLinksRemoved": len(removed_dr_links),
+    }
+
+
+def _forget_lookups(customer_uuid: str):
+    with _memo_lock:
+        for key in [key for key in _memo if key[0] == customer_uuid]:
+            del _memo[key]
+
+
+def invalidate_topology(customer_uuid: str):
+    """
+    Marks the index as out of date, so the next lookup refreshes it first. Called after commands that change DR configs.
+    """
+    _forget_lookups(customer_uuid)
+    try:
+        with _connect() as connection:
+            connection.execute(
+                "DELETE FROM refreshes WHERE customer_uuid = ?", (customer_uuid,)
+            )
+        connection.close()
+    except sqlite3.Error:
+        # lookups fall back to YBA when the index cannot be read either
+        pass
+
+
+def _claim_refresh(customer_uuid: str) -> bool:
+    # only one process refreshes a stale index at a time
+    now = time.time()
+    with _connect() as connection:
+        claimed = connection.execute(
+            "UPDATE refreshes SET claimed_at = ? WHERE customer_uuid = ? AND (claimed_at IS NULL OR claimed_at < ?)",
+            (now, customer_uuid, now - REFRESH_CLAIM_SECONDS),
+        ).rowcount
+    connection.close()
+    return claimed == 1
+
+
+def _refresh_in_background(customer_uuid: str):
+    with _background_refreshes_lock:
+        if customer_uuid in _background_refreshes:
+            return
+        _background_refreshes.add(customer_uuid)
+
+    def run_refresh():
+        try:
+            if _claim_refresh(customer_uuid):
+                refresh_topology(customer_uuid)
+        except Exception:
+            # the stale index stays in use; the next command tries again
+            pass
+        finally:
+            with _background_refreshes_lock:
+                _background_refreshes.discard(customer_uuid)
+
+    threading.Thread(target=run_refresh, name="topology-refresh", daemon=True).start()
+
+
+def _ensure_fresh(customer_uuid: str):
+    with _connect() as connection:
+        row = connection.execute(
+            "SELECT refreshed_at FROM refreshes WHERE customer_uuid = ?",
+            (customer_uuid,),
+        ).fetchone()
+    connection.close()
+
+    if row is None or row[0] is None:
+        # never built, or invalidated: the answer must come from a fresh list
+        refresh_topology(customer_uuid)
+    elif time.time() - row[0] > get_topology_ttl():
+        # stale: answer from the index while it refreshes
+        _refresh_in_background(customer_uuid)
+
+
+def _query(customer_uuid: str, sql: str, parameters: tuple) -> list:
+    """
+    Runs a lookup against the index, refreshing it as needed. Returns None if the index cannot be used, so callers fall back to YBA.
+
+    Lookups that found something are remembered by the process for the TTL, so a long-running process (the shell) does not repeat them.
+    """
+    key = (customer_uuid, sql, parameters)
+    with _memo_lock:
+        memo = _memo.get(key)
+    if memo is not None and time.monotonic() - memo[0] < get_topology_ttl():
+        return memo[1]
+
+    try:
+        _ensure_fresh(customer_uuid)
+        with _connect() as connection:
+            rows = connection.execute(sql, (customer_uuid,) + parameters).fetchall()
+        connection.close()
+    except Exception:
+        # the index is only a shortcut; YBA still has every answer
+        return None
+
+    if rows:
+        with _memo_lock:
+            _memo[key] = (time.monotonic(), rows)
+    return rows
+
+
+def lookup_universe_uuid(customer_uuid: str, universe_name: str):
+    """
+    :return: str - the universe's UUID, or None if it is not in the index
+    """
+    rows = _query(
+        customer_uuid,
+        "SELECT universe_uuid FROM universes WHERE customer_uuid = ? AND name = ?",
+        (universe_name,),
+    )
+    return rows[0][0] if rows else None
+
+
+def lookup_universe_name(customer_uuid: str, universe_uuid: str):
+    """
+    :return: str - the universe's name, or None if it is not in the index
+    """
+    rows = _query(
+        customer_uuid,
+        "SELECT name FROM universes WHERE customer_uuid = ? AND universe_uuid = ?",
+        (universe_uuid,),
+    )
+    return rows[0][0] if rows else None
+
+
+def lookup_dr_roles(customer_uuid: str, universe_name: str):
+    """
+    Returns the DR config UUIDs of a universe, the way drConfigUuidsAsSource and drConfigUuidsAsTarget list them.
+
+    :return: dict - the universeUUID and lists of DR config UUIDs as source and as target, or None if the universe is not in the index
+    """
+    rows = _query(
+        customer_uuid,
+        """
+        SELECT universes.universe_uuid, dr_links.dr_config_uuid, dr_links.role
+        FROM universes LEFT JOIN dr_links
+          ON dr_links.customer_uuid = universes.customer_uuid
+         AND dr_links.universe_uuid = universes.universe_uuid
+        WHERE universes.customer_uuid = ? AND universes.name = ?
+        ORDER BY dr_links.dr_config_uuid
+        """,
+        (universe_name,),
+    )
+    if not rows:
+        return None
+
+    roles = {
+        "universeUUID": rows[0][0],
+        "drConfigUuidsAsSource": [],
+        "drConfigUuidsAsTarget": [],
+    }
+    for _, dr_config_uuid, role in rows:
+        if role == "source":
+            roles["drConfigUuidsAsSource"].append(dr_config_uuid)
+        elif role == "target":
+            roles["drConfigUuidsAsTarget"].append(dr_config_uuid)
+    return roles
+
+
+def lookup_dr_pair(customer_uuid: str, dr_config_uuid: str):
+    """
+    :return: tuple<str, str> - the names of the primary (source) and replica (target) universes of a DR config, or None if it is not in the index
+    """
+    rows = _query(
+        customer_uuid,
+        """
+        SELECT source.name, target.name
+        FROM dr_links source_link
+        JOIN dr_links target_link
+          ON target_link.customer_uuid = source_link.customer_uuid
+         AND target_link.dr_config_uuid = source_link.dr_config_uuid
+         AND target_link.role = 'target'
+        JOIN universes source
+          ON source.customer_uuid = source_link.customer_uuid
+         AND source.universe_uuid = source_link.universe_uuid
+        JOIN universes target
+          ON target.customer_uuid = target_link.customer_uuid
+         AND target.universe_uuid = target_link.universe_uuid
+        WHERE source_link.customer_uuid = ? AND source_link.dr_config_uuid = ?
+          AND source_link.role = 'source'
+        """,
+        (dr_config_uuid,),
+    )
+    return tuple(rows[0]) if rows else None
@@ -0,0 +1,184 @@
+import atexit
+import os
+import threading
+
+from contextlib import contextmanager
+
+from includes.structured_logging import get_logger
+
+logger = get_logger("ysql")
+
+# Connections to the YSQL API of universes, for the commands that run SQL
+# (DDL, checks). psycopg2 is optional: only these commands need it, so it is
+# imported when a pool is first made.
+
+
+def get_ysql_settings() -> dict:
+    """
+    Returns the YSQL connection settings. Each can be set in the environment or in the configuration file passed with --config.
+
+    - YSQL_USER: the database user; default yugabyte
+    - YSQL_PASSWORD: its password (optional)
+    - YSQL_PORT: the YSQL port of the nodes; default 5433
+    - YSQL_SSLMODE: the libpq sslmode; default prefer
+    - YSQL_SSLROOTCERT: the CA certificate, for sslmode verify-ca or verify-full (optional)
+    - YSQL_CONNECT_TIMEOUT: seconds to wait for a connection; default 10
+    - YSQL_POOL_SIZE: the most connections to one database of a universe; default 4
+    """
+    return {
+        "user": os.getenv("YSQL_USER", "yugabyte"),
+        "password": os.getenv("YSQL_PASSWORD"),
+        "port": int(os.getenv("YSQL_PORT", 5433)),
+        "sslmode": os.getenv("YSQL_SSLMODE", "prefer"),
+        "sslrootcert": os.getenv("YSQL_SSLROOTCERT"),
+        "connect_timeout": int(os.getenv("YSQL_CONNECT_TIMEOUT", 10)),
+        "pool_size": int(os.getenv("YSQL_POOL_SIZE", 4)),
+    }
+
+
+def _import_psycopg2():
+    try:
+        import psycopg2
+        import psycopg2.pool
+    except ImportError:
+        raise RuntimeError(
+            "ERROR: this command connects to YSQL and needs psycopg2; install it with 'pip install psycopg2-binary'."
+        )
+    return psycopg2
+
+
+class YsqlPool:
+    """
+    A pool of connections to one database. Connections are opened when first needed, kept for reuse, and replaced when they break; when all of them are in use, callers wait for one.
+    """
+
+    def __init__(self, connect_kwargs: dict, max_connections=4):
+        """
+        :param connect_kwargs: dict - libpq connection parameters (host, port, dbname, user, ...)
+        :param max_connections: int - the most connections open at once; default 4
+        """
+        psycopg2 = _import_psycopg2()
+        self.connect_kwargs = connect_kwargs
+        self._errors = (psycopg2.OperationalError, psycopg2.InterfaceError)
+        self._pool = psycopg2.pool.ThreadedConnectionPool(
+            0, max_connections, **connect_kwargs
+        )
+        # ThreadedConnectionPool fails when it is exhausted; waiting is what callers want
+        self._slots = threading.BoundedSemaphore(max_connections)
+
+    @contextmanager
+    def connection(self):
+        """
+        Lends a connection in autocommit mode, as YSQL runs DDL outside transactions.
+        """
+        with self._slots:
+            try:
+                connection = self._pool.getconn()
+            except self._errors as e:
+                raise RuntimeError(
+                    f"ERROR: failed to connect to YSQL at {self.connect_kwargs.get('host')}: {str(e).strip()}"
+                )
+            try:
+                connection.autocommit = True
+                yield connection
+            except self._errors:
+                connection.close()
+                raise
+            finally:
+                self._pool.putconn(connection, close=bool(connection.closed))
+
+    def query(self, statement: str, params=None) -> list:
+        """
+        :return: list<tuple> - the rows of a query
+        """
+        with self.connection() as connection, connection.cursor() as cursor:
+            cursor.execute(statement, params)
+            return cursor.fetchall()
+
+    def execute_all(self, statements: list):
+        """
+        Runs statements in order on one connection, stopping at the first that fails.
+        """
+        with self.connection() as connection, connection.cursor() as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+
+    def close(self):
+        self._pool.closeall()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def quote_identifier(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def get_ysql_hosts(universe) -> list:
+    """
+    :param universe: Universe - the universe
+    :return: list<str> - the addresses of the live nodes of its primary cluster
+    """
+    primary_cluster = universe.primary_cluster
+    return [
+        node.private_ip
+        for node in universe.nodes
+        if node.state == "Live"
+        and node.private_ip
+        and (primary_cluster is None or node.placement_uuid == primary_cluster.uuid)
+    ]
+
+
+def get_ysql_pool(universe, database: str, max_connections=None) -> YsqlPool:
+    """
+    Returns the pool of connections to a database of a universe, made on first use and kept for the process (so commands run in the shell reuse it). libpq is given every live node, and connects to the first that answers.
+
+    :param universe: Universe - the universe
+    :param database: str - the database (YSQL keyspace)
+    :param max_connections: int - the size of the pool, if it is made now; default YSQL_POOL_SIZE
+    :raises RuntimeError: if the universe has no live node
+    """
+    key = (universe.universe_uuid, database)
+    with _pools_lock:
+        if key not in _pools:
+            hosts = get_ysql_hosts(universe)
+            if not hosts:
+                raise RuntimeError(
+                    f"ERROR: the universe '{universe.name}' has no live node to connect to."
+                )
+            settings = get_ysql_settings()
+            connect_kwargs = {
+                "host": ",".join(hosts),
+                "port": settings["port"],
+                "dbname": database,
+                "user": settings["user"],
+                "sslmode": settings["sslmode"],
+                "connect_timeout": settings["connect_timeout"],
+                "application_name": "yb_day2ops",
+            }
+            for name in ("password", "sslrootcert"):
+                if settings[name]:
+                    connect_kwargs[name] = settings[name]
+            logger.debug(
+                "ysql pool",
+                extra={
+                    "fields": {
+                        "universe": universe.name,
+                        "database": database,
+                        "hosts": hosts,
+                    }
+                },
+            )
+            _pools[key] = YsqlPool(
+                connect_kwargs, max_connections or settings["pool_size"]
+            )
+        return _pools[key]
+
+
+@atexit.register
+def close_ysql_pools():
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.close()
+        _pools.clear()
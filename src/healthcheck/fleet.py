@@ -0,0 +1,215 @@
+import json
+import tabulate
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from core.internal_rest_apis import (
+    _get_universe_by_name,
+    _get_xcluster_dr_configs,
+    _get_xcluster_dr_safetime,
+    _list_all_universes,
+)
+from core.models import DrConfig, Universe
+from core.topology import refresh_topology
+
+
+def check_universe(customer_uuid: str, universe: Universe, max_lag_ms=30000) -> dict:
+    """
+    Runs the healthchecks for one universe: live node count vs expected, AZ spread vs replication factor, DR role, DR state and safetime lag.
+
+    :param customer_uuid: str - the customer UUID
+    :param universe: Universe - the universe to check
+    :param max_lag_ms: float - the safetime lag above which a DR source is reported; default 30000
+    :return: dict - the check results, with a list of problems found
+    """
+    problems = []
+
+    # node count vs expected
+
+    expected_nodes = sum(cluster.num_nodes for cluster in universe.clusters)
+    live_nodes = sum(1 for node in universe.nodes if node.state == "Live")
+    if live_nodes < expected_nodes:
+        problems.append(f"{live_nodes} of {expected_nodes} nodes live")
+
+    # AZ spread of the primary cluster vs its replication factor
+
+    primary_cluster = universe.primary_cluster
+    replication_factor = primary_cluster.replication_factor if primary_cluster else None
+    primary_cluster_uuid = primary_cluster.uuid if primary_cluster else None
+    primary_azs = {
+        node.az
+        for node in universe.nodes
+        if (node.placement_uuid or primary_cluster_uuid) == primary_cluster_uuid
+    }
+    if replication_factor and len(primary_azs) < replication_factor:
+        problems.append(
+            f"{len(primary_azs)} AZs for replication factor {replication_factor}"
+        )
+
+    # DR role, state and lag
+
+    if universe.dr_config_uuids_as_source:
+        dr_role = "source"
+        dr_config_uuid = universe.dr_config_uuids_as_source[0]
+    elif universe.dr_config_uuids_as_target:
+        dr_role = "target"
+        dr_config_uuid = universe.dr_config_uuids_as_target[0]
+    else:
+        dr_role = ""
+        dr_config_uuid = None
+
+    dr_state = dr_status = paused = max_lag = None
+    if dr_config_uuid is not None:
+        dr_config = DrConfig.from_json(
+            _get_xcluster_dr_configs(customer_uuid, dr_config_uuid)
+        )
+        dr_state = dr_config.state
+        dr_status = dr_config.status
+        paused = dr_config.paused
+        if dr_state != "Replicating":
+            problems.append(f"DR state is {dr_state}")
+        if paused:
+            problems.append("DR is paused")
+
+        # lag is measured once per pair, from the source side
+        if dr_role == "source":
+            safetimes = _get_xcluster_dr_safetime(customer_uuid, dr_config_uuid)[
+                "safetimes"
+            ]
+            if safetimes:
+                max_lag = max(entry["safetimeLagUs"] for entry in safetimes) / 1000
+                if max_lag > max_lag_ms:
+                    problems.append(f"safetime lag {max_lag:.0f} ms")
+
+    return {
+        "name": universe.name,
+        "universeUUID": universe.universe_uuid,
+        "liveNodes": live_nodes,
+        "expectedNodes": expected_nodes,
+        "azs": len(primary_azs),
+        "replicationFactor": replication_factor,
+        "drRole": dr_role,
+        "drConfigUuid": dr_config_uuid,
+        "drState": dr_state,
+        "drStatus": dr_status,
+        "paused": paused,
+        "maxSafetimeLagMs": max_lag,
+        "status": "WARN" if problems else "OK",
+        "problems": problems,
+    }
+
+
+def check_fleet(
+    customer_uuid: str, universe_names=None, concurrency=8, max_lag_ms=30000
+) -> dict:
+    """
+    Runs the healthchecks for every universe (or the named ones) in a worker pool, so the fleet takes roughly as long as its slowest universe.
+
+    :param customer_uuid: str - the customer UUID
+    :param universe_names: list<str> - the universes to check; default None (all universes, from one list call)
+    :param concurrency: int - the maximum number of universes checked at once; default 8
+    :param max_lag_ms: float - the safetime lag above which a DR source is reported; default 30000
+    :return: dict - the report, with one result per universe
+    """
+    start_time = time.monotonic()
+
+    # named universes are looked up inside the pool; otherwise one call lists them all
+    if universe_names:
+        universes = universe_names
+    else:
+        universes_json = _list_all_universes(customer_uuid)
+        try:
+            refresh_topology(customer_uuid, universes_json)
+        except Exception:
+            # the index is only a shortcut for later commands
+            pass
+        # keep only the fields the checks read while the pool runs
+        universes = [Universe.from_json(universe) for universe in universes_json]
+        del universes_json
+
+    def run_check(universe):
+        universe_name = universe if isinstance(universe, str) else universe.name
+        try:
+            if isinstance(universe, str):
+                universe_json = next(
+                    iter(_get_universe_by_name(customer_uuid, universe_name)), None
+                )
+                if universe_json is None:
+                    raise RuntimeError(
+                        f"ERROR: the universe '{universe_name}' was not found."
+                    )
+                universe = Universe.from_json(universe_json)
+            return check_universe(customer_uuid, universe, max_lag_ms)
+        except Exception as e:
+            # one failing universe should not hide the results of the others
+            return {
+                "name": universe_name,
+                "status": "ERROR",
+                "problems": [f"check failed: {e}"],
+            }
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        results = list(pool.map(run_check, universes))
+
+    return {
+        "time": datetime.now(timezone.utc).isoformat(),
+        "elapsedSeconds": round(time.monotonic() - start_time, 3),
+        "universes": sorted(results, key=lambda result: result["name"]),
+    }
+
+
+def format_fleet_report(report: dict) -> str:
+    """
+    Formats the result of check_fleet as a summary table.
+    """
+    rows = [
+        [
+            result["status"],
+            result["name"],
+            (
+                f"{result['liveNodes']}/{result['expectedNodes']}"
+                if "liveNodes" in result
+                else ""
+            ),
+            (
+                f"{result['azs']} (RF {result['replicationFactor']})"
+                if "azs" in result
+                else ""
+            ),
+            result.get("drRole") or "",
+            result.get("drState") or "",
+            "" if result.get("paused") is None else result["paused"],
+            result.get("maxSafetimeLagMs"),
+            "; ".join(result["problems"]),
+        ]
+        for result in report["universes"]
+    ]
+
+    return tabulate.tabulate(
+        rows,
+        headers=(
+            "status",
+            "universe",
+            "live nodes",
+            "AZs",
+            "DR role",
+            "DR state",
+            "paused",
+            "max lag (ms)",
+            "problems",
+        ),
+        tablefmt="rounded_grid",
+        floatfmt=".3f",
+        showindex=False,
+    )
+
+
+def write_fleet_report(report: dict, report_file_name: str):
+    """
+    Saves the result of check_fleet as json.
+    """
+    with open(report_file_name, "w") as file:
+        file.write(json.dumps(report, indent=4))
+    print(f"Healthcheck report written to {report_file_name}")
@@ -1,14 +1,132 @@
+import plotly
 import plotly.graph_objects as pgo
-import json
+import plotly.colors
 import networkx as nx
-import random
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from itertools import combinations
+from pathlib import Path
 
-from core.internal_rest_apis import _get_universe_by_name, _get_region_metadata
-from core.map_functions import center_on_view
+from core.internal_rest_apis import (
+    _get_universe_by_name,
+    _get_region_metadata,
+    _list_all_universes,
+)
+from core.map_functions import center_on_view, spread_around, figure_height_for
+from healthcheck.snapshots import save_snapshot
 
+# spread of AZ markers around their region's coordinates, in degrees
+AZ_SPREAD_DEGREES = 0.05
 
-def get_diagram_map(customer_uuid: str, universe_name: str):
+# spread of individual node markers around their AZ marker, in degrees
+NODE_SPREAD_DEGREES = 0.01
+
+
+def aggregate_nodes_by_az(node_details: list) -> dict:
+    """
+    Groups the nodes of a universe by availability zone. Large universes have many nodes per AZ, so one marker per AZ keeps the map readable.
+
+    :param node_details: list - the nodeDetailsSet of a universe
+    :return: dict<(cloud, region, az), dict> - the cloud, region, az and private_ips of each AZ
+    """
+    az_dict = {}
+
+    for node in node_details:
+        cloud_info = node["cloudInfo"]
+        az_key = (cloud_info["cloud"], cloud_info["region"], cloud_info["az"])
+        az_data = az_dict.setdefault(
+            az_key,
+            {
+                "cloud": cloud_info["cloud"],
+                "region": cloud_info["region"],
+                "az": cloud_info["az"],
+                "private_ips": [],
+            },
+        )
+        az_data["private_ips"].append(cloud_info["private_ip"])
+
+    return az_dict
+
+
+def get_region_metadata_by_cloud(
+    customer_uuid: str, clouds: set, max_workers=8
+) -> dict:
+    """
+    Fetches the region metadata (including longitude and latitude) once per cloud provider, in parallel.
+
+    :param customer_uuid: str - the customer UUID
+    :param clouds: set<str> - the cloud provider codes in use
+    :param max_workers: int - the maximum number of concurrent requests
+    :return: dict<str, dict> - the regionMetadata for each cloud
+    """
+    clouds = sorted(clouds)
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(clouds)))) as pool:
+        responses = pool.map(
+            lambda cloud: _get_region_metadata(customer_uuid, cloud), clouds
+        )
+        return {
+            cloud: response["regionMetadata"]
+            for cloud, response in zip(clouds, responses)
+        }
+
+
+def place_azs(az_dict: dict, region_metadata: dict) -> dict:
+    """
+    Sets the longitude and latitude of each AZ, spread deterministically around its region's coordinates so the AZs of a region don't overlap.
+
+    :param az_dict: dict - the AZs as returned by aggregate_nodes_by_az (updated in place)
+    :param region_metadata: dict - the region metadata as returned by get_region_metadata_by_cloud
+    :return: dict<(cloud, region), list> - the AZ keys of each region
+    """
+    region_az_keys = {}
+    for az_key in sorted(az_dict):
+        region_az_keys.setdefault(az_key[:2], []).append(az_key)
+
+    for (cloud, region), az_keys in region_az_keys.items():
+        cloud_metadata = region_metadata[cloud][region]
+        az_coordinates = spread_around(
+            cloud_metadata["longitude"],
+            cloud_metadata["latitude"],
+            len(az_keys),
+            AZ_SPREAD_DEGREES,
+        )
+        for az_key, (longitude, latitude) in zip(az_keys, az_coordinates):
+            az_dict[az_key]["longitude"] = longitude
+            az_dict[az_key]["latitude"] = latitude
+
+    return region_az_keys
+
+
+def write_figure_html(fig, html_file_name: str, shared_plotlyjs=False):
+    """
+    Saves a figure as an html file.
+
+    By default plotly.js (several megabytes) is embedded in every file. With shared_plotlyjs, the library is written once per output directory, named for the plotly version, and each html file references it.
+
+    :param fig: plotly Figure - the figure to save
+    :param html_file_name: str - the path of the html file
+    :param shared_plotlyjs: bool - reference a shared plotly.js file instead of embedding it
+    """
+    if not shared_plotlyjs:
+        fig.write_html(html_file_name)
+        return
+
+    plotlyjs_file_name = f"plotly-{plotly.__version__}.min.js"
+    plotlyjs_path = Path(html_file_name).parent / plotlyjs_file_name
+    if not plotlyjs_path.exists():
+        plotlyjs_path.write_text(plotly.offline.get_plotlyjs(), encoding="utf-8")
+        print(f"Shared plotly.js written to {plotlyjs_path}")
+
+    fig.write_html(html_file_name, include_plotlyjs=plotlyjs_file_name)
+
+
+def get_diagram_map(
+    customer_uuid: str,
+    universe_name: str,
+    expand_nodes=False,
+    output_dir="/tmp",
+    shared_plotlyjs=False,
+):
 
     # UNIVERSE
     # retrieve info about the universe from various REST APIs
@@ -18,85 +136,86 @@ def get_diagram_map(customer_uuid: str, universe_name: str):
     universe_info = _get_universe_by_name(customer_uuid, universe_name)
     node_details = universe_info[0]["universeDetails"]["nodeDetailsSet"]
 
-    node_dict = {}
-
-    for i, node in enumerate(node_details):
-        node_dict[f"node_{i}"] = {
-            "cloud": node["cloudInfo"]["cloud"],
-            "region": node["cloudInfo"]["region"],
-            "az": node["cloudInfo"]["az"],
-            "private_ip": node["cloudInfo"]["private_ip"],
-        }
+    ## aggregate the nodes by availability zone
+    az_dict = aggregate_nodes_by_az(node_details)
 
     ## get region metadata for this universe, to include longitude and latitude
-    ## transform the lat/long slightly so the servers in a single region don't overlap
-    ## update node dictionary with this long/lat
-    for node_key, node_data in node_dict.items():
-        cloud_metadata = _get_region_metadata(customer_uuid, node_data["cloud"])[
-            "regionMetadata"
-        ][node_data["region"]]
-        node_data["latitude"] = cloud_metadata["latitude"] + random.uniform(0.001, 0.05)
-        node_data["longitude"] = cloud_metadata["longitude"] + random.uniform(
-            0.001, 0.05
-        )
+    ## (one call per cloud provider rather than one per node)
+    region_metadata = get_region_metadata_by_cloud(
+        customer_uuid, {az_data["cloud"] for az_data in az_dict.values()}
+    )
 
-    # NODES
-    # extract node geographical positions for graph
-    # (nodes = database instances in the universe)
+    ## spread the AZs of each region around the region coordinates
+    region_az_keys = place_azs(az_dict, region_metadata)
 
-    ## this includes the node coordinates (longitude, latitude)
-    node_positions = {}
+    # NODES
+    # extract AZ geographical positions for graph
+    # (graph nodes = AZs holding one or more database instances in the universe)
 
+    ## this includes the AZ coordinates (longitude, latitude)
     node_positions = {
-        node_data["az"]: (node_data["longitude"], node_data["latitude"])
-        for node_data in node_dict.values()
+        az_key: (az_data["longitude"], az_data["latitude"])
+        for az_key, az_data in az_dict.items()
     }
 
     # EDGES
     # extract edge endpoint pairs for graph
-    # (edge = network connections between database instances)
-    edge_endpoints = []
+    # (edge = network connections between the regions of the universe)
+
+    ## place each region at the center of its AZs
+    region_positions = {
+        region_key: (
+            sum(node_positions[az_key][0] for az_key in az_keys) / len(az_keys),
+            sum(node_positions[az_key][1] for az_key in az_keys) / len(az_keys),
+        )
+        for region_key, az_keys in region_az_keys.items()
+    }
 
-    az_list = [node_data["az"] for node_data in node_dict.values()]
-    edge_endpoints = [(az_list[i], az_list[i + 1]) for i in range(len(az_list) - 1)]
-    edge_endpoints.append((az_list[-1], az_list[0]))  # add the final edge
+    ## every region replicates with every other region; the graph deduplicates the pairs
+    edge_endpoints = list(combinations(sorted(region_positions), 2))
 
     # GRAPH
 
-    ## create a network graph
+    ## create a network graph of the regions
     G = nx.Graph()
 
-    ## add nodes and edge endpoints (both of which are the AZ names) to graph object
-    G.add_nodes_from(node_positions.keys())
+    ## add regions and edge endpoints to graph object
+    G.add_nodes_from(region_positions.keys())
     G.add_edges_from(edge_endpoints)
 
-    ## get longitude and latitude for node placement
-    node_longitudes = [node_positions[node][0] for node in G.nodes()]
-    node_latitudes = [node_positions[node][1] for node in G.nodes()]
+    ## get longitude and latitude for AZ placement
+    node_longitudes = [position[0] for position in node_positions.values()]
+    node_latitudes = [position[1] for position in node_positions.values()]
 
     ## get longitude and latitude for edge endpoint placement
     edge_longitudes = []
     edge_latitudes = []
     for edge in G.edges():
-        lon0, lat0 = node_positions[edge[0]]
-        lon1, lat1 = node_positions[edge[1]]
+        lon0, lat0 = region_positions[edge[0]]
+        lon1, lat1 = region_positions[edge[1]]
 
-        edge_longitudes.append(lon0)
-        edge_longitudes.append(lon1)
-        edge_longitudes.append(None)
+        edge_longitudes.extend((lon0, lon1, None))
+        edge_latitudes.extend((lat0, lat1, None))
         # 'None' is used to break the line between segments
 
-        edge_latitudes.append(lat0)
-        edge_latitudes.append(lat1)
-        edge_latitudes.append(None)
-
-    ## create the node trace (trace = drawing on the map)
+    ## create the AZ trace (trace = drawing on the map)
+    ## marker size grows with the number of nodes in the AZ
+    node_counts = [len(az_data["private_ips"]) for az_data in az_dict.values()]
     node_trace = pgo.Scattermapbox(
         lon=node_longitudes,
         lat=node_latitudes,
         mode="markers+text",
-        marker=dict(size=10, color="blue"),
-        text=list(G.nodes()),  # display the server names as text
+        marker=dict(size=[10 + 4 * count**0.5 for count in node_counts], color="blue"),
+        text=[
+            f"{az_data['az']} ({len(az_data['private_ips'])})"
+            for az_data in az_dict.values()
+        ],  # display the AZ names and node counts as text
+        hovertext=[
+            f"{az_data['az']} ({az_data['region']}, {az_data['cloud']})<br>"
+            f"{len(az_data['private_ips'])} node(s)<br>"
+            + "<br>".join(sorted(az_data["private_ips"]))
+            for az_data in az_dict.values()
+        ],
         hoverinfo="text",
     )
 
@@ -109,6 +228,36 @@ def get_diagram_map(customer_uuid: str, universe_name: str):
         hoverinfo="none",
     )
 
+    traces = [edge_trace, node_trace]
+
+    ## optionally draw each node around its AZ marker
+    if expand_nodes:
+        expanded_longitudes = []
+        expanded_latitudes = []
+        expanded_text = []
+        for az_key, az_data in az_dict.items():
+            private_ips = sorted(az_data["private_ips"])
+            node_coordinates = spread_around(
+                az_data["longitude"],
+                az_data["latitude"],
+                len(private_ips),
+                NODE_SPREAD_DEGREES,
+            )
+            expanded_longitudes.extend(position[0] for position in node_coordinates)
+            expanded_latitudes.extend(position[1] for position in node_coordinates)
+            expanded_text.extend(f"{ip} ({az_data['az']})" for ip in private_ips)
+
+        traces.append(
+            pgo.Scattermapbox(
+                lon=expanded_longitudes,
+                lat=expanded_latitudes,
+                mode="markers",
+                marker=dict(size=6, color="orange"),
+                text=expanded_text,
+                hoverinfo="text",
+            )
+        )
+
     ## create the Mapbox figure
     ## center_on_view helps to center and zoom on the bounding box of the universe
     average_latitude, average_longitude, calculated_zoom = center_on_view(
@@ -119,11 +268,12 @@ def get_diagram_map(customer_uuid: str, universe_name: str):
     display_time = current_time.strftime("%Y-%m-%d %H:%M:%S")
 
     fig = pgo.Figure(
-        data=[edge_trace, node_trace],
+        data=traces,
         layout=pgo.Layout(
-            title=f"YugabyteDB node distribution for {universe_name} {display_time}",
+            title=f"YugabyteDB node distribution for {universe_name} {display_time} ({len(node_details)} nodes in {len(az_dict)} AZs)",
             showlegend=False,
             hovermode="closest",
+            height=figure_height_for(len(az_dict)),
             margin=dict(b=0, l=0, r=0, t=40),
             mapbox=dict(
                 style="open-street-map",  # see https://docs.mapbox.com/mapbox-gl-js/guides/styles/
@@ -141,17 +291,202 @@ def get_diagram_map(customer_uuid: str, universe_name: str):
     ## get timestamp for universe details and mapbox html files
     file_time = current_time.strftime("%Y%m%d_%H:%M:%S")
 
-    ## save the full node details to a file
-    details_file_name = f"/tmp/{universe_name}-{file_time}"
-
-    with open(details_file_name, "w") as file:
-        file.write(json.dumps(universe_info, indent=4))
-    print(f"Universe details written to {details_file_name}")
+    ## save the full node details to the snapshot store
+    ## (unchanged universes reuse the stored snapshot)
+    digest, changed = save_snapshot(universe_name, universe_info)
+    print(
+        f"Universe details saved as snapshot {digest[:12]}"
+        + ("" if changed else " (unchanged since the last snapshot)")
+    )
 
     ## save the mapbox as an html file
-    html_file_name = f"/tmp/{universe_name}-{file_time}.html"
-    fig.write_html(html_file_name)
+    html_file_name = f"{output_dir}/{universe_name}-{file_time}.html"
+    write_figure_html(fig, html_file_name, shared_plotlyjs)
     print(f"Network diagram saved to {html_file_name}")
 
     ## alternatively immediately open figure in the default browser
     # fig.show()
+
+
+def get_fleet_diagram_map(
+    customer_uuid: str,
+    universe_names=None,
+    output_dir="/tmp",
+    shared_plotlyjs=False,
+    max_workers=8,
+):
+    """
+    Creates one diagram of many universes, with their xCluster DR links.
+
+    :param customer_uuid: str - the customer UUID
+    :param universe_names: list<str> - the universes to include; default None (all universes)
+    :param output_dir: str - the directory for the html file; default /tmp
+    :param shared_plotlyjs: bool - reference a shared plotly.js file instead of embedding it
+    :param max_workers: int - the maximum number of concurrent requests to YBA
+    :return: str - the path of the html file
+    """
+
+    # UNIVERSES
+    # one list call covers the fleet; named universes are fetched in parallel
+
+    if universe_names:
+        with ThreadPoolExecutor(
+            max_workers=max(1, min(max_workers, len(universe_names)))
+        ) as pool:
+            responses = pool.map(
+                lambda name: _get_universe_by_name(customer_uuid, name),
+                universe_names,
+            )
+            universes = []
+            for universe_name, response in zip(universe_names, responses):
+                universe = next(iter(response), None)
+                if universe is None:
+                    raise RuntimeError(
+                        f"ERROR: the universe '{universe_name}' was not found."
+                    )
+                universes.append(universe)
+    else:
+        universes = _list_all_universes(customer_uuid)
+
+    if not universes:
+        raise RuntimeError("ERROR: no universes were found.")
+
+    universe_az_dicts = {
+        universe["universeUUID"]: aggregate_nodes_by_az(
+            universe["universeDetails"]["nodeDetailsSet"]
+        )
+        for universe in universes
+    }
+    if not any(universe_az_dicts.values()):
+        raise RuntimeError("ERROR: none of the universes has nodes to show.")
+
+    region_metadata = get_region_metadata_by_cloud(
+        customer_uuid,
+        {
+            az_data["cloud"]
+            for az_dict in universe_az_dicts.values()
+            for az_data in az_dict.values()
+        },
+        max_workers,
+    )
+
+    # NODES
+    # one trace per universe, one marker per AZ
+
+    colors = plotly.colors.qualitative.Plotly
+    traces = []
+    universe_positions = {}
+    all_longitudes = []
+    all_latitudes = []
+
+    for i, universe in enumerate(universes):
+        az_dict = universe_az_dicts[universe["universeUUID"]]
+        if not az_dict:
+            continue
+        place_azs(az_dict, region_metadata)
+
+        longitudes = [az_data["longitude"] for az_data in az_dict.values()]
+        latitudes = [az_data["latitude"] for az_data in az_dict.values()]
+        all_longitudes.extend(longitudes)
+        all_latitudes.extend(latitudes)
+
+        ## DR links are drawn between the centers of the universes
+        universe_positions[universe["universeUUID"]] = (
+            sum(longitudes) / len(longitudes),
+            sum(latitudes) / len(latitudes),
+        )
+
+        traces.append(
+            pgo.Scattermapbox(
+                lon=longitudes,
+                lat=latitudes,
+                mode="markers",
+                name=universe["name"],
+                marker=dict(
+                    size=[
+                        10 + 4 * len(az_data["private_ips"]) ** 0.5
+                        for az_data in az_dict.values()
+                    ],
+                    color=colors[i % len(colors)],
+                ),
+                hovertext=[
+                    f"{universe['name']}<br>"
+                    f"{az_data['az']} ({az_data['region']}, {az_data['cloud']})<br>"
+                    f"{len(az_data['private_ips'])} node(s)<br>"
+                    + "<br>".join(sorted(az_data["private_ips"]))
+                    for az_data in az_dict.values()
+                ],
+                hoverinfo="text",
+            )
+        )
+
+    # EDGES
+    # xCluster DR links; the target of a DR config lists it in drConfigUuidsAsTarget
+
+    dr_targets = {
+        dr_config_uuid: universe["universeUUID"]
+        for universe in universes
+        for dr_config_uuid in universe["drConfigUuidsAsTarget"]
+    }
+
+    G = nx.Graph()
+    for universe in universes:
+        for dr_config_uuid in universe["drConfigUuidsAsSource"]:
+            target_uuid = dr_targets.get(dr_config_uuid)
+            if (
+                target_uuid in universe_positions
+                and universe["universeUUID"] in universe_positions
+            ):
+                G.add_edge(universe["universeUUID"], target_uuid)
+
+    edge_longitudes = []
+    edge_latitudes = []
+    for edge in G.edges():
+        lon0, lat0 = universe_positions[edge[0]]
+        lon1, lat1 = universe_positions[edge[1]]
+
+        edge_longitudes.extend((lon0, lon1, None))
+        edge_latitudes.extend((lat0, lat1, None))
+
+    traces.insert(
+        0,
+        pgo.Scattermapbox(
+            lon=edge_longitudes,
+            lat=edge_latitudes,
+            mode="lines",
+            name="xCluster DR",
+            line=dict(width=2, color="DarkSlateGrey"),
+            hoverinfo="none",
+        ),
+    )
+
+    average_latitude, average_longitude, calculated_zoom = center_on_view(
+        all_latitudes, all_longitudes
+    )
+
+    current_time = datetime.now()
+    display_time = current_time.strftime("%Y-%m-%d %H:%M:%S")
+
+    fig = pgo.Figure(
+        data=traces,
+        layout=pgo.Layout(
+            title=f"YugabyteDB fleet: {len(universes)} universes, {G.number_of_edges()} xCluster DR links {display_time}",
+            showlegend=True,
+            hovermode="closest",
+            height=figure_height_for(len(all_longitudes)),
+            margin=dict(b=0, l=0, r=0, t=40),
+            mapbox=dict(
+                style="open-street-map",
+                center=dict(lat=average_latitude, lon=average_longitude),
+                zoom=calculated_zoom,
+            ),
+        ),
+    )
+
+    # OUTPUT
+
+    file_time = current_time.strftime("%Y%m%d_%H:%M:%S")
+    html_file_name = f"{output_dir}/fleet-{file_time}.html"
+    write_figure_html(fig, html_file_name, shared_plotlyjs)
+    print(f"Fleet diagram saved to {html_file_name}")
+    return html_file_name
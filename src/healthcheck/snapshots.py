@@ -0,0 +1,249 @@
+import gzip
+import hashlib
+import json
+import os
+import re
+import tabulate
+
+from datetime import datetime, timezone
+from pathlib import Path
+from urllib.parse import quote
+
+from core.internal_rest_apis import _get_universe_by_name
+
+
+def get_snapshot_dir() -> Path:
+    """
+    Returns the snapshot store directory, from the SNAPSHOT_DIR setting (default /tmp/day2ops-snapshots).
+    """
+    return Path(os.getenv("SNAPSHOT_DIR", "/tmp/day2ops-snapshots"))
+
+
+def canonical_json(data) -> bytes:
+    """
+    Serializes data the same way every time (sorted keys, no whitespace), so equal data has an equal hash.
+    """
+    return json.dumps(data, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def get_ref_path(universe_name: str, store_dir=None) -> Path:
+    """
+    Returns the history file of a universe. The name is percent-encoded, so a name with a / or other special characters stays one file in the refs directory.
+    """
+    return (
+        Path(store_dir or get_snapshot_dir())
+        / "refs"
+        / f"{quote(universe_name, safe='')}.jsonl"
+    )
+
+
+def save_snapshot(universe_name: str, data, store_dir=None) -> tuple:
+    """
+    Stores a universe snapshot compressed and addressed by the SHA-256 of its canonical json. An unchanged universe reuses the stored object and adds no new entry to the universe's history.
+
+    :param universe_name: str - the universe's friendly name
+    :param data: json - the universe details (e.g. the _get_universe_by_name response)
+    :param store_dir: Path - the snapshot store directory; default get_snapshot_dir()
+    :return: tuple<str, bool> - the snapshot digest, and whether the universe changed since its last snapshot
+    """
+    store_dir = Path(store_dir or get_snapshot_dir())
+    content = canonical_json(data)
+    digest = hashlib.sha256(content).hexdigest()
+
+    object_path = store_dir / "objects" / digest[:2] / f"{digest}.json.gz"
+    if not object_path.exists():
+        object_path.parent.mkdir(parents=True, exist_ok=True)
+        # write then rename, so a reader never sees a partial object
+        temporary_path = object_path.with_suffix(f".tmp{os.getpid()}")
+        temporary_path.write_bytes(gzip.compress(content))
+        temporary_path.replace(object_path)
+
+    history = list_snapshots(universe_name, store_dir)
+    changed = not history or history[-1]["digest"] != digest
+    if changed:
+        ref_path = get_ref_path(universe_name, store_dir)
+        ref_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(ref_path, "a") as file:
+            file.write(
+                json.dumps(
+                    {
+                        "digest": digest,
+                        "time": datetime.now(timezone.utc).isoformat(),
+                    }
+                )
+                + "\n"
+            )
+
+    return digest, changed
+
+
+def list_snapshots(universe_name: str, store_dir=None) -> list:
+    """
+    Returns the snapshot history of a universe, oldest first.
+
+    :param universe_name: str - the universe's friendly name
+    :param store_dir: Path - the snapshot store directory; default get_snapshot_dir()
+    :return: list<dict> - the digest and time of each change
+    """
+    ref_path = get_ref_path(universe_name, store_dir)
+    if not ref_path.exists():
+        return []
+    with open(ref_path) as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def load_snapshot(digest: str, store_dir=None):
+    """
+    Loads a snapshot by its digest, or by a unique prefix of at least 4 characters.
+
+    :param digest: str - the snapshot digest or prefix
+    :param store_dir: Path - the snapshot store directory; default get_snapshot_dir()
+    :return: json - the stored universe details
+    :raises RuntimeError: if the id is not 4 to 64 hex digits, or the snapshot is not found, or the prefix is ambiguous
+    """
+    # the id goes into a path and a glob pattern
+    if not re.fullmatch(r"[0-9a-f]{4,64}", digest):
+        raise RuntimeError(
+            f"ERROR: the snapshot id '{digest}' is not 4 to 64 hex digits."
+        )
+
+    object_dir = Path(store_dir or get_snapshot_dir()) / "objects" / digest[:2]
+    matches = sorted(object_dir.glob(f"{digest}*.json.gz"))
+    if len(matches) != 1:
+        raise RuntimeError(
+            f"ERROR: the snapshot '{digest}' was "
+            + ("not found." if not matches else "ambiguous.")
+        )
+
+    return json.loads(gzip.decompress(matches[0].read_bytes()))
+
+
+def _universe_of(snapshot) -> dict:
+    # the diagram stores the _get_universe_by_name response, which is a list
+    return snapshot[0] if isinstance(snapshot, list) else snapshot
+
+
+def _software_version(universe: dict):
+    for cluster in universe.get("universeDetails", {}).get("clusters", []):
+        if cluster.get("clusterType", "PRIMARY") == "PRIMARY":
+            return cluster.get("userIntent", {}).get("ybSoftwareVersion")
+    return None
+
+
+def diff_snapshots(old_snapshot, new_snapshot) -> dict:
+    """
+    Compares two universe snapshots: nodes added or removed, nodes that moved AZ, the software version and the DR config UUIDs.
+
+    :param old_snapshot: json - the older universe details
+    :param new_snapshot: json - the newer universe details
+    :return: dict - the changes found (empty lists/None where nothing changed)
+    """
+    old_universe = _universe_of(old_snapshot)
+    new_universe = _universe_of(new_snapshot)
+
+    old_nodes = {
+        node["nodeName"]: node["cloudInfo"]
+        for node in old_universe["universeDetails"]["nodeDetailsSet"]
+    }
+    new_nodes = {
+        node["nodeName"]: node["cloudInfo"]
+        for node in new_universe["universeDetails"]["nodeDetailsSet"]
+    }
+
+    old_version = _software_version(old_universe)
+    new_version = _software_version(new_universe)
+
+    changes = {
+        "nodes_added": sorted(new_nodes.keys() - old_nodes.keys()),
+        "nodes_removed": sorted(old_nodes.keys() - new_nodes.keys()),
+        "az_moves": [
+            (
+                name,
+                f"{old_nodes[name]['region']}/{old_nodes[name]['az']}",
+                f"{new_nodes[name]['region']}/{new_nodes[name]['az']}",
+            )
+            for name in sorted(old_nodes.keys() & new_nodes.keys())
+            if (old_nodes[name]["region"], old_nodes[name]["az"])
+            != (new_nodes[name]["region"], new_nodes[name]["az"])
+        ],
+        "software_version": (
+            (old_version, new_version) if old_version != new_version else None
+        ),
+    }
+
+    for key in ("drConfigUuidsAsSource", "drConfigUuidsAsTarget"):
+        old_uuids = set(old_universe.get(key, []))
+        new_uuids = set(new_universe.get(key, []))
+        changes[key] = {
+            "added": sorted(new_uuids - old_uuids),
+            "removed": sorted(old_uuids - new_uuids),
+        }
+
+    return changes
+
+
+def format_snapshot_diff(changes: dict) -> str:
+    """
+    Formats the result of diff_snapshots as a table.
+    """
+    rows = [["node added", name, "", ""] for name in changes["nodes_added"]]
+    rows += [["node removed", name, "", ""] for name in changes["nodes_removed"]]
+    rows += [["AZ moved", name, old, new] for name, old, new in changes["az_moves"]]
+    if changes["software_version"]:
+        rows.append(["software version", "", *changes["software_version"]])
+    for key in ("drConfigUuidsAsSource", "drConfigUuidsAsTarget"):
+        rows += [[f"{key} added", uuid, "", ""] for uuid in changes[key]["added"]]
+        rows += [[f"{key} removed", uuid, "", ""] for uuid in changes[key]["removed"]]
+
+    if not rows:
+        return "No changes."
+
+    return tabulate.tabulate(
+        rows,
+        headers=("change", "item", "old", "new"),
+        tablefmt="rounded_grid",
+        showindex=False,
+    )
+
+
+def take_universe_snapshot(customer_uuid: str, universe_name: str) -> str:
+    """
+    Fetches a universe's details and stores them as a snapshot.
+
+    :param customer_uuid: str - the customer UUID
+    :param universe_name: str - the universe's friendly name
+    :return: str - the snapshot digest
+    :raises RuntimeError: if the universe is not found
+    """
+    universe_info = _get_universe_by_name(customer_uuid, universe_name)
+    if not universe_info:
+        raise RuntimeError(f"ERROR: the universe '{universe_name}' was not found.")
+
+    digest, changed = save_snapshot(universe_name, universe_info)
+    print(
+        f"Universe details saved as snapshot {digest[:12]}"
+        + ("" if changed else " (unchanged since the last snapshot)")
+    )
+    return digest
+
+
+def diff_universe_snapshots(universe_name: str, old=None, new=None) -> str:
+    """
+    Compares two snapshots of a universe. By default these are the two most recent.
+
+    :param universe_name: str - the universe's friendly name
+    :param old: str - the older snapshot digest or prefix (optional)
+    :param new: str - the newer snapshot digest or prefix (optional)
+    :return: str - a table of the changes
+    :raises RuntimeError: if there are not enough snapshots to compare
+    """
+    history = [entry["digest"] for entry in list_snapshots(universe_name)]
+    new = new or (history[-1] if history else None)
+    old = old or (history[-2] if len(history) > 1 else None)
+    if old is None or new is None:
+        raise RuntimeError(
+            f"ERROR: the universe '{universe_name}' needs two snapshots to compare; it has {len(history)}."
+        )
+
+    print(f"Comparing snapshot {old[:12]} to {new[:12]}")
+    return format_snapshot_diff(diff_snapshots(load_snapshot(old), load_snapshot(new)))
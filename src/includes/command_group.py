@@ -0,0 +1,13 @@
+from typer.core import TyperGroup
+
+
+class CommandGroup(TyperGroup):
+    """
+    The app's group of commands. It keeps the arguments given to the invoked command in ctx.meta["command_args"], for the hooks of the main callback: in the shell, sys.argv is the shell's and not the command's.
+    """
+
+    def resolve_command(self, ctx, args):
+        cmd_name, cmd, cmd_args = super().resolve_command(ctx, args)
+        # the arguments the invoked command's context is made from
+        ctx.meta["command_args"] = list(cmd_args)
+        return cmd_name, cmd, cmd_args
@@ -0,0 +1,9 @@
+import os
+
+from pathlib import Path
+
+
+def get_state_dir() -> Path:
+    state_dir = Path(os.getenv("DAY2OPS_STATE_DIR", Path.home() / ".yb_day2ops"))
+    state_dir.mkdir(parents=True, exist_ok=True)
+    return state_dir
@@ -1,5 +1,7 @@
 import requests
 
+from core import http_client
+
 
 def suppress_warnings():
     # os.environ['REQUESTS_CA_BUNDLE'] = "./ca_cert.pem"
@@ -20,3 +22,6 @@ def suppress_warnings():
     requests.delete = lambda url, **kwargs: requests.request(
         method="DELETE", url=url, verify=False, **kwargs
     )
+
+    # the pooled session used for YBA requests
+    http_client.session.verify = False
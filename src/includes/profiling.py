@@ -0,0 +1,90 @@
+import cProfile
+import io
+import pstats
+import shlex
+import sys
+import tracemalloc
+
+from datetime import datetime, timezone
+
+# the number of functions or allocation sites shown in the reports
+PROFILE_TOP = 25
+
+
+def get_command_tag(ctx) -> str:
+    """
+    Returns a header naming the command and arguments being profiled, so reports can be attached to tickets. The arguments are the invoked command's (see CommandGroup), so commands run in the shell are tagged with their own and not the shell's.
+
+    :param ctx: typer.Context - the context of the main callback
+    """
+    return (
+        f"command: {ctx.command_path} {ctx.invoked_subcommand}\n"
+        f"arguments: {shlex.join(ctx.meta.get('command_args', []))}\n"
+        f"time: {datetime.now(timezone.utc).isoformat()}\n"
+    )
+
+
+def profile_command(ctx, profile_file_name: str):
+    """
+    Profiles the rest of the command with cProfile. When the command ends, the stats are saved to the file (for pstats or snakeviz) and a report of the slowest functions, tagged with the command, is saved next to it.
+
+    :param ctx: typer.Context - the context of the main callback
+    :param profile_file_name: str - the pstats file to write
+    """
+    profiler = cProfile.Profile()
+    tag = get_command_tag(ctx)
+
+    def write_profile():
+        profiler.disable()
+        profiler.dump_stats(profile_file_name)
+
+        report = io.StringIO()
+        report.write(tag + "\n")
+        pstats.Stats(profiler, stream=report).sort_stats("cumulative").print_stats(
+            PROFILE_TOP
+        )
+        with open(f"{profile_file_name}.txt", "w") as file:
+            file.write(report.getvalue())
+
+        print(
+            f"Profile written to {profile_file_name} (report: {profile_file_name}.txt)",
+            file=sys.stderr,
+        )
+
+    ctx.call_on_close(write_profile)
+    profiler.enable()
+
+
+def trace_command_allocations(ctx):
+    """
+    Traces memory allocations for the rest of the command. When the command ends, the peak traced memory and the top allocation sites, tagged with the command, are printed to stderr.
+
+    :param ctx: typer.Context - the context of the main callback
+    """
+    tag = get_command_tag(ctx)
+
+    def print_allocations():
+        snapshot = tracemalloc.take_snapshot()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        # leave out the allocations of the profilers themselves
+        snapshot = snapshot.filter_traces(
+            (
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, cProfile.__file__),
+                tracemalloc.Filter(False, pstats.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            )
+        )
+        lines = [
+            tag,
+            f"traced memory: {current / 1024:.1f} KiB at the end, {peak / 1024:.1f} KiB at the peak",
+            f"top {PROFILE_TOP} allocation sites:",
+        ]
+        for stat in snapshot.statistics("lineno")[:PROFILE_TOP]:
+            lines.append(f"  {stat}")
+        print("\n".join(lines), file=sys.stderr)
+
+    ctx.call_on_close(print_allocations)
+    tracemalloc.start()
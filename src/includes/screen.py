@@ -0,0 +1,182 @@
+import os
+import select
+import shutil
+import sys
+
+# ANSI escape sequences
+ALTERNATE_SCREEN = "\x1b[?1049h"
+MAIN_SCREEN = "\x1b[?1049l"
+HIDE_CURSOR = "\x1b[?25l"
+SHOW_CURSOR = "\x1b[?25h"
+CLEAR_SCREEN = "\x1b[2J"
+RESET_STYLE = "\x1b[0m"
+
+# the keys read_key returns for the escape sequences of arrow and page keys
+KEY_NAMES = {
+    "\x1b[A": "up",
+    "\x1b[B": "down",
+    "\x1b[5~": "page_up",
+    "\x1b[6~": "page_down",
+    "\x1b[H": "home",
+    "\x1b[F": "end",
+}
+
+
+class Screen:
+    """
+    Draws a title, a table and a footer on the whole terminal. Each frame only rewrites the cells whose text or style changed since the last one, so a large table that barely changes costs a few bytes per frame.
+
+    Column widths only grow, so a value that gets shorter does not shift the columns after it; when a width grows or the terminal is resized, the next frame is drawn in full.
+    """
+
+    def __init__(self, out=None, size=None):
+        """
+        :param out: file - where to draw; default sys.stdout
+        :param size: tuple<int, int> - a fixed size (columns, lines) instead of the terminal's (optional)
+        """
+        self.out = out or sys.stdout
+        self._size = size
+        self._widths = []
+        self._drawn_size = None
+        # (line, column) -> (text, style) as it is on the terminal
+        self._cells = {}
+
+    def get_size(self) -> tuple:
+        """
+        :return: tuple<int, int> - the columns and lines to draw on
+        """
+        if self._size:
+            return self._size
+        size = shutil.get_terminal_size()
+        return size.columns, size.lines
+
+    def get_page_rows(self) -> int:
+        """
+        :return: int - the number of table rows that fit (the title, header and footer take a line each)
+        """
+        return max(1, self.get_size()[1] - 3)
+
+    def enter(self):
+        self.out.write(ALTERNATE_SCREEN + HIDE_CURSOR + CLEAR_SCREEN)
+        self.out.flush()
+        self._cells = {}
+
+    def leave(self):
+        self.out.write(RESET_STYLE + SHOW_CURSOR + MAIN_SCREEN)
+        self.out.flush()
+
+    def draw(self, title: str, headers: list, rows: list, footer="") -> int:
+        """
+        Draws a frame.
+
+        :param title: str - the first line
+        :param headers: list<str> - the column headers, on the second line
+        :param rows: list<tuple<list<str>, str>> - the cells of each table row and its style (an SGR code such as "31" for red, or None); rows past the bottom of the screen are not drawn
+        :param footer: str - the last line
+        :return: int - the number of characters written
+        """
+        columns, lines = self.get_size()
+        rows = rows[: max(1, lines - 3)]
+
+        widths = [len(header) for header in headers]
+        for cells, _ in rows:
+            for index, cell in enumerate(cells):
+                widths[index] = max(widths[index], len(cell))
+        widths = [
+            max(width, previous)
+            for width, previous in zip(widths, self._widths + [0] * len(widths))
+        ]
+
+        output = []
+        if widths != self._widths or (columns, lines) != self._drawn_size:
+            output.append(CLEAR_SCREEN)
+            self._cells = {}
+            self._widths = widths
+            self._drawn_size = (columns, lines)
+
+        positions = []
+        position = 0
+        for width in widths:
+            positions.append(position)
+            position += width + 2
+
+        frame = {(1, 0): (title, "1"), (lines, 0): (footer, "7")}
+        for index, header in enumerate(headers):
+            frame[(2, index)] = (header, "1;4")
+        for line, (cells, style) in enumerate(rows, start=3):
+            for index, cell in enumerate(cells):
+                frame[(line, index)] = (cell, style)
+
+        for key in sorted(frame.keys() | self._cells.keys()):
+            cell = frame.get(key, ("", None))
+            if self._cells.get(key, ("", None)) == cell:
+                continue
+            line, index = key
+            text, style = cell
+            if key == (1, 0) or key == (lines, 0):
+                start, width = 0, columns
+            else:
+                start, width = positions[index], widths[index]
+            if start >= columns:
+                continue
+            width = min(width, columns - start)
+            text = text[:width].ljust(width)
+            if style:
+                text = f"\x1b[{style}m{text}{RESET_STYLE}"
+            output.append(f"\x1b[{line};{start + 1}H{text}")
+            if key in frame:
+                self._cells[key] = cell
+            else:
+                self._cells.pop(key, None)
+
+        written = "".join(output)
+        if written:
+            self.out.write(written)
+            self.out.flush()
+        return len(written)
+
+
+class KeyReader:
+    """
+    Reads single key presses from the terminal without waiting for Enter, while in a with block. Where the terminal cannot be switched to that mode (not a tty, or not POSIX), read_key only waits.
+    """
+
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdin
+        self._saved = None
+
+    def __enter__(self):
+        try:
+            import termios
+            import tty
+
+            self._fd = self.stream.fileno()
+            if os.isatty(self._fd):
+                self._saved = termios.tcgetattr(self._fd)
+                tty.setcbreak(self._fd)
+        except (ImportError, OSError, ValueError):
+            self._saved = None
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._saved is not None:
+            import termios
+
+            termios.tcsetattr(self._fd, termios.TCSADRAIN, self._saved)
+            self._saved = None
+
+    def read_key(self, timeout: float):
+        """
+        Waits up to timeout seconds for a key.
+
+        :param timeout: float - the most seconds to wait
+        :return: str - the key (a character, or a name in KEY_NAMES), or None
+        """
+        if self._saved is None:
+            select.select([], [], [], timeout)
+            return None
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return None
+        key = os.read(self._fd, 16).decode(errors="ignore")
+        return KEY_NAMES.get(key, key[:1])
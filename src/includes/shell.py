@@ -0,0 +1,91 @@
+import click
+import shlex
+
+from includes.get_state_dir import get_state_dir
+
+SHELL_PROMPT = "day2ops> "
+SHELL_HISTORY_LENGTH = 1000
+
+
+def _enable_history():
+    # readline is not available on every platform; the shell works without history
+    try:
+        import readline
+    except ImportError:
+        return None
+
+    history_path = get_state_dir() / "shell_history"
+    try:
+        readline.read_history_file(history_path)
+    except OSError:
+        pass
+    readline.set_history_length(SHELL_HISTORY_LENGTH)
+    return lambda: readline.write_history_file(history_path)
+
+
+def run_shell_command(app, args: list):
+    """
+    Runs one command line of the shell through the Typer app, in this process. Errors are shown and the shell carries on.
+
+    :param app: typer.Typer - the app
+    :param args: list<str> - the command and its arguments
+    """
+    try:
+        app(args, prog_name="day2ops", standalone_mode=False)
+    except click.exceptions.Abort:
+        print("Aborted.")
+    except click.ClickException as e:
+        e.show()
+    except RuntimeError as e:
+        print(f"There was a RuntimeError: {e}")
+    except Exception as e:
+        print(f"ERROR: {type(e).__name__}: {e}")
+
+
+def run_shell(app, refresh):
+    """
+    Reads commands of the app from the terminal and runs them in this process, so the connection to YBA, the customer UUID and the lookups are kept between commands.
+
+    Besides the app's commands: 'help', 'refresh' (forget what is cached), and 'exit' or 'quit'.
+
+    :param app: typer.Typer - the app
+    :param refresh: callable - forgets the cached customer UUID and lookups
+    """
+    save_history = _enable_history()
+    print(
+        "Run commands without the program name (e.g. obs-status --xcluster-source-name my-universe). "
+        "Type 'help' for the commands, 'refresh' to forget cached lookups, 'exit' to leave."
+    )
+
+    try:
+        while True:
+            try:
+                line = input(SHELL_PROMPT)
+            except EOFError:
+                print()
+                break
+            except KeyboardInterrupt:
+                print()
+                continue
+
+            try:
+                args = shlex.split(line)
+            except ValueError as e:
+                print(f"ERROR: {e}")
+                continue
+
+            if not args:
+                continue
+            if args[0] in ("exit", "quit"):
+                break
+            if args[0] == "refresh":
+                refresh()
+            elif args[0] == "help":
+                run_shell_command(app, args[1:] + ["--help"])
+            elif args[0] == "shell":
+                print("ERROR: already in the shell.")
+            else:
+                run_shell_command(app, args)
+    finally:
+        if save_history is not None:
+            save_history()
@@ -0,0 +1,222 @@
+import atexit
+import contextlib
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+
+from datetime import datetime, timezone
+
+# the fields every event can carry, besides its own
+CONTEXT_FIELDS = ("command", "operation", "dr_config_uuid", "task_uuid")
+
+_log_context = contextvars.ContextVar("log_context", default={})
+
+# the messages of these loggers are also shown on the console, as they are
+PROGRESS_LOGGER = "day2ops.progress"
+
+_queue = queue.Queue()
+_listener = None
+_listener_lock = threading.Lock()
+_file_handler = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    :param name: str - the module, e.g. "journal"
+    :return: logging.Logger - a logger under "day2ops"
+    """
+    return logging.getLogger(f"day2ops.{name}")
+
+
+def get_progress_logger(name: str) -> logging.Logger:
+    """
+    Returns a logger for the progress of a command (e.g. a task's percent complete): its messages are shown on the console, and written to the log file like other events. The final result of a command is printed, not logged.
+
+    :param name: str - the module, e.g. "tasks"
+    :return: logging.Logger - a logger under "day2ops.progress"
+    """
+    return logging.getLogger(f"{PROGRESS_LOGGER}.{name}")
+
+
+def get_log_settings() -> dict:
+    """
+    Returns the log settings. Each can be set in the environment or in the configuration file passed with --config.
+
+    - LOG_LEVEL: the lowest level written (DEBUG also logs each request to YBA); default INFO
+    - LOG_MAX_BYTES: the size at which the log file is rotated; default 10485760 (10 MiB)
+    - LOG_BACKUP_COUNT: rotated files kept; default 5
+    """
+    return {
+        "level": os.getenv("LOG_LEVEL", "INFO").upper(),
+        "max_bytes": int(os.getenv("LOG_MAX_BYTES", 10 * 1024 * 1024)),
+        "backup_count": int(os.getenv("LOG_BACKUP_COUNT", 5)),
+    }
+
+
+def bind_log_context(**fields) -> contextvars.Token:
+    """
+    Adds fields to the events logged from here on, until reset_log_context is called with the returned token. For scopes that are not one block (e.g. a command, from its callback until it closes).
+    """
+    return _log_context.set({**_log_context.get(), **fields})
+
+
+def reset_log_context(token: contextvars.Token):
+    _log_context.reset(token)
+
+
+@contextlib.contextmanager
+def log_context(**fields):
+    """
+    Adds fields (e.g. dr_config_uuid) to the events logged inside the block, in this thread or task.
+    """
+    token = bind_log_context(**fields)
+    try:
+        yield
+    finally:
+        reset_log_context(token)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Formats each event as one line of json: the time, level, logger and message, then the context fields and the event's own fields (passed with extra={"fields": {...}}).
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        event.update(getattr(record, "context", {}))
+        event.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            event["exception"] = self.formatException(record.exc_info)
+        return json.dumps(event, default=str)
+
+
+class ContextQueueHandler(logging.handlers.QueueHandler):
+    """
+    Puts events on the queue with the log context of the thread that logged them, since the writer thread has its own. The writer thread is started with the first event.
+    """
+
+    def enqueue(self, record: logging.LogRecord):
+        if _listener is None:
+            _start_listener(restart=False)
+        super().enqueue(record)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.context = {
+            name: value
+            for name, value in _log_context.get().items()
+            if value is not None
+        }
+        return super().prepare(record)
+
+
+class ConsoleHandler(logging.StreamHandler):
+    """
+    Shows the messages of progress loggers on stdout, as they are. The stream is looked up for each message, since the shell or a test may replace sys.stdout.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.addFilter(logging.Filter(PROGRESS_LOGGER))
+
+    def emit(self, record: logging.LogRecord):
+        self.stream = sys.stdout
+        super().emit(record)
+
+
+def _start_listener(restart=True):
+    # one background thread writes the events of every handler, in the order they were logged
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            if not restart:
+                return
+            _listener.stop()
+        handlers = [ConsoleHandler()]
+        if _file_handler is not None:
+            handlers.append(_file_handler)
+        _listener = logging.handlers.QueueListener(
+            _queue, *handlers, respect_handler_level=True
+        )
+        _listener.start()
+
+
+def configure_logging(log_file: str):
+    """
+    Also writes the "day2ops" events as json lines to a size-rotated file. Given another file (e.g. --log-file again in the shell), the events logged so far are written to the previous file, and later events to the new one.
+
+    :param log_file: str - the file to write
+    """
+    global _file_handler
+    previous_handler = _file_handler
+    if (
+        previous_handler is not None
+        and previous_handler.baseFilename == os.path.abspath(log_file)
+    ):
+        return
+
+    settings = get_log_settings()
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file,
+        maxBytes=settings["max_bytes"],
+        backupCount=settings["backup_count"],
+    )
+    file_handler.setFormatter(JsonFormatter())
+    file_handler.setLevel(settings["level"])
+    logging.getLogger("day2ops").setLevel(settings["level"])
+
+    _file_handler = file_handler
+    # stopping the writer thread writes out what is queued, with the previous handlers
+    _start_listener()
+    if previous_handler is not None:
+        previous_handler.close()
+
+
+def flush_logging():
+    """
+    Waits until every event logged so far is written, so what is printed next comes after the progress shown before it.
+    """
+    if _listener is not None:
+        _queue.join()
+
+
+def stop_logging():
+    """
+    Writes out the queued events and closes the log file. Progress is still shown on the console.
+    """
+    global _file_handler
+    file_handler = _file_handler
+    if file_handler is None:
+        return
+    _file_handler = None
+    if _listener is not None:
+        _start_listener()
+    file_handler.close()
+
+
+def _stop_listener():
+    global _listener
+    with _listener_lock:
+        if _listener is not None:
+            _listener.stop()
+            _listener = None
+
+
+# Loggers only put events on a queue; a background thread, started with the
+# first event, shows the progress on the console and writes the log file (see
+# configure_logging), so a slow terminal, disk or pipe never holds up polling.
+# Nothing else reaches the console, and nothing else is written unless a log
+# file is configured.
+logging.getLogger("day2ops").addHandler(ContextQueueHandler(_queue))
+logging.getLogger(PROGRESS_LOGGER).setLevel(logging.INFO)
+# written out at exit, also when the command ends with an error
+atexit.register(_stop_listener)
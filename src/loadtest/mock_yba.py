@@ -0,0 +1,351 @@
+import json
+import random
+import re
+import threading
+import time
+import uuid
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+CUSTOMER_UUID = "00000000-0000-0000-0000-00000000c0de"
+STORAGE_CONFIG_UUID = "00000000-0000-0000-0000-0000000005c0"
+
+# request paths are counted by endpoint, with ids replaced by {id}
+ID_PATTERN = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+def build_fleet(pairs=5, tables_per_universe=200, keyspaces_per_universe=4) -> dict:
+    """
+    Builds the state of a stand-in YBA: DR pairs of source and target universes, each source with a table catalog.
+
+    :param pairs: int - the number of DR pairs; default 5
+    :param tables_per_universe: int - the number of tables on each source universe; default 200
+    :param keyspaces_per_universe: int - the number of databases the tables are spread over; default 4
+    :return: dict - the fleet, by kind of object
+    """
+    fleet = {
+        "universes": {},
+        "dr_configs": {},
+        "xcluster_configs": {},
+        "tables": {},
+        "tasks": {},
+    }
+
+    for pair in range(pairs):
+        source_uuid, target_uuid = str(uuid.uuid4()), str(uuid.uuid4())
+        dr_config_uuid, xcluster_config_uuid = str(uuid.uuid4()), str(uuid.uuid4())
+
+        for universe_uuid, name, as_source, as_target in (
+            (source_uuid, f"source-{pair}", [dr_config_uuid], []),
+            (target_uuid, f"target-{pair}", [], [dr_config_uuid]),
+        ):
+            cluster_uuid = str(uuid.uuid4())
+            fleet["universes"][universe_uuid] = {
+                "universeUUID": universe_uuid,
+                "name": name,
+                "drConfigUuidsAsSource": as_source,
+                "drConfigUuidsAsTarget": as_target,
+                "universeDetails": {
+                    "clusters": [
+                        {
+                            "uuid": cluster_uuid,
+                            "clusterType": "PRIMARY",
+                            "userIntent": {"numNodes": 3, "replicationFactor": 3},
+                        }
+                    ],
+                    "nodeDetailsSet": [
+                        {
+                            "nodeName": f"{name}-n{node}",
+                            "state": "Live",
+                            "placementUuid": cluster_uuid,
+                            "cloudInfo": {
+                                "cloud": "aws",
+                                "region": "us-east-1",
+                                "az": f"us-east-1{'abc'[node]}",
+                                "private_ip": f"10.{pair}.0.{node}",
+                            },
+                        }
+                        for node in range(3)
+                    ],
+                },
+            }
+
+        tables = [
+            {
+                "tableID": uuid.uuid4().hex,
+                "tableType": "PGSQL_TABLE_TYPE",
+                "keySpace": f"db{table % keyspaces_per_universe}",
+                "pgSchemaName": "public",
+                "tableName": f"table_{table}",
+                "isIndexTable": table % 5 == 4,
+                "sizeBytes": float(table * 1024),
+            }
+            for table in range(tables_per_universe)
+        ]
+        fleet["tables"][source_uuid] = tables
+
+        fleet["dr_configs"][dr_config_uuid] = {
+            "uuid": dr_config_uuid,
+            "name": f"dr-{pair}",
+            "state": "Replicating",
+            "status": "Running",
+            "paused": False,
+            "primaryUniverseState": "ReplicatingData",
+            "drReplicaUniverseState": "ReceivingData",
+            "primaryUniverseUuid": source_uuid,
+            "drReplicaUniverseUuid": target_uuid,
+            "xclusterConfigUuid": xcluster_config_uuid,
+            "bootstrapParams": {
+                "backupRequestParams": {"storageConfigUUID": STORAGE_CONFIG_UUID}
+            },
+            "tables": [
+                table["tableID"] for table in tables[: tables_per_universe // 2]
+            ],
+            # not part of YBA's DrConfig: the range of the safetime lags the mock reports
+            "lagRangeUs": (100_000, 2_000_000),
+        }
+        fleet["xcluster_configs"][xcluster_config_uuid] = dr_config_uuid
+
+    return fleet
+
+
+def _task_status(task: dict) -> dict:
+    elapsed = time.monotonic() - task["started"]
+    percent = min(100.0, 100.0 * elapsed / task["duration"])
+    return {
+        "id": task["id"],
+        "title": task["title"],
+        "targetUUID": task.get("targetUUID"),
+        "status": "Success" if percent >= 100 else "Running",
+        "percent": percent,
+        "percentComplete": percent,
+    }
+
+
+class MockYbaHandler(BaseHTTPRequestHandler):
+    """
+    Answers the YBA endpoints used by the tool from the server's fleet. Requests are delayed by the server's latency and fail with a 503 at its error rate.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status_code: int, body):
+        payload = json.dumps(body).encode()
+        self.send_response(status_code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _handle(self, method: str):
+        server = self.server
+        parts = urlsplit(self.path)
+        endpoint = f"{method} {ID_PATTERN.sub('{id}', parts.path)}"
+        with server.lock:
+            server.request_counts[endpoint] = server.request_counts.get(endpoint, 0) + 1
+
+        if server.latency_ms:
+            time.sleep(random.uniform(0.5, 1.5) * server.latency_ms / 1000)
+        if server.error_rate and random.random() < server.error_rate:
+            with server.lock:
+                server.errors_injected += 1
+            return self._send(503, {"error": "injected failure"})
+
+        body = None
+        if method == "PUT" or method == "POST":
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+
+        status_code, response = route(
+            server.fleet, server.task_seconds, method, parts, body
+        )
+        self._send(status_code, response)
+
+    def do_GET(self):
+        self._handle("GET")
+
+    def do_PUT(self):
+        self._handle("PUT")
+
+    def do_POST(self):
+        self._handle("POST")
+
+
+def route(fleet: dict, task_seconds: float, method: str, parts, body) -> tuple:
+    """
+    :return: tuple<int, json> - the status code and body of the response
+    """
+    path = parts.path.rstrip("/")
+    query = parse_qs(parts.query)
+    prefix = f"/api/v1/customers/{CUSTOMER_UUID}"
+
+    if method == "GET" and path == "/api/v1/session_info":
+        return 200, {"customerUUID": CUSTOMER_UUID}
+
+    if method == "GET" and path == f"{prefix}/universes":
+        universes = list(fleet["universes"].values())
+        if "name" in query:
+            universes = [u for u in universes if u["name"] == query["name"][0]]
+        return 200, universes
+
+    match = re.fullmatch(rf"{prefix}/universes/([^/]+)(/tables|/namespaces)?", path)
+    if method == "GET" and match:
+        universe_uuid, collection = match.groups()
+        if universe_uuid not in fleet["universes"]:
+            return 400, {"success": False, "error": "Invalid Universe UUID"}
+        if collection == "/tables":
+            return 200, fleet["tables"].get(universe_uuid, [])
+        if collection == "/namespaces":
+            keyspaces = sorted(
+                {t["keySpace"] for t in fleet["tables"].get(universe_uuid, [])}
+            )
+            return 200, [
+                {"name": keyspace, "tableType": "PGSQL_TABLE_TYPE"}
+                for keyspace in keyspaces
+            ]
+        return 200, fleet["universes"][universe_uuid]
+
+    match = re.fullmatch(rf"{prefix}/dr_configs/([^/]+)(/safetime)?", path)
+    if method == "GET" and match:
+        dr_config_uuid, safetime = match.groups()
+        dr_config = fleet["dr_configs"].get(dr_config_uuid)
+        if dr_config is None:
+            return 400, {"success": False, "error": "Invalid DR config UUID"}
+        if not safetime:
+            return 200, dr_config
+        now_us = time.time() * 1_000_000
+        keyspaces = sorted(
+            {t["keySpace"] for t in fleet["tables"][dr_config["primaryUniverseUuid"]]}
+        )
+        return 200, {
+            "safetimes": [
+                {
+                    "namespaceId": keyspace,
+                    "namespaceName": keyspace,
+                    "safetimeEpochUs": now_us - lag_us,
+                    "safetimeLagUs": lag_us,
+                    "safetimeSkewUs": lag_us / 10,
+                    "estimatedDataLossMs": lag_us / 1000,
+                }
+                for keyspace in keyspaces
+                for lag_us in [random.uniform(*dr_config["lagRangeUs"])]
+            ]
+        }
+
+    match = re.fullmatch(rf"{prefix}/dr_configs/([^/]+)/(failover|switchover)", path)
+    if method == "POST" and match:
+        dr_config_uuid, action = match.groups()
+        if dr_config_uuid not in fleet["dr_configs"]:
+            return 400, {"success": False, "error": "Invalid DR config UUID"}
+        task_uuid = str(uuid.uuid4())
+        fleet["tasks"][task_uuid] = {
+            "id": task_uuid,
+            "title": action.capitalize(),
+            "targetUUID": dr_config_uuid,
+            "started": time.monotonic(),
+            "duration": task_seconds,
+            "body": body,
+        }
+        return 200, {"taskUUID": task_uuid, "resourceUUID": dr_config_uuid}
+
+    match = re.fullmatch(rf"{prefix}/xcluster_configs/([^/]+)", path)
+    if method == "GET" and match:
+        dr_config_uuid = fleet["xcluster_configs"].get(match.group(1))
+        if dr_config_uuid is None:
+            return 400, {"success": False, "error": "Invalid xCluster config UUID"}
+        dr_config = fleet["dr_configs"][dr_config_uuid]
+        # not part of YBA's DrConfig: the status of tables that are not Running
+        table_statuses = dr_config.get("tableStatuses", {})
+        return 200, {
+            "uuid": match.group(1),
+            "name": dr_config["name"],
+            "status": "Running",
+            "paused": dr_config["paused"],
+            "tableDetails": [
+                {
+                    "tableId": table_id,
+                    "status": table_statuses.get(table_id, "Running"),
+                    "replicationSetupDone": True,
+                    "indexTable": False,
+                    "replicationStatusErrors": (
+                        ["ERROR_MISSING_OP_ID"]
+                        if table_statuses.get(table_id) in ("Failed", "Error")
+                        else []
+                    ),
+                }
+                for table_id in dr_config["tables"]
+            ],
+        }
+    if method == "PUT" and match:
+        dr_config_uuid = fleet["xcluster_configs"].get(match.group(1))
+        if dr_config_uuid is None:
+            return 400, {"success": False, "error": "Invalid xCluster config UUID"}
+        paused = (body or {}).get("status") == "Paused"
+        fleet["dr_configs"][dr_config_uuid]["paused"] = paused
+        task_uuid = str(uuid.uuid4())
+        fleet["tasks"][task_uuid] = {
+            "id": task_uuid,
+            "title": "Pause" if paused else "Resume",
+            "targetUUID": match.group(1),
+            "started": time.monotonic(),
+            "duration": task_seconds,
+        }
+        return 200, {"taskUUID": task_uuid, "resourceUUID": match.group(1)}
+
+    match = re.fullmatch(rf"{prefix}/tasks/([^/]+)", path)
+    if method == "GET" and match:
+        task = fleet["tasks"].get(match.group(1))
+        if task is None:
+            return 400, {"success": False, "error": "Invalid task UUID"}
+        return 200, _task_status(task)
+
+    if method == "GET" and path == f"{prefix}/tasks_list":
+        return 200, [_task_status(task) for task in list(fleet["tasks"].values())]
+
+    return 404, {
+        "success": False,
+        "error": f"not implemented in the mock: {method} {path}",
+    }
+
+
+def start_mock_yba(
+    fleet: dict, latency_ms=20, error_rate=0.0, task_seconds=4, port=0
+) -> ThreadingHTTPServer:
+    """
+    Starts a stand-in YBA on localhost in a background thread.
+
+    :param fleet: dict - the result of build_fleet
+    :param latency_ms: float - the average time YBA takes to answer a request; default 20
+    :param error_rate: float - the fraction of requests that fail with a 503; default 0
+    :param task_seconds: float - how long pause/resume tasks take; default 4
+    :param port: int - the port to listen on; default 0 (any free port)
+    :return: ThreadingHTTPServer - the server (its URL is http://127.0.0.1:{server.server_port})
+    """
+    server = ThreadingHTTPServer(("127.0.0.1", port), MockYbaHandler)
+    server.daemon_threads = True
+    server.fleet = fleet
+    server.latency_ms = latency_ms
+    server.error_rate = error_rate
+    server.task_seconds = task_seconds
+    server.lock = threading.Lock()
+    server.request_counts = {}
+    server.errors_injected = 0
+
+    threading.Thread(target=server.serve_forever, name="mock-yba", daemon=True).start()
+    return server
+
+
+def take_request_counts(server: ThreadingHTTPServer) -> tuple:
+    """
+    Returns and resets the server's request counts.
+
+    :return: tuple<dict<str, int>, int> - the requests by endpoint, and the number of injected errors
+    """
+    with server.lock:
+        request_counts, server.request_counts = server.request_counts, {}
+        errors_injected, server.errors_injected = server.errors_injected, 0
+    return request_counts, errors_injected
@@ -0,0 +1,309 @@
+import json
+import multiprocessing
+import os
+import random
+import shutil
+import sys
+import tabulate
+import tempfile
+import time
+import typer
+
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing_extensions import Annotated
+
+from loadtest.mock_yba import build_fleet, start_mock_yba, take_request_counts
+
+# the commands an operator runs, and how often by default
+DEFAULT_MIX = "obs-status=3,obs-latency=3,get-tables=1,task-wait=1"
+
+
+def parse_mix(mix: str) -> dict:
+    """
+    :param mix: str - command weights, e.g. "obs-status=3,get-tables=1"
+    :return: dict<str, float> - the weight of each command
+    """
+    weights = {}
+    for item in mix.split(","):
+        command, _, weight = item.strip().partition("=")
+        weights[command] = float(weight or 1)
+    unknown = set(weights) - {"obs-status", "obs-latency", "get-tables", "task-wait"}
+    if unknown:
+        raise RuntimeError(f"ERROR: unknown commands in the mix: {', '.join(unknown)}")
+    return weights
+
+
+def percentile(sorted_values: list, fraction: float):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def run_operator(
+    operator_id: int,
+    start_at: float,
+    duration: float,
+    weights: dict,
+    pairs: int,
+    seed: int,
+) -> list:
+    """
+    Runs one simulated operator in its own process: from start_at (a wall-clock time, so all operators start together), picks commands from the mix for random DR pairs until the duration is up. Like the CLI, each command first looks up the customer UUID.
+
+    :return: list<tuple> - (command, latency in seconds, error or None) for each command run
+    """
+    # output of the commands is not part of the test
+    sys.stdout = open(os.devnull, "w")
+
+    # imported here, after the parent set up config/auth.yaml for the mock
+    from core.internal_rest_apis import _get_session_info
+    from xclusterdr.manage_dr_cluster import (
+        get_xcluster_tables,
+        pause_xcluster,
+        resume_xcluster,
+    )
+    from xclusterdr.observability import get_status, get_xcluster_dr_safetimes
+
+    def task_wait(customer_uuid, source_universe_name):
+        if random.random() < 0.5:
+            return pause_xcluster(customer_uuid, source_universe_name)
+        return resume_xcluster(customer_uuid, source_universe_name)
+
+    commands = {
+        "obs-status": get_status,
+        "obs-latency": get_xcluster_dr_safetimes,
+        "get-tables": get_xcluster_tables,
+        "task-wait": task_wait,
+    }
+
+    random.seed(seed + operator_id)
+    results = []
+    time.sleep(max(0, start_at - time.time()))
+    end_time = time.monotonic() + duration
+    while time.monotonic() < end_time:
+        command = random.choices(list(weights), weights=list(weights.values()))[0]
+        source_universe_name = f"source-{random.randrange(pairs)}"
+        start_time = time.monotonic()
+        try:
+            customer_uuid = _get_session_info()["customerUUID"]
+            commands[command](customer_uuid, source_universe_name)
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        results.append((command, time.monotonic() - start_time, error))
+    return results
+
+
+def run_level(
+    server, operators: int, duration: float, weights: dict, pairs: int, seed: int
+) -> dict:
+    """
+    Runs a number of operators at once against the mock and measures what YBA sees and what the operators see.
+    """
+    take_request_counts(server)
+    # leave time for the processes to start, so the measured window is the same for all
+    start_at = time.time() + 2 + operators * 0.2
+    with ProcessPoolExecutor(
+        max_workers=operators, mp_context=multiprocessing.get_context("spawn")
+    ) as pool:
+        futures = [
+            pool.submit(
+                run_operator, operator_id, start_at, duration, weights, pairs, seed
+            )
+            for operator_id in range(operators)
+        ]
+        results = [result for future in futures for result in future.result()]
+    # commands still running at the end of the window finish after it
+    elapsed = max(duration, time.time() - start_at)
+    request_counts, errors_injected = take_request_counts(server)
+
+    latencies = sorted(latency for _, latency, _ in results)
+    errors = [error for _, _, error in results if error is not None]
+    requests_total = sum(request_counts.values())
+    by_command = {}
+    for command, latency, error in results:
+        entry = by_command.setdefault(command, {"latencies": [], "errors": 0})
+        entry["latencies"].append(latency)
+        entry["errors"] += error is not None
+
+    return {
+        "operators": operators,
+        "elapsedSeconds": elapsed,
+        "commands": len(results),
+        "commandsPerSecond": len(results) / elapsed,
+        "ybaRequests": requests_total,
+        "ybaRequestsPerSecond": requests_total / elapsed,
+        "ybaRequestsPerCommand": requests_total / len(results) if results else None,
+        "p50Ms": (percentile(latencies, 0.50) or 0) * 1000,
+        "p95Ms": (percentile(latencies, 0.95) or 0) * 1000,
+        "p99Ms": (percentile(latencies, 0.99) or 0) * 1000,
+        "errorRate": len(errors) / len(results) if results else 0,
+        "errorsInjected": errors_injected,
+        "sampleErrors": sorted(set(errors))[:5],
+        "byCommand": {
+            command: {
+                "commands": len(entry["latencies"]),
+                "p50Ms": percentile(sorted(entry["latencies"]), 0.50) * 1000,
+                "p95Ms": percentile(sorted(entry["latencies"]), 0.95) * 1000,
+                "errorRate": entry["errors"] / len(entry["latencies"]),
+            }
+            for command, entry in sorted(by_command.items())
+        },
+        "requestsByEndpoint": dict(
+            sorted(request_counts.items(), key=lambda item: -item[1])
+        ),
+    }
+
+
+def format_load_report(levels: list) -> str:
+    """
+    Formats the results of run_level as a table, one row per number of operators.
+    """
+    return tabulate.tabulate(
+        [
+            [
+                level["operators"],
+                level["commands"],
+                level["commandsPerSecond"],
+                level["ybaRequestsPerSecond"],
+                level["ybaRequestsPerCommand"],
+                level["p50Ms"],
+                level["p95Ms"],
+                level["p99Ms"],
+                level["errorRate"] * 100,
+                level["errorsInjected"],
+            ]
+            for level in levels
+        ],
+        headers=(
+            "operators",
+            "commands",
+            "commands/s",
+            "YBA req/s",
+            "YBA req/command",
+            "p50 (ms)",
+            "p95 (ms)",
+            "p99 (ms)",
+            "errors (%)",
+            "503s injected",
+        ),
+        tablefmt="rounded_grid",
+        floatfmt=".1f",
+        showindex=False,
+    )
+
+
+def format_level_details(level: dict, top_endpoints=8) -> str:
+    """
+    Formats the per-command latencies and busiest YBA endpoints of one run_level result.
+    """
+    commands_table = tabulate.tabulate(
+        [
+            [
+                command,
+                entry["commands"],
+                entry["p50Ms"],
+                entry["p95Ms"],
+                entry["errorRate"] * 100,
+            ]
+            for command, entry in level["byCommand"].items()
+        ],
+        headers=("command", "runs", "p50 (ms)", "p95 (ms)", "errors (%)"),
+        tablefmt="rounded_grid",
+        floatfmt=".1f",
+        showindex=False,
+    )
+    endpoints_table = tabulate.tabulate(
+        [
+            [endpoint, count, count / level["elapsedSeconds"]]
+            for endpoint, count in list(level["requestsByEndpoint"].items())[
+                :top_endpoints
+            ]
+        ],
+        headers=("YBA endpoint", "requests", "req/s"),
+        tablefmt="rounded_grid",
+        floatfmt=".1f",
+        showindex=False,
+    )
+    return f"{commands_table}\n{endpoints_table}"
+
+
+def main(
+    operators: Annotated[
+        str,
+        typer.Option(
+            help="Comma-separated numbers of concurrent operators to run, in turn"
+        ),
+    ] = "1,2,4,8",
+    duration: Annotated[
+        float, typer.Option(help="Seconds to run each number of operators")
+    ] = 20,
+    mix: Annotated[str, typer.Option(help="Command weights")] = DEFAULT_MIX,
+    pairs: Annotated[int, typer.Option(help="DR pairs in the mock YBA")] = 5,
+    tables: Annotated[
+        int, typer.Option(help="Tables per source universe in the mock YBA")
+    ] = 200,
+    latency_ms: Annotated[
+        float, typer.Option(help="Average mock YBA response time")
+    ] = 20,
+    error_rate: Annotated[
+        float, typer.Option(help="Fraction of mock YBA requests that fail with a 503")
+    ] = 0.0,
+    task_seconds: Annotated[
+        float, typer.Option(help="Seconds a pause/resume task takes in the mock YBA")
+    ] = 4,
+    seed: Annotated[int, typer.Option(help="Random seed for the operators")] = 1,
+    report: Annotated[
+        str, typer.Option(help="Also save the full results as json to this file")
+    ] = None,
+):
+    """
+    Runs growing numbers of simulated operators against a stand-in YBA and reports the load YBA sees and the latency and errors operators see.
+
+    Each operator is a separate process, like separate CLI users or cron jobs, with its own HTTP client (rate limit, retries, circuit breaker) and task tracker. They share the state directory (journal and topology index), as they would on one host. The YBA_* settings of the HTTP client apply.
+    """
+    weights = parse_mix(mix)
+    if report:
+        report = str(Path(report).resolve())
+    operator_counts = [int(count) for count in operators.split(",") if count.strip()]
+
+    fleet = build_fleet(pairs, tables)
+    server = start_mock_yba(fleet, latency_ms, error_rate, task_seconds)
+
+    # the operators read config/auth.yaml and config/status.yaml from the working directory
+    config_dir = Path("config").resolve()
+    work_dir = Path(tempfile.mkdtemp(prefix="day2ops-loadtest-"))
+    (work_dir / "config").mkdir()
+    (work_dir / "config" / "auth.yaml").write_text(
+        f'YBA_URL: "http://127.0.0.1:{server.server_port}"\nAPI_KEY: "loadtest"\n'
+    )
+    shutil.copy(config_dir / "status.yaml", work_dir / "config" / "status.yaml")
+    os.environ["DAY2OPS_STATE_DIR"] = str(work_dir / "state")
+    original_dir = os.getcwd()
+    os.chdir(work_dir)
+
+    levels = []
+    try:
+        for count in operator_counts:
+            print(f"Running {count} operator(s) for {duration:.0f}s...")
+            level = run_level(server, count, duration, weights, pairs, seed)
+            levels.append(level)
+            print(format_level_details(level))
+            for error in level["sampleErrors"]:
+                print(f"  error: {error}")
+    finally:
+        server.shutdown()
+        os.chdir(original_dir)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(format_load_report(levels))
+    if report:
+        with open(report, "w") as file:
+            file.write(json.dumps(levels, indent=4))
+        print(f"Load test report written to {report}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -1,49 +1,31 @@
+#!/usr/bin/env python3
 import os
 import yaml
 
+import click
 import typer
 from typing import List
 
 from pprint import pprint
 from typing_extensions import Annotated
 
-from core.internal_rest_apis import (
-    _get_session_info,
+from core.completion_index import (
+    complete_database_names,
+    complete_table_ids,
+    complete_universe_names,
 )
-from core.get_universe_info import get_universe_uuid_by_name
-
-from includes.get_demo_config import get_config
-from includes.overrides import suppress_warnings
+from includes.command_group import CommandGroup
+from includes.shell import run_shell
 from includes.validation import command_confirmed
 
-from xclusterdr.manage_dr_cluster import (
-    create_xcluster_dr,
-    delete_xcluster_dr,
-    get_xcluster_tables,
-    add_tables_to_xcluster_dr,
-    pause_xcluster,
-    resume_xcluster,
-    perform_xcluster_dr_switchover,
-    perform_xcluster_dr_failover,
-    perform_xcluster_dr_recovery,
-    get_xcluster_details_by_name,
-)
-from xclusterdr.common import get_source_xcluster_dr_config
-
-from xclusterdr.observability import (
-    get_xcluster_dr_safetimes,
-    get_status,
-    get_all_clusters,
-)
-
-from healthcheck.map import get_diagram_map
-
-suppress_warnings()
+# Commands import what they use when they run: shell completion loads this
+# module on every TAB, and must not wait for requests, plotly or networkx.
 
 app = typer.Typer(
+    cls=CommandGroup,
     no_args_is_help=True,
     rich_markup_mode="rich",
-    add_completion=False,
+    add_completion=True,
 )
 state = {"verbose": False}
 
@@ -52,15 +34,26 @@ state = {"verbose": False}
 
 
 def get_customer_uuid():
-    user_session = _get_session_info()
-    customer_uuid = user_session["customerUUID"]
-    return customer_uuid
+    # completion parses the command line without running the command: no need to ask YBA
+    ctx = click.get_current_context(silent=True)
+    if ctx is not None and ctx.resilient_parsing:
+        return None
+
+    # kept for the process, so commands run in the shell look it up once
+    if "customer_uuid" not in state:
+        from core.internal_rest_apis import _get_session_info
+
+        user_session = _get_session_info()
+        state["customer_uuid"] = user_session["customerUUID"]
+    return state["customer_uuid"]
 
 
 # generic helper functions
 
 
 def get_xcluster_source_uuid():
+    from core.get_universe_info import get_universe_uuid_by_name
+
     source_universe_uuid = get_universe_uuid_by_name(
         get_customer_uuid(), os.getenv("XCLUSTER_SOURCE")
     )
@@ -68,6 +61,8 @@ def get_xcluster_source_uuid():
 
 
 def get_xcluster_target_uuid():
+    from core.get_universe_info import get_universe_uuid_by_name
+
     target_universe_uuid = get_universe_uuid_by_name(
         get_customer_uuid(), os.getenv("XCLUSTER_TARGET")()
     )
@@ -75,9 +70,26 @@ def get_xcluster_target_uuid():
 
 
 def parse_comma_separated_list(value: str) -> List[str]:
+    if value is None:
+        return value
     return [item.strip() for item in value.split(",") if item.strip()]
 
 
+# shell completion, answered from the local completion index (see refresh-index)
+
+
+def complete_universe_name(incomplete: str):
+    return complete_universe_names(incomplete)
+
+
+def complete_database_names_of_source(ctx: typer.Context, incomplete: str):
+    return complete_database_names(incomplete, ctx.params.get("xcluster_source_name"))
+
+
+def complete_table_ids_of_source(ctx: typer.Context, incomplete: str):
+    return complete_table_ids(incomplete, ctx.params.get("xcluster_source_name"))
+
+
 # the app commands
 
 
@@ -90,32 +102,55 @@ def create_xcluster_dr_configuration(
         str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
     ],
     xcluster_source_name: Annotated[
-        str, typer.Option(envvar="XCLUSTER_SOURCE", prompt=True)
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
     ],
     xcluster_target_name: Annotated[
         str, typer.Option(envvar="XCLUSTER_TARGET", prompt=True)
     ],
     replicate_database_names: Annotated[
-        str, typer.Option(envvar="REPLICATE_DATABASE_NAMES", prompt=True)
+        str,
+        typer.Option(
+            envvar="REPLICATE_DATABASE_NAMES",
+            prompt=True,
+            autocompletion=complete_database_names_of_source,
+        ),
     ],
     shared_backup_location: Annotated[
         str, typer.Option(envvar="SHARED_BACKUP_LOCATION", prompt=True)
     ],
     force: Annotated[bool, typer.Option("--force")] = False,
+    dry_run: Annotated[
+        bool,
+        typer.Option(
+            "--dry-run",
+            help="Run the checks and show the request and bootstrap size without creating anything",
+        ),
+    ] = False,
 ):
     """
     Create an xCluster DR configuration
     """
+    from xclusterdr.manage_dr_cluster import create_xcluster_dr
+
     confirmation_text = f"You are about to set up xCluster DR async replication of the database(s) {replicate_database_names} between the source universe {xcluster_source_name} and the target universe {xcluster_target_name}. The backup storage you'll use for the initial bootstrapping is {shared_backup_location}. Is this what you want to do?"
 
-    if force or command_confirmed(confirmation_text):
-        create_xcluster_dr(
-            customer_uuid,
-            xcluster_source_name,
-            xcluster_target_name,
-            replicate_database_names,
-            shared_backup_location,
-        )
+    if dry_run or force or command_confirmed(confirmation_text):
+        try:
+            return create_xcluster_dr(
+                customer_uuid,
+                xcluster_source_name,
+                xcluster_target_name,
+                replicate_database_names,
+                shared_backup_location,
+                dry_run,
+            )
+        except RuntimeError as e:
+            print(f"There was a RuntimeError: {e}")
     else:
         print(f"OK. Command cancelled.")
 
@@ -126,13 +161,20 @@ def remove_xcluster_dr_configuration(
         str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
     ],
     xcluster_source_name: Annotated[
-        str, typer.Option(envvar="XCLUSTER_SOURCE", prompt=True)
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
     ],
     force: Annotated[bool, typer.Option("--force")] = False,
 ):
     """
     Remove an xCluster DR configuration
     """
+    from xclusterdr.manage_dr_cluster import delete_xcluster_dr
+
     confirmation_text = f"You are about to remove the xCluster DR async replication between {xcluster_source_name} and its target. If you want to set it back up, you will need to re-bootstrap the data. Is this what you want to do?"
 
     if force or command_confirmed(confirmation_text):
@@ -150,7 +192,12 @@ def get_xcluster_configuration_info(
         str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
     ],
     xcluster_source_name: Annotated[
-        str, typer.Option(envvar="XCLUSTER_SOURCE", prompt=True)
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
     ],
     key: Annotated[
         str,
@@ -162,6 +209,8 @@ def get_xcluster_configuration_info(
     """
     Show existing xCluster DR configuration info for the source universe
     """
+    from xclusterdr.common import get_source_xcluster_dr_config
+
     pprint(get_source_xcluster_dr_config(customer_uuid, xcluster_source_name, key))
 
 
@@ -170,12 +219,21 @@ def get_xcluster_details_by_universe_name(
     customer_uuid: Annotated[
         str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
     ],
-    universe_name: Annotated[str, typer.Option(envvar="XCLUSTER_SOURCE", prompt=True)],
+    universe_name: Annotated[
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
+    ],
 ):
     """
     Get source universe name from any universe name
     """
-    return get_xcluster_details_by_name(customer_uuid, universe_name)
+    from xclusterdr.manage_dr_cluster import get_xcluster_details_by_name
+
+    print(get_xcluster_details_by_name(customer_uuid, universe_name))
 
 
 ## app commands: xCluster DR replication management
@@ -187,17 +245,26 @@ def do_pause_xcluster(
         str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
     ],
     xcluster_source_name: Annotated[
-        str, typer.Option(envvar="XCLUSTER_SOURCE", prompt=True)
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
     ],
     force: Annotated[bool, typer.Option("--force")] = False,
 ):
     """
     Pause the running xCluster DR replication
     """
+    from xclusterdr.manage_dr_cluster import pause_xcluster
+
     confirmation_text = f"You are about to pause the xCluster DR async replication between the source universe {xcluster_source_name} and its target universe. Is this what you want to do?"
 
     if force or command_confirmed(confirmation_text):
-        return pause_xcluster(customer_uuid, xcluster_source_name)
+        print(
+            f"Replication is paused? {pause_xcluster(customer_uuid, xcluster_source_name)}"
+        )
     else:
         print(f"OK. Command cancelled.")
 
@@ -208,17 +275,26 @@ def do_resume_xcluster(
         str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
     ],
     xcluster_source_name: Annotated[
-        str, typer.Option(envvar="XCLUSTER_SOURCE", prompt=True)
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
     ],
     force: Annotated[bool, typer.Option("--force")] = False,
 ):
     """
     Resume the active xCluster DR replication
     """
+    from xclusterdr.manage_dr_cluster import resume_xcluster
+
     confirmation_text = f"You are about to resume the xCluster DR async replication between the source universe {xcluster_source_name} and its target universe. Is this what you want to do?"
 
     if force or command_confirmed(confirmation_text):
-        return resume_xcluster(customer_uuid, xcluster_source_name)
+        print(
+            f"Replication is paused? {resume_xcluster(customer_uuid, xcluster_source_name)}"
+        )
     else:
         print(f"OK. Command cancelled.")
 
@@ -235,15 +311,29 @@ def do_switchover(
         str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
     ],
     force: Annotated[bool, typer.Option("--force")] = False,
+    max_lag: Annotated[
+        float,
+        typer.Option(
+            help="Only submit the switchover once the replication lag of every namespace is under this many ms"
+        ),
+    ] = None,
+    timeout: Annotated[
+        float,
+        typer.Option(help="Seconds to wait for the lag to fall under --max-lag"),
+    ] = 300.0,
 ):
     """
     Switchover the running xCluster DR replication
     """
+    from xclusterdr.manage_dr_cluster import perform_xcluster_dr_switchover
+
     confirmation_text = f"You are about to do a switchover of the xCluster DR async replication between the source universe {current_primary} and its target universe. Is this what you want to do?"
 
     if force or command_confirmed(confirmation_text):
         try:
-            return perform_xcluster_dr_switchover(customer_uuid, current_primary)
+            return perform_xcluster_dr_switchover(
+                customer_uuid, current_primary, max_lag, timeout
+            )
         except RuntimeError as e:
             print(f"There was a RuntimeError: {e}")
     else:
@@ -262,15 +352,38 @@ def do_failover(
         str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
     ],
     force: Annotated[bool, typer.Option("--force")] = False,
+    sample_window: Annotated[
+        float,
+        typer.Option(
+            help="Seconds to sample safetimes for before failing over, to pick the sample with the lowest estimated data loss (0: use one read)"
+        ),
+    ] = 0.0,
+    sample_interval: Annotated[
+        float, typer.Option(help="Seconds between safetime samples")
+    ] = 0.2,
+    max_loss_ms: Annotated[
+        float,
+        typer.Option(
+            help="While sampling, fail over as soon as the estimated data loss is at or under this many ms"
+        ),
+    ] = None,
 ):
     """
     Failover (immediately, non-gracefully) the running xCluster DR replication
     """
+    from xclusterdr.manage_dr_cluster import perform_xcluster_dr_failover
+
     confirmation_text = f"You are about to do an emergency failover of the xCluster DR async replication between the source universe {current_primary} and its target universe. You will need to run a recovery in order to re-establish DR, and this will probably require a re-bootstrap of all data. Is this what you want to do?"
 
     if force or command_confirmed(confirmation_text):
         try:
-            return perform_xcluster_dr_failover(customer_uuid, current_primary)
+            return perform_xcluster_dr_failover(
+                customer_uuid,
+                current_primary,
+                sample_window,
+                sample_interval,
+                max_loss_ms,
+            )
         except RuntimeError as e:
             print(f"There was a RuntimeError: {e}")
     else:
@@ -293,6 +406,8 @@ def do_recovery(
     """
     Recovery restores replication that previously had a non-graceful failover
     """
+    from xclusterdr.manage_dr_cluster import perform_xcluster_dr_recovery
+
     confirmation_text = f"You are about to do a recovery of the xCluster DR async replication between the source universe {current_primary} and its target universe. This will probably require a re-bootstrap of all data. Is this what you want to do?"
 
     if force or command_confirmed(confirmation_text):
@@ -316,17 +431,29 @@ def get_xcluster_dr_unreplicated_tables(
         str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
     ],
     xcluster_source_name: Annotated[
-        str, typer.Option(envvar="XCLUSTER_SOURCE", prompt=True)
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
     ],
     force: Annotated[bool, typer.Option("--force")] = False,
 ):
     """
     Show tables eligible for xCluster DR replication management
     """
+    from xclusterdr.manage_dr_cluster import get_xcluster_tables
+    from xclusterdr.render import format_xcluster_tables
+
     confirmation_text = f"This will show the list of tables on the source universe {xcluster_source_name}, both replicated and unreplicated. You can add tables using the do-add-tables-to-dr command. OK?"
 
     if force or command_confirmed(confirmation_text):
-        print(get_xcluster_tables(customer_uuid, xcluster_source_name))
+        print(
+            format_xcluster_tables(
+                get_xcluster_tables(customer_uuid, xcluster_source_name)
+            )
+        )
     else:
         print(f"OK. Command cancelled.")
 
@@ -339,13 +466,19 @@ def do_add_tables_to_dr(
         str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
     ],
     xcluster_source_name: Annotated[
-        str, typer.Option(envvar="XCLUSTER_SOURCE", prompt=True)
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
     ],
     add_table_ids: Annotated[
         str,
         typer.Option(
             help='Comma-separated list of IDs (example: "id1,id2")',
             callback=parse_comma_separated_list,
+            autocompletion=complete_table_ids_of_source,
         ),
     ],
     force: Annotated[bool, typer.Option("--force")] = False,
@@ -353,6 +486,8 @@ def do_add_tables_to_dr(
     """
     Add specified unreplicated table to the xCluster DR configuration
     """
+    from xclusterdr.manage_dr_cluster import add_tables_to_xcluster_dr
+
     confirmation_text = f"You are about to add the tables {add_table_ids} to the xCluster DR async replication stream between the source universe {xcluster_source_name} and its target universe. Is this what you want to do?"
 
     if force or command_confirmed(confirmation_text):
@@ -366,6 +501,368 @@ def do_add_tables_to_dr(
         print(f"OK. Command cancelled.")
 
 
+@app.command("dr-plan", rich_help_panel="xCluster DR Replication Table Management")
+def show_dr_plan(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    desired_state_file: Annotated[
+        str,
+        typer.Option(
+            "--file",
+            envvar="DR_DESIRED_STATE",
+            prompt=True,
+            help="YAML file with the tables each DR pair should replicate",
+        ),
+    ],
+):
+    """
+    Show the tables to add to and remove from DR to match a desired state file
+    """
+    from xclusterdr.reconcile import format_dr_plan, load_desired_state, plan_dr
+
+    try:
+        plans = plan_dr(customer_uuid, load_desired_state(desired_state_file))
+    except RuntimeError as e:
+        print(f"There was a RuntimeError: {e}")
+        return
+    print(format_dr_plan(plans))
+
+
+@app.command("dr-apply", rich_help_panel="xCluster DR Replication Table Management")
+def do_dr_apply(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    desired_state_file: Annotated[
+        str,
+        typer.Option(
+            "--file",
+            envvar="DR_DESIRED_STATE",
+            prompt=True,
+            help="YAML file with the tables each DR pair should replicate",
+        ),
+    ],
+    force: Annotated[bool, typer.Option("--force")] = False,
+):
+    """
+    Add and remove tables in DR to match a desired state file
+    """
+    from xclusterdr.reconcile import (
+        apply_dr_plan,
+        format_dr_plan,
+        has_changes,
+        load_desired_state,
+        plan_dr,
+    )
+
+    try:
+        plans = plan_dr(
+            customer_uuid, load_desired_state(desired_state_file), live=True
+        )
+    except RuntimeError as e:
+        print(f"There was a RuntimeError: {e}")
+        return
+    print(format_dr_plan(plans))
+
+    if not any(has_changes(plan) for plan in plans):
+        return
+
+    confirmation_text = "You are about to change the tables replicated by the DR configs above. Tables added with data will be bootstrapped with a full backup/restore. Is this what you want to do?"
+
+    if force or command_confirmed(confirmation_text):
+        try:
+            return apply_dr_plan(customer_uuid, plans)
+        except RuntimeError as e:
+            print(f"There was a RuntimeError: {e}")
+    else:
+        print(f"OK. Command cancelled.")
+
+
+## app commands: xCluster DR DDL
+
+
+def run_ddl_command(
+    customer_uuid: str,
+    xcluster_source_name: str,
+    database: str,
+    statements: list,
+    force: bool,
+    kind=None,
+    drop_relations=(),
+):
+    from xclusterdr.ddl import check_ddl_statements, run_ddl_on_dr_pair
+    from xclusterdr.render import format_ddl_result
+
+    if kind is not None:
+        try:
+            check_ddl_statements(statements, kind)
+        except RuntimeError as e:
+            print(f"There was a RuntimeError: {e}")
+            return
+
+    ddl = ";\n".join(statements)
+    confirmation_text = f"You are about to run the following on the database {database} of the source universe {xcluster_source_name} and of its target universe, and to update the tables of their xCluster DR config to match:\n{ddl}\nIs this what you want to do?"
+
+    if force or command_confirmed(confirmation_text):
+        try:
+            print(
+                format_ddl_result(
+                    run_ddl_on_dr_pair(
+                        customer_uuid,
+                        xcluster_source_name,
+                        database,
+                        statements,
+                        drop_relations,
+                    )
+                )
+            )
+        except RuntimeError as e:
+            print(f"There was a RuntimeError: {e}")
+    else:
+        print(f"OK. Command cancelled.")
+
+
+@app.command("ddl-create-table", rich_help_panel="xCluster DR DDL")
+def do_ddl_create_table(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    xcluster_source_name: Annotated[
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
+    ],
+    database: Annotated[
+        str,
+        typer.Option(
+            prompt=True,
+            help="The database (YSQL keyspace) to run the DDL in",
+            autocompletion=complete_database_names_of_source,
+        ),
+    ],
+    statements: Annotated[
+        List[str],
+        typer.Option(
+            "--statement",
+            help="A DDL statement; repeat the option to run several, in order",
+        ),
+    ],
+    force: Annotated[bool, typer.Option("--force")] = False,
+):
+    """
+    Create tables on the source and target, and add them to the xCluster DR configuration
+    """
+    run_ddl_command(
+        customer_uuid, xcluster_source_name, database, statements, force, "create-table"
+    )
+
+
+@app.command("ddl-alter-table", rich_help_panel="xCluster DR DDL")
+def do_ddl_alter_table(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    xcluster_source_name: Annotated[
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
+    ],
+    database: Annotated[
+        str,
+        typer.Option(
+            prompt=True,
+            help="The database (YSQL keyspace) to run the DDL in",
+            autocompletion=complete_database_names_of_source,
+        ),
+    ],
+    statements: Annotated[
+        List[str],
+        typer.Option(
+            "--statement",
+            help="A DDL statement; repeat the option to run several, in order",
+        ),
+    ],
+    force: Annotated[bool, typer.Option("--force")] = False,
+):
+    """
+    Alter tables on the source and target
+    """
+    run_ddl_command(
+        customer_uuid, xcluster_source_name, database, statements, force, "alter-table"
+    )
+
+
+@app.command("ddl-drop-table", rich_help_panel="xCluster DR DDL")
+def do_ddl_drop_table(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    xcluster_source_name: Annotated[
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
+    ],
+    database: Annotated[
+        str,
+        typer.Option(
+            prompt=True,
+            help="The database (YSQL keyspace) to run the DDL in",
+            autocompletion=complete_database_names_of_source,
+        ),
+    ],
+    tables: Annotated[
+        List[str],
+        typer.Option(
+            "--table", help="A table (schema.name); repeat the option to drop several"
+        ),
+    ],
+    force: Annotated[bool, typer.Option("--force")] = False,
+):
+    """
+    Remove tables from the xCluster DR configuration, and drop them on the source and target
+    """
+    from xclusterdr.ddl import get_drop_statement
+
+    run_ddl_command(
+        customer_uuid,
+        xcluster_source_name,
+        database,
+        [get_drop_statement("TABLE", table) for table in tables],
+        force,
+        drop_relations=tables,
+    )
+
+
+@app.command("ddl-create-index", rich_help_panel="xCluster DR DDL")
+def do_ddl_create_index(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    xcluster_source_name: Annotated[
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
+    ],
+    database: Annotated[
+        str,
+        typer.Option(
+            prompt=True,
+            help="The database (YSQL keyspace) to run the DDL in",
+            autocompletion=complete_database_names_of_source,
+        ),
+    ],
+    statements: Annotated[
+        List[str],
+        typer.Option(
+            "--statement",
+            help="A DDL statement; repeat the option to run several, in order",
+        ),
+    ],
+    force: Annotated[bool, typer.Option("--force")] = False,
+):
+    """
+    Create indexes on the source and target, and add them to the xCluster DR configuration
+    """
+    run_ddl_command(
+        customer_uuid, xcluster_source_name, database, statements, force, "create-index"
+    )
+
+
+@app.command("ddl-alter-index", rich_help_panel="xCluster DR DDL")
+def do_ddl_alter_index(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    xcluster_source_name: Annotated[
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
+    ],
+    database: Annotated[
+        str,
+        typer.Option(
+            prompt=True,
+            help="The database (YSQL keyspace) to run the DDL in",
+            autocompletion=complete_database_names_of_source,
+        ),
+    ],
+    statements: Annotated[
+        List[str],
+        typer.Option(
+            "--statement",
+            help="A DDL statement; repeat the option to run several, in order",
+        ),
+    ],
+    force: Annotated[bool, typer.Option("--force")] = False,
+):
+    """
+    Alter indexes on the source and target
+    """
+    run_ddl_command(
+        customer_uuid, xcluster_source_name, database, statements, force, "alter-index"
+    )
+
+
+@app.command("ddl-drop-index", rich_help_panel="xCluster DR DDL")
+def do_ddl_drop_index(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    xcluster_source_name: Annotated[
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
+    ],
+    database: Annotated[
+        str,
+        typer.Option(
+            prompt=True,
+            help="The database (YSQL keyspace) to run the DDL in",
+            autocompletion=complete_database_names_of_source,
+        ),
+    ],
+    indexes: Annotated[
+        List[str],
+        typer.Option(
+            "--index", help="An index (schema.name); repeat the option to drop several"
+        ),
+    ],
+    force: Annotated[bool, typer.Option("--force")] = False,
+):
+    """
+    Remove indexes from the xCluster DR configuration, and drop them on the source and target
+    """
+    from xclusterdr.ddl import get_drop_statement
+
+    run_ddl_command(
+        customer_uuid,
+        xcluster_source_name,
+        database,
+        [get_drop_statement("INDEX", index) for index in indexes],
+        force,
+        drop_relations=indexes,
+    )
+
+
 ## app commands: xCluster DR observability
 
 
@@ -375,13 +872,39 @@ def get_observability_safetime_lag(
         str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
     ],
     xcluster_source_name: Annotated[
-        str, typer.Option(envvar="XCLUSTER_SOURCE", prompt=True)
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
     ],
+    samples: Annotated[
+        int,
+        typer.Option(
+            "--samples",
+            help="Read the safetimes this many times to estimate the apply rate and catch-up ETA (needs 2 or more)",
+        ),
+    ] = 1,
+    interval: Annotated[
+        float,
+        typer.Option("--interval", help="Seconds between two reads of the safetimes"),
+    ] = 1.0,
 ):
     """
     Retrieve latency and safetime metrics
     """
-    print(get_xcluster_dr_safetimes(customer_uuid, xcluster_source_name))
+    from xclusterdr.observability import get_xcluster_dr_safetimes
+    from xclusterdr.render import format_safetimes
+
+    print(
+        format_safetimes(
+            get_xcluster_dr_safetimes(
+                customer_uuid, xcluster_source_name, samples, interval
+            ),
+            samples,
+        )
+    )
 
 
 @app.command("obs-status", rich_help_panel="xCluster DR Replication Observability")
@@ -390,13 +913,96 @@ def get_observability_status(
         str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
     ],
     xcluster_source_name: Annotated[
-        str, typer.Option(envvar="XCLUSTER_SOURCE", prompt=True)
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
     ],
 ):
     """
     Retrieve status, state, etc.
     """
-    print(get_status(customer_uuid, xcluster_source_name))
+    from xclusterdr.observability import get_status
+    from xclusterdr.render import format_status
+
+    print(format_status(get_status(customer_uuid, xcluster_source_name)))
+
+
+@app.command("obs-tables", rich_help_panel="xCluster DR Replication Observability")
+def get_observability_tables(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    xcluster_source_name: Annotated[
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
+    ],
+    show_all: Annotated[
+        bool,
+        typer.Option("--all", help="Also list the tables that are replicating"),
+    ] = False,
+):
+    """
+    Show the replication status of each table, unhealthy tables first
+    """
+    from xclusterdr.observability import get_xcluster_table_status
+    from xclusterdr.render import format_table_status
+
+    print(
+        format_table_status(
+            get_xcluster_table_status(customer_uuid, xcluster_source_name), show_all
+        )
+    )
+
+
+@app.command("verify", rich_help_panel="xCluster DR Replication Observability")
+def do_verify(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    xcluster_source_name: Annotated[
+        str,
+        typer.Option(
+            envvar="XCLUSTER_SOURCE",
+            prompt=True,
+            autocompletion=complete_universe_name,
+        ),
+    ],
+    databases: Annotated[
+        List[str],
+        typer.Option(
+            "--database",
+            help="Only verify the tables of this database; repeat the option for several",
+            autocompletion=complete_database_names_of_source,
+        ),
+    ] = None,
+    chunk_rows: Annotated[
+        int, typer.Option(help="The rows compared in one chunk")
+    ] = 10000,
+    workers: Annotated[
+        int,
+        typer.Option(help="The chunks compared at once, each on both universes"),
+    ] = 8,
+):
+    """
+    Compare the rows of the replicated tables on the source and target, by primary key range
+    """
+    from xclusterdr.render import format_verification
+    from xclusterdr.verify import verify_dr_tables
+
+    print(
+        format_verification(
+            verify_dr_tables(
+                customer_uuid, xcluster_source_name, databases, chunk_rows, workers
+            )
+        )
+    )
 
 
 @app.command("obs-xcluster", rich_help_panel="xCluster DR Replication Observability")
@@ -408,7 +1014,155 @@ def get_all_clusters_for_yba(
     """
     Show info for all universes
     """
-    print(get_all_clusters(customer_uuid))
+    from xclusterdr.observability import get_all_clusters
+    from xclusterdr.render import format_dr_pairs
+
+    print(format_dr_pairs(get_all_clusters(customer_uuid)))
+
+
+@app.command("obs-fleet", rich_help_panel="xCluster DR Replication Observability")
+def get_fleet_lag(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    duration: Annotated[
+        float,
+        typer.Option(help="Seconds to keep sampling; 0 samples each DR pair once"),
+    ] = 0,
+    interval: Annotated[
+        float, typer.Option(help="Seconds between two samples of a DR pair")
+    ] = 30,
+    lagging_interval: Annotated[
+        float, typer.Option(help="Seconds between two samples of a lagging DR pair")
+    ] = 5,
+    max_lag_ms: Annotated[
+        float,
+        typer.Option(help="Safetime lag (ms) above which a DR pair is lagging"),
+    ] = 30000,
+    concurrency: Annotated[
+        int, typer.Option(help="Maximum number of DR pairs sampled at once")
+    ] = 8,
+    budget: Annotated[
+        float,
+        typer.Option(
+            envvar="FLEET_REQUEST_BUDGET",
+            help="Maximum requests per second sent to YBA for the samples",
+        ),
+    ] = 5,
+    export: Annotated[
+        str,
+        typer.Option(
+            help="Path of a .json or .csv file kept up to date with the table (optional)"
+        ),
+    ] = None,
+):
+    """
+    Sample the lag of every DR pair into one table
+    """
+    from xclusterdr.fleet_lag import sample_fleet_lag
+    from xclusterdr.render import format_fleet_lag
+
+    fleet_lag = sample_fleet_lag(
+        customer_uuid,
+        duration,
+        interval,
+        lagging_interval,
+        max_lag_ms,
+        concurrency,
+        budget,
+        export,
+    )
+    print(format_fleet_lag(fleet_lag["pairs"]))
+    print(
+        f"Sampled {len(fleet_lag['pairs'])} DR pair(s) with {fleet_lag['requests']} request(s) in {fleet_lag['elapsedSeconds']:.1f}s (budget: {budget} per second)"
+    )
+    if export:
+        print(f"Fleet lag written to {export}")
+
+
+@app.command("dashboard", rich_help_panel="xCluster DR Replication Observability")
+def show_dashboard(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    interval: Annotated[
+        float, typer.Option(help="Seconds between two lag samples of a DR pair")
+    ] = 30,
+    lagging_interval: Annotated[
+        float,
+        typer.Option(help="Seconds between two lag samples of a lagging DR pair"),
+    ] = 5,
+    max_lag_ms: Annotated[
+        float,
+        typer.Option(help="Safetime lag (ms) above which a DR pair is lagging"),
+    ] = 30000,
+    status_interval: Annotated[
+        float, typer.Option(help="Seconds between two reads of the DR configs")
+    ] = 60,
+    task_interval: Annotated[
+        float, typer.Option(help="Seconds between two reads of the task list")
+    ] = 5,
+    concurrency: Annotated[
+        int, typer.Option(help="Maximum number of requests to YBA at once")
+    ] = 8,
+    budget: Annotated[
+        float,
+        typer.Option(
+            envvar="FLEET_REQUEST_BUDGET",
+            help="Maximum requests per second sent to YBA for the dashboard",
+        ),
+    ] = 5,
+):
+    """
+    Show a live full-screen view of every DR pair: state, lag and tasks in flight
+    """
+    from includes.screen import Screen
+    from xclusterdr.dashboard import DashboardData, run_dashboard
+
+    run_dashboard(
+        DashboardData(
+            customer_uuid,
+            interval,
+            lagging_interval,
+            max_lag_ms,
+            concurrency,
+            budget,
+            status_interval,
+            task_interval,
+        ),
+        Screen(),
+    )
+
+
+## app commands: tasks
+
+
+@app.command("tasks", rich_help_panel="Tasks")
+def show_journaled_tasks(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    show_all: Annotated[
+        bool, typer.Option("--all", help="Include finished tasks")
+    ] = False,
+    limit: Annotated[int, typer.Option(help="Show at most this many tasks")] = 20,
+    follow: Annotated[
+        str,
+        typer.Option(help="A task id (or unique prefix) to follow until it finishes"),
+    ] = None,
+):
+    """
+    List the tasks submitted by this tool, or follow one until it finishes
+    """
+    from core.journal import follow_journaled_task, get_journaled_tasks_table
+
+    if follow:
+        try:
+            return follow_journaled_task(customer_uuid, follow)
+        except RuntimeError as e:
+            print(f"There was a RuntimeError: {e}")
+    else:
+        print(get_journaled_tasks_table(customer_uuid, show_all, limit))
 
 
 ## app commands: healthcheck
@@ -419,26 +1173,310 @@ def show_diagram(
     customer_uuid: Annotated[
         str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
     ],
-    universe_name: Annotated[str, typer.Option(envvar="UNIVERSE", prompt=True)],
+    universe_name: Annotated[
+        str,
+        typer.Option(
+            envvar="UNIVERSE", prompt=True, autocompletion=complete_universe_name
+        ),
+    ],
+    expand_nodes: Annotated[
+        bool,
+        typer.Option(
+            "--expand-nodes",
+            help="Also draw each node around its availability zone marker",
+        ),
+    ] = False,
+    output_dir: Annotated[
+        str, typer.Option(help="Directory for the diagram files")
+    ] = "/tmp",
+    shared_plotlyjs: Annotated[
+        bool,
+        typer.Option(
+            "--shared-plotlyjs",
+            help="Write plotly.js once to the output directory instead of embedding it in each file",
+        ),
+    ] = False,
 ):
     """
     Create network diagram for provided universe name
     """
-    return get_diagram_map(customer_uuid, universe_name)
+    from healthcheck.map import get_diagram_map
+
+    return get_diagram_map(
+        customer_uuid, universe_name, expand_nodes, output_dir, shared_plotlyjs
+    )
+
+
+@app.command("diagram-fleet", rich_help_panel="Healthcheck")
+def show_fleet_diagram(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    universe_names: Annotated[
+        str,
+        typer.Option(
+            help='Comma-separated list of universe names (example: "name1,name2"); default is all universes',
+            callback=parse_comma_separated_list,
+        ),
+    ] = "",
+    output_dir: Annotated[
+        str, typer.Option(help="Directory for the diagram file")
+    ] = "/tmp",
+    shared_plotlyjs: Annotated[
+        bool,
+        typer.Option(
+            "--shared-plotlyjs",
+            help="Write plotly.js once to the output directory instead of embedding it in each file",
+        ),
+    ] = False,
+    concurrency: Annotated[
+        int, typer.Option(help="Maximum number of concurrent requests to YBA")
+    ] = 8,
+):
+    """
+    Create one network diagram for many universes and their xCluster DR links
+    """
+    from healthcheck.map import get_fleet_diagram_map
+
+    try:
+        return get_fleet_diagram_map(
+            customer_uuid, universe_names, output_dir, shared_plotlyjs, concurrency
+        )
+    except RuntimeError as e:
+        print(f"There was a RuntimeError: {e}")
+
+
+@app.command("healthcheck", rich_help_panel="Healthcheck")
+def run_healthcheck(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    universe_names: Annotated[
+        str,
+        typer.Option(
+            help='Comma-separated list of universe names (example: "name1,name2")',
+            callback=parse_comma_separated_list,
+        ),
+    ] = "",
+    all_universes: Annotated[
+        bool, typer.Option("--all", help="Check every universe for this YBA instance")
+    ] = False,
+    concurrency: Annotated[
+        int, typer.Option(help="Maximum number of universes checked at once")
+    ] = 8,
+    max_lag_ms: Annotated[
+        float, typer.Option(help="Safetime lag (ms) above which a DR pair is reported")
+    ] = 30000,
+    report: Annotated[
+        str, typer.Option(help="Path of a json file for the full report (optional)")
+    ] = None,
+):
+    """
+    Check node counts, AZ spread, DR role, DR state and lag for one or more universes
+    """
+    from healthcheck.fleet import check_fleet, format_fleet_report, write_fleet_report
+
+    if not all_universes and not universe_names:
+        print("Please provide --universe-names or --all. Command cancelled.")
+        raise typer.Exit(code=2)
+
+    fleet_report = check_fleet(
+        customer_uuid,
+        None if all_universes else universe_names,
+        concurrency,
+        max_lag_ms,
+    )
+    print(format_fleet_report(fleet_report))
+    print(
+        f"Checked {len(fleet_report['universes'])} universe(s) in {fleet_report['elapsedSeconds']:.1f}s"
+    )
+    if report:
+        write_fleet_report(fleet_report, report)
+
+    if any(result["status"] != "OK" for result in fleet_report["universes"]):
+        raise typer.Exit(code=1)
+
+
+@app.command("snapshot", rich_help_panel="Healthcheck")
+def save_universe_snapshot(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    universe_name: Annotated[
+        str,
+        typer.Option(
+            envvar="UNIVERSE", prompt=True, autocompletion=complete_universe_name
+        ),
+    ],
+):
+    """
+    Save the universe details to the snapshot store
+    """
+    from healthcheck.snapshots import take_universe_snapshot
+
+    try:
+        return take_universe_snapshot(customer_uuid, universe_name)
+    except RuntimeError as e:
+        print(f"There was a RuntimeError: {e}")
+
+
+@app.command("snapshot-diff", rich_help_panel="Healthcheck")
+def show_universe_snapshot_diff(
+    universe_name: Annotated[
+        str,
+        typer.Option(
+            envvar="UNIVERSE", prompt=True, autocompletion=complete_universe_name
+        ),
+    ],
+    old: Annotated[
+        str, typer.Option(help="Older snapshot id (default: the second most recent)")
+    ] = None,
+    new: Annotated[
+        str, typer.Option(help="Newer snapshot id (default: the most recent)")
+    ] = None,
+):
+    """
+    Show what changed in a universe between two snapshots
+    """
+    from healthcheck.snapshots import diff_universe_snapshots
+
+    try:
+        print(diff_universe_snapshots(universe_name, old, new))
+    except RuntimeError as e:
+        print(f"There was a RuntimeError: {e}")
+
+
+## app commands: shell
+
+
+def refresh_shell_session():
+    from core.topology import refresh_topology
+
+    state.pop("customer_uuid", None)
+    counts = refresh_topology(get_customer_uuid())
+    print(
+        f"Refreshed: {counts['universesUpserted']} universe(s) and {counts['drLinksUpserted']} DR link(s) changed, "
+        f"{counts['universesRemoved']} universe(s) and {counts['drLinksRemoved']} DR link(s) removed"
+    )
+
+
+@app.command("shell", rich_help_panel="Shell")
+def run_interactive_shell():
+    """
+    Run commands interactively, keeping the connection to YBA and lookups between them
+    """
+    run_shell(app, refresh_shell_session)
+
+
+@app.command("refresh-index", rich_help_panel="Shell")
+def refresh_completion_index_command(
+    customer_uuid: Annotated[
+        str, typer.Argument(default_factory=get_customer_uuid, hidden=True)
+    ],
+    concurrency: Annotated[
+        int, typer.Option(help="Maximum number of universes read at once")
+    ] = 8,
+    quiet: Annotated[bool, typer.Option("--quiet", help="Print nothing")] = False,
+):
+    """
+    Rebuild the local index of universe, database and table names used by shell completion
+    """
+    from core.completion_index import refresh_completion_index
+
+    counts = refresh_completion_index(customer_uuid, concurrency)
+    if not quiet:
+        print(
+            f"Indexed {counts['universes']} universe(s), {counts['databases']} database(s) and {counts['tables']} table(s)"
+        )
+        if counts["failedUniverses"]:
+            print(
+                f"Could not read the databases and tables of: {', '.join(counts['failedUniverses'])}"
+            )
 
 
 ## the app callback
 
 
+def log_command(ctx: typer.Context):
+    # every event of the command carries its name; its start and end are logged
+    import sys
+    import time
+
+    from includes.structured_logging import (
+        bind_log_context,
+        flush_logging,
+        get_logger,
+        reset_log_context,
+    )
+
+    logger = get_logger("command")
+    token = bind_log_context(command=ctx.invoked_subcommand)
+    start_time = time.monotonic()
+    logger.info("command started", extra={"fields": {"arguments": sys.argv[1:]}})
+
+    def log_end():
+        logger.info(
+            "command ended",
+            extra={"fields": {"latency_ms": (time.monotonic() - start_time) * 1000}},
+        )
+        reset_log_context(token)
+        # in the shell, the prompt comes after the command's progress
+        flush_logging()
+
+    ctx.call_on_close(log_end)
+
+
 @app.callback()
 def main(
+    ctx: typer.Context,
     config: str = typer.Option(
         None, "--config", "-c", help="Path to the config file (optional)"
     ),
+    http_metrics: bool = typer.Option(
+        False,
+        "--http-metrics",
+        help="Show the YBA request metrics (retries, failures, throttling, latency) when the command ends",
+    ),
+    cprofile: str = typer.Option(
+        None,
+        "--cprofile",
+        help="Profile the command and save the stats to this file (plus a .txt report)",
+    ),
+    trace_allocations: bool = typer.Option(
+        False,
+        "--tracemalloc",
+        help="Show the top memory allocation sites of the command when it ends",
+    ),
+    log_file: str = typer.Option(
+        None,
+        "--log-file",
+        envvar="LOG_FILE",
+        help="Also write structured (json lines) logs of the command to this file",
+    ),
 ):
     if config:
+        from includes.get_demo_config import get_config
+
         typer.echo(f"Using config file: {config}")
         get_config(config)
+    if log_file:
+        from includes.structured_logging import configure_logging
+
+        configure_logging(log_file)
+    log_command(ctx)
+    if http_metrics:
+        from core.http_client import format_http_metrics, get_http_metrics
+
+        ctx.call_on_close(lambda: print(format_http_metrics(get_http_metrics())))
+    # both hooks start here, so they cover the command and not interpreter startup
+    if trace_allocations:
+        from includes.profiling import trace_command_allocations
+
+        trace_command_allocations(ctx)
+    if cprofile:
+        from includes.profiling import profile_command
+
+        profile_command(ctx, cprofile)
 
 
 if __name__ == "__main__":
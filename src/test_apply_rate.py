@@ -0,0 +1,41 @@
+import pytest
+
+from xclusterdr.apply_rate import ApplyRateEstimator, format_catch_up
+
+
+def read(estimator, wall_seconds, lag_ms, key="ns"):
+    return estimator.update(
+        key, wall_seconds * 1_000_000 - lag_ms * 1000, lag_ms * 1000
+    )
+
+
+def test_rate_and_catch_up_of_a_draining_replica():
+    estimator = ApplyRateEstimator(half_life_seconds=10)
+
+    first = read(estimator, 0, 10000)
+    assert first.rate is None
+    assert format_catch_up(first) == ""
+
+    # 1000 ms of lag drained in 1s: the safetime advanced 2s
+    estimate = read(estimator, 1, 9000)
+    assert estimate.rate == pytest.approx(2.0)
+    assert estimate.get_catch_up_seconds() == pytest.approx(9.0)
+    assert estimate.get_catch_up_seconds(target_lag_ms=1000) == pytest.approx(8.0)
+
+    # a reading one half-life later counts half
+    estimate = read(estimator, 11, 9000)
+    assert estimate.rate == pytest.approx(1.5)
+    assert estimate.samples == 2
+    assert format_catch_up(estimate) == "18.0"
+
+
+def test_replica_falling_behind_has_no_catch_up():
+    estimator = ApplyRateEstimator()
+    for second in range(5):
+        estimate = read(estimator, second, 1000 + 500 * second)
+
+    assert estimate.rate == pytest.approx(0.5)
+    assert estimate.get_catch_up_seconds() is None
+    assert format_catch_up(estimate) == "falling behind"
+    # namespaces are estimated apart
+    assert read(estimator, 5, 100, key="other").rate is None
@@ -0,0 +1,97 @@
+import pytest
+
+from xclusterdr import common
+
+DR_CONFIGS = {
+    # switched over since the index was built: west is now the primary
+    "dr-1": {"uuid": "dr-1", "primaryUniverseUuid": "u-west", "paused": False},
+    "dr-2": {"uuid": "dr-2", "primaryUniverseUuid": "u-north", "paused": True},
+    "dr-3": {"uuid": "dr-3", "primaryUniverseUuid": "u-south"},
+}
+
+
+@pytest.fixture
+def yba(monkeypatch):
+    """
+    Fakes a stale topology index and the live YBA answers; the test reads which were asked.
+    """
+    calls = {"index": [], "universes": [], "invalidated": 0}
+    indexed_roles = {
+        "east": {
+            "universeUUID": "u-east",
+            "drConfigUuidsAsSource": ["dr-1"],
+            "drConfigUuidsAsTarget": [],
+        },
+        "north": {
+            "universeUUID": "u-north",
+            "drConfigUuidsAsSource": [],
+            "drConfigUuidsAsTarget": [],
+        },
+        "south": {
+            "universeUUID": "u-south",
+            "drConfigUuidsAsSource": ["dr-3"],
+            "drConfigUuidsAsTarget": [],
+        },
+        "west": {
+            "universeUUID": "u-west",
+            "drConfigUuidsAsSource": [],
+            "drConfigUuidsAsTarget": ["dr-1"],
+        },
+    }
+    live_universes = {
+        "east": {"drConfigUuidsAsSource": [], "drConfigUuidsAsTarget": ["dr-1"]},
+        # set up as a DR source from another host
+        "north": {"drConfigUuidsAsSource": ["dr-2"], "drConfigUuidsAsTarget": []},
+        "west": {"drConfigUuidsAsSource": ["dr-1"], "drConfigUuidsAsTarget": []},
+    }
+
+    def lookup_dr_roles(customer_uuid, universe_name):
+        calls["index"].append(universe_name)
+        return indexed_roles.get(universe_name)
+
+    def get_universe_by_name(customer_uuid, universe_name):
+        calls["universes"].append(universe_name)
+        return (
+            [live_universes[universe_name]] if universe_name in live_universes else []
+        )
+
+    def invalidate_topology(customer_uuid):
+        calls["invalidated"] += 1
+
+    monkeypatch.setattr(common, "lookup_dr_roles", lookup_dr_roles)
+    monkeypatch.setattr(common, "_get_universe_by_name", get_universe_by_name)
+    monkeypatch.setattr(
+        common, "_get_xcluster_dr_configs", lambda c, uuid: DR_CONFIGS[uuid]
+    )
+    monkeypatch.setattr(common, "invalidate_topology", invalidate_topology)
+    return calls
+
+
+def test_live_reads_the_role_from_yba(yba):
+    with pytest.raises(RuntimeError, match="'east' does not have a DR config"):
+        common.get_source_xcluster_dr_config("c", "east", "all", live=True)
+
+    assert common.get_source_xcluster_dr_config("c", "west", "uuid", live=True) == (
+        "dr-1"
+    )
+    assert yba["index"] == []
+
+
+def test_a_stale_source_role_in_the_index_is_checked(yba):
+    with pytest.raises(RuntimeError, match="'east' does not have a DR config"):
+        common.get_source_xcluster_dr_config("c", "east", "all")
+
+    assert yba["universes"] == ["east"]
+    assert yba["invalidated"] == 1
+
+
+def test_no_source_role_in_the_index_asks_yba(yba):
+    assert common.get_source_xcluster_dr_config("c", "north", "paused") is True
+    assert common.get_source_xcluster_dr_config("c", "west", "uuid") == "dr-1"
+    assert yba["universes"] == ["north", "west"]
+
+
+def test_a_current_index_saves_the_universe_read(yba):
+    assert common.get_source_xcluster_dr_config("c", "south", "uuid") == "dr-3"
+    assert yba["universes"] == []
+    assert yba["invalidated"] == 0
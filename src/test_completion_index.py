@@ -0,0 +1,82 @@
+import pytest
+
+from core import completion_index, internal_rest_apis, topology
+
+UNIVERSES = [
+    {"universeUUID": "u-east", "name": "east"},
+    {"universeUUID": "u-west", "name": "west"},
+]
+
+TABLES = {
+    "u-east": [
+        {
+            "tableID": "aa01",
+            "keySpace": "orders",
+            "pgSchemaName": "public",
+            "tableName": "order",
+        },
+        {
+            "tableID": "aa02",
+            "keySpace": "orders",
+            "pgSchemaName": "public",
+            "tableName": "order_pkey_idx",
+            "isIndexTable": True,
+        },
+        {
+            "tableID": "ab03",
+            "keySpace": "users",
+            "pgSchemaName": "public",
+            "tableName": "user",
+        },
+    ],
+}
+
+
+@pytest.fixture
+def indexed(tmp_path, monkeypatch):
+    monkeypatch.setenv("DAY2OPS_STATE_DIR", str(tmp_path))
+    monkeypatch.setenv("COMPLETION_INDEX_TTL", "0")
+    monkeypatch.setattr(topology, "_memo", {})
+    monkeypatch.setattr(
+        internal_rest_apis, "_list_all_universes", lambda customer_uuid: UNIVERSES
+    )
+    monkeypatch.setattr(topology, "_list_all_universes", lambda customer_uuid: [])
+
+    def fake_namespaces(customer_uuid, universe_uuid):
+        if universe_uuid == "u-west":
+            raise RuntimeError("ERROR: GET /namespaces failed after 4 attempt(s)")
+        return [{"name": "orders"}, {"name": "users"}]
+
+    monkeypatch.setattr(internal_rest_apis, "_get_database_namespaces", fake_namespaces)
+    monkeypatch.setattr(
+        internal_rest_apis,
+        "_get_all_ysql_tables_list",
+        lambda customer_uuid, universe_uuid: TABLES.get(universe_uuid, []),
+    )
+    return completion_index.refresh_completion_index("c")
+
+
+def test_refresh_indexes_names_and_tables(indexed):
+    assert indexed == {
+        "universes": 2,
+        "databases": 2,
+        "tables": 2,
+        "failedUniverses": ["west"],
+    }
+    # the same list of universes refreshed the topology index
+    assert topology.lookup_universe_uuid("c", "west") == "u-west"
+
+
+def test_completion_of_names_and_comma_separated_lists(indexed):
+    assert completion_index.complete_universe_names("") == ["east", "west"]
+    assert completion_index.complete_universe_names("w") == ["west"]
+    assert completion_index.complete_database_names("orders,u", "east") == [
+        "orders,users"
+    ]
+    assert completion_index.complete_database_names("o", "west") == []
+    # index tables are left out; the help is the table's qualified name
+    assert completion_index.complete_table_ids("x1,a", "east") == [
+        ("x1,aa01", "orders.public.order"),
+        ("x1,ab03", "users.public.user"),
+    ]
+    assert completion_index.complete_table_ids("ab") == [("ab03", "users.public.user")]
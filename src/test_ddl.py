@@ -0,0 +1,264 @@
+import os
+import uuid
+
+import pytest
+
+from xclusterdr import ddl
+
+
+def test_schema_differences_name_the_side():
+    source = frozenset(
+        {
+            ("column", "public", "t", "id integer not null"),
+            ("column", "public", "t", "v text"),
+        }
+    )
+    target = frozenset(
+        {
+            ("column", "public", "t", "id integer not null"),
+            ("column", "public", "t", "v integer"),
+        }
+    )
+    assert ddl.get_schema_differences(source, target) == [
+        "only on the source: column of public.t: v text",
+        "only on the target: column of public.t: v integer",
+    ]
+    assert ddl.get_schema_differences(source, source) == []
+
+
+def test_check_rejects_more_than_one_statement_per_argument():
+    ddl.check_ddl_statements(["CREATE TABLE t (id int);  "], "create-table")
+    with pytest.raises(RuntimeError, match="more than one statement"):
+        ddl.check_ddl_statements(
+            ["CREATE TABLE t (id int); DROP TABLE u"], "create-table"
+        )
+
+
+class FakePool:
+    """
+    Stands in for the YsqlPool of one side: the relations are those of the source before and after the DDL, which fails if error is set.
+    """
+
+    def __init__(self, schema, relations, relations_after, error=None):
+        self.schema = schema
+        self.relations = relations
+        self.relations_after = relations_after
+        self.error = error
+        self.executed = []
+
+    def query(self, statement, params=None):
+        if statement == ddl.SCHEMA_QUERY:
+            return list(self.schema)
+        if statement == ddl.TABLE_INDEXES_QUERY:
+            return [
+                relation
+                for relation in self.relations
+                if params == ("public", "orders") and relation[1].startswith("orders_")
+            ]
+        return list(self.relations)
+
+    def execute_all(self, statements):
+        self.executed.extend(statements)
+        if self.error is not None:
+            raise Exception(self.error)
+        self.relations = self.relations_after
+
+
+@pytest.fixture
+def dr_pair(monkeypatch):
+    """
+    Fakes a DR pair replicating public.orders, its index public.orders_idx and public.users; the test sets the pools of each side, and reads the set_tables calls.
+    """
+    relations = [("public", "orders"), ("public", "orders_idx"), ("public", "users")]
+    schema = [("column", "public", "orders", "id integer")]
+    pair = {
+        "pools": {
+            side: FakePool(schema, relations, [("public", "users")])
+            for side in ("source", "target")
+        },
+        "set_tables": [],
+    }
+    monkeypatch.setattr(
+        ddl,
+        "get_source_xcluster_dr_config",
+        lambda customer_uuid, name, key, live: {
+            "uuid": "dr-1",
+            "primaryUniverseUuid": "source",
+            "drReplicaUniverseUuid": "target",
+            "tables": ["id-orders", "id-orders_idx", "id-users"],
+        },
+    )
+    monkeypatch.setattr(
+        ddl,
+        "_get_universe_by_uuid",
+        lambda customer_uuid, universe_uuid: {
+            "universeUUID": universe_uuid,
+            "name": universe_uuid,
+        },
+    )
+    monkeypatch.setattr(
+        ddl,
+        "get_ysql_pool",
+        lambda universe, database: pair["pools"][universe.universe_uuid],
+    )
+    monkeypatch.setattr(
+        ddl,
+        "_get_all_ysql_tables_list",
+        lambda customer_uuid, universe_uuid: [
+            {
+                "tableID": f"id-{name}",
+                "keySpace": "db",
+                "pgSchemaName": "public",
+                "tableName": name,
+            }
+            for _, name in relations
+        ],
+    )
+    monkeypatch.setattr(
+        ddl,
+        "_set_tables",
+        lambda customer_uuid, dr_config, tables, friendly_name: pair[
+            "set_tables"
+        ].append(tables),
+    )
+    return pair
+
+
+def drop_orders():
+    return ddl.run_ddl_on_dr_pair(
+        "c",
+        "source",
+        "db",
+        [ddl.get_drop_statement("TABLE", "orders")],
+        ["orders"],
+    )
+
+
+def test_drop_removes_the_table_and_its_indexes_from_the_dr_config(dr_pair):
+    result = drop_orders()
+
+    assert result["removedTables"] == ["id-orders", "id-orders_idx"]
+    assert dr_pair["set_tables"] == [["id-users"]]
+
+
+def test_drop_on_schemas_that_differ_leaves_the_dr_config(dr_pair):
+    dr_pair["pools"]["target"].schema = []
+
+    with pytest.raises(RuntimeError, match="already differ"):
+        drop_orders()
+
+    assert dr_pair["set_tables"] == []
+    assert dr_pair["pools"]["source"].executed == []
+
+
+def test_a_failed_drop_names_the_tables_removed_from_the_dr_config(dr_pair):
+    dr_pair["pools"]["target"].error = "lock timeout"
+
+    with pytest.raises(RuntimeError) as error:
+        drop_orders()
+
+    assert "on the target: lock timeout" in str(error.value)
+    assert (
+        "The tables id-orders, id-orders_idx were removed from the xCluster DR config"
+        in str(error.value)
+    )
+    assert dr_pair["set_tables"] == [["id-users"]]
+
+
+# PostgreSQL stand-ins for the two universes, e.g. host=127.0.0.1 port=5432 dbname=source user=postgres
+STAND_IN_DSNS = (os.getenv("DDL_TEST_SOURCE_DSN"), os.getenv("DDL_TEST_TARGET_DSN"))
+
+
+@pytest.mark.skipif(
+    not all(STAND_IN_DSNS),
+    reason="set DDL_TEST_SOURCE_DSN and DDL_TEST_TARGET_DSN to two empty PostgreSQL databases",
+)
+def test_ddl_runs_on_both_sides_and_adds_new_tables_in_one_task(monkeypatch):
+    pytest.importorskip("psycopg2")
+    from core.ysql import YsqlPool
+
+    pools = {
+        "source": YsqlPool({"dsn": STAND_IN_DSNS[0]}, 2),
+        "target": YsqlPool({"dsn": STAND_IN_DSNS[1]}, 2),
+    }
+    schema = f"ddl_{uuid.uuid4().hex[:8]}"
+    set_tables_calls = []
+
+    monkeypatch.setattr(
+        ddl,
+        "get_source_xcluster_dr_config",
+        lambda customer_uuid, name, key, live: {
+            "uuid": "dr-1",
+            "primaryUniverseUuid": "source",
+            "drReplicaUniverseUuid": "target",
+            "tables": ["existing"],
+            "bootstrapParams": {"backupRequestParams": {"storageConfigUUID": "s-1"}},
+        },
+    )
+    monkeypatch.setattr(
+        ddl,
+        "_get_universe_by_uuid",
+        lambda customer_uuid, universe_uuid: {
+            "universeUUID": universe_uuid,
+            "name": universe_uuid,
+        },
+    )
+    monkeypatch.setattr(
+        ddl, "get_ysql_pool", lambda universe, database: pools[universe.universe_uuid]
+    )
+    monkeypatch.setattr(
+        ddl,
+        "_get_all_ysql_tables_list",
+        lambda customer_uuid, universe_uuid: [
+            {
+                "tableID": f"{table_schema}.{name}",
+                "keySpace": "db",
+                "pgSchemaName": table_schema,
+                "tableName": name,
+            }
+            for table_schema, name in pools["source"].query(ddl.RELATIONS_QUERY)
+        ],
+    )
+    monkeypatch.setattr(
+        ddl,
+        "_set_tables",
+        lambda customer_uuid, dr_config, tables, friendly_name: set_tables_calls.append(
+            tables
+        ),
+    )
+
+    try:
+        for pool in pools.values():
+            pool.execute_all([f"CREATE SCHEMA {schema}"])
+
+        result = ddl.run_ddl_on_dr_pair(
+            "c",
+            "source",
+            "db",
+            [
+                f"CREATE TABLE {schema}.a (id int PRIMARY KEY, v text)",
+                f"CREATE TABLE {schema}.b (id int PRIMARY KEY)",
+                f"CREATE INDEX a_v ON {schema}.a (v)",
+            ],
+        )
+        # the primary keys are part of their tables; the new tables and the index go in one call
+        assert sorted(result["addedTables"]) == [
+            f"{schema}.a",
+            f"{schema}.a_v",
+            f"{schema}.b",
+        ]
+        assert set_tables_calls == [["existing"] + result["addedTables"]]
+
+        pools["source"].execute_all([f"ALTER TABLE {schema}.b ADD COLUMN v int"])
+        with pytest.raises(RuntimeError, match="already differ"):
+            ddl.run_ddl_on_dr_pair(
+                "c", "source", "db", [f"ALTER TABLE {schema}.a ADD COLUMN w int"]
+            )
+        # nothing ran on either side
+        assert ("column", schema, "a", "w integer") not in ddl.read_schema(
+            pools["source"]
+        )
+    finally:
+        for pool in pools.values():
+            pool.execute_all([f"DROP SCHEMA IF EXISTS {schema} CASCADE"])
+            pool.close()
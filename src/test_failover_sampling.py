@@ -0,0 +1,79 @@
+import math
+
+from xclusterdr import failover_sampling
+
+
+class FakeResponse:
+    def __init__(self, losses):
+        self.losses = losses
+
+    def json(self):
+        return {
+            "safetimes": [
+                {
+                    "namespaceId": f"ns{index}",
+                    "safetimeEpochUs": 1_700_000_000_000_000 + index,
+                    "estimatedDataLossMs": loss,
+                }
+                for index, loss in enumerate(self.losses)
+            ]
+        }
+
+
+def fake_sender(monkeypatch, samples):
+    sent = []
+
+    def fake_send(prepared_request, timeout=None, retry=True):
+        sent.append(prepared_request)
+        losses = samples.pop(0)
+        if losses is None:
+            raise RuntimeError("ERROR: GET /safetime failed after 1 attempt(s)")
+        return FakeResponse(losses)
+
+    monkeypatch.setattr(
+        failover_sampling,
+        "_prepare_xcluster_dr_safetime_request",
+        lambda customer_uuid, dr_config_uuid: "prepared",
+    )
+    monkeypatch.setattr(failover_sampling.http_client, "send", fake_send)
+    # a fake clock: each sample takes no time, and sleeping advances the clock
+    clock = [0.0]
+    monkeypatch.setattr(failover_sampling.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(
+        failover_sampling.time,
+        "sleep",
+        lambda seconds: clock.__setitem__(0, clock[0] + seconds),
+    )
+    return sent
+
+
+def test_sampling_picks_lowest_worst_namespace_loss(monkeypatch):
+    sent = fake_sender(
+        monkeypatch,
+        [[400, 900], None, [300, 500], [100, 700], [-1, 10], [800, 800]],
+    )
+
+    # six samples fit in the window
+    sampling = failover_sampling.sample_failover_safetimes("c", "dr", 0.55, 0.1)
+
+    # the worst namespace decides a sample's loss; unknown estimates are never chosen
+    assert (
+        failover_sampling.get_sample_loss_ms([{"estimatedDataLossMs": -1}]) == math.inf
+    )
+    assert sampling["chosen"]["lossMs"] == 500
+    assert sampling["samples"] == 5
+    assert sampling["errors"] == 1
+    assert not sampling["underBound"]
+    assert sent == ["prepared"] * 6
+
+
+def test_sampling_stops_under_the_bound(monkeypatch):
+    sent = fake_sender(monkeypatch, [[900], [250], [50]])
+
+    sampling = failover_sampling.sample_failover_safetimes(
+        "c", "dr", 60, 0.01, max_loss_ms=300
+    )
+
+    assert sampling["underBound"]
+    assert sampling["chosen"]["sample"] == 2
+    assert len(sent) == 2
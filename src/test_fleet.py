@@ -0,0 +1,198 @@
+import json
+
+import pytest
+
+from core.models import Universe
+from healthcheck import fleet
+
+
+def make_universe_json(
+    name,
+    azs=("a", "b", "c"),
+    states=None,
+    replication_factor=3,
+    dr_as_source=(),
+    dr_as_target=(),
+):
+    states = states or ["Live"] * len(azs)
+    return {
+        "universeUUID": f"{name}-uuid",
+        "name": name,
+        "drConfigUuidsAsSource": list(dr_as_source),
+        "drConfigUuidsAsTarget": list(dr_as_target),
+        "universeDetails": {
+            "clusters": [
+                {
+                    "uuid": "primary",
+                    "clusterType": "PRIMARY",
+                    "userIntent": {
+                        "numNodes": len(azs),
+                        "replicationFactor": replication_factor,
+                    },
+                }
+            ],
+            "nodeDetailsSet": [
+                {
+                    "nodeName": f"{name}-n{i}",
+                    "state": state,
+                    "placementUuid": "primary",
+                    "cloudInfo": {"cloud": "gcp", "region": "r", "az": az},
+                }
+                for i, (az, state) in enumerate(zip(azs, states))
+            ],
+        },
+    }
+
+
+@pytest.fixture
+def dr_apis(monkeypatch):
+    """
+    Fakes the DR config and safetime APIs; the test sets the configs and lags, and reads the safetime calls.
+    """
+    apis = {"configs": {}, "lags_us": {}, "safetime_calls": []}
+
+    def get_xcluster_dr_configs(customer_uuid, dr_config_uuid):
+        return apis["configs"][dr_config_uuid]
+
+    def get_xcluster_dr_safetime(customer_uuid, dr_config_uuid):
+        apis["safetime_calls"].append(dr_config_uuid)
+        return {
+            "safetimes": [
+                {"safetimeLagUs": lag_us}
+                for lag_us in apis["lags_us"].get(dr_config_uuid, [])
+            ]
+        }
+
+    monkeypatch.setattr(fleet, "_get_xcluster_dr_configs", get_xcluster_dr_configs)
+    monkeypatch.setattr(fleet, "_get_xcluster_dr_safetime", get_xcluster_dr_safetime)
+    return apis
+
+
+def test_check_universe_reports_each_problem(dr_apis):
+    dr_apis["configs"]["dr-1"] = {
+        "uuid": "dr-1",
+        "state": "Halted",
+        "status": "Failed",
+        "paused": True,
+    }
+    dr_apis["lags_us"]["dr-1"] = [1_000_000, 45_000_000]
+    universe = Universe.from_json(
+        make_universe_json(
+            "east",
+            azs=("a", "a", "b"),
+            states=["Live", "Stopped", "Live"],
+            dr_as_source=["dr-1"],
+        )
+    )
+
+    result = fleet.check_universe("c", universe, max_lag_ms=30000)
+
+    assert result["status"] == "WARN"
+    assert (result["liveNodes"], result["expectedNodes"], result["azs"]) == (2, 3, 2)
+    assert (result["drRole"], result["drConfigUuid"]) == ("source", "dr-1")
+    assert result["maxSafetimeLagMs"] == 45000
+    assert result["problems"] == [
+        "2 of 3 nodes live",
+        "2 AZs for replication factor 3",
+        "DR state is Halted",
+        "DR is paused",
+        "safetime lag 45000 ms",
+    ]
+
+
+def test_check_universe_measures_lag_from_the_source_only(dr_apis):
+    dr_apis["configs"]["dr-1"] = {
+        "uuid": "dr-1",
+        "state": "Replicating",
+        "status": "Running",
+        "paused": False,
+    }
+    dr_apis["lags_us"]["dr-1"] = [90_000_000]
+
+    target = fleet.check_universe(
+        "c", Universe.from_json(make_universe_json("west", dr_as_target=["dr-1"]))
+    )
+    assert (target["status"], target["drRole"], target["problems"]) == (
+        "OK",
+        "target",
+        [],
+    )
+    assert target["maxSafetimeLagMs"] is None
+    assert dr_apis["safetime_calls"] == []
+
+    plain = fleet.check_universe("c", Universe.from_json(make_universe_json("solo")))
+    assert (plain["status"], plain["drRole"], plain["drState"]) == ("OK", "", None)
+
+
+def test_check_fleet_keeps_the_results_of_the_other_universes(dr_apis, monkeypatch):
+    dr_apis["configs"]["dr-1"] = {
+        "uuid": "dr-1",
+        "state": "Replicating",
+        "status": "Running",
+        "paused": False,
+    }
+    dr_apis["lags_us"]["dr-1"] = [2_000]
+    universes_json = [
+        make_universe_json("west", dr_as_target=["dr-1"]),
+        make_universe_json("east", dr_as_source=["dr-1"]),
+        # its DR config cannot be read
+        make_universe_json("broken", dr_as_source=["dr-missing"]),
+    ]
+    refreshed = []
+    monkeypatch.setattr(fleet, "_list_all_universes", lambda c: universes_json)
+    monkeypatch.setattr(
+        fleet, "refresh_topology", lambda c, universes: refreshed.append(universes)
+    )
+
+    report = fleet.check_fleet("c", concurrency=3)
+
+    assert refreshed == [universes_json]
+    assert [(result["name"], result["status"]) for result in report["universes"]] == [
+        ("broken", "ERROR"),
+        ("east", "OK"),
+        ("west", "OK"),
+    ]
+    assert report["universes"][0]["problems"] == ["check failed: 'dr-missing'"]
+    assert report["universes"][1]["maxSafetimeLagMs"] == 2
+    assert "check failed: 'dr-missing'" in fleet.format_fleet_report(report)
+
+
+def test_check_fleet_looks_up_named_universes(dr_apis, monkeypatch):
+    def get_universe_by_name(customer_uuid, universe_name):
+        return [make_universe_json("east")] if universe_name == "east" else []
+
+    monkeypatch.setattr(fleet, "_get_universe_by_name", get_universe_by_name)
+
+    report = fleet.check_fleet("c", ["missing", "east"])
+
+    assert [
+        (result["name"], result["status"], result["problems"])
+        for result in report["universes"]
+    ] == [
+        ("east", "OK", []),
+        (
+            "missing",
+            "ERROR",
+            ["check failed: ERROR: the universe 'missing' was not found."],
+        ),
+    ]
+
+
+def test_write_fleet_report(tmp_path, capsys):
+    report = {"time": "t", "elapsedSeconds": 0.1, "universes": []}
+    report_file_name = tmp_path / "fleet.json"
+
+    fleet.write_fleet_report(report, str(report_file_name))
+
+    assert json.loads(report_file_name.read_text()) == report
+    assert str(report_file_name) in capsys.readouterr().out
+
+
+def test_a_node_without_a_state_is_not_live(dr_apis):
+    universe_json = make_universe_json("east")
+    del universe_json["universeDetails"]["nodeDetailsSet"][2]["state"]
+
+    result = fleet.check_universe("c", Universe.from_json(universe_json))
+
+    assert result["liveNodes"] == 2
+    assert result["problems"] == ["2 of 3 nodes live"]
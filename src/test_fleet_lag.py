@@ -0,0 +1,82 @@
+import time
+
+from xclusterdr import fleet_lag
+from xclusterdr.records import DrPair
+
+
+class FakeResponse:
+    def __init__(self, safetimes):
+        self._safetimes = safetimes
+
+    def json(self):
+        return {"safetimes": self._safetimes}
+
+
+def fake_yba(monkeypatch, lags_ms):
+    sent = []
+
+    def fake_send(prepared_request, timeout=None, retry=True):
+        sent.append((prepared_request, time.monotonic()))
+        lag_ms = lags_ms[prepared_request]
+        return FakeResponse(
+            [
+                {
+                    "namespaceId": "ns",
+                    "namespaceName": "db",
+                    "safetimeEpochUs": time.time() * 1_000_000 - lag_ms * 1000,
+                    "safetimeLagUs": lag_ms * 1000,
+                    "safetimeSkewUs": 0,
+                    "estimatedDataLossMs": lag_ms,
+                }
+            ]
+        )
+
+    monkeypatch.setattr(
+        fleet_lag,
+        "_prepare_xcluster_dr_safetime_request",
+        lambda customer_uuid, dr_config_uuid: dr_config_uuid,
+    )
+    monkeypatch.setattr(fleet_lag.http_client, "send", fake_send)
+    return sent
+
+
+def pairs(*dr_config_uuids):
+    return [
+        DrPair(uuid, f"{uuid}-source", f"{uuid}-target") for uuid in dr_config_uuids
+    ]
+
+
+def test_one_pass_stays_within_the_request_budget(monkeypatch):
+    sent = fake_yba(monkeypatch, {f"dr-{i}": 10 for i in range(5)})
+    sampler = fleet_lag.FleetLagSampler(
+        "c", pairs(*(f"dr-{i}" for i in range(5))), request_budget=20, concurrency=2
+    )
+
+    sampler.run()
+
+    assert sorted(uuid for uuid, _ in sent) == [f"dr-{i}" for i in range(5)]
+    # one request at a time, 50 ms apart
+    times = [sent_at for _, sent_at in sent]
+    assert times[-1] - times[0] >= 4 / 20 * 0.9
+    assert all(row["samples"] == 1 for row in sampler.snapshot())
+
+
+def test_lagging_pairs_are_polled_more_often_and_listed_first(monkeypatch):
+    sent = fake_yba(monkeypatch, {"dr-ok": 10, "dr-lagging": 60000})
+    sampler = fleet_lag.FleetLagSampler(
+        "c",
+        pairs("dr-ok", "dr-lagging"),
+        interval=0.5,
+        lagging_interval=0.1,
+        max_lag_ms=30000,
+        request_budget=100,
+    )
+
+    sampler.run(duration_seconds=1.0)
+
+    polls = [uuid for uuid, _ in sent]
+    assert polls.count("dr-lagging") >= 2 * polls.count("dr-ok")
+    rows = sampler.snapshot()
+    assert [row["drConfigUuid"] for row in rows] == ["dr-lagging", "dr-ok"]
+    assert [fleet_lag.get_fleet_lag_status(row) for row in rows] == ["LAGGING", "OK"]
+    assert rows[0]["maxLagMs"] == 60000
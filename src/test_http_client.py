@@ -0,0 +1,111 @@
+import pytest
+import requests
+
+from core import http_client
+
+
+class FakeResponse:
+    def __init__(self, status_code, text=""):
+        self.status_code = status_code
+        self.headers = {}
+        self.text = text
+
+
+@pytest.fixture
+def fresh_client(monkeypatch):
+    monkeypatch.setattr(http_client, "_instances", {})
+    monkeypatch.setattr(http_client.time, "sleep", lambda seconds: None)
+    monkeypatch.setenv("YBA_MAX_RETRIES", "3")
+    monkeypatch.setenv("YBA_BREAKER_THRESHOLD", "3")
+    monkeypatch.setenv("YBA_BREAKER_COOLDOWN", "60")
+
+
+def test_get_retries_then_succeeds(fresh_client, monkeypatch):
+    responses = [FakeResponse(503), FakeResponse(503), FakeResponse(200)]
+
+    def fake_request(method, url, **kwargs):
+        assert kwargs["timeout"] == 30
+        return responses.pop(0)
+
+    monkeypatch.setattr(http_client.session, "request", fake_request)
+
+    response = http_client.get("https://yba.example/api/v1/session_info")
+    assert response.status_code == 200
+
+    metrics = http_client.get_http_metrics()["https://yba.example"]
+    assert metrics["requests"] == 3
+    assert metrics["retries"] == 2
+    assert metrics["status_codes"] == {503: 2, 200: 1}
+
+
+def test_breaker_fails_fast_and_posts_are_not_retried(fresh_client, monkeypatch):
+    calls = []
+
+    def fake_request(method, url, **kwargs):
+        calls.append(method)
+        raise requests.ConnectionError("connection refused")
+
+    monkeypatch.setattr(http_client.session, "request", fake_request)
+
+    with pytest.raises(RuntimeError, match="failed after 1 attempt"):
+        http_client.post("https://yba.example/api/v1/customers/c/dr_configs")
+    assert calls == ["POST"]
+
+    # two more failures open the breaker; after that no request is sent
+    with pytest.raises(RuntimeError, match="is failing"):
+        http_client.get("https://yba.example/api/v1/customers/c/tasks_list")
+    assert len(calls) == 3
+
+    metrics = http_client.get_http_metrics()["https://yba.example"]
+    assert metrics["breaker_opens"] == 1
+    assert metrics["fast_failures"] == 1
+
+
+def test_errors_keep_the_response_body(fresh_client, monkeypatch):
+    bodies = ['{"error": "Storage config is not valid"}', "x" * 5000]
+
+    monkeypatch.setattr(
+        http_client.session,
+        "request",
+        lambda method, url, **kwargs: FakeResponse(500, bodies.pop(0)),
+    )
+
+    with pytest.raises(RuntimeError) as error:
+        http_client.post("https://yba.example/api/v1/customers/c/dr_configs")
+    assert str(error.value).endswith(
+        'failed after 1 attempt(s): HTTP 500: {"error": "Storage config is not valid"}'
+    )
+
+    with pytest.raises(RuntimeError) as error:
+        http_client.post("https://yba.example/api/v1/customers/c/dr_configs")
+    assert str(error.value).endswith("HTTP 500: " + "x" * 1000 + "...")
+
+
+@pytest.mark.parametrize(
+    "trial_error", [requests.exceptions.ChunkedEncodingError, KeyboardInterrupt]
+)
+def test_any_error_in_a_trial_request_ends_the_trial(
+    fresh_client, monkeypatch, trial_error
+):
+    monkeypatch.setenv("YBA_BREAKER_THRESHOLD", "1")
+    monkeypatch.setenv("YBA_BREAKER_COOLDOWN", "0")
+    outcomes = [requests.ConnectionError("refused"), trial_error(), FakeResponse(200)]
+
+    def fake_request(method, url, **kwargs):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    monkeypatch.setattr(http_client.session, "request", fake_request)
+    url = "https://yba.example/api/v1/customers/c/dr_configs"
+
+    # opens the breaker
+    with pytest.raises(RuntimeError):
+        http_client.post(url)
+    # the trial request raises something other than a connection error or timeout
+    with pytest.raises(trial_error):
+        http_client.post(url)
+    # the breaker lets the next trial through instead of refusing requests for good
+    assert http_client.post(url).status_code == 200
+    assert http_client.get_http_metrics()["https://yba.example"]["breaker_opens"] == 2
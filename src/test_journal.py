@@ -0,0 +1,145 @@
+import pytest
+
+from core import journal
+from core.task_tracker import TaskFailedError
+
+
+@pytest.fixture
+def yba(monkeypatch, tmp_path):
+    """
+    Points the journal at a temporary state directory and fakes YBA: the test sets the status of each task, and reads the status requests and submits.
+    """
+    monkeypatch.setenv("DAY2OPS_STATE_DIR", str(tmp_path))
+    fake = {"statuses": {}, "status_requests": [], "submits": 0, "wait": None}
+
+    def get_task_status(customer_uuid, task_uuid):
+        fake["status_requests"].append(task_uuid)
+        return fake["statuses"].get(task_uuid, {})
+
+    def wait_for_task(customer_uuid, task_response, friendly_name):
+        if fake["wait"] is not None:
+            raise fake["wait"]
+        return {"status": "Success"}
+
+    monkeypatch.setattr(journal, "_get_task_status", get_task_status)
+    monkeypatch.setattr(journal, "wait_for_task", wait_for_task)
+    monkeypatch.setattr(journal, "invalidate_topology", lambda customer_uuid: None)
+    return fake
+
+
+def submit_for(fake, task_uuid):
+    def submit():
+        fake["submits"] += 1
+        return {"taskUUID": task_uuid, "resourceUUID": "dr-1"}
+
+    return submit
+
+
+def test_list_merges_updates_and_skips_a_cut_short_line(yba):
+    journal.record_task("c", "setup-dr", "east", {"taskUUID": "t1"}, "Create")
+    journal.record_task(
+        "c", "pause", "dr-2", {"taskUUID": "t2", "resourceUUID": "dr-2"}, "Pause"
+    )
+    journal.update_task("t1", "Success")
+    with open(journal.get_journal_path(), "a") as file:
+        file.write('{"task_uuid": "t2", "sta')
+
+    tasks = journal.list_journaled_tasks()
+
+    assert [(task["task_uuid"], task["status"]) for task in tasks] == [
+        ("t1", "Success"),
+        ("t2", "Submitted"),
+    ]
+    assert tasks[0]["operation"] == "setup-dr" and "updated_at" in tasks[0]
+    assert tasks[1]["dr_config_uuid"] == "dr-2"
+
+
+def test_find_in_flight_task_closes_finished_tasks(yba):
+    for task_uuid, key in (("t1", "east"), ("t2", "east"), ("t3", "west")):
+        journal.record_task("c", "setup-dr", key, {"taskUUID": task_uuid})
+    yba["statuses"] = {"t1": {"status": "Running"}, "t2": {"status": "Aborted"}}
+
+    task = journal.find_in_flight_task("c", "setup-dr", "east")
+
+    # the most recent task is read first: t2 has finished, so t1 is the one in flight
+    assert task["task_uuid"] == "t1"
+    assert yba["status_requests"] == ["t2", "t1"]
+    assert {
+        task["task_uuid"]: task["status"] for task in journal.list_journaled_tasks()
+    } == {
+        "t1": "Submitted",
+        "t2": "Aborted",
+        "t3": "Submitted",
+    }
+    assert journal.find_in_flight_task("c", "setup-dr", "north") is None
+    assert journal.find_in_flight_task("other", "setup-dr", "east") is None
+
+
+def test_run_journaled_task_reattaches_to_a_task_in_flight(yba, caplog):
+    journal.record_task(
+        "c", "setup-dr", "east", {"taskUUID": "t1", "resourceUUID": "dr-1"}
+    )
+    yba["statuses"]["t1"] = {"status": "Running"}
+
+    task_response, task_status = journal.run_journaled_task(
+        "c", "setup-dr", "east", submit_for(yba, "t2"), "Create"
+    )
+
+    assert yba["submits"] == 0
+    assert task_response == {"taskUUID": "t1", "resourceUUID": "dr-1"}
+    assert task_status == {"status": "Success"}
+    assert "Reattaching to 'Create' (task='t1')" in caplog.messages[0]
+    assert journal.list_journaled_tasks()[0]["status"] == "Success"
+
+
+def test_a_poll_error_leaves_the_task_open_for_the_next_run(yba):
+    yba["wait"] = RuntimeError("ERROR: failed to get the status: HTTP 503")
+    with pytest.raises(RuntimeError, match="HTTP 503"):
+        journal.run_journaled_task("c", "setup-dr", "east", submit_for(yba, "t1"))
+    assert journal.list_journaled_tasks()[0]["status"] == "Submitted"
+
+    # the task is still running in YBA: the next run reattaches instead of submitting again
+    yba["wait"] = None
+    yba["statuses"]["t1"] = {"status": "Running"}
+    task_response, _ = journal.run_journaled_task(
+        "c", "setup-dr", "east", submit_for(yba, "t2")
+    )
+
+    assert yba["submits"] == 1
+    assert task_response["taskUUID"] == "t1"
+
+
+def test_a_reported_failure_closes_the_task(yba):
+    yba["wait"] = TaskFailedError("ERROR: Task 'Create' failed", "Aborted")
+    with pytest.raises(RuntimeError, match="failed"):
+        journal.run_journaled_task("c", "setup-dr", "east", submit_for(yba, "t1"))
+    assert journal.list_journaled_tasks()[0]["status"] == "Aborted"
+
+    yba["wait"] = None
+    task_response, _ = journal.run_journaled_task(
+        "c", "setup-dr", "east", submit_for(yba, "t2")
+    )
+
+    assert yba["submits"] == 2
+    assert task_response["taskUUID"] == "t2"
+    assert yba["status_requests"] == []
+
+
+def test_tasks_table_reads_only_the_shown_tasks_from_yba(yba):
+    for i in range(5):
+        journal.record_task("c", "pause", f"dr-{i}", {"taskUUID": f"t{i}"})
+    journal.record_task("other", "pause", "dr-x", {"taskUUID": "tx"})
+    journal.update_task("t4", "Success")
+    yba["statuses"] = {
+        "t2": {"status": "Running", "percent": 40},
+        "t3": {"status": "Success", "percent": 100},
+    }
+
+    table = journal.get_journaled_tasks_table("c", limit=2)
+
+    assert yba["status_requests"] == ["t2", "t3"]
+    assert "t2" in table and "t3" not in table and "t1" not in table
+    # t3 is now closed in the journal, and no longer read
+    yba["status_requests"].clear()
+    journal.get_journaled_tasks_table("c", limit=2)
+    assert yba["status_requests"] == ["t1", "t2"]
@@ -0,0 +1,65 @@
+import pytest
+
+from xclusterdr import lag_gate
+
+
+def fake_safetimes(monkeypatch, lags_ms):
+    clock = [0.0]
+    sleeps = []
+
+    def safetime(namespace_id, lag_ms):
+        return {
+            "namespaceId": namespace_id,
+            "namespaceName": namespace_id,
+            "safetimeEpochUs": clock[0] * 1_000_000 - lag_ms * 1000,
+            "safetimeLagUs": lag_ms * 1000,
+        }
+
+    def fake_get_safetime(customer_uuid, dr_config_uuid):
+        lag_ms = lags_ms.pop(0) if len(lags_ms) > 1 else lags_ms[0]
+        return {"safetimes": [safetime("db0", 1), safetime("db1", lag_ms)]}
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    monkeypatch.setattr(lag_gate, "_get_xcluster_dr_safetime", fake_get_safetime)
+    monkeypatch.setattr(lag_gate.time, "monotonic", lambda: clock[0])
+    monkeypatch.setattr(lag_gate.time, "sleep", fake_sleep)
+    return sleeps
+
+
+def test_polls_faster_as_lag_drains(monkeypatch):
+    sleeps = fake_safetimes(monkeypatch, [5000, 4000, 3000, 1000, 400])
+
+    lag = lag_gate.wait_for_lag_under("c", "dr", 500, 60)
+
+    assert lag["worstNamespace"] == "db1"
+    assert lag["worstLagMs"] == 400
+    assert lag["reads"] == 5
+    # no apply rate yet: the interval doubles from the minimum; then half the expected time to drain
+    assert sleeps[0] == 0.5
+    # 1000 ms drained in 0.5s (an apply rate of 3): 3500 ms to go takes 1.75s
+    assert sleeps[1] == pytest.approx(0.875)
+    # the new rate (1875 ms of safetime in 0.875s) is smoothed into the previous one
+    rate = 3 + (1 - 0.5 ** (0.875 / 10)) * (1.875 / 0.875 - 3)
+    assert sleeps[2] == pytest.approx(2500 / ((rate - 1) * 1000) / 2)
+
+
+def test_times_out_when_lag_stays_high(monkeypatch):
+    sleeps = fake_safetimes(monkeypatch, [5000])
+
+    with pytest.raises(RuntimeError, match="did not fall under 500 ms within 10s"):
+        lag_gate.wait_for_lag_under("c", "dr", 500, 10)
+    # not draining: the interval doubles up to the maximum, and the last read is at the deadline
+    assert sleeps == [0.5, 1.0, 2.0, 4.0, 2.5]
+
+
+def test_gives_up_when_lag_cannot_drain_in_time(monkeypatch):
+    # 100 ms drained per read, reads at most seconds apart: over 20 minutes to go
+    sleeps = fake_safetimes(monkeypatch, [130000 - 100 * i for i in range(100)])
+
+    with pytest.raises(RuntimeError, match="not projected to fall under 500 ms"):
+        lag_gate.wait_for_lag_under("c", "dr", 500, 300)
+    # the rate settles after three readings of it
+    assert len(sleeps) == 3
@@ -0,0 +1,193 @@
+import pytest
+
+from xclusterdr import manage_dr_cluster
+
+
+def make_universe(name, dr_as_source=(), dr_as_target=()):
+    return {
+        "universeUUID": f"{name}-uuid",
+        "name": name,
+        "drConfigUuidsAsSource": list(dr_as_source),
+        "drConfigUuidsAsTarget": list(dr_as_target),
+    }
+
+
+def fake_yba(monkeypatch, universes, databases=("orders", "users"), storage=True):
+    """
+    Fakes the reads of the pre-flight checks: the universes by name, the databases and tables of the source, and the storage config.
+    """
+    monkeypatch.setattr(
+        manage_dr_cluster,
+        "_get_backup_UUID_by_name",
+        lambda customer_uuid, name: (
+            [{"configUUID": "storage-uuid"}] if storage else []
+        ),
+    )
+    monkeypatch.setattr(
+        manage_dr_cluster,
+        "_get_universe_by_name",
+        lambda customer_uuid, name: [
+            universe for universe in universes if universe["name"] == name
+        ],
+    )
+    monkeypatch.setattr(
+        manage_dr_cluster,
+        "_get_database_namespaces",
+        lambda customer_uuid, universe_uuid: [
+            {"name": name, "namespaceUUID": f"{name}-ns"} for name in databases
+        ],
+    )
+    monkeypatch.setattr(
+        manage_dr_cluster,
+        "_get_all_ysql_tables_list",
+        lambda customer_uuid, universe_uuid, dbs_include_list: [
+            {"tableID": "t1", "keySpace": "orders", "tableName": "a", "sizeBytes": 100},
+            {"tableID": "t2", "keySpace": "orders", "tableName": "b", "sizeBytes": 50},
+            {"tableID": "t3", "keySpace": "users", "tableName": "c", "sizeBytes": 7},
+        ],
+    )
+
+
+def test_check_passes_and_returns_the_uuids(monkeypatch):
+    fake_yba(monkeypatch, [make_universe("east"), make_universe("west")])
+
+    checked = manage_dr_cluster.check_xcluster_dr_create(
+        "c", "east", "west", "orders, users", "backups"
+    )
+
+    assert checked == {
+        "storage_config_uuid": "storage-uuid",
+        "source_universe_uuid": "east-uuid",
+        "target_universe_uuid": "west-uuid",
+        "db_names": ["orders", "users"],
+        "dbs_list_uuids": ["orders-ns", "users-ns"],
+        "tables_list": None,
+    }
+
+
+def test_check_reports_every_problem_at_once(monkeypatch):
+    fake_yba(
+        monkeypatch,
+        [
+            make_universe("east", dr_as_source=["dr-old"]),
+            make_universe("west", dr_as_target=["dr-other"]),
+        ],
+        storage=False,
+    )
+
+    with pytest.raises(RuntimeError) as error:
+        manage_dr_cluster.check_xcluster_dr_create(
+            "c", "east", "west", ["orders", "missing", "gone"], "backups"
+        )
+
+    assert str(error.value).split("\n - ") == [
+        "ERROR: the xCluster DR config cannot be created:",
+        "the backup location 'backups' was not found",
+        "the source universe 'east' already has a disaster-recovery config: dr-old",
+        "the target universe 'west' is already the target of a disaster-recovery config: dr-other",
+        "the database(s) missing, gone were not found on 'east'",
+    ]
+
+
+def test_check_rejects_the_same_universe_and_no_databases(monkeypatch):
+    fake_yba(monkeypatch, [make_universe("east")])
+
+    with pytest.raises(RuntimeError) as error:
+        manage_dr_cluster.check_xcluster_dr_create("c", "east", "east", " , ", "b")
+
+    assert str(error.value).split("\n - ")[1:] == [
+        "the source and target universes must be different",
+        "no databases were given to replicate",
+    ]
+
+
+def test_check_reports_a_failed_read_and_a_missing_universe(monkeypatch):
+    fake_yba(monkeypatch, [make_universe("east")])
+
+    def unavailable(customer_uuid, universe_uuid):
+        raise RuntimeError("ERROR: HTTP 503")
+
+    monkeypatch.setattr(manage_dr_cluster, "_get_database_namespaces", unavailable)
+
+    with pytest.raises(RuntimeError) as error:
+        manage_dr_cluster.check_xcluster_dr_create("c", "east", "west", "orders", "b")
+
+    assert str(error.value).split("\n - ")[1:] == [
+        "the databases could not be checked: ERROR: HTTP 503",
+        "the target universe 'west' was not found",
+    ]
+
+
+def test_dry_run_estimates_the_bootstrap_of_each_database(monkeypatch, capsys):
+    fake_yba(monkeypatch, [make_universe("east"), make_universe("west")])
+    monkeypatch.setattr(
+        manage_dr_cluster,
+        "_create_dr_config",
+        lambda *args: pytest.fail("a dry run must not create the DR config"),
+    )
+
+    form_data = manage_dr_cluster.create_xcluster_dr(
+        "c", "east", "west", ["orders", "users"], "backups", dry_run=True
+    )
+
+    assert form_data["dbs"] == ["orders-ns", "users-ns"]
+    assert (
+        form_data["bootstrapParams"]["backupRequestParams"]["storageConfigUUID"]
+        == "storage-uuid"
+    )
+    estimate = [
+        [cell.strip() for cell in line.strip("│").split("│")]
+        for line in capsys.readouterr().out.splitlines()
+        if line.startswith("│")
+    ]
+    assert estimate == [
+        ["database", "estimated bootstrap (bytes)"],
+        ["orders", "150"],
+        ["users", "7"],
+        ["total", "157"],
+    ]
+
+
+def test_details_by_name_reads_the_role_from_yba_unless_indexed_as_source(
+    monkeypatch,
+):
+    universes = [
+        make_universe("east", dr_as_target=["dr-1"]),
+        make_universe("west", dr_as_source=["dr-1"]),
+    ]
+    fake_yba(monkeypatch, universes)
+    # the index is from before a switchover: east was the source
+    indexed_roles = {
+        "east": make_universe("east", dr_as_source=["dr-1"]),
+        "west": make_universe("west", dr_as_target=["dr-1"]),
+    }
+    monkeypatch.setattr(
+        manage_dr_cluster,
+        "lookup_dr_roles",
+        lambda customer_uuid, name: indexed_roles.get(name),
+    )
+    invalidated = []
+    monkeypatch.setattr(manage_dr_cluster, "invalidate_topology", invalidated.append)
+    monkeypatch.setattr(
+        manage_dr_cluster,
+        "_get_xcluster_dr_configs",
+        lambda customer_uuid, uuid: {"primaryUniverseUuid": "west-uuid"},
+    )
+    monkeypatch.setattr(
+        manage_dr_cluster,
+        "lookup_universe_name",
+        lambda customer_uuid, uuid: uuid.removesuffix("-uuid"),
+    )
+
+    assert manage_dr_cluster.get_xcluster_details_by_name("c", "west") == "west"
+    assert manage_dr_cluster.get_xcluster_details_by_name("c", "east") == "west"
+    assert invalidated == ["c"]
+
+    # once rebuilt, the index answers for the source without reading the universe
+    indexed_roles["west"] = make_universe("west", dr_as_source=["dr-1"])
+    monkeypatch.setattr(
+        manage_dr_cluster,
+        "_get_universe_by_name",
+        lambda customer_uuid, name: pytest.fail("the index is up to date"),
+    )
+    assert manage_dr_cluster.get_xcluster_details_by_name("c", "west") == "west"
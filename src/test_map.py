@@ -0,0 +1,137 @@
+import math
+
+import plotly
+import plotly.graph_objects as pgo
+import pytest
+
+from core.map_functions import figure_height_for, spread_around
+from healthcheck import map as fleet_map
+from healthcheck.map import aggregate_nodes_by_az, place_azs, write_figure_html
+
+
+def make_node(cloud, region, az, private_ip):
+    return {
+        "cloudInfo": {
+            "cloud": cloud,
+            "region": region,
+            "az": az,
+            "private_ip": private_ip,
+        }
+    }
+
+
+def test_aggregate_nodes_by_az():
+    az_dict = aggregate_nodes_by_az(
+        [
+            make_node("gcp", "us-east1", "us-east1-a", "10.0.0.1"),
+            make_node("gcp", "us-east1", "us-east1-b", "10.0.0.2"),
+            make_node("gcp", "us-east1", "us-east1-a", "10.0.0.3"),
+            make_node("aws", "us-east1", "us-east1-a", "10.1.0.1"),
+        ]
+    )
+
+    assert sorted(az_dict) == [
+        ("aws", "us-east1", "us-east1-a"),
+        ("gcp", "us-east1", "us-east1-a"),
+        ("gcp", "us-east1", "us-east1-b"),
+    ]
+    assert az_dict[("gcp", "us-east1", "us-east1-a")] == {
+        "cloud": "gcp",
+        "region": "us-east1",
+        "az": "us-east1-a",
+        "private_ips": ["10.0.0.1", "10.0.0.3"],
+    }
+
+
+def test_spread_around_is_deterministic_and_within_radius():
+    points = spread_around(-75.0, 40.0, 5, 0.05)
+
+    assert points == spread_around(-75.0, 40.0, 5, 0.05)
+    assert len(set(points)) == 5
+    # the first point is the center, the others within the radius of it
+    assert points[0] == (-75.0, 40.0)
+    assert all(math.dist(point, (-75.0, 40.0)) < 0.05 for point in points)
+    assert spread_around(-75.0, 40.0, 0, 0.05) == []
+
+
+def test_place_azs_spreads_the_azs_of_a_region():
+    az_dict = aggregate_nodes_by_az(
+        [
+            make_node("gcp", "us-east1", "us-east1-b", "10.0.0.2"),
+            make_node("gcp", "us-east1", "us-east1-a", "10.0.0.1"),
+            make_node("gcp", "us-west1", "us-west1-a", "10.0.1.1"),
+        ]
+    )
+    region_metadata = {
+        "gcp": {
+            "us-east1": {"longitude": -75.0, "latitude": 40.0},
+            "us-west1": {"longitude": -120.0, "latitude": 45.0},
+        }
+    }
+
+    region_az_keys = place_azs(az_dict, region_metadata)
+
+    assert region_az_keys == {
+        ("gcp", "us-east1"): [
+            ("gcp", "us-east1", "us-east1-a"),
+            ("gcp", "us-east1", "us-east1-b"),
+        ],
+        ("gcp", "us-west1"): [("gcp", "us-west1", "us-west1-a")],
+    }
+    east = [
+        (az_dict[az_key]["longitude"], az_dict[az_key]["latitude"])
+        for az_key in region_az_keys[("gcp", "us-east1")]
+    ]
+    assert east == spread_around(-75.0, 40.0, 2, 0.05)
+    west = az_dict[("gcp", "us-west1", "us-west1-a")]
+    assert (west["longitude"], west["latitude"]) == (-120.0, 45.0)
+
+
+def test_figure_height_for():
+    assert figure_height_for(0) == 450
+    assert figure_height_for(10) == 570
+    assert figure_height_for(10_000) == 1600
+
+
+def test_shared_plotlyjs_is_written_once_per_directory(tmp_path, monkeypatch):
+    writes = []
+
+    def get_plotlyjs():
+        writes.append(1)
+        return "/* plotly.js */"
+
+    monkeypatch.setattr(plotly.offline, "get_plotlyjs", get_plotlyjs)
+    fig = pgo.Figure()
+
+    write_figure_html(fig, str(tmp_path / "a.html"), shared_plotlyjs=True)
+    write_figure_html(fig, str(tmp_path / "b.html"), shared_plotlyjs=True)
+
+    plotlyjs_file_name = f"plotly-{plotly.__version__}.min.js"
+    assert len(writes) == 1
+    assert [path.name for path in tmp_path.glob("*.js")] == [plotlyjs_file_name]
+    for html_file_name in ("a.html", "b.html"):
+        html = (tmp_path / html_file_name).read_text()
+        assert f'src="{plotlyjs_file_name}"' in html
+        assert "/* plotly.js */" not in html
+
+
+def test_fleet_diagram_of_universes_without_nodes(monkeypatch, tmp_path):
+    monkeypatch.setattr(
+        fleet_map,
+        "_list_all_universes",
+        lambda customer_uuid: [
+            {
+                "universeUUID": "u1",
+                "name": "empty",
+                "universeDetails": {"nodeDetailsSet": []},
+                "drConfigUuidsAsSource": [],
+                "drConfigUuidsAsTarget": [],
+            }
+        ],
+    )
+    monkeypatch.setattr(
+        fleet_map, "get_region_metadata_by_cloud", lambda *args: pytest.fail("no nodes")
+    )
+
+    with pytest.raises(RuntimeError, match="ERROR: none of the universes has nodes"):
+        fleet_map.get_fleet_diagram_map("c", output_dir=str(tmp_path))
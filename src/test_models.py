@@ -0,0 +1,71 @@
+from core.models import DrConfig, Table, Universe
+from core.ysql import get_ysql_hosts
+
+
+def test_universe_projection_interns_repeated_strings():
+    universe_json = {
+        "universeUUID": "u1",
+        "name": "east",
+        "drConfigUuidsAsSource": ["dr-1"],
+        "universeDetails": {
+            "clusters": [
+                {
+                    "uuid": "c1",
+                    "clusterType": "PRIMARY",
+                    "userIntent": {"numNodes": 3, "replicationFactor": 3},
+                }
+            ],
+            "nodeDetailsSet": [
+                {
+                    "nodeName": f"n{i}",
+                    "placementUuid": "c1",
+                    # the last node has no state
+                    **({"state": "Live"} if i < 2 else {}),
+                    "cloudInfo": {
+                        "cloud": "".join(["a", "ws"]),
+                        "region": "us-east-1",
+                        "az": f"us-east-1{'abc'[i]}",
+                        "private_ip": f"10.0.0.{i}",
+                    },
+                }
+                for i in range(3)
+            ],
+        },
+    }
+    universe = Universe.from_json(universe_json)
+
+    assert universe.primary_cluster.replication_factor == 3
+    assert [node.state for node in universe.nodes] == ["Live", "Live", None]
+    # a node without a state is neither counted live nor connected to
+    assert get_ysql_hosts(universe) == ["10.0.0.0", "10.0.0.1"]
+    assert universe.dr_config_uuids_as_source == ("dr-1",)
+    assert universe.dr_config_uuids_as_target == ()
+    assert universe.nodes[0].cloud is universe.nodes[2].cloud
+    assert not hasattr(universe, "__dict__")
+
+
+def test_table_and_dr_config_projection():
+    table = Table.from_json(
+        {
+            "tableID": "t1",
+            "keySpace": "sales",
+            "pgSchemaName": "public",
+            "tableName": "orders",
+            "isIndexTable": False,
+            "sizeBytes": 10,
+            "relationType": "USER_TABLE_RELATION",
+        }
+    )
+    assert table.qualified_name == "public.orders"
+
+    dr_config = DrConfig.from_json(
+        {
+            "uuid": "dr-1",
+            "state": "Replicating",
+            "paused": False,
+            "bootstrapParams": {"backupRequestParams": {"storageConfigUUID": "s1"}},
+            "tables": ["t1"],
+        }
+    )
+    assert dr_config.storage_config_uuid == "s1"
+    assert dr_config.tables == ("t1",)
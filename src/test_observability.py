@@ -0,0 +1,56 @@
+from xclusterdr import observability, render
+
+
+def test_table_status_lists_unhealthy_keyspaces_and_tables_first(monkeypatch):
+    catalog = [
+        {
+            "tableID": f"0000-{i:04d}",
+            "keySpace": f"db{i % 3}",
+            "pgSchemaName": "public",
+            "tableName": f"t{i}",
+        }
+        for i in range(9)
+    ]
+    statuses = {"00000003": "Failed", "00000005": "Bootstrapping"}
+    table_details = [
+        {"tableId": f"0000{i:04d}", "status": statuses.get(f"0000{i:04d}", "Running")}
+        for i in range(9)
+    ] + [{"tableId": "dropped", "status": "DroppedFromSource"}]
+
+    monkeypatch.setattr(
+        observability,
+        "get_source_xcluster_dr_config",
+        lambda customer_uuid, name, key: {"uuid": "dr-1", "xclusterConfigUuid": "x-1"},
+    )
+    monkeypatch.setattr(
+        observability, "get_universe_uuid_by_name", lambda customer_uuid, name: "u-1"
+    )
+    monkeypatch.setattr(
+        observability,
+        "_get_all_ysql_tables_list",
+        lambda customer_uuid, universe_uuid: catalog,
+    )
+    monkeypatch.setattr(
+        observability,
+        "_get_xcluster_configs",
+        lambda customer_uuid, uuid: {"tableDetails": table_details},
+    )
+
+    rows = observability.get_xcluster_table_status("c", "east")
+    assert rows[0].problems == ("not in the source universe's catalog",)
+
+    output = render.format_table_status(rows)
+    lines = [line for line in output.splitlines() if "│" in line]
+    summary = [line.split("│")[1].strip() for line in lines[1:5]]
+    # the table missing from the catalog, then db0 (t3 failed), then db2 (t5 pending)
+    assert summary == ["", "db0", "db2", "db1"]
+    details = [line for line in lines if "UNHEALTHY" in line or "PENDING" in line]
+    assert [line.split("│")[3].strip() for line in details] == [
+        "",
+        "public.t3",
+        "public.t5",
+    ]
+    assert "not in the source universe's catalog" in details[0]
+    assert "public.t4" not in output
+
+    assert "public.t4" in render.format_table_status(rows, show_all=True)
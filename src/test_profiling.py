@@ -0,0 +1,34 @@
+import sys
+import typer
+
+from includes.command_group import CommandGroup
+from includes.profiling import get_command_tag
+
+
+def test_command_tag_names_the_invoked_command_and_its_arguments(monkeypatch):
+    app = typer.Typer(cls=CommandGroup)
+    tags = []
+
+    @app.callback()
+    def main(ctx: typer.Context):
+        tags.append(get_command_tag(ctx))
+
+    @app.command()
+    def pause(name: str, timeout: int):
+        pass
+
+    @app.command()
+    def resume():
+        pass
+
+    # as in the shell: sys.argv is the shell's command line, not the command's
+    monkeypatch.setattr(sys, "argv", ["mainapp.py", "shell"])
+    app(
+        ["pause", "my universe", "60"],
+        prog_name="day2ops",
+        standalone_mode=False,
+    )
+
+    command, arguments, _ = tags[0].splitlines()
+    assert command == "command: day2ops pause"
+    assert arguments == "arguments: 'my universe' 60"
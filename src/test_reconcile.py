@@ -0,0 +1,56 @@
+import pytest
+
+from core.models import Table
+from xclusterdr.reconcile import (
+    compute_table_changes,
+    load_desired_state,
+    resolve_desired_tables,
+)
+
+
+def table(table_id, keyspace, name, is_index=False, schema="public"):
+    return Table.from_json(
+        {
+            "tableID": table_id,
+            "keySpace": keyspace,
+            "pgSchemaName": schema,
+            "tableName": name,
+            "isIndexTable": is_index,
+            "sizeBytes": 0,
+        }
+    )
+
+
+TABLES = [
+    table("t1", "sales", "orders"),
+    table("t2", "sales", "customers"),
+    table("i1", "sales", "orders_idx", is_index=True),
+    table("t3", "hr", "people"),
+    table("t4", "hr", "payroll", schema="private"),
+]
+
+
+def test_resolve_desired_tables():
+    table_ids, missing = resolve_desired_tables(
+        {"sales": "all", "hr": ["people", "private.payroll", "missing"]}, TABLES
+    )
+    assert table_ids == {"t1", "t2", "t3", "t4"}
+    assert missing == ["hr.public.missing"]
+
+
+def test_compute_table_changes():
+    # replicated now: orders (with its index), people, and a table not in the list
+    changes = compute_table_changes({"t1", "t2"}, {"t1", "i1", "t3", "x9"}, TABLES)
+    assert changes["add"] == {"t2"}
+    assert changes["remove"] == {"t3"}
+    # one full set for set_tables: indexes are auto-included, unlisted tables kept
+    assert changes["tables"] == {"t1", "t2", "x9"}
+
+
+def test_load_desired_state_rejects_bad_tables(tmp_path):
+    desired_state_file = tmp_path / "desired.yaml"
+    desired_state_file.write_text(
+        "dr_pairs:\n  - source: east\n    databases:\n      sales: everything\n"
+    )
+    with pytest.raises(RuntimeError, match="must be 'all' or a list"):
+        load_desired_state(str(desired_state_file))
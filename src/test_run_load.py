@@ -0,0 +1,54 @@
+import shutil
+
+from pathlib import Path
+
+import pytest
+
+from loadtest.mock_yba import build_fleet, start_mock_yba, take_request_counts
+from loadtest.run_load import parse_mix, percentile, run_level
+
+
+def test_parse_mix():
+    assert parse_mix("obs-status=3, get-tables") == {
+        "obs-status": 3.0,
+        "get-tables": 1.0,
+    }
+    with pytest.raises(RuntimeError, match="unknown commands in the mix: obs-lag"):
+        parse_mix("obs-status=1,obs-lag=2")
+
+
+def test_percentile():
+    values = [10, 20, 30, 40]
+    assert percentile(values, 0.0) == 10
+    assert percentile(values, 0.5) == 30
+    assert percentile(values, 0.99) == 40
+    assert percentile([], 0.5) is None
+
+
+def test_operators_run_against_the_mock_yba(tmp_path, monkeypatch):
+    server = start_mock_yba(build_fleet(pairs=2, tables_per_universe=20), 1)
+    # as in main: the operators read their config from the working directory
+    (tmp_path / "config").mkdir()
+    (tmp_path / "config" / "auth.yaml").write_text(
+        f'YBA_URL: "http://127.0.0.1:{server.server_port}"\nAPI_KEY: "loadtest"\n'
+    )
+    shutil.copy(Path("config/status.yaml"), tmp_path / "config" / "status.yaml")
+    monkeypatch.setenv("DAY2OPS_STATE_DIR", str(tmp_path / "state"))
+    monkeypatch.chdir(tmp_path)
+
+    try:
+        level = run_level(
+            server, 2, 1, {"obs-status": 1, "get-tables": 1}, pairs=2, seed=1
+        )
+    finally:
+        server.shutdown()
+
+    assert level["operators"] == 2
+    assert level["commands"] > 0
+    assert level["errorRate"] == 0, level["sampleErrors"]
+    assert level["errorsInjected"] == 0
+    assert level["ybaRequests"] == sum(level["requestsByEndpoint"].values()) > 0
+    assert level["ybaRequestsPerCommand"] == level["ybaRequests"] / level["commands"]
+    assert set(level["byCommand"]) <= {"obs-status", "get-tables"}
+    # every request of the run was counted in it
+    assert take_request_counts(server) == ({}, 0)
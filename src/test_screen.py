@@ -0,0 +1,46 @@
+import io
+
+from includes.screen import CLEAR_SCREEN, Screen
+
+
+def draw(screen, rows, title="title"):
+    out = screen.out
+    out.seek(0)
+    out.truncate()
+    screen.draw(title, ["name", "lag"], [(cells, None) for cells in rows], "footer")
+    return out.getvalue()
+
+
+def test_only_changed_cells_are_redrawn():
+    screen = Screen(io.StringIO(), size=(40, 10))
+    rows = [[f"pair-{i}", "100.0"] for i in range(5)]
+
+    first = draw(screen, rows)
+    assert first.startswith(CLEAR_SCREEN)
+    assert "pair-4" in first
+
+    # nothing changed: nothing is written
+    assert draw(screen, rows) == ""
+
+    rows[2][1] = "250.0"
+    second = draw(screen, rows)
+    # one cell: line 5 (after the title and header), at the second column
+    assert second == "\x1b[5;9H250.0"
+
+    # a row that goes away is blanked
+    third = draw(screen, rows[:4])
+    assert third == "\x1b[7;1H      \x1b[7;9H     "
+
+
+def test_rows_past_the_screen_are_not_drawn_and_wider_columns_redraw_all():
+    screen = Screen(io.StringIO(), size=(40, 6))
+    rows = [[f"pair-{i}", "1.0"] for i in range(100)]
+
+    first = draw(screen, rows)
+    assert "pair-2" in first
+    assert "pair-3" not in first
+    assert screen.get_page_rows() == 3
+
+    wider = draw(screen, [["a-much-longer-pair-name", "1.0"]] + rows[1:])
+    assert wider.startswith(CLEAR_SCREEN)
+    assert "pair-1" in wider
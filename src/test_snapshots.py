@@ -0,0 +1,98 @@
+import copy
+
+import pytest
+
+from healthcheck.snapshots import (
+    diff_snapshots,
+    list_snapshots,
+    load_snapshot,
+    save_snapshot,
+)
+
+
+def make_universe(nodes, version="2.20.1.0-b97", dr_as_source=()):
+    return [
+        {
+            "name": "test-universe",
+            "drConfigUuidsAsSource": list(dr_as_source),
+            "drConfigUuidsAsTarget": [],
+            "universeDetails": {
+                "clusters": [
+                    {
+                        "clusterType": "PRIMARY",
+                        "userIntent": {"ybSoftwareVersion": version},
+                    }
+                ],
+                "nodeDetailsSet": [
+                    {
+                        "nodeName": name,
+                        "cloudInfo": {"region": region, "az": az},
+                    }
+                    for name, region, az in nodes
+                ],
+            },
+        }
+    ]
+
+
+def test_save_snapshot_deduplicates_unchanged_universes(tmp_path):
+    universe = make_universe([("n1", "us-east1", "us-east1-a")])
+
+    digest, changed = save_snapshot("test-universe", universe, tmp_path)
+    assert changed
+
+    # same content with a different key order is the same snapshot
+    reordered = [dict(reversed(list(universe[0].items())))]
+    same_digest, changed = save_snapshot("test-universe", reordered, tmp_path)
+    assert same_digest == digest
+    assert not changed
+
+    assert len(list_snapshots("test-universe", tmp_path)) == 1
+    assert len(list(tmp_path.glob("objects/*/*.json.gz"))) == 1
+    assert load_snapshot(digest[:8], tmp_path) == universe
+
+
+@pytest.mark.parametrize("digest", ["abc", "../../etc/passwd", "ab*", "ABCD1234"])
+def test_load_snapshot_refuses_ids_that_are_not_hex(tmp_path, digest):
+    with pytest.raises(RuntimeError, match="is not 4 to 64 hex digits"):
+        load_snapshot(digest, tmp_path)
+
+
+def test_diff_snapshots():
+    old = make_universe(
+        [("n1", "us-east1", "us-east1-a"), ("n2", "us-east1", "us-east1-b")]
+    )
+    new = make_universe(
+        [("n2", "us-east1", "us-east1-c"), ("n3", "us-west1", "us-west1-a")],
+        version="2.20.2.0-b145",
+        dr_as_source=["dr-1"],
+    )
+
+    changes = diff_snapshots(old, new)
+
+    assert changes["nodes_added"] == ["n3"]
+    assert changes["nodes_removed"] == ["n1"]
+    assert changes["az_moves"] == [("n2", "us-east1/us-east1-b", "us-east1/us-east1-c")]
+    assert changes["software_version"] == ("2.20.1.0-b97", "2.20.2.0-b145")
+    assert changes["drConfigUuidsAsSource"] == {"added": ["dr-1"], "removed": []}
+
+    unchanged = diff_snapshots(old, copy.deepcopy(old))
+    assert unchanged["nodes_added"] == unchanged["nodes_removed"] == []
+    assert unchanged["az_moves"] == []
+    assert unchanged["software_version"] is None
+
+
+def test_universe_names_are_escaped_in_ref_file_names(tmp_path):
+    universe = make_universe([("n1", "us-east1", "us-east1-a")])
+
+    for name in ("../escape", "a/b", "plain-name"):
+        save_snapshot(name, universe, tmp_path)
+        assert len(list_snapshots(name, tmp_path)) == 1
+
+    # every history file is directly in refs; plain names keep their file name
+    assert sorted(path.name for path in (tmp_path / "refs").iterdir()) == [
+        "..%2Fescape.jsonl",
+        "a%2Fb.jsonl",
+        "plain-name.jsonl",
+    ]
+    assert not (tmp_path / "escape.jsonl").exists()
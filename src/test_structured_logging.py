@@ -0,0 +1,105 @@
+import json
+import logging
+
+import pytest
+
+from includes import structured_logging
+
+
+@pytest.fixture
+def log_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("LOG_MAX_BYTES", "2000")
+    monkeypatch.setenv("LOG_BACKUP_COUNT", "2")
+    path = tmp_path / "day2ops.jsonl"
+    structured_logging.configure_logging(str(path))
+    yield path
+    structured_logging.stop_logging()
+    logging.getLogger("day2ops").setLevel(logging.NOTSET)
+
+
+def test_events_carry_context_and_fields(log_file):
+    logger = structured_logging.get_logger("test")
+    token = structured_logging.bind_log_context(command="do-switchover")
+    with structured_logging.log_context(dr_config_uuid="dr-1", task_uuid=None):
+        logger.info("task finished", extra={"fields": {"latency_ms": 12.5}})
+    logger.info("command ended")
+    structured_logging.reset_log_context(token)
+    logger.info("outside")
+    structured_logging.stop_logging()
+
+    events = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert [event["message"] for event in events] == [
+        "task finished",
+        "command ended",
+        "outside",
+    ]
+    assert events[0]["command"] == "do-switchover"
+    assert events[0]["dr_config_uuid"] == "dr-1"
+    assert events[0]["latency_ms"] == 12.5
+    assert "task_uuid" not in events[0]
+    assert "dr_config_uuid" not in events[1]
+    assert "command" not in events[2]
+
+
+def test_log_file_is_rotated_by_size(log_file):
+    logger = structured_logging.get_logger("test")
+    for i in range(100):
+        logger.info("safetime", extra={"fields": {"sample": i, "lag_ms": 1.0}})
+    structured_logging.stop_logging()
+
+    files = sorted(log_file.parent.glob("day2ops.jsonl*"))
+    assert len(files) == 3
+    assert all(path.stat().st_size <= 2000 for path in files)
+    last = json.loads(log_file.read_text().splitlines()[-1])
+    assert last["sample"] == 99
+
+
+def test_progress_is_shown_on_the_console_and_written_to_the_file(log_file, capsys):
+    structured_logging.get_logger("test").info("task progress")
+    structured_logging.get_progress_logger("test").info("Waiting: 40% complete...")
+    structured_logging.flush_logging()
+
+    assert capsys.readouterr().out == "Waiting: 40% complete...\n"
+    structured_logging.stop_logging()
+    events = [json.loads(line) for line in log_file.read_text().splitlines()]
+    assert [event["message"] for event in events] == [
+        "task progress",
+        "Waiting: 40% complete...",
+    ]
+    assert events[1]["logger"] == "day2ops.progress.test"
+
+
+def test_progress_is_shown_without_a_log_file(capsys):
+    structured_logging.get_progress_logger("test").info("Reattaching...")
+    structured_logging.get_logger("test").info("not shown")
+    structured_logging.flush_logging()
+
+    assert capsys.readouterr().out == "Reattaching...\n"
+
+
+def test_another_log_file_takes_over(log_file):
+    logger = structured_logging.get_logger("test")
+    logger.info("first")
+    other_file = log_file.parent / "other.jsonl"
+    structured_logging.configure_logging(str(other_file))
+    logger.info("second")
+    structured_logging.stop_logging()
+
+    def read_messages(path):
+        return [json.loads(line)["message"] for line in path.read_text().splitlines()]
+
+    assert read_messages(log_file) == ["first"]
+    assert read_messages(other_file) == ["second"]
+
+
+def test_the_writer_thread_starts_with_the_first_event(capsys):
+    structured_logging._stop_listener()
+
+    # below the level of the loggers, so never queued
+    structured_logging.get_logger("test").info("not logged")
+    assert structured_logging._listener is None
+
+    structured_logging.get_progress_logger("test").info("Waiting...")
+    assert structured_logging._listener is not None
+    structured_logging.flush_logging()
+    assert capsys.readouterr().out == "Waiting...\n"
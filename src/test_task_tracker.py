@@ -0,0 +1,113 @@
+import pytest
+
+import core.task_tracker as task_tracker
+from core.task_tracker import TaskTracker
+
+
+def test_task_tracker_polls_many_tasks_together(monkeypatch):
+    polls = {"list": 0, "single": 0}
+    remaining_polls = {"task-a": 1, "task-b": 2, "task-c": 3}
+
+    def list_customer_tasks(customer_uuid):
+        polls["list"] += 1
+        tasks = []
+        for task_uuid in list(remaining_polls):
+            remaining_polls[task_uuid] -= 1
+            done = remaining_polls[task_uuid] <= 0
+            status = "Running"
+            if done:
+                status = "Failure" if task_uuid == "task-c" else "Success"
+            tasks.append({"id": task_uuid, "status": status, "percentComplete": 50})
+        return tasks
+
+    def get_task_status(customer_uuid, task_uuid):
+        polls["single"] += 1
+        return {"status": "Success", "percent": 100}
+
+    monkeypatch.setattr(task_tracker, "_list_customer_tasks", list_customer_tasks)
+    monkeypatch.setattr(task_tracker, "_get_task_status", get_task_status)
+    monkeypatch.setattr(
+        task_tracker,
+        "_get_task_failure",
+        lambda customer_uuid, task_uuid: {"failedSubTasks": [{"errorString": "boom"}]},
+    )
+
+    tracker = TaskTracker("customer", poll_interval=0.01, task_list_threshold=1)
+    futures = {
+        task_uuid: tracker.track({"taskUUID": task_uuid}, task_uuid)
+        for task_uuid in ("task-a", "task-b", "task-c")
+    }
+
+    assert futures["task-a"].result(timeout=5)["status"] == "Success"
+    assert futures["task-b"].result(timeout=5)["status"] == "Success"
+    with pytest.raises(RuntimeError, match="boom"):
+        futures["task-c"].result(timeout=5)
+
+    # one list request per poll (not one request per task per poll)
+    assert polls["list"] == 3
+    assert polls["single"] == 0
+
+
+def test_task_tracker_events_end_with_final_status(monkeypatch):
+    statuses = iter(["Running", "Running", "Success"])
+    monkeypatch.setattr(
+        task_tracker,
+        "_get_task_status",
+        lambda customer_uuid, task_uuid: {"status": next(statuses), "percent": 10},
+    )
+
+    tracker = TaskTracker("customer", poll_interval=0.01)
+    future = tracker.track({"taskUUID": "task-a"}, "task-a")
+    events = [event["status"] for event in tracker.events("task-a")]
+
+    assert future.result(timeout=5)["status"] == "Success"
+    assert events[-1] == "Success"
+
+
+def test_task_tracker_retries_failed_polls(monkeypatch):
+    responses = iter(
+        [ConnectionError("YBA restarting")] * 3
+        + [{"status": "Running", "percent": 50}, {"status": "Aborted"}]
+    )
+
+    def get_task_status(customer_uuid, task_uuid):
+        response = next(responses)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(task_tracker, "_get_task_status", get_task_status)
+    monkeypatch.setattr(
+        task_tracker, "_get_task_failure", lambda customer_uuid, task_uuid: {}
+    )
+
+    tracker = TaskTracker(
+        "customer", poll_interval=0.001, max_poll_errors=4, max_poll_backoff=0.01
+    )
+    future = tracker.track({"taskUUID": "task-a"}, "task-a")
+
+    # the failure YBA reports carries its status
+    with pytest.raises(task_tracker.TaskFailedError) as error:
+        future.result(timeout=5)
+    assert error.value.status == "Aborted"
+
+
+def test_task_tracker_gives_up_after_failed_polls_in_a_row(monkeypatch):
+    polls = []
+
+    def get_task_status(customer_uuid, task_uuid):
+        polls.append(task_uuid)
+        raise ConnectionError("YBA down")
+
+    monkeypatch.setattr(task_tracker, "_get_task_status", get_task_status)
+
+    tracker = TaskTracker(
+        "customer", poll_interval=0.001, max_poll_errors=3, max_poll_backoff=0.01
+    )
+    future = tracker.track({"taskUUID": "task-a"}, "task-a")
+
+    with pytest.raises(RuntimeError, match="3 times in a row") as error:
+        future.result(timeout=5)
+    # not a failure of the task itself: it may still be running
+    assert not isinstance(error.value, task_tracker.TaskFailedError)
+    assert polls == ["task-a"] * 3
@@ -0,0 +1,90 @@
+import pytest
+import sqlite3
+
+from core import topology
+
+UNIVERSES = [
+    {
+        "universeUUID": "u-east",
+        "name": "east",
+        "drConfigUuidsAsSource": ["dr-1"],
+        "drConfigUuidsAsTarget": [],
+    },
+    {
+        "universeUUID": "u-west",
+        "name": "west",
+        "drConfigUuidsAsSource": [],
+        "drConfigUuidsAsTarget": ["dr-1"],
+    },
+]
+
+
+@pytest.fixture
+def listed(tmp_path, monkeypatch):
+    monkeypatch.setenv("DAY2OPS_STATE_DIR", str(tmp_path))
+    monkeypatch.setattr(topology, "_memo", {})
+    calls = []
+
+    def fake_list_all_universes(customer_uuid):
+        calls.append(customer_uuid)
+        return UNIVERSES
+
+    monkeypatch.setattr(topology, "_list_all_universes", fake_list_all_universes)
+    return calls
+
+
+def test_lookups_come_from_one_list_call(listed):
+    assert topology.lookup_universe_uuid("c", "west") == "u-west"
+    assert topology.lookup_universe_name("c", "u-east") == "east"
+    assert topology.lookup_dr_roles("c", "west") == {
+        "universeUUID": "u-west",
+        "drConfigUuidsAsSource": [],
+        "drConfigUuidsAsTarget": ["dr-1"],
+    }
+    assert topology.lookup_dr_pair("c", "dr-1") == ("east", "west")
+    assert topology.lookup_universe_uuid("c", "north") is None
+    assert listed == ["c"]
+
+
+def test_invalidate_and_incremental_refresh(listed):
+    assert topology.lookup_dr_pair("c", "dr-1") == ("east", "west")
+
+    # after a switchover the roles swap; only the changed links are rewritten
+    swapped = [
+        {
+            **UNIVERSES[0],
+            "drConfigUuidsAsSource": [],
+            "drConfigUuidsAsTarget": ["dr-1"],
+        },
+        {
+            **UNIVERSES[1],
+            "drConfigUuidsAsSource": ["dr-1"],
+            "drConfigUuidsAsTarget": [],
+        },
+    ]
+    assert topology.refresh_topology("c", swapped) == {
+        "universesUpserted": 0,
+        "universesRemoved": 0,
+        "drLinksUpserted": 2,
+        "drLinksRemoved": 0,
+    }
+    assert topology.lookup_dr_pair("c", "dr-1") == ("west", "east")
+
+    topology.invalidate_topology("c")
+    assert topology.lookup_dr_pair("c", "dr-1") == ("east", "west")
+    assert listed == ["c", "c"]
+
+
+def test_lookups_are_remembered_until_invalidated(listed, monkeypatch):
+    assert topology.lookup_universe_uuid("c", "east") == "u-east"
+
+    # answered by the process without opening the index again
+    def no_index():
+        raise sqlite3.OperationalError("unable to open database file")
+
+    monkeypatch.setattr(topology, "_connect", no_index)
+    assert topology.lookup_universe_uuid("c", "east") == "u-east"
+
+    # after an invalidation the index is needed again, and callers fall back to YBA
+    topology.invalidate_topology("c")
+    assert topology.lookup_universe_uuid("c", "east") is None
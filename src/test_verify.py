@@ -0,0 +1,121 @@
+import os
+import uuid
+
+import pytest
+
+from xclusterdr import verify
+
+
+def test_chunk_predicates_cover_the_key_without_overlap():
+    assert verify.get_chunk_predicate(['"a"', '"b"'], None, (1, "x")) == (
+        '("a", "b") < (%s, %s)',
+        [1, "x"],
+    )
+    assert verify.get_chunk_predicate(['"id"'], (0,), (32768,), by_hash=True) == (
+        'yb_hash_code("id") >= (%s) AND yb_hash_code("id") < (%s)',
+        [0, 32768],
+    )
+    assert verify.get_chunk_predicate(['"id"'], None, None) == ("TRUE", [])
+
+
+# PostgreSQL stand-ins for the two universes, e.g. host=127.0.0.1 port=5432 dbname=source user=postgres
+STAND_IN_DSNS = (os.getenv("DDL_TEST_SOURCE_DSN"), os.getenv("DDL_TEST_TARGET_DSN"))
+
+
+@pytest.mark.skipif(
+    not all(STAND_IN_DSNS),
+    reason="set DDL_TEST_SOURCE_DSN and DDL_TEST_TARGET_DSN to two empty PostgreSQL databases",
+)
+def test_verify_reports_the_chunks_that_differ(monkeypatch):
+    pytest.importorskip("psycopg2")
+    from core.ysql import YsqlPool
+
+    pools = {
+        "source": YsqlPool({"dsn": STAND_IN_DSNS[0]}, 4),
+        "target": YsqlPool({"dsn": STAND_IN_DSNS[1]}, 4),
+    }
+    schema = f"verify_{uuid.uuid4().hex[:8]}"
+
+    monkeypatch.setattr(
+        verify,
+        "get_source_xcluster_dr_config",
+        lambda customer_uuid, name, key: {
+            "uuid": "dr-1",
+            "primaryUniverseUuid": "source",
+            "drReplicaUniverseUuid": "target",
+            "tables": ["orders", "lines"],
+        },
+    )
+    monkeypatch.setattr(
+        verify,
+        "_get_universe_by_uuid",
+        lambda customer_uuid, universe_uuid: {
+            "universeUUID": universe_uuid,
+            "name": universe_uuid,
+        },
+    )
+    monkeypatch.setattr(
+        verify,
+        "get_ysql_pool",
+        lambda universe, database, max_connections: pools[universe.universe_uuid],
+    )
+    monkeypatch.setattr(
+        verify,
+        "_get_all_ysql_tables_list",
+        lambda customer_uuid, universe_uuid: [
+            {
+                "tableID": name,
+                "keySpace": "db",
+                "pgSchemaName": schema,
+                "tableName": name,
+            }
+            for name in ("orders", "lines", "unreplicated")
+        ],
+    )
+    monkeypatch.setattr(
+        verify,
+        "_get_xcluster_dr_safetime",
+        lambda customer_uuid, uuid: {"safetimes": []},
+    )
+
+    try:
+        for pool in pools.values():
+            pool.execute_all(
+                [
+                    f"CREATE SCHEMA {schema}",
+                    f"CREATE TABLE {schema}.orders (id int PRIMARY KEY, total numeric)",
+                    f"INSERT INTO {schema}.orders SELECT i, i * 1.5 FROM generate_series(1, 1000) i",
+                    f"CREATE TABLE {schema}.lines (o int, n int, sku text, PRIMARY KEY (o, n))",
+                    f"INSERT INTO {schema}.lines SELECT i / 3, i % 3, 'sku' || i FROM generate_series(0, 899) i",
+                    f"CREATE TABLE {schema}.unreplicated (id int)",
+                ]
+            )
+        pools["target"].execute_all(
+            [
+                f"UPDATE {schema}.orders SET total = 0 WHERE id = 420",
+                f"DELETE FROM {schema}.lines WHERE o = 7 AND n = 1",
+                f"INSERT INTO {schema}.unreplicated VALUES (1)",
+            ]
+        )
+
+        results = verify.verify_dr_tables("c", "source", chunk_rows=100, workers=4)
+
+        by_name = {result.name: result for result in results}
+        assert sorted(by_name) == [f"{schema}.lines", f"{schema}.orders"]
+        orders = by_name[f"{schema}.orders"]
+        assert (orders.chunks, orders.source_rows, orders.target_rows) == (
+            10,
+            1000,
+            1000,
+        )
+        assert [(m.lower, m.upper) for m in orders.mismatches] == [((401,), (501,))]
+        lines = by_name[f"{schema}.lines"]
+        assert [(m.lower, m.source_rows, m.target_rows) for m in lines.mismatches] == [
+            (None, 100, 99)
+        ]
+        # PostgreSQL has no yb_read_time: each side is read at its latest
+        assert not orders.at_safetime and orders.error is None
+    finally:
+        for pool in pools.values():
+            pool.execute_all([f"DROP SCHEMA IF EXISTS {schema} CASCADE"])
+            pool.close()
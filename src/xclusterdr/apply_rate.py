@@ -0,0 +1,131 @@
+import math
+import threading
+
+from dataclasses import dataclass
+
+# How fast a DR replica applies changes: the rate at which a namespace's
+# safetime advances per second of wall clock. At 1.0 the replica keeps up and
+# its lag stays the same; above 1.0 it is catching up; below, falling behind.
+# Each namespace keeps one smoothed rate and its last reading, whatever the
+# number of readings, so an estimator can follow a whole fleet for as long as
+# it runs.
+
+
+@dataclass(slots=True)
+class ApplyRate:
+    wall_us: float
+    safetime_us: float
+    lag_ms: float
+    rate: float = None
+    samples: int = 0
+
+    def get_catch_up_seconds(self, target_lag_ms=0.0):
+        """
+        Projects how long the lag takes to fall to a target at the smoothed rate.
+
+        :param target_lag_ms: float - the lag to reach; default 0
+        :return: float - seconds (0 when already there), or None when the replica is not catching up or there is no rate yet
+        """
+        if self.lag_ms <= target_lag_ms:
+            return 0.0
+        if self.rate is None or self.rate <= 1:
+            return None
+        return (self.lag_ms - target_lag_ms) / ((self.rate - 1) * 1000)
+
+
+class ApplyRateEstimator:
+    """
+    Smooths the apply rate of each namespace with an exponentially weighted moving average. The weight of a reading depends on the time since the previous one, so readings at uneven intervals are weighed fairly: a reading half_life_seconds old counts half as much as a new one.
+    """
+
+    def __init__(self, half_life_seconds=10.0):
+        self.half_life_seconds = half_life_seconds
+        self._rates = {}
+        self._lock = threading.Lock()
+
+    def update(self, key, safetime_epoch_us: float, lag_us: float) -> ApplyRate:
+        """
+        Adds a reading of a namespace's safetime.
+
+        The wall clock of the reading is taken as its safetime plus its lag, as YBA computed them, so the rate does not depend on this host's clock or on the time the request took.
+
+        :param key: the namespace, e.g. (DR config UUID, namespace ID)
+        :param safetime_epoch_us: float - safetimeEpochUs of a NamespaceSafetime
+        :param lag_us: float - safetimeLagUs of the same NamespaceSafetime
+        :return: ApplyRate - the namespace's estimate
+        """
+        wall_us = safetime_epoch_us + lag_us
+        with self._lock:
+            estimate = self._rates.get(key)
+            if estimate is None:
+                estimate = ApplyRate(wall_us, safetime_epoch_us, lag_us / 1000)
+                self._rates[key] = estimate
+                return estimate
+
+            elapsed_us = wall_us - estimate.wall_us
+            if elapsed_us <= 0:
+                return estimate
+
+            rate = (safetime_epoch_us - estimate.safetime_us) / elapsed_us
+            if estimate.rate is None:
+                estimate.rate = rate
+            else:
+                weight = 1 - math.pow(
+                    0.5, elapsed_us / 1_000_000 / self.half_life_seconds
+                )
+                estimate.rate += weight * (rate - estimate.rate)
+            estimate.samples += 1
+            estimate.wall_us = wall_us
+            estimate.safetime_us = safetime_epoch_us
+            estimate.lag_ms = lag_us / 1000
+            return estimate
+
+    def update_safetimes(self, dr_config_uuid: str, safetimes: list) -> dict:
+        """
+        Adds a reading of every namespace of a DR config.
+
+        :param dr_config_uuid: str - the DR config UUID
+        :param safetimes: list<json<NamespaceSafetime>> - the safetimes of a DrConfigSafeTimeResp
+        :return: dict<str, ApplyRate> - the estimate of each namespace, by namespace ID
+        """
+        return {
+            entry["namespaceId"]: self.update(
+                (dr_config_uuid, entry["namespaceId"]),
+                entry["safetimeEpochUs"],
+                entry["safetimeLagUs"],
+            )
+            for entry in safetimes
+        }
+
+    def get(self, key):
+        """
+        :return: ApplyRate - the estimate of a namespace, or None if it has no reading
+        """
+        with self._lock:
+            return self._rates.get(key)
+
+    def forget(self, key):
+        with self._lock:
+            self._rates.pop(key, None)
+
+
+def format_catch_up(estimate: ApplyRate, target_lag_ms=0.0) -> str:
+    """
+    :return: str - the projected seconds to catch up, or why there is none
+    """
+    return format_catch_up_seconds(
+        estimate.rate, estimate.get_catch_up_seconds(target_lag_ms)
+    )
+
+
+def format_catch_up_seconds(rate: float, seconds: float) -> str:
+    """
+    :param rate: float - the apply rate, or None if there is none yet
+    :param seconds: float - the projected seconds to catch up, or None if not catching up
+    :return: str - the seconds, or why there are none
+    """
+    if rate is None:
+        return ""
+    if seconds is None:
+        return "falling behind" if rate < 1 else "not catching up"
+    return f"{seconds:.1f}"
@@ -2,11 +2,34 @@ from core.internal_rest_apis import (
     _get_universe_by_name,
     _get_xcluster_dr_configs,
 )
+from core.topology import invalidate_topology, lookup_dr_roles
 
 
 def get_source_xcluster_dr_config(
-    customer_uuid: str, source_universe_name: str, key: str
+    customer_uuid: str, source_universe_name: str, key: str, live=False
 ):
+    """
+    Returns the DR config a universe is the source (primary) of.
+
+    The topology index can be minutes behind a switchover or setup-dr run from elsewhere. Commands that change a DR config pass live, so the universe's role is read from YBA. Otherwise the index saves that read, but only when the DR config it points to still has the universe as its primary; if not, or if the index shows no source role, YBA is asked.
+
+    :param customer_uuid: str - the customer UUID
+    :param source_universe_name: str - the name of the universe
+    :param key: str - a field of the DR config, or all for the whole config
+    :param live: bool - read the universe's role from YBA, not the index; default False
+    :return: json<DrConfig>, or the value of the field
+    :raises RuntimeError: if the universe is not found or is not the source of a DR config
+    """
+    if not live:
+        indexed_roles = lookup_dr_roles(customer_uuid, source_universe_name)
+        if indexed_roles is not None and indexed_roles["drConfigUuidsAsSource"]:
+            dr_config = _get_xcluster_dr_configs(
+                customer_uuid, indexed_roles["drConfigUuidsAsSource"][0]
+            )
+            if dr_config.get("primaryUniverseUuid") == indexed_roles["universeUUID"]:
+                return dr_config if key == "all" else dr_config[key]
+            # the index is out of date, e.g. the pair was switched over since it was built
+            invalidate_topology(customer_uuid)
 
     get_source_universe_response = _get_universe_by_name(
         customer_uuid, source_universe_name
@@ -0,0 +1,274 @@
+import math
+import threading
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+from core import http_client
+from core.internal_rest_apis import _get_xcluster_dr_configs, _list_customer_tasks
+from core.models import DrConfig
+from core.task_tracker import FINISHED_STATUSES
+from includes.screen import KeyReader, Screen
+from includes.structured_logging import get_logger
+from xclusterdr.fleet_lag import (
+    FleetLagSampler,
+    discover_dr_pairs,
+    get_fleet_lag_status,
+)
+
+logger = get_logger("dashboard")
+
+DASHBOARD_HEADERS = (
+    "",
+    "source",
+    "target",
+    "state",
+    "paused",
+    "max lag (ms)",
+    "max skew (ms)",
+    "catch-up ETA (s)",
+    "task",
+    "sampled (UTC)",
+)
+
+# the style of a row, by its status
+DASHBOARD_STYLES = {"LAGGING": "31", "ERROR": "33"}
+
+
+class DashboardData:
+    """
+    Keeps the rows of the dashboard up to date in background threads, apart from drawing: the lag of each DR pair (from a FleetLagSampler), its DR config state, and the tasks in flight. All of them share one request budget.
+    """
+
+    def __init__(
+        self,
+        customer_uuid: str,
+        interval=30.0,
+        lagging_interval=5.0,
+        max_lag_ms=30000,
+        concurrency=8,
+        request_budget=5.0,
+        status_interval=60.0,
+        task_interval=5.0,
+    ):
+        """
+        :param customer_uuid: str - the customer UUID
+        :param interval: float - the seconds between two lag samples of a pair; default 30
+        :param lagging_interval: float - the seconds between two lag samples of a lagging pair; default 5
+        :param max_lag_ms: float - the safetime lag above which a pair is lagging; default 30000
+        :param concurrency: int - the most requests in flight for lag samples, and for DR configs; default 8
+        :param request_budget: float - the most requests per second to YBA; default 5
+        :param status_interval: float - the seconds between two reads of the DR configs; default 60
+        :param task_interval: float - the seconds between two reads of the task list; default 5
+        """
+        self.customer_uuid = customer_uuid
+        self.concurrency = concurrency
+        self.status_interval = status_interval
+        self.task_interval = task_interval
+        self.error = None
+
+        self._budget = http_client.TokenBucket(request_budget, 1)
+        self.sampler = FleetLagSampler(
+            customer_uuid,
+            discover_dr_pairs(customer_uuid),
+            interval,
+            lagging_interval,
+            max_lag_ms,
+            concurrency,
+            request_budget,
+            budget=self._budget,
+        )
+        self._dr_configs = {}
+        self._tasks = {}
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._threads = []
+
+    def start(self):
+        self._threads = [
+            threading.Thread(
+                target=self.sampler.run,
+                args=(math.inf, self._stop_event),
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._refresh_forever,
+                args=(
+                    lambda: self._refresh_dr_configs(
+                        [row["drConfigUuid"] for row in self.sampler.snapshot()]
+                    ),
+                    self.status_interval,
+                ),
+                daemon=True,
+            ),
+            threading.Thread(
+                target=self._refresh_forever,
+                args=(self._refresh_tasks, self.task_interval),
+                daemon=True,
+            ),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        for thread in self._threads:
+            thread.join(timeout=5)
+
+    def _read_dr_config(self, dr_config_uuid: str):
+        self._budget.acquire()
+        return DrConfig.from_json(
+            _get_xcluster_dr_configs(self.customer_uuid, dr_config_uuid)
+        )
+
+    def _refresh_dr_configs(self, dr_config_uuids: list):
+        with ThreadPoolExecutor(max_workers=max(1, self.concurrency)) as pool:
+            futures = {
+                pool.submit(self._read_dr_config, dr_config_uuid): dr_config_uuid
+                for dr_config_uuid in dr_config_uuids
+            }
+            # each row is updated as soon as its DR config is read
+            for future in as_completed(futures):
+                try:
+                    dr_config = future.result()
+                except Exception as e:
+                    self.error = f"DR config {futures[future]}: {e}"
+                    continue
+                with self._lock:
+                    self._dr_configs[dr_config.uuid] = dr_config
+
+    def _refresh_tasks(self):
+        # a task is shown on the pair whose DR config, xCluster config or universes it targets
+        with self._lock:
+            pair_by_target = {
+                target_uuid: dr_config.uuid
+                for dr_config in self._dr_configs.values()
+                for target_uuid in (
+                    dr_config.uuid,
+                    dr_config.xcluster_config_uuid,
+                    dr_config.primary_universe_uuid,
+                    dr_config.dr_replica_universe_uuid,
+                )
+                if target_uuid
+            }
+        self._budget.acquire()
+        tasks = {}
+        for task in _list_customer_tasks(self.customer_uuid):
+            dr_config_uuid = pair_by_target.get(task.get("targetUUID"))
+            if dr_config_uuid is None or task.get("status") in FINISHED_STATUSES:
+                continue
+            tasks[dr_config_uuid] = (
+                f"{task.get('title', task.get('type', 'task'))} "
+                f"{task.get('percentComplete', 0):.0f}%"
+            )
+        with self._lock:
+            self._tasks = tasks
+
+    def _refresh_forever(self, refresh, interval: float):
+        while not self._stop_event.is_set():
+            try:
+                refresh()
+            except Exception as e:
+                # the dashboard keeps showing what it has; the error is in its footer
+                self.error = str(e)
+                logger.warning(
+                    "dashboard refresh failed", extra={"fields": {"error": str(e)}}
+                )
+            self._stop_event.wait(interval)
+
+    def get_rows(self) -> list:
+        """
+        :return: list<dict> - the latest row of each pair (see FleetLagSampler.snapshot), with its DR config state, paused and task in flight
+        """
+        rows = self.sampler.snapshot()
+        with self._lock:
+            for row in rows:
+                dr_config = self._dr_configs.get(row["drConfigUuid"])
+                row["state"] = dr_config.state if dr_config else None
+                row["paused"] = dr_config.paused if dr_config else None
+                row["task"] = self._tasks.get(row["drConfigUuid"])
+        return rows
+
+
+def _format_number(value) -> str:
+    return "" if value is None else f"{value:.1f}"
+
+
+def format_dashboard_row(row: dict) -> tuple:
+    """
+    :return: tuple<list<str>, str> - the cells of a pair's row on the dashboard, and its style
+    """
+    status = get_fleet_lag_status(row)
+    cells = [
+        status,
+        row["source"] or "",
+        row["target"] or "",
+        row["state"] or "",
+        "" if row["paused"] is None else str(row["paused"]),
+        _format_number(row["maxLagMs"]),
+        _format_number(row["maxSkewMs"]),
+        row["catchUp"] or "",
+        row["task"] or "",
+        (row["sampledAt"] or "")[11:19],
+    ]
+    return cells, DASHBOARD_STYLES.get(status)
+
+
+def run_dashboard(data: DashboardData, screen: Screen, refresh_seconds=1.0):
+    """
+    Draws the dashboard until 'q' is pressed (or Ctrl-C). Only the rows on screen are formatted, and only their changed cells are drawn, so the frame rate does not depend on the size of the fleet.
+
+    Keys: j/k or the arrows scroll by a row, space/b or page down/up by a page, g/G go to the top/bottom, q quits.
+
+    :param data: DashboardData - the data, refreshed in the background
+    :param screen: Screen - where to draw
+    :param refresh_seconds: float - the most seconds between two frames; default 1
+    """
+    top = 0
+    data.start()
+    screen.enter()
+    try:
+        with KeyReader() as keys:
+            while True:
+                rows = data.get_rows()
+                page = screen.get_page_rows()
+                top = max(0, min(top, len(rows) - page))
+                lagging = sum(1 for row in rows if row["lagging"])
+                title = (
+                    f"day2ops dashboard - {len(rows)} DR pair(s), {lagging} lagging - "
+                    f"{datetime.now(timezone.utc):%Y-%m-%d %H:%M:%S} UTC"
+                )
+                footer = (
+                    f"rows {top + 1 if rows else 0}-{min(top + page, len(rows))} of {len(rows)} | "
+                    f"{data.sampler.requests} lag sample(s) sent | j/k scroll, space/b page, q quit"
+                )
+                if data.error:
+                    footer = f"{footer} | last error: {data.error}"
+                screen.draw(
+                    title,
+                    DASHBOARD_HEADERS,
+                    [format_dashboard_row(row) for row in rows[top : top + page]],
+                    footer,
+                )
+
+                key = keys.read_key(refresh_seconds)
+                if key in ("q", "Q"):
+                    break
+                if key in ("j", "down"):
+                    top += 1
+                elif key in ("k", "up"):
+                    top -= 1
+                elif key in (" ", "page_down"):
+                    top += page
+                elif key in ("b", "page_up"):
+                    top -= page
+                elif key in ("g", "home"):
+                    top = 0
+                elif key in ("G", "end"):
+                    top = len(rows)
+                top = max(0, top)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        screen.leave()
+        data.stop()
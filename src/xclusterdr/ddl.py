@@ -0,0 +1,374 @@
+from concurrent.futures import ThreadPoolExecutor
+
+from core.internal_rest_apis import (
+    _get_all_ysql_tables_list,
+    _get_universe_by_uuid,
+    _set_tables_in_dr_config,
+)
+from core.journal import run_journaled_task
+from core.models import DrConfig, Universe, parse_tables
+from core.ysql import get_ysql_pool, quote_identifier
+from includes.structured_logging import get_logger
+from xclusterdr.common import get_source_xcluster_dr_config
+
+logger = get_logger("ddl")
+
+# xCluster DR replicates data, not DDL: a table must be created (altered,
+# dropped) the same way on both universes, and new tables added to the DR
+# config. These run the DDL on both at once and check the result.
+
+# the statements each DDL command accepts, by the words they start with
+DDL_KINDS = {
+    "create-table": ("CREATE TABLE",),
+    "alter-table": ("ALTER TABLE",),
+    "create-index": ("CREATE INDEX", "CREATE UNIQUE INDEX"),
+    "alter-index": ("ALTER INDEX",),
+}
+
+_USER_SCHEMAS = "n.nspname NOT IN ('pg_catalog', 'information_schema') AND n.nspname NOT LIKE 'pg\\_%'"
+
+# a row for each column, index and constraint of the user relations of a database
+SCHEMA_QUERY = f"""
+SELECT 'column', n.nspname, c.relname,
+       a.attname || ' ' || format_type(a.atttypid, a.atttypmod)
+       || CASE WHEN a.attnotnull THEN ' not null' ELSE '' END
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+JOIN pg_attribute a ON a.attrelid = c.oid AND a.attnum > 0 AND NOT a.attisdropped
+WHERE c.relkind IN ('r', 'p', 'v', 'm') AND {_USER_SCHEMAS}
+UNION ALL
+SELECT 'index', n.nspname, c.relname, pg_get_indexdef(i.indexrelid)
+FROM pg_index i
+JOIN pg_class c ON c.oid = i.indrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE {_USER_SCHEMAS}
+UNION ALL
+SELECT 'constraint', n.nspname, c.relname,
+       con.conname || ' ' || pg_get_constraintdef(con.oid)
+FROM pg_constraint con
+JOIN pg_class c ON c.oid = con.conrelid
+JOIN pg_namespace n ON n.oid = c.relnamespace
+WHERE {_USER_SCHEMAS}
+"""
+
+# the tables and indexes of a database, as YBA lists them (a primary key is part of its table)
+RELATIONS_QUERY = f"""
+SELECT n.nspname, c.relname
+FROM pg_class c
+JOIN pg_namespace n ON n.oid = c.relnamespace
+LEFT JOIN pg_index i ON i.indexrelid = c.oid
+WHERE c.relkind IN ('r', 'p', 'i', 'I') AND i.indisprimary IS NOT TRUE
+  AND {_USER_SCHEMAS}
+"""
+
+# the indexes of a table (but its primary key), which are dropped with it
+TABLE_INDEXES_QUERY = """
+SELECT n.nspname, ic.relname
+FROM pg_index i
+JOIN pg_class c ON c.oid = i.indrelid
+JOIN pg_namespace tn ON tn.oid = c.relnamespace
+JOIN pg_class ic ON ic.oid = i.indexrelid
+JOIN pg_namespace n ON n.oid = ic.relnamespace
+WHERE NOT i.indisprimary AND tn.nspname = %s AND c.relname = %s
+"""
+
+
+def check_ddl_statements(statements: list, kind: str):
+    """
+    :param statements: list<str> - the statements of a DDL command
+    :param kind: str - a key of DDL_KINDS
+    :raises RuntimeError: if there is no statement, or one is not of that kind or holds more than one statement
+    """
+    if not statements:
+        raise RuntimeError("ERROR: no DDL statement was given.")
+    for statement in statements:
+        # each statement is run as one string: a second one would get past the check of its kind
+        if ";" in statement.strip().rstrip(";"):
+            raise RuntimeError(
+                f"ERROR: '{statement}' holds more than one statement; give each as its own argument."
+            )
+        words = " ".join(statement.split()).upper()
+        if not words.startswith(DDL_KINDS[kind]):
+            raise RuntimeError(
+                f"ERROR: '{statement}' is not a {' or '.join(DDL_KINDS[kind])} statement."
+            )
+
+
+def parse_relation_name(relation_name: str) -> tuple:
+    """
+    :param relation_name: str - schema.name, or a name in the public schema
+    :return: tuple<str, str> - the schema and the name
+    """
+    schema, _, name = relation_name.rpartition(".")
+    return schema or "public", name
+
+
+def get_drop_statement(kind: str, relation_name: str) -> str:
+    """
+    :param kind: str - TABLE or INDEX
+    :param relation_name: str - schema.name
+    :return: str - the DROP statement
+    """
+    schema, name = parse_relation_name(relation_name)
+    return f"DROP {kind} {quote_identifier(schema)}.{quote_identifier(name)}"
+
+
+def read_schema(pool) -> frozenset:
+    """
+    :param pool: YsqlPool - a pool of connections to the database
+    :return: frozenset<tuple<str, str, str, str>> - the kind, schema, relation and definition of each column, index and constraint
+    """
+    return frozenset(pool.query(SCHEMA_QUERY))
+
+
+def get_schema_differences(source_schema: frozenset, target_schema: frozenset) -> list:
+    """
+    :param source_schema: frozenset - read_schema of the source
+    :param target_schema: frozenset - read_schema of the target
+    :return: list<str> - each column, index or constraint that is on one side only
+    """
+    return [
+        f"only on the {side}: {kind} of {schema}.{relation}: {definition}"
+        for side, only in (
+            ("source", source_schema - target_schema),
+            ("target", target_schema - source_schema),
+        )
+        for kind, schema, relation, definition in sorted(only)
+    ]
+
+
+def _read_both(pool, source_pool, target_pool) -> tuple:
+    source_future = pool.submit(
+        lambda: (read_schema(source_pool), set(source_pool.query(RELATIONS_QUERY)))
+    )
+    target_schema = read_schema(target_pool)
+    source_schema, source_relations = source_future.result()
+    return source_schema, target_schema, source_relations
+
+
+def apply_ddl_to_pair(
+    source_pool, target_pool, statements: list, before_ddl=None
+) -> dict:
+    """
+    Runs DDL statements on the source and the target at the same time, each side in order on one connection, then checks that both have the same schema.
+
+    The schemas are checked before too: nothing is run (not even before_ddl) on schemas that already differ.
+
+    :param source_pool: YsqlPool - connections to the database on the source
+    :param target_pool: YsqlPool - connections to the same database on the target
+    :param statements: list<str> - the statements
+    :param before_ddl: callable - called once the schemas are checked, before any statement runs (optional)
+    :return: dict - the (schema, name) of the tables and indexes the statements created (createdRelations) and dropped (droppedRelations) on the source
+    :raises RuntimeError: if the schemas differ before or after, or a statement fails on either side
+    """
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        source_schema, target_schema, relations_before = _read_both(
+            pool, source_pool, target_pool
+        )
+        differences = get_schema_differences(source_schema, target_schema)
+        if differences:
+            raise RuntimeError(
+                "ERROR: the schemas of the source and target already differ; no DDL was run:\n"
+                + "\n".join(differences)
+            )
+        if before_ddl is not None:
+            before_ddl()
+
+        futures = {
+            side: pool.submit(side_pool.execute_all, statements)
+            for side, side_pool in (("source", source_pool), ("target", target_pool))
+        }
+        errors = {}
+        for side, future in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                errors[side] = str(e).strip()
+
+        source_schema, target_schema, relations_after = _read_both(
+            pool, source_pool, target_pool
+        )
+
+    differences = get_schema_differences(source_schema, target_schema)
+    logger.info(
+        "ddl applied",
+        extra={
+            "fields": {
+                "statements": len(statements),
+                "errors": errors,
+                "differences": len(differences),
+            }
+        },
+    )
+    if errors:
+        failed = "; ".join(f"on the {side}: {error}" for side, error in errors.items())
+        raise RuntimeError(
+            f"ERROR: the DDL failed {failed}"
+            + (
+                "\nThe schemas now differ:\n" + "\n".join(differences)
+                if differences
+                else ""
+            )
+        )
+    if differences:
+        raise RuntimeError(
+            "ERROR: the DDL ran on both sides, but the schemas differ:\n"
+            + "\n".join(differences)
+        )
+    return {
+        "createdRelations": sorted(relations_after - relations_before),
+        "droppedRelations": sorted(relations_before - relations_after),
+    }
+
+
+def _get_table_ids(customer_uuid: str, universe_uuid: str, database: str) -> dict:
+    return {
+        (table.schema, table.name): table.table_id
+        for table in parse_tables(
+            _get_all_ysql_tables_list(customer_uuid, universe_uuid)
+        )
+        if table.keyspace == database
+    }
+
+
+def _set_tables(customer_uuid: str, dr_config: DrConfig, tables: list, friendly_name):
+    _, task_status = run_journaled_task(
+        customer_uuid,
+        "set-tables",
+        dr_config.uuid,
+        lambda: _set_tables_in_dr_config(
+            customer_uuid, dr_config.uuid, dr_config.storage_config_uuid, tables
+        ),
+        friendly_name,
+        dr_config.uuid,
+    )
+    return task_status
+
+
+def run_ddl_on_dr_pair(
+    customer_uuid: str,
+    source_universe_name: str,
+    database: str,
+    statements: list,
+    drop_relations=(),
+) -> dict:
+    """
+    Runs DDL on both universes of a DR pair (see apply_ddl_to_pair), and keeps the DR config in step with it:
+
+    - tables and indexes to drop that are replicated (with the indexes of the tables) are removed from the DR config once the schemas are checked and before the DDL runs, as replication must stop before they are dropped;
+    - the tables and indexes the DDL creates are then added to the DR config, and any other dropped relation still in it (e.g. dropped by CASCADE) removed, all in one set_tables task, so all new tables of the database are added at once.
+
+    Tables are added empty, so there is no backup/restore bootstrap.
+
+    :param customer_uuid: str - the customer UUID
+    :param source_universe_name: str - the name of the DR primary
+    :param database: str - the database (YSQL keyspace) to run the DDL in
+    :param statements: list<str> - the statements
+    :param drop_relations: list<str> - the schema.name of the tables and indexes the statements drop (optional)
+    :return: dict - the tables added to and removed from the DR config (by ID), and the set_tables task statuses
+    :raises RuntimeError: if the DDL fails or leaves the schemas different, or a new table cannot be found in YBA; the error names the tables already removed from the DR config, if any
+    """
+    dr_config = DrConfig.from_json(
+        get_source_xcluster_dr_config(
+            customer_uuid, source_universe_name, "all", live=True
+        )
+    )
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        source_universe, target_universe = pool.map(
+            lambda universe_uuid: Universe.from_json(
+                _get_universe_by_uuid(customer_uuid, universe_uuid)
+            ),
+            (dr_config.primary_universe_uuid, dr_config.dr_replica_universe_uuid),
+        )
+    source_pool = get_ysql_pool(source_universe, database)
+    target_pool = get_ysql_pool(target_universe, database)
+
+    result = {"addedTables": [], "removedTables": [], "taskStatuses": []}
+    replicated_tables = list(dr_config.tables)
+
+    dropped_table_ids = {}
+    removed = []
+    if drop_relations:
+        dropped_table_ids = _get_table_ids(
+            customer_uuid, source_universe.universe_uuid, database
+        )
+        dropped = set()
+        for relation_name in drop_relations:
+            relation = parse_relation_name(relation_name)
+            dropped.add(relation)
+            # dropping a table drops its indexes too
+            dropped.update(source_pool.query(TABLE_INDEXES_QUERY, relation))
+        removed = sorted(
+            dropped_table_ids[relation]
+            for relation in dropped
+            if dropped_table_ids.get(relation) in replicated_tables
+        )
+
+    def remove_from_dr_config():
+        result["taskStatuses"].append(
+            _set_tables(
+                customer_uuid,
+                dr_config,
+                [table_id for table_id in replicated_tables if table_id not in removed],
+                "Remove tables from xCluster DR",
+            )
+        )
+        result["removedTables"] = removed
+
+    try:
+        relations = apply_ddl_to_pair(
+            source_pool,
+            target_pool,
+            statements,
+            remove_from_dr_config if removed else None,
+        )
+    except RuntimeError as e:
+        if result["removedTables"]:
+            raise RuntimeError(
+                f"{e}\nThe tables {', '.join(removed)} were removed from the xCluster DR config before the DDL ran, and are no longer replicated; add back those that still exist on both sides with do-add-tables-to-dr."
+            ) from e
+        raise
+    replicated_tables = [
+        table_id for table_id in replicated_tables if table_id not in removed
+    ]
+    # anything else the DDL dropped (e.g. with CASCADE) leaves the DR config too
+    stale = [
+        dropped_table_ids[relation]
+        for relation in relations["droppedRelations"]
+        if dropped_table_ids.get(relation) in replicated_tables
+    ]
+
+    if relations["createdRelations"]:
+        table_ids = _get_table_ids(
+            customer_uuid, source_universe.universe_uuid, database
+        )
+        missing = [
+            f"{schema}.{name}"
+            for schema, name in relations["createdRelations"]
+            if (schema, name) not in table_ids
+        ]
+        if missing:
+            raise RuntimeError(
+                f"ERROR: the DDL ran on both sides, but YBA does not list {', '.join(missing)} yet; add the new tables with do-add-tables-to-dr."
+            )
+        result["addedTables"] = [
+            table_ids[relation]
+            for relation in relations["createdRelations"]
+            if table_ids[relation] not in replicated_tables
+        ]
+    if result["addedTables"] or stale:
+        result["removedTables"] = sorted(result["removedTables"] + stale)
+        result["taskStatuses"].append(
+            _set_tables(
+                customer_uuid,
+                dr_config,
+                [table_id for table_id in replicated_tables if table_id not in stale]
+                + result["addedTables"],
+                (
+                    "Add tables to xCluster DR"
+                    if result["addedTables"]
+                    else "Remove tables from xCluster DR"
+                ),
+            )
+        )
+    return result
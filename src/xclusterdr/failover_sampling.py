@@ -0,0 +1,182 @@
+import datetime
+import json
+import math
+import pytz
+import tabulate
+import time
+
+from core import http_client
+from core.internal_rest_apis import _prepare_xcluster_dr_safetime_request
+from includes.get_state_dir import get_state_dir
+from includes.structured_logging import get_logger
+
+logger = get_logger("failover")
+
+
+def get_failover_log_path():
+    return get_state_dir() / "failover_safetimes.jsonl"
+
+
+def get_sample_loss_ms(safetimes: list) -> float:
+    """
+    Returns the data loss of failing over at a sample of safetimes: the largest estimatedDataLossMs across its namespaces. A namespace without an estimate (missing or negative) makes the loss unknown (infinite).
+
+    :param safetimes: list<json<NamespaceSafetime>> - the safetimes of a DrConfigSafeTimeResp
+    :return: float - the estimated data loss in ms
+    """
+    losses = [entry.get("estimatedDataLossMs") for entry in safetimes]
+    if not losses or any(loss is None or loss < 0 for loss in losses):
+        return math.inf
+    return max(losses)
+
+
+def sample_failover_safetimes(
+    customer_uuid: str,
+    dr_config_uuid: str,
+    window_seconds: float,
+    interval_seconds: float,
+    max_loss_ms=None,
+) -> dict:
+    """
+    Samples the safetimes of a DR config every interval for up to the window, and picks the sample to fail over at: the first with an estimated data loss under max_loss_ms, otherwise the one with the lowest loss (the latest, on ties).
+
+    The request is built once and sent on the pooled session, whose connection to YBA is already open from looking up the DR config, so each sample costs one round trip. A failed sample is not retried (the next one is due soon); it is counted and skipped.
+
+    :param customer_uuid: str - the customer UUID
+    :param dr_config_uuid: str - the DR config UUID
+    :param window_seconds: float - the most seconds to sample for
+    :param interval_seconds: float - the seconds between the start of two samples
+    :param max_loss_ms: float - stop as soon as a sample's estimated loss is at or under this (optional)
+    :return: dict - the chosen sample, and counts of samples and errors
+    :raises RuntimeError: if no sample succeeded within the window
+    """
+    prepared_request = _prepare_xcluster_dr_safetime_request(
+        customer_uuid, dr_config_uuid
+    )
+
+    chosen = None
+    samples = 0
+    errors = []
+    under_bound = False
+    start_time = time.monotonic()
+    deadline = start_time + window_seconds
+
+    while True:
+        sent_at = time.monotonic()
+        try:
+            response = http_client.send(
+                prepared_request,
+                timeout=max(interval_seconds, deadline - sent_at),
+                retry=False,
+            )
+            safetimes = response.json()["safetimes"]
+        except (RuntimeError, ValueError, KeyError, TypeError) as e:
+            errors.append(f"{type(e).__name__}: {e}")
+        else:
+            samples += 1
+            sample = {
+                "sample": samples,
+                "elapsedSeconds": sent_at - start_time,
+                "sampledAt": datetime.datetime.now(pytz.UTC).isoformat(),
+                "lossMs": get_sample_loss_ms(safetimes),
+                "safetimes": safetimes,
+            }
+            if chosen is None or sample["lossMs"] <= chosen["lossMs"]:
+                chosen = sample
+            if max_loss_ms is not None and sample["lossMs"] <= max_loss_ms:
+                under_bound = True
+                break
+
+        next_sample_at = sent_at + interval_seconds
+        if next_sample_at >= deadline:
+            break
+        time.sleep(max(0.0, next_sample_at - time.monotonic()))
+
+    if chosen is None:
+        raise RuntimeError(
+            f"ERROR: no safetime sample of DR config {dr_config_uuid} succeeded in {window_seconds}s; last error: {errors[-1] if errors else 'none'}"
+        )
+
+    return {
+        "drConfigUuid": dr_config_uuid,
+        "chosen": chosen,
+        "samples": samples,
+        "errors": len(errors),
+        "underBound": under_bound,
+        "maxLossMs": max_loss_ms,
+        "elapsedSeconds": time.monotonic() - start_time,
+    }
+
+
+def log_failover_safetimes(sampling: dict):
+    """
+    Appends the result of sample_failover_safetimes to the failover log in the state directory, for the post-incident review.
+    """
+    chosen = sampling["chosen"]
+    entry = {
+        **sampling,
+        "chosen": {
+            **chosen,
+            "lossMs": None if math.isinf(chosen["lossMs"]) else chosen["lossMs"],
+        },
+        "loggedAt": datetime.datetime.now(pytz.UTC).isoformat(),
+    }
+    with open(get_failover_log_path(), "a") as file:
+        file.write(json.dumps(entry) + "\n")
+    logger.info(
+        "failover safetimes chosen",
+        extra={
+            "fields": {
+                "dr_config_uuid": sampling["drConfigUuid"],
+                "sample": chosen["sample"],
+                "samples": sampling["samples"],
+                "failed_samples": sampling["errors"],
+                "under_bound": sampling["underBound"],
+                "loss_ms": entry["chosen"]["lossMs"],
+                "latency_ms": sampling["elapsedSeconds"] * 1000,
+                "safetimes": {
+                    safetime["namespaceId"]: safetime["safetimeEpochUs"]
+                    for safetime in chosen["safetimes"]
+                },
+            }
+        },
+    )
+
+
+def format_failover_safetimes(sampling: dict) -> str:
+    """
+    Formats the result of sample_failover_safetimes: how the sample was chosen, and its safetimes by namespace.
+    """
+    chosen = sampling["chosen"]
+    if sampling["underBound"]:
+        reason = f"under the bound of {sampling['maxLossMs']} ms"
+    else:
+        reason = "lowest estimated loss in the window"
+    summary = (
+        f"Failing over at sample {chosen['sample']} of {sampling['samples']} "
+        f"(+{chosen['elapsedSeconds']:.3f}s, {reason}; {sampling['errors']} failed sample(s))"
+    )
+
+    table = tabulate.tabulate(
+        [
+            [
+                entry.get("namespaceName"),
+                entry["namespaceId"],
+                datetime.datetime.fromtimestamp(
+                    entry["safetimeEpochUs"] / 1000 / 1000, pytz.UTC
+                ),
+                entry.get("estimatedDataLossMs"),
+            ]
+            for entry in chosen["safetimes"]
+        ],
+        headers=(
+            "keyspace",
+            "namespace id",
+            "safetime (UTC)",
+            "est failover loss (ms)",
+        ),
+        tablefmt="rounded_grid",
+        floatfmt=".3f",
+        showindex=False,
+    )
+    return f"{summary}\n{table}"
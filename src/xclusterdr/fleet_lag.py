@@ -0,0 +1,354 @@
+import csv
+import heapq
+import json
+import os
+import random
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from core import http_client
+from core.internal_rest_apis import (
+    _list_all_universes,
+    _prepare_xcluster_dr_safetime_request,
+)
+from core.models import Universe
+from core.topology import refresh_topology
+from includes.structured_logging import get_logger
+from xclusterdr.apply_rate import ApplyRateEstimator, format_catch_up
+from xclusterdr.records import DrPair
+
+logger = get_logger("fleet_lag")
+
+# the fields of a pair's row, in the order of the table and the csv export
+FLEET_LAG_FIELDS = (
+    "source",
+    "target",
+    "drConfigUuid",
+    "lagging",
+    "maxLagMs",
+    "worstNamespace",
+    "maxSkewMs",
+    "estimatedDataLossMs",
+    "applyRate",
+    "catchUp",
+    "sampledAt",
+    "samples",
+    "errors",
+    "lastError",
+)
+
+
+def discover_dr_pairs(customer_uuid: str) -> list:
+    """
+    Finds every DR pair from one list of all universes: each DR config a universe is the source of, and the universe that is its target.
+
+    :param customer_uuid: str - the customer UUID
+    :return: list<DrPair> - every DR pair
+    """
+    universes_json = _list_all_universes(customer_uuid)
+    try:
+        refresh_topology(customer_uuid, universes_json)
+    except Exception:
+        # the index is only a shortcut for later commands
+        pass
+    universes = [Universe.from_json(universe) for universe in universes_json]
+    del universes_json
+
+    targets = {
+        dr_config_uuid: universe.name
+        for universe in universes
+        for dr_config_uuid in universe.dr_config_uuids_as_target
+    }
+    return [
+        DrPair(dr_config_uuid, universe.name, targets.get(dr_config_uuid))
+        for universe in universes
+        for dr_config_uuid in universe.dr_config_uuids_as_source
+    ]
+
+
+class FleetLagSampler:
+    """
+    Polls the safetimes of many DR pairs and keeps the latest lag of each.
+
+    Polls are scheduled earliest deadline first: each pair is due again an interval after its last poll (a shorter one while it lags), give or take some jitter so pairs do not fall into step. Every poll takes a token from a request budget; when the fleet needs more requests than the budget allows, every pair's deadline slips, the most overdue pair still going first, so none is starved. At most `concurrency` polls are in flight, and a pair is never polled twice at once.
+    """
+
+    def __init__(
+        self,
+        customer_uuid: str,
+        pairs: list,
+        interval=30.0,
+        lagging_interval=5.0,
+        max_lag_ms=30000,
+        concurrency=8,
+        request_budget=5.0,
+        jitter=0.1,
+        budget=None,
+    ):
+        """
+        :param customer_uuid: str - the customer UUID
+        :param pairs: list<DrPair> - the DR pairs, as returned by discover_dr_pairs
+        :param interval: float - the seconds between two polls of a pair; default 30
+        :param lagging_interval: float - the seconds between two polls of a lagging pair; default 5
+        :param max_lag_ms: float - the safetime lag above which a pair is lagging; default 30000
+        :param concurrency: int - the most polls in flight; default 8
+        :param request_budget: float - the most requests per second to YBA; default 5
+        :param jitter: float - the fraction by which each interval is randomly lengthened or shortened; default 0.1
+        :param budget: http_client.TokenBucket - a budget shared with other requests, instead of one of request_budget (optional)
+        """
+        self.customer_uuid = customer_uuid
+        self.interval = interval
+        self.lagging_interval = lagging_interval
+        self.max_lag_ms = max_lag_ms
+        self.concurrency = max(1, concurrency)
+        self.request_budget = request_budget
+        self.jitter = jitter
+        self.estimator = ApplyRateEstimator()
+        self.requests = 0
+
+        self._pairs = {pair.dr_config_uuid: pair for pair in pairs}
+        self._rows = {
+            pair.dr_config_uuid: {
+                **{field: None for field in FLEET_LAG_FIELDS},
+                "source": pair.source,
+                "target": pair.target,
+                "drConfigUuid": pair.dr_config_uuid,
+                "samples": 0,
+                "errors": 0,
+            }
+            for pair in pairs
+        }
+        self._requests = {}
+        # (deadline, sequence, DR config UUID); the sequence keeps ties in order
+        self._queue = []
+        self._sequence = 0
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._slots = threading.BoundedSemaphore(self.concurrency)
+        self._budget = budget or http_client.TokenBucket(request_budget, 1)
+        self._random = random.Random()
+
+        now = time.monotonic()
+        for dr_config_uuid in self._pairs:
+            self._schedule(dr_config_uuid, now)
+
+    def _schedule(self, dr_config_uuid: str, deadline: float):
+        # with self._condition held, or before the sampler runs
+        self._sequence += 1
+        heapq.heappush(self._queue, (deadline, self._sequence, dr_config_uuid))
+
+    def _next_interval(self, row: dict) -> float:
+        interval = self.lagging_interval if row["lagging"] else self.interval
+        return interval * self._random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _next_due(self, once: bool, end_time: float, stop_event: threading.Event):
+        # waits for the earliest deadline; None when the run is over
+        with self._condition:
+            while not stop_event.is_set():
+                now = time.monotonic()
+                if once and not self._queue and not self._in_flight:
+                    return None
+                if not once and now >= end_time:
+                    return None
+                if self._queue and self._queue[0][0] <= now:
+                    self._in_flight += 1
+                    return heapq.heappop(self._queue)[2]
+                timeout = self._queue[0][0] - now if self._queue else 1.0
+                if not once:
+                    timeout = min(timeout, end_time - now)
+                # woken when a poll finishes; the cap notices stop_event
+                self._condition.wait(min(timeout, 1.0))
+            return None
+
+    def _poll(self, dr_config_uuid: str, once: bool):
+        try:
+            self._poll_pair(dr_config_uuid, once)
+        finally:
+            self._slots.release()
+
+    def _poll_pair(self, dr_config_uuid: str, once: bool):
+        row = dict(self._rows[dr_config_uuid])
+        sent_at = time.monotonic()
+        try:
+            prepared_request = self._requests.get(dr_config_uuid)
+            if prepared_request is None:
+                prepared_request = _prepare_xcluster_dr_safetime_request(
+                    self.customer_uuid, dr_config_uuid
+                )
+                self._requests[dr_config_uuid] = prepared_request
+            # not retried: a retry would spend the budget twice, and the pair is due again soon
+            safetimes = http_client.send(prepared_request, retry=False).json()[
+                "safetimes"
+            ]
+            row.update(self._summarize(dr_config_uuid, safetimes))
+            row["samples"] += 1
+            row["lastError"] = None
+        except Exception as e:
+            row["errors"] += 1
+            row["lastError"] = f"{type(e).__name__}: {e}"
+        row["sampledAt"] = datetime.now(timezone.utc).isoformat()
+
+        logger.info(
+            "fleet lag",
+            extra={
+                "fields": {
+                    "dr_config_uuid": dr_config_uuid,
+                    "lag_ms": row["maxLagMs"],
+                    "lagging": row["lagging"],
+                    "error": row["lastError"],
+                    "latency_ms": (time.monotonic() - sent_at) * 1000,
+                }
+            },
+        )
+
+        with self._condition:
+            self._rows[dr_config_uuid] = row
+            self._in_flight -= 1
+            if not once:
+                self._schedule(
+                    dr_config_uuid, time.monotonic() + self._next_interval(row)
+                )
+            self._condition.notify()
+
+    def _summarize(self, dr_config_uuid: str, safetimes: list) -> dict:
+        estimates = self.estimator.update_safetimes(dr_config_uuid, safetimes)
+        if not safetimes:
+            return {"maxLagMs": None, "lagging": False}
+        worst = max(safetimes, key=lambda entry: entry["safetimeLagUs"])
+        worst_estimate = estimates[worst["namespaceId"]]
+        losses = [
+            entry.get("estimatedDataLossMs")
+            for entry in safetimes
+            if entry.get("estimatedDataLossMs") is not None
+        ]
+        max_lag_ms = worst["safetimeLagUs"] / 1000
+        return {
+            "maxLagMs": max_lag_ms,
+            "worstNamespace": worst.get("namespaceName", worst["namespaceId"]),
+            "maxSkewMs": max(entry.get("safetimeSkewUs", 0) for entry in safetimes)
+            / 1000,
+            "estimatedDataLossMs": max(losses) if losses else None,
+            "applyRate": worst_estimate.rate,
+            "catchUp": format_catch_up(worst_estimate),
+            "lagging": max_lag_ms > self.max_lag_ms,
+        }
+
+    def run(self, duration_seconds=0.0, stop_event=None):
+        """
+        Polls the pairs until the duration is over (or stop_event is set).
+
+        :param duration_seconds: float - the seconds to run; 0 polls each pair once; default 0
+        :param stop_event: threading.Event - ends the run early when set (optional)
+        """
+        once = duration_seconds <= 0
+        end_time = time.monotonic() + duration_seconds
+        stop_event = stop_event or threading.Event()
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            while True:
+                dr_config_uuid = self._next_due(once, end_time, stop_event)
+                if dr_config_uuid is None:
+                    break
+                # a free worker first, so the token is spent when the request is sent
+                self._slots.acquire()
+                self._budget.acquire()
+                self.requests += 1
+                pool.submit(self._poll, dr_config_uuid, once)
+
+    def snapshot(self) -> list:
+        """
+        :return: list<dict> - a copy of the latest row of each pair, lagging pairs first, then by lag
+        """
+        with self._condition:
+            rows = [dict(row) for row in self._rows.values()]
+        return sorted(
+            rows,
+            key=lambda row: (
+                not row["lagging"],
+                -(row["maxLagMs"] or 0),
+                row["source"] or "",
+            ),
+        )
+
+
+def sample_fleet_lag(
+    customer_uuid: str,
+    duration_seconds=0.0,
+    interval=30.0,
+    lagging_interval=5.0,
+    max_lag_ms=30000,
+    concurrency=8,
+    request_budget=5.0,
+    export_file=None,
+    export_every=5.0,
+) -> dict:
+    """
+    Samples the lag of every DR pair of the YBA instance, and optionally keeps an export file fresh while it runs.
+
+    :param customer_uuid: str - the customer UUID
+    :param duration_seconds: float - the seconds to run; 0 polls each pair once; default 0
+    :param export_file: str - a .json or .csv file rewritten every export_every seconds and at the end (optional)
+    :param export_every: float - the seconds between two rewrites of the export file; default 5
+    :return: dict - the rows, and how many requests were sent in how long
+    """
+    start_time = time.monotonic()
+    sampler = FleetLagSampler(
+        customer_uuid,
+        discover_dr_pairs(customer_uuid),
+        interval,
+        lagging_interval,
+        max_lag_ms,
+        concurrency,
+        request_budget,
+    )
+
+    stop_event = threading.Event()
+    runner = threading.Thread(
+        target=sampler.run, args=(duration_seconds, stop_event), daemon=True
+    )
+    runner.start()
+    try:
+        while runner.is_alive():
+            runner.join(export_every)
+            if export_file and runner.is_alive():
+                export_fleet_lag(sampler.snapshot(), export_file)
+    finally:
+        stop_event.set()
+        runner.join()
+
+    rows = sampler.snapshot()
+    if export_file:
+        export_fleet_lag(rows, export_file)
+    return {
+        "time": datetime.now(timezone.utc).isoformat(),
+        "elapsedSeconds": round(time.monotonic() - start_time, 3),
+        "requests": sampler.requests,
+        "requestBudget": request_budget,
+        "pairs": rows,
+    }
+
+
+def export_fleet_lag(rows: list, export_file: str):
+    """
+    Writes the rows of a fleet sample as json or csv (by the file's extension). The file is replaced in one step, so a reader never sees half of it.
+    """
+    temporary_file = f"{export_file}.tmp"
+    with open(temporary_file, "w", newline="") as file:
+        if export_file.endswith(".csv"):
+            writer = csv.DictWriter(file, fieldnames=FLEET_LAG_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+        else:
+            file.write(json.dumps(rows, indent=4))
+    os.replace(temporary_file, export_file)
+
+
+def get_fleet_lag_status(row: dict) -> str:
+    if row["lagging"]:
+        return "LAGGING"
+    if row["lastError"]:
+        return "ERROR"
+    return "OK" if row["samples"] else ""
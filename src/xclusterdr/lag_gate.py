@@ -0,0 +1,149 @@
+import time
+
+from core.internal_rest_apis import _get_xcluster_dr_safetime
+from includes.structured_logging import get_logger, get_progress_logger
+from xclusterdr.apply_rate import ApplyRateEstimator
+
+logger = get_logger("lag_gate")
+progress = get_progress_logger("lag_gate")
+
+# readings of the apply rate needed before trusting it to give up early
+MIN_RATE_SAMPLES = 3
+
+
+def get_worst_lag(safetimes: list) -> tuple:
+    """
+    Returns the namespace with the highest safetime lag.
+
+    :param safetimes: list<json<NamespaceSafetime>> - the safetimes of a DrConfigSafeTimeResp
+    :return: tuple<str, float> - the namespace name and its lag in ms (None, 0.0 when there are no namespaces)
+    """
+    worst_name, worst_lag_ms = None, 0.0
+    for entry in safetimes:
+        lag_ms = entry["safetimeLagUs"] / 1000
+        if worst_name is None or lag_ms > worst_lag_ms:
+            worst_name = entry.get("namespaceName", entry.get("namespaceId"))
+            worst_lag_ms = lag_ms
+    return worst_name, worst_lag_ms
+
+
+def get_catch_up_seconds(estimates, max_lag_ms: float):
+    """
+    Projects how long until every namespace is under the lag threshold, at their smoothed apply rates.
+
+    :param estimates: iterable<ApplyRate> - the estimate of each namespace
+    :param max_lag_ms: float - the lag threshold
+    :return: float - seconds, or None if a namespace over the threshold is not catching up (or has no rate yet)
+    """
+    seconds = 0.0
+    for estimate in estimates:
+        namespace_seconds = estimate.get_catch_up_seconds(max_lag_ms)
+        if namespace_seconds is None:
+            return None
+        seconds = max(seconds, namespace_seconds)
+    return seconds
+
+
+def get_next_poll_interval(
+    catch_up_seconds,
+    previous_interval: float,
+    min_interval: float,
+    max_interval: float,
+) -> float:
+    """
+    Chooses how long to wait before reading the lag again. While the lag is draining, the next read is planned for about half the time it should take to fall under the threshold at the smoothed apply rate. While it is not draining, the interval doubles.
+
+    :param catch_up_seconds: float - the projected seconds until the lag is under the threshold, or None
+    :return: float - seconds until the next read, between min_interval and max_interval
+    """
+    if catch_up_seconds is not None:
+        interval = catch_up_seconds / 2
+    else:
+        interval = previous_interval * 2
+    return min(max_interval, max(min_interval, interval))
+
+
+def wait_for_lag_under(
+    customer_uuid: str,
+    dr_config_uuid: str,
+    max_lag_ms: float,
+    timeout_seconds: float,
+    min_interval=0.25,
+    max_interval=5.0,
+    half_life_seconds=10.0,
+) -> dict:
+    """
+    Waits until the safetime lag of every namespace of a DR config is under a threshold, polling the safetimes more often as the lag gets close to it.
+
+    The apply rate of each namespace is smoothed across the reads (see xclusterdr.apply_rate) to project when the lag will be under the threshold. Once the rates are settled, the wait ends early if that is later than the timeout.
+
+    :param customer_uuid: str - the customer UUID
+    :param dr_config_uuid: str - the DR config UUID
+    :param max_lag_ms: float - the lag every namespace must be under
+    :param timeout_seconds: float - the most seconds to wait
+    :param min_interval: float - the shortest wait between reads; default 0.25
+    :param max_interval: float - the longest wait between reads; default 5
+    :param half_life_seconds: float - the half-life of the smoothing of the apply rates; default 10
+    :return: dict - the last safetimes read, the worst lag and the number of reads
+    :raises RuntimeError: if the lag is not under the threshold within the timeout, or is not projected to be
+    """
+    start_time = time.monotonic()
+    deadline = start_time + timeout_seconds
+    interval = min_interval
+    estimator = ApplyRateEstimator(half_life_seconds)
+    reads = 0
+
+    while True:
+        safetimes = _get_xcluster_dr_safetime(customer_uuid, dr_config_uuid)[
+            "safetimes"
+        ]
+        reads += 1
+        worst_name, worst_lag_ms = get_worst_lag(safetimes)
+        estimates = estimator.update_safetimes(dr_config_uuid, safetimes).values()
+        catch_up_seconds = get_catch_up_seconds(estimates, max_lag_ms)
+        logger.info(
+            "replication lag",
+            extra={
+                "fields": {
+                    "dr_config_uuid": dr_config_uuid,
+                    "namespace": worst_name,
+                    "lag_ms": worst_lag_ms,
+                    "max_lag_ms": max_lag_ms,
+                    "catch_up_seconds": catch_up_seconds,
+                }
+            },
+        )
+        if worst_lag_ms < max_lag_ms:
+            return {
+                "safetimes": safetimes,
+                "worstNamespace": worst_name,
+                "worstLagMs": worst_lag_ms,
+                "reads": reads,
+                "waitedSeconds": time.monotonic() - start_time,
+            }
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RuntimeError(
+                f"ERROR: the replication lag did not fall under {max_lag_ms} ms within {timeout_seconds}s; the highest is {worst_lag_ms:.1f} ms on '{worst_name}'"
+            )
+        settled = all(estimate.samples >= MIN_RATE_SAMPLES for estimate in estimates)
+        if catch_up_seconds is not None and settled and catch_up_seconds > remaining:
+            raise RuntimeError(
+                f"ERROR: the replication lag is not projected to fall under {max_lag_ms} ms within {timeout_seconds}s; the highest is {worst_lag_ms:.1f} ms on '{worst_name}', about {catch_up_seconds:.1f}s from the threshold at the current apply rate"
+            )
+
+        if catch_up_seconds is not None:
+            projection = f"about {catch_up_seconds:.1f}s to go"
+        elif any(estimate.rate is None for estimate in estimates):
+            projection = "measuring the apply rate"
+        else:
+            projection = "not catching up"
+        progress.info(
+            f"Waiting for the replication lag to fall under {max_lag_ms} ms: {worst_lag_ms:.1f} ms on '{worst_name}' ({projection})..."
+        )
+        interval = get_next_poll_interval(
+            catch_up_seconds, interval, min_interval, max_interval
+        )
+        # the last read is at the deadline
+        time.sleep(min(interval, remaining))
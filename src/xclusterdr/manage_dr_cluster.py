@@ -1,4 +1,8 @@
+import json
 import tabulate
+import time
+
+from concurrent.futures import ThreadPoolExecutor
 
 from core.internal_rest_apis import (
     _get_all_ysql_tables_list,
@@ -7,6 +11,7 @@ from core.internal_rest_apis import (
     _get_xcluster_dr_configs,
     _get_universe_by_uuid,
     _create_dr_config,
+    _create_dr_config_form_data,
     _delete_xcluster_dr_config,
     _set_tables_in_dr_config,
     _pause_xcluster_config,
@@ -18,140 +23,272 @@ from core.internal_rest_apis import (
     _get_backup_UUID_by_name,
 )
 from core.get_universe_info import get_universe_uuid_by_name
-from core.manage_tasks import wait_for_task
+from core.journal import run_journaled_task
+from core.models import parse_tables
+from core.topology import (
+    invalidate_topology,
+    lookup_dr_roles,
+    lookup_universe_name,
+)
+from includes.structured_logging import get_logger, get_progress_logger
 from xclusterdr.common import get_source_xcluster_dr_config
+from xclusterdr.failover_sampling import (
+    format_failover_safetimes,
+    log_failover_safetimes,
+    sample_failover_safetimes,
+)
+from xclusterdr.lag_gate import wait_for_lag_under
+from xclusterdr.records import DrTableRow
+
+logger = get_logger("dr")
+progress = get_progress_logger("dr")
 
 
 def get_xcluster_tables(customer_uuid: str, source_universe_name: str) -> list:
     """
-    For a given universe name, returns a list of database tables included or not included in the current xcluster dr config. An indicator shows the tables that can be added to the configuration. Ideally, the tables added should have sizeBytes = 0 or it will trigger a full backup/restore of the existing database (this will slow the process down).
+    For a given universe name, returns the database tables included or not included in the current xcluster dr config. The tables not included can be added to the configuration. Ideally, the tables added should have sizeBytes = 0 or it will trigger a full backup/restore of the existing database (this will slow the process down).
 
     :param customer_uuid: str - the customer uuid.
     :param universe_name: str - the name of the universe.
-    :return: list<str> - a list of database table ids not already included in the current xCluster DR config.
+    :return: list<DrTableRow> - the tables (not indexes) of the universe by keyspace and name, and whether each is in the current xCluster DR config.
     """
     universe_uuid = get_universe_uuid_by_name(customer_uuid, source_universe_name)
 
     all_tables_list = sorted(
-        _get_all_ysql_tables_list(customer_uuid, universe_uuid),
-        key=lambda t: (t["keySpace"], t["tableName"]),
-    )
-
-    xcluster_dr_existing_tables_id = get_source_xcluster_dr_config(
-        customer_uuid, source_universe_name, "tables"
-    )
-
-    formatted_tables_list = []
-    for table in all_tables_list:
-        if not table["isIndexTable"]:
-            replicated = (
-                "Yes" if table["tableID"] in xcluster_dr_existing_tables_id else ""
-            )
-            new_row = [
-                replicated,
-                table["pgSchemaName"],
-                table["keySpace"],
-                table["tableName"],
-                table["sizeBytes"],
-                table["tableID"],
-            ]
-            formatted_tables_list.append(new_row)
-
-    print(
-        "You can use the do-add-tables-to-dr command to add these to the xCluster DR configuration by table id."
-    )
-
-    print(
-        "NOTE 1: Be sure that the table definition exists on the source and target, and that the table is empty."
+        parse_tables(_get_all_ysql_tables_list(customer_uuid, universe_uuid)),
+        key=lambda t: (t.keyspace, t.name),
     )
 
-    print(
-        "NOTE 2: When adding tables, all new tables within a keyspace must be added at once."
+    xcluster_dr_existing_tables_id = set(
+        get_source_xcluster_dr_config(customer_uuid, source_universe_name, "tables")
     )
 
-    return tabulate.tabulate(
-        formatted_tables_list,
-        headers=("replicated?", "schema", "keyspace", "table", "size (bytes)", "id"),
-        tablefmt="rounded_grid",
-        floatfmt=".0f",
-        showindex=False,
-    )
+    return [
+        DrTableRow(table, table.table_id in xcluster_dr_existing_tables_id)
+        for table in all_tables_list
+        if not table.is_index
+    ]
 
 
-def create_xcluster_dr(
+def check_xcluster_dr_create(
     customer_uuid: str,
     source_universe_name: str,
     target_universe_name: str,
     db_names: list,
     backup_location: str,
-):
+    include_table_sizes=False,
+) -> dict:
+    """
+    Runs the pre-flight checks for creating an xCluster DR configuration: the storage config, both universes and the databases.
 
-    # verify the storage location
+    The checks are independent reads, so they run concurrently, and every problem found is reported at once.
 
-    storage_configs = _get_backup_UUID_by_name(customer_uuid, backup_location)
-    if len(storage_configs) < 1:
-        raise RuntimeError(
-            f"ERROR: The backup location '{backup_location}' was not found"
+    :param customer_uuid: str - the customer uuid
+    :param source_universe_name: str - the name of the source universe
+    :param target_universe_name: str - the name of the target universe
+    :param db_names: list<str> - the names of the databases to replicate (or a comma-separated string)
+    :param backup_location: str - the name of the storage config used to bootstrap the target
+    :param include_table_sizes: bool - also fetch the tables of the databases (for the bootstrap estimate); default False
+    :return: dict - the UUIDs needed to create the DR config, and the tables if requested
+    :raises RuntimeError: if any of the checks fail
+    """
+    if isinstance(db_names, str):
+        db_names = [name.strip() for name in db_names.split(",") if name.strip()]
+
+    problems = []
+
+    def result_of(future, check_name):
+        try:
+            return future.result()
+        except Exception as e:
+            problems.append(f"{check_name} could not be checked: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=5) as pool:
+        storage_future = pool.submit(
+            _get_backup_UUID_by_name, customer_uuid, backup_location
+        )
+        source_future = pool.submit(
+            _get_universe_by_name, customer_uuid, source_universe_name
+        )
+        target_future = pool.submit(
+            _get_universe_by_name, customer_uuid, target_universe_name
         )
 
-    else:
-        storage_config_uuid = storage_configs[0]["configUUID"]
+        # the databases and table sizes need the source universe uuid,
+        # so they start as soon as the source universe is known
+        source_universe_details = next(
+            iter(result_of(source_future, "the source universe") or []), None
+        )
+        dbs_future = tables_future = None
+        if source_universe_details is not None:
+            dbs_future = pool.submit(
+                _get_database_namespaces,
+                customer_uuid,
+                source_universe_details["universeUUID"],
+            )
+            if include_table_sizes:
+                tables_future = pool.submit(
+                    lambda universe_uuid: parse_tables(
+                        _get_all_ysql_tables_list(
+                            customer_uuid, universe_uuid, dbs_include_list=db_names
+                        )
+                    ),
+                    source_universe_details["universeUUID"],
+                )
+
+        storage_configs = result_of(storage_future, "the backup location")
+        target_universe_details = next(
+            iter(result_of(target_future, "the target universe") or []), None
+        )
+        dbs_list = result_of(dbs_future, "the databases") if dbs_future else None
+        tables_list = (
+            result_of(tables_future, "the table sizes") if tables_future else None
+        )
+
+    # verify the storage location
+
+    if storage_configs is not None and len(storage_configs) < 1:
+        problems.append(f"the backup location '{backup_location}' was not found")
 
     # verify the source universe
 
-    get_source_universe_response = _get_universe_by_name(
-        customer_uuid, source_universe_name
-    )
-    source_universe_details = next(iter(get_source_universe_response), None)
     if source_universe_details is None:
-        raise RuntimeError(
-            f"ERROR: the universe '{source_universe_name}' was not found"
+        problems.append(f"the universe '{source_universe_name}' was not found")
+    else:
+        dr_config_source_uuid = next(
+            iter(source_universe_details["drConfigUuidsAsSource"]), None
         )
+        if dr_config_source_uuid is not None:
+            problems.append(
+                f"the source universe '{source_universe_name}' already has a disaster-recovery config:"
+                f" {dr_config_source_uuid}"
+            )
 
-    source_universe_uuid = source_universe_details["universeUUID"]
+    # verify the target universe
 
-    dr_config_source_uuid = next(
-        iter(source_universe_details["drConfigUuidsAsSource"]), None
-    )
-    # see note below about prechecks in dry run
-    if dr_config_source_uuid is not None:
-        # dr_config = get_dr_configs(session_uuid, dr_config_source_uuid)
-        raise RuntimeError(
-            f"WARN: the source universe '{source_universe_name}' already has a disaster-recovery config:"
-            f" {dr_config_source_uuid},"
+    if target_universe_details is None:
+        problems.append(f"the target universe '{target_universe_name}' was not found")
+    elif target_universe_details["drConfigUuidsAsTarget"]:
+        problems.append(
+            f"the target universe '{target_universe_name}' is already the target of a disaster-recovery config:"
+            f" {target_universe_details['drConfigUuidsAsTarget'][0]}"
         )
 
-    # verify the target universe
+    if source_universe_name == target_universe_name:
+        problems.append("the source and target universes must be different")
 
-    target_universe_response = _get_universe_by_name(
-        customer_uuid, target_universe_name
-    )
-    target_universe_details = next(iter(target_universe_response), None)
+    # verify the list of databases
 
-    if target_universe_details is None:
+    if not db_names:
+        problems.append("no databases were given to replicate")
+    elif dbs_list is not None:
+        found_db_names = {d["name"] for d in dbs_list}
+        missing_db_names = [name for name in db_names if name not in found_db_names]
+        if missing_db_names:
+            problems.append(
+                f"the database(s) {', '.join(missing_db_names)} were not found on '{source_universe_name}'"
+            )
+
+    if problems:
         raise RuntimeError(
-            f"ERROR: the target universe '{target_universe_name}' was not found"
+            "ERROR: the xCluster DR config cannot be created:\n - "
+            + "\n - ".join(problems)
         )
 
-    target_universe_uuid = target_universe_details["universeUUID"]
+    return {
+        "storage_config_uuid": storage_configs[0]["configUUID"],
+        "source_universe_uuid": source_universe_details["universeUUID"],
+        "target_universe_uuid": target_universe_details["universeUUID"],
+        "db_names": db_names,
+        "dbs_list_uuids": [
+            d["namespaceUUID"] for d in dbs_list if d["name"] in db_names
+        ],
+        "tables_list": tables_list,
+    }
 
-    # verify the list of databases
 
-    dbs_list = _get_database_namespaces(customer_uuid, source_universe_uuid)
-    dbs_list_uuids = [d["namespaceUUID"] for d in dbs_list if d["name"] in db_names]
+def create_xcluster_dr(
+    customer_uuid: str,
+    source_universe_name: str,
+    target_universe_name: str,
+    db_names: list,
+    backup_location: str,
+    dry_run=False,
+):
+    """
+    Creates an xCluster DR configuration after running the pre-flight checks (see check_xcluster_dr_create).
+
+    The create task is journaled; if an earlier run for the same source universe was interrupted while its task was still running, this reattaches to that task instead of creating the config again.
+
+    :param customer_uuid: str - the customer uuid
+    :param source_universe_name: str - the name of the source universe
+    :param target_universe_name: str - the name of the target universe
+    :param db_names: list<str> - the names of the databases to replicate (or a comma-separated string)
+    :param backup_location: str - the name of the storage config used to bootstrap the target
+    :param dry_run: bool - only print the request that would be sent and the estimated bootstrap size; default False
+    :return: str - the DR config uuid (or the request body in a dry run)
+    :raises RuntimeError: if any of the pre-flight checks fail
+    """
+    if dry_run:
+        checked = check_xcluster_dr_create(
+            customer_uuid,
+            source_universe_name,
+            target_universe_name,
+            db_names,
+            backup_location,
+            include_table_sizes=True,
+        )
+        form_data = _create_dr_config_form_data(
+            checked["storage_config_uuid"],
+            checked["source_universe_uuid"],
+            checked["target_universe_uuid"],
+            checked["dbs_list_uuids"],
+        )
+        print("DRY RUN: the following request would be sent to create the DR config:")
+        print(json.dumps(form_data, indent=4))
+
+        bootstrap_bytes = {name: 0 for name in checked["db_names"]}
+        for table in checked["tables_list"] or []:
+            bootstrap_bytes[table.keyspace] += table.size_bytes
+        print(
+            tabulate.tabulate(
+                [[name, size] for name, size in bootstrap_bytes.items()]
+                + [["total", sum(bootstrap_bytes.values())]],
+                headers=("database", "estimated bootstrap (bytes)"),
+                tablefmt="rounded_grid",
+                floatfmt=".0f",
+                showindex=False,
+            )
+        )
+        return form_data
+
+    # call the api request (the checks only run if there's no task to reattach to)
 
-    # call the api request
+    def submit():
+        checked = check_xcluster_dr_create(
+            customer_uuid,
+            source_universe_name,
+            target_universe_name,
+            db_names,
+            backup_location,
+        )
+        return _create_dr_config(
+            customer_uuid,
+            checked["storage_config_uuid"],
+            checked["source_universe_uuid"],
+            checked["target_universe_uuid"],
+            checked["dbs_list_uuids"],
+        )
 
-    create_dr_response = _create_dr_config(
+    create_dr_response, _ = run_journaled_task(
         customer_uuid,
-        storage_config_uuid,
-        source_universe_uuid,
-        target_universe_uuid,
-        dbs_list_uuids,
+        "setup-dr",
+        source_universe_name,
+        submit,
+        "Create xCluster DR",
     )
 
-    wait_for_task(customer_uuid, create_dr_response, "Create xCluster DR")
-
     dr_config_uuid = create_dr_response["resourceUUID"]
     print(f"SUCCESS: created disaster-recovery config {dr_config_uuid}")
     return dr_config_uuid
@@ -178,8 +315,14 @@ def delete_xcluster_dr(customer_uuid, source_universe_name) -> str:
             f"ERROR: the universe '{source_universe_name}' is not the source in a disaster-recovery config"
         )
 
-    response = _delete_xcluster_dr_config(customer_uuid, dr_config_source_uuid)
-    dr_config_uuid = wait_for_task(customer_uuid, response, "Delete xCluster DR")
+    response, dr_config_uuid = run_journaled_task(
+        customer_uuid,
+        "remove-dr",
+        dr_config_source_uuid,
+        lambda: _delete_xcluster_dr_config(customer_uuid, dr_config_source_uuid),
+        "Delete xCluster DR",
+        dr_config_source_uuid,
+    )
     print(f"SUCCESS: deleted disaster-recovery config '{response['resourceUUID']}'.")
     return dr_config_uuid
 
@@ -199,7 +342,7 @@ def add_tables_to_xcluster_dr(
     :raises RuntimeError: if no tables could be found to add to the xCluster DR config
     """
     xcluster_dr_config = get_source_xcluster_dr_config(
-        customer_uuid, source_universe_name, "all"
+        customer_uuid, source_universe_name, "all", live=True
     )
     xcluster_dr_uuid = xcluster_dr_config["uuid"]
     storage_config_uuid = xcluster_dr_config["bootstrapParams"]["backupRequestParams"][
@@ -208,87 +351,186 @@ def add_tables_to_xcluster_dr(
 
     merged_dr_tables_list = xcluster_dr_config["tables"] + add_table_ids
 
-    resp = _set_tables_in_dr_config(
-        customer_uuid, xcluster_dr_uuid, storage_config_uuid, merged_dr_tables_list
+    _, task_status = run_journaled_task(
+        customer_uuid,
+        "set-tables",
+        xcluster_dr_uuid,
+        lambda: _set_tables_in_dr_config(
+            customer_uuid, xcluster_dr_uuid, storage_config_uuid, merged_dr_tables_list
+        ),
+        "Add tables to xCluster DR",
+        xcluster_dr_uuid,
     )
-    return wait_for_task(customer_uuid, resp, "Add tables to xCluster DR")
+    return task_status
 
 
-def pause_xcluster(customer_uuid, xcluster_source_name):
+def pause_xcluster(customer_uuid, xcluster_source_name) -> bool:
     dr_config = get_source_xcluster_dr_config(
-        customer_uuid, xcluster_source_name, "all"
+        customer_uuid, xcluster_source_name, "all", live=True
+    )
+    run_journaled_task(
+        customer_uuid,
+        "pause-xcluster",
+        dr_config["xclusterConfigUuid"],
+        lambda: _pause_xcluster_config(customer_uuid, dr_config["xclusterConfigUuid"]),
+        "Pause XCluster",
+        dr_config["uuid"],
+    )
+    return get_source_xcluster_dr_config(
+        customer_uuid, xcluster_source_name, "paused", live=True
     )
-    resp = _pause_xcluster_config(customer_uuid, dr_config["xclusterConfigUuid"])
-    wait_for_task(customer_uuid, resp, "Pause XCluster")
-    print("Replication is paused? ")
-    print(get_source_xcluster_dr_config(customer_uuid, xcluster_source_name, "paused"))
 
 
-def resume_xcluster(customer_uuid, xcluster_source_name):
+def resume_xcluster(customer_uuid, xcluster_source_name) -> bool:
     dr_config = get_source_xcluster_dr_config(
-        customer_uuid, xcluster_source_name, "all"
+        customer_uuid, xcluster_source_name, "all", live=True
+    )
+    run_journaled_task(
+        customer_uuid,
+        "resume-xcluster",
+        dr_config["xclusterConfigUuid"],
+        lambda: _resume_xcluster_config(customer_uuid, dr_config["xclusterConfigUuid"]),
+        "Resume XCluster",
+        dr_config["uuid"],
+    )
+    return get_source_xcluster_dr_config(
+        customer_uuid, xcluster_source_name, "paused", live=True
     )
-    resp = _resume_xcluster_config(customer_uuid, dr_config["xclusterConfigUuid"])
-    wait_for_task(customer_uuid, resp, "Resume XCluster")
-    print("Replication is paused? ")
-    print(get_source_xcluster_dr_config(customer_uuid, xcluster_source_name, "paused"))
 
 
 def perform_xcluster_dr_switchover(
     customer_uuid: str,
     source_universe_name: str,
+    max_lag_ms=None,
+    timeout_seconds=300.0,
 ) -> str:
     """
     Performs an xCluster DR switchover (a planned switchover).  This effectively changes the direction of the xCluster replication with zero RPO.
 
+    Writes are unavailable from when the switchover is submitted until its task finishes, and the task cannot finish before the replica has caught up. With max_lag_ms, the switchover is only submitted once the safetime lag of every namespace is under it, so the window is short. The length of the window is reported.
+
     :param customer_uuid: str - the customer uuid
     :param source_universe_name: str - the name of the source universe
+    :param max_lag_ms: float - the lag every namespace must be under before submitting (optional; default is to submit right away)
+    :param timeout_seconds: float - the most seconds to wait for the lag; default 300
     :return: resource_uuid: str - the uuid of the resource being removed
     """
     dr_config = get_source_xcluster_dr_config(
-        customer_uuid, source_universe_name, "all"
+        customer_uuid, source_universe_name, "all", live=True
     )
     dr_config_uuid = dr_config["uuid"]
     primary_universe_uuid = dr_config["primaryUniverseUuid"]
     dr_replica_universe_uuid = dr_config["drReplicaUniverseUuid"]
 
-    resp = _switchover_xcluster_dr(
-        customer_uuid, dr_config_uuid, primary_universe_uuid, dr_replica_universe_uuid
+    submitted_at = []
+
+    def submit():
+        if max_lag_ms is not None:
+            lag = wait_for_lag_under(
+                customer_uuid, dr_config_uuid, max_lag_ms, timeout_seconds
+            )
+            progress.info(
+                f"The replication lag is under {max_lag_ms} ms ({lag['worstLagMs']:.1f} ms on '{lag['worstNamespace']}' after {lag['waitedSeconds']:.1f}s); submitting the switchover"
+            )
+        submitted_at.append(time.monotonic())
+        return _switchover_xcluster_dr(
+            customer_uuid,
+            dr_config_uuid,
+            primary_universe_uuid,
+            dr_replica_universe_uuid,
+        )
+
+    _, task_status = run_journaled_task(
+        customer_uuid,
+        "switchover",
+        dr_config_uuid,
+        submit,
+        "Switchover XCluster DR",
+        dr_config_uuid,
     )
-    return wait_for_task(customer_uuid, resp, "Switchover XCluster DR")
+    if submitted_at:
+        unavailable_seconds = time.monotonic() - submitted_at[0]
+        logger.info(
+            "switchover write-unavailable window",
+            extra={
+                "fields": {
+                    "dr_config_uuid": dr_config_uuid,
+                    "latency_ms": unavailable_seconds * 1000,
+                }
+            },
+        )
+        progress.info(
+            f"Writes were unavailable for about {unavailable_seconds:.1f}s (from submitting the switchover until its task finished)"
+        )
+    return task_status
 
 
-def perform_xcluster_dr_failover(customer_uuid: str, source_universe_name: str) -> str:
+def perform_xcluster_dr_failover(
+    customer_uuid: str,
+    source_universe_name: str,
+    sample_window=0.0,
+    sample_interval=0.2,
+    max_loss_ms=None,
+) -> str:
     """
     Performs an xCluster DR failover (unplanned emergency). This promotes the DR replica to be the Primary. This operation has a small, but non-zero RPO.
 
+    By default the failover uses the safetimes read just before submitting it. With a sample window, the safetimes are sampled for up to that long and the failover uses the sample with the lowest estimated data loss, or the first under max_loss_ms. The chosen safetimes are printed and logged to the state directory.
+
     :param customer_uuid: str - the customer uuid
     :param source_universe_name: str - the name of the source universe
+    :param sample_window: float - seconds to sample safetimes for; default 0 (one read)
+    :param sample_interval: float - seconds between samples; default 0.2
+    :param max_loss_ms: float - fail over as soon as a sample's estimated loss is at or under this (optional)
     :return: resource_uuid: str - the uuid of the resource being failed over to?
     """
     dr_config = get_source_xcluster_dr_config(
-        customer_uuid, source_universe_name, "all"
+        customer_uuid, source_universe_name, "all", live=True
     )
 
     dr_config_uuid = dr_config["uuid"]
     primary_universe_uuid = dr_config["primaryUniverseUuid"]
     dr_replica_universe_uuid = dr_config["drReplicaUniverseUuid"]
 
-    xcluster_dr_safetimes = _get_xcluster_dr_safetime(customer_uuid, dr_config_uuid)
+    def submit():
+        if sample_window > 0:
+            sampling = sample_failover_safetimes(
+                customer_uuid,
+                dr_config_uuid,
+                sample_window,
+                sample_interval,
+                max_loss_ms,
+            )
+            log_failover_safetimes(sampling)
+            print(format_failover_safetimes(sampling))
+            xcluster_dr_safetimes = {"safetimes": sampling["chosen"]["safetimes"]}
+        else:
+            xcluster_dr_safetimes = _get_xcluster_dr_safetime(
+                customer_uuid, dr_config_uuid
+            )
 
-    safetime_epoch_map = {
-        entry["namespaceId"]: entry["safetimeEpochUs"]
-        for entry in xcluster_dr_safetimes["safetimes"]
-    }
+        safetime_epoch_map = {
+            entry["namespaceId"]: entry["safetimeEpochUs"]
+            for entry in xcluster_dr_safetimes["safetimes"]
+        }
+
+        return _failover_xcluster_dr(
+            customer_uuid,
+            dr_config_uuid,
+            primary_universe_uuid,
+            dr_replica_universe_uuid,
+            safetime_epoch_map,
+        )
 
-    resp = _failover_xcluster_dr(
+    _, task_status = run_journaled_task(
         customer_uuid,
+        "failover",
+        dr_config_uuid,
+        submit,
+        "Failover XCluster DR",
         dr_config_uuid,
-        primary_universe_uuid,
-        dr_replica_universe_uuid,
-        safetime_epoch_map,
     )
-    return wait_for_task(customer_uuid, resp, "Failover XCluster DR")
+    return task_status
 
 
 def perform_xcluster_dr_recovery(customer_uuid: str, source_universe_name: str) -> str:
@@ -302,22 +544,43 @@ def perform_xcluster_dr_recovery(customer_uuid: str, source_universe_name: str)
     :return: resource_uuid: str - the uuid of the resource being recovered
     """
     dr_config = get_source_xcluster_dr_config(
-        customer_uuid, source_universe_name, "all"
+        customer_uuid, source_universe_name, "all", live=True
     )
 
     dr_config_uuid = dr_config["uuid"]
 
-    resp = _recover_xcluster_dr_config(customer_uuid, dr_config_uuid)
-    return wait_for_task(customer_uuid, resp, "Recover XCluster DR")
+    _, task_status = run_journaled_task(
+        customer_uuid,
+        "recovery",
+        dr_config_uuid,
+        lambda: _recover_xcluster_dr_config(customer_uuid, dr_config_uuid),
+        "Recover XCluster DR",
+        dr_config_uuid,
+    )
+    return task_status
 
 
 def get_xcluster_details_by_name(customer_uuid: str, universe_name: str) -> str:
     """
     Helper function to return the source given any universe name.
+
+    The topology index answers for a universe it shows as a DR source, but only when the DR config it points to still has the universe as its primary; otherwise the universe's role is read from YBA, as the index can be minutes behind a switchover.
+
     :param customer_uuid: str - the customer UUID
     :param universe_name: str - the universe's friendly name
+    :return: str - the name of the source universe of its xCluster DR config
     :raises RuntimeError: if the universe is not found
     """
+    indexed_roles = lookup_dr_roles(customer_uuid, universe_name)
+    if indexed_roles is not None and indexed_roles["drConfigUuidsAsSource"]:
+        dr_config = _get_xcluster_dr_configs(
+            customer_uuid, indexed_roles["drConfigUuidsAsSource"][0]
+        )
+        if dr_config.get("primaryUniverseUuid") == indexed_roles["universeUUID"]:
+            return universe_name
+        # the index is out of date, e.g. the pair was switched over since it was built
+        invalidate_topology(customer_uuid)
+
     universe = next(iter(_get_universe_by_name(customer_uuid, universe_name)), None)
     if universe is None:
         raise RuntimeError(
@@ -327,15 +590,20 @@ def get_xcluster_details_by_name(customer_uuid: str, universe_name: str) -> str:
         source_config_UUID = universe["drConfigUuidsAsSource"]
         target_config_UUID = universe["drConfigUuidsAsTarget"]
         if len(source_config_UUID) > 0:
-            print(f"{universe_name}")
+            return universe_name
         elif len(target_config_UUID) > 0:
             source_uuid_in_this_xcluster_config = _get_xcluster_dr_configs(
                 customer_uuid, target_config_UUID[0]
             )["primaryUniverseUuid"]
-            source_name_in_this_xcluster_config = _get_universe_by_uuid(
+            # the index only resolves the name
+            source_name_in_this_xcluster_config = lookup_universe_name(
                 customer_uuid, source_uuid_in_this_xcluster_config
-            )["name"]
-            print(f"{source_name_in_this_xcluster_config}")
+            ) or (
+                _get_universe_by_uuid(
+                    customer_uuid, source_uuid_in_this_xcluster_config
+                )["name"]
+            )
+            return source_name_in_this_xcluster_config
         else:
             raise RuntimeError(
                 f"ERROR: '{universe_name}' is not configured as part of an xCluster config."
@@ -1,23 +1,39 @@
-import tabulate
-
 import datetime
 import pytz
-import yaml
+import time
 
-from pprint import pprint
+from concurrent.futures import ThreadPoolExecutor
 
+from core.get_universe_info import get_universe_uuid_by_name
 from core.internal_rest_apis import (
+    _get_all_ysql_tables_list,
+    _get_xcluster_configs,
     _get_xcluster_dr_safetime,
     _get_universe_by_name,
-    _get_universe_by_uuid,
-    _get_xcluster_dr_configs,
-    _list_all_universes,
 )
+from core.models import DrConfig, XClusterTable, parse_tables
 
+from includes.structured_logging import get_logger
+from xclusterdr.apply_rate import ApplyRateEstimator
 from xclusterdr.common import get_source_xcluster_dr_config
+from xclusterdr.fleet_lag import discover_dr_pairs
+from xclusterdr.records import SafetimeRow, TableReplicationRow
+
+logger = get_logger("observability")
+
 
+def get_xcluster_dr_safetimes(
+    customer_uuid: str, source_universe_name: str, samples=1, interval_seconds=1.0
+) -> list:
+    """
+    Reads the safetimes of the DR config of a universe, and from several reads, the apply rate of each namespace and when it should catch up.
 
-def get_xcluster_dr_safetimes(customer_uuid: str, source_universe_name: str):
+    :param customer_uuid: str - the customer UUID
+    :param source_universe_name: str - the name of the DR primary
+    :param samples: int - the number of reads; the apply rate needs at least 2; default 1
+    :param interval_seconds: float - the seconds between two reads; default 1
+    :return: list<SafetimeRow> - the last read, by keyspace
+    """
 
     get_source_universe_response = _get_universe_by_name(
         customer_uuid, source_universe_name
@@ -27,48 +43,60 @@ def get_xcluster_dr_safetimes(customer_uuid: str, source_universe_name: str):
         raise RuntimeError(
             f"ERROR: the universe '{source_universe_name}' was not found."
         )
-    else:
-        dr_config_uuid = get_source_xcluster_dr_config(
-            customer_uuid, source_universe_name, "uuid"
-        )
 
+    dr_config_uuid = get_source_xcluster_dr_config(
+        customer_uuid, source_universe_name, "uuid"
+    )
+
+    estimator = ApplyRateEstimator()
+    for sample in range(max(samples, 1)):
+        if sample:
+            time.sleep(interval_seconds)
         safetime_by_keyspace_list = _get_xcluster_dr_safetime(
             customer_uuid, dr_config_uuid
         )
-
-        print(
-            "See the following for details on these metrics: https://docs.yugabyte.com/v2.20/yugabyte-platform/back-up-restore-universes/disaster-recovery/disaster-recovery-setup/#metrics"
+        estimates = estimator.update_safetimes(
+            dr_config_uuid, safetime_by_keyspace_list["safetimes"]
         )
-
-        formatted_safetime_by_keyspace_list = []
         for i in safetime_by_keyspace_list["safetimes"]:
-            new_row = [
-                i["namespaceName"],
-                datetime.datetime.fromtimestamp(
-                    i["safetimeEpochUs"] / 1000 / 1000, pytz.UTC
-                ),
-                i["safetimeLagUs"] / 1000,
-                i["safetimeSkewUs"] / 1000,
-                i["estimatedDataLossMs"],
-            ]
-            formatted_safetime_by_keyspace_list.append(new_row)
-
-        return tabulate.tabulate(
-            formatted_safetime_by_keyspace_list,
-            headers=(
-                "keyspace",
-                "safetime (UTC)",
-                "safetime lag (ms)",
-                "safetime skew (ms)",
-                "est failover loss (ms)",
+            logger.info(
+                "safetime",
+                extra={
+                    "fields": {
+                        "dr_config_uuid": dr_config_uuid,
+                        "namespace": i["namespaceName"],
+                        "safetime_epoch_us": i["safetimeEpochUs"],
+                        "lag_ms": i["safetimeLagUs"] / 1000,
+                        "skew_ms": i["safetimeSkewUs"] / 1000,
+                        "estimated_data_loss_ms": i["estimatedDataLossMs"],
+                        "apply_rate": estimates[i["namespaceId"]].rate,
+                    }
+                },
+            )
+
+    return [
+        SafetimeRow(
+            namespace_id=i["namespaceId"],
+            namespace_name=i["namespaceName"],
+            safetime=datetime.datetime.fromtimestamp(
+                i["safetimeEpochUs"] / 1000 / 1000, pytz.UTC
             ),
-            tablefmt="rounded_grid",
-            floatfmt=".3f",
-            showindex=False,
+            lag_ms=i["safetimeLagUs"] / 1000,
+            skew_ms=i["safetimeSkewUs"] / 1000,
+            estimated_data_loss_ms=i["estimatedDataLossMs"],
+            apply_rate=estimates[i["namespaceId"]].rate,
+            catch_up_seconds=estimates[i["namespaceId"]].get_catch_up_seconds(),
         )
+        for i in safetime_by_keyspace_list["safetimes"]
+    ]
 
 
-def get_status(customer_uuid: str, source_universe_name: str):
+def get_status(customer_uuid: str, source_universe_name: str) -> DrConfig:
+    """
+    :param customer_uuid: str - the customer UUID
+    :param source_universe_name: str - the name of the DR primary
+    :return: DrConfig - the DR config of the universe, with its state, status, paused and the state of each universe
+    """
 
     get_source_universe_response = _get_universe_by_name(
         customer_uuid, source_universe_name
@@ -79,76 +107,114 @@ def get_status(customer_uuid: str, source_universe_name: str):
             f"ERROR: the universe '{source_universe_name}' was not found."
         )
 
-    else:
-
-        status_list = get_source_xcluster_dr_config(
-            customer_uuid, source_universe_name, "all"
-        )
-        state = status_list["state"]
-        status = status_list["status"]
-        paused = status_list["paused"]
-        primaryUniverseState = status_list["primaryUniverseState"]
-        drReplicaUniverseState = status_list["drReplicaUniverseState"]
+    return DrConfig.from_json(
+        get_source_xcluster_dr_config(customer_uuid, source_universe_name, "all")
+    )
 
-        with open("config/status.yaml", "r") as file:
-            status_tooltips = yaml.safe_load(file)
 
-        configuration_tooltip = status_tooltips.get("configuration", {}).get(
-            state, "this is a new status that is undefined"
-        )
+def get_all_clusters(customer_uuid: str) -> list:
+    """
+    :param customer_uuid: str - the customer UUID
+    :return: list<DrPair> - every DR pair of the YBA instance
+    """
+    return discover_dr_pairs(customer_uuid)
 
-        replication_tooltip = status_tooltips.get("replication", {}).get(
-            status, "this is a new status that is undefined"
-        )
 
-        paused_tooltip = status_tooltips.get("paused", {}).get(
-            paused, "this is a new status that is undefined"
-        )
+# xCluster table statuses: Running is healthy; these are on their way to it; any other is unhealthy
+PENDING_TABLE_STATUSES = ("Validated", "Bootstrapping", "Updating")
 
-        source_tooltip = status_tooltips.get("source", {}).get(
-            primaryUniverseState,
-            "this is a new status that is undefined",
-        )
 
-        target_tooltip = status_tooltips.get("target", {}).get(
-            drReplicaUniverseState,
-            "this is a new status that is undefined",
-        )
+def _get_table_key(table_id: str) -> str:
+    # table IDs are given with and without dashes depending on the API
+    return table_id.replace("-", "").lower()
 
-        print(f"configuration: {state} - {configuration_tooltip}")
-        print(f"replication: {status} - {replication_tooltip}")
-        print(f"paused? {paused} - {paused_tooltip}")
-        print(f"source: {primaryUniverseState} - {source_tooltip}")
-        print(f"target: {drReplicaUniverseState} - {target_tooltip}")
 
-        return "Please see the README file for further notes on these status fields."
+def get_table_health(table: XClusterTable) -> str:
+    """
+    :return: str - "unhealthy", "pending" or "running"
+    """
+    if table.errors or table.status not in ("Running",) + PENDING_TABLE_STATUSES:
+        return "unhealthy"
+    return "pending" if table.status in PENDING_TABLE_STATUSES else "running"
 
 
-def get_all_clusters(customer_uuid: str):
+def get_xcluster_table_status(customer_uuid: str, source_universe_name: str) -> list:
+    """
+    Shows the replication status of each table of the DR config of a universe, from its xCluster config, with the table names from the source universe's catalog.
 
-    get_universe_response = _list_all_universes(customer_uuid)
+    Keyspaces with unhealthy tables come first, then those with tables on their way to Running; within a keyspace, unhealthy tables come first.
 
-    formatted_universe_list = [
-        [
-            universe["name"],
-            _get_universe_by_uuid(
-                customer_uuid,
-                _get_xcluster_dr_configs(
-                    customer_uuid, universe["drConfigUuidsAsSource"][0]
-                )["drReplicaUniverseUuid"],
-            )["name"],
+    :param customer_uuid: str - the customer UUID
+    :param source_universe_name: str - the name of the DR primary
+    :return: list<TableReplicationRow> - every replicated table, in that order
+    """
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        dr_config_future = pool.submit(
+            get_source_xcluster_dr_config, customer_uuid, source_universe_name, "all"
+        )
+        catalog_future = pool.submit(
+            lambda: parse_tables(
+                _get_all_ysql_tables_list(
+                    customer_uuid,
+                    get_universe_uuid_by_name(customer_uuid, source_universe_name),
+                )
+            )
+        )
+        dr_config = DrConfig.from_json(dr_config_future.result())
+        xcluster_tables = [
+            XClusterTable.from_json(table)
+            for table in _get_xcluster_configs(
+                customer_uuid, dr_config.xcluster_config_uuid
+            ).get("tableDetails", [])
         ]
-        for universe in get_universe_response
-        if universe["drConfigUuidsAsSource"]
-    ]
+        catalog = {
+            _get_table_key(table.table_id): table for table in catalog_future.result()
+        }
+
+    health_order = {"unhealthy": 0, "pending": 1, "running": 2}
+    rows = []
+    for xcluster_table in xcluster_tables:
+        table = catalog.get(_get_table_key(xcluster_table.table_id))
+        health = get_table_health(xcluster_table)
+        problems = xcluster_table.errors
+        if table is None:
+            problems += ("not in the source universe's catalog",)
+            health = "unhealthy"
+        rows.append(
+            TableReplicationRow(
+                health=health,
+                keyspace=table.keyspace if table else "",
+                name=table.qualified_name if table else "",
+                table=xcluster_table,
+                problems=problems,
+            )
+        )
 
-    return tabulate.tabulate(
-        formatted_universe_list,
-        headers=(
-            "source",
-            "target",
+    keyspaces = count_table_health(rows)
+    keyspace_rank = {
+        keyspace: (-counts["unhealthy"], -counts["pending"], keyspace)
+        for keyspace, counts in keyspaces.items()
+    }
+    return sorted(
+        rows,
+        key=lambda row: (
+            keyspace_rank[row.keyspace],
+            health_order[row.health],
+            row.name,
         ),
-        tablefmt="rounded_grid",
-        floatfmt=".3f",
-        showindex=False,
     )
+
+
+def count_table_health(rows: list) -> dict:
+    """
+    :param rows: list<TableReplicationRow> - the rows of get_xcluster_table_status
+    :return: dict<str, dict<str, int>> - the number of tables, unhealthy, pending and running, by keyspace, in the order the keyspaces first appear
+    """
+    keyspaces = {}
+    for row in rows:
+        counts = keyspaces.setdefault(
+            row.keyspace, {"tables": 0, "unhealthy": 0, "pending": 0, "running": 0}
+        )
+        counts["tables"] += 1
+        counts[row.health] += 1
+    return keyspaces
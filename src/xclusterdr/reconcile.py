@@ -0,0 +1,298 @@
+import tabulate
+import yaml
+
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from core.internal_rest_apis import (
+    _get_all_ysql_tables_list,
+    _set_tables_in_dr_config,
+)
+from core.get_universe_info import get_universe_uuid_by_name
+from core.journal import run_journaled_task
+from core.models import DrConfig, parse_tables
+from xclusterdr.common import get_source_xcluster_dr_config
+
+# a database listed with this value replicates all of its tables
+ALL_TABLES = "all"
+
+
+def load_desired_state(desired_state_file_name: str) -> list:
+    """
+    Reads the desired replication of each DR pair from a YAML file, for example:
+
+        dr_pairs:
+          - source: source-universe-name
+            databases:
+              database1: all
+              database2:
+                - public.orders
+                - customers
+
+    A table without a schema is in the public schema.
+
+    :param desired_state_file_name: str - the YAML file
+    :return: list<dict> - one entry per DR pair, with its source and databases
+    :raises RuntimeError: if the file is not in this form
+    """
+    desired_state = yaml.safe_load(Path(desired_state_file_name).read_text()) or {}
+    dr_pairs = desired_state.get("dr_pairs")
+    if not isinstance(dr_pairs, list) or not dr_pairs:
+        raise RuntimeError(
+            f"ERROR: '{desired_state_file_name}' has no list of dr_pairs."
+        )
+
+    for dr_pair in dr_pairs:
+        if not dr_pair.get("source") or not isinstance(dr_pair.get("databases"), dict):
+            raise RuntimeError(
+                f"ERROR: each DR pair needs a source and a mapping of databases: {dr_pair}"
+            )
+        for db_name, tables in dr_pair["databases"].items():
+            if tables != ALL_TABLES and not isinstance(tables, list):
+                raise RuntimeError(
+                    f"ERROR: the tables of '{db_name}' must be '{ALL_TABLES}' or a list."
+                )
+    return dr_pairs
+
+
+def resolve_desired_tables(databases: dict, tables_list: list) -> tuple:
+    """
+    Finds the ids of the tables a DR pair should replicate.
+
+    :param databases: dict - the desired tables by database name ('all' or a list of [schema.]table names)
+    :param tables_list: list<Table> - the tables of the source universe
+    :return: tuple<set<str>, list<str>> - the table ids, and the desired tables that do not exist
+    """
+    tables_by_keyspace = {}
+    for table in tables_list:
+        if not table.is_index:
+            tables_by_keyspace.setdefault(table.keyspace, []).append(table)
+
+    desired_table_ids = set()
+    missing = []
+    for db_name, desired_tables in databases.items():
+        keyspace_tables = tables_by_keyspace.get(db_name, [])
+        if desired_tables == ALL_TABLES:
+            if not keyspace_tables:
+                missing.append(f"{db_name} (no tables)")
+            desired_table_ids.update(table.table_id for table in keyspace_tables)
+            continue
+
+        table_ids_by_name = {
+            table.qualified_name: table.table_id for table in keyspace_tables
+        }
+        for table_name in desired_tables:
+            qualified_name = table_name if "." in table_name else f"public.{table_name}"
+            if qualified_name in table_ids_by_name:
+                desired_table_ids.add(table_ids_by_name[qualified_name])
+            else:
+                missing.append(f"{db_name}.{qualified_name}")
+
+    return desired_table_ids, missing
+
+
+def compute_table_changes(
+    desired_table_ids: set, replicated_table_ids: set, tables_list: list
+) -> dict:
+    """
+    Computes the changes that take a DR config from its replicated tables to the desired ones.
+
+    Index tables are left to autoIncludeIndexTables, and replicated tables missing from the tables list (which only holds the tables supported for xCluster) are kept as they are.
+
+    :param desired_table_ids: set<str> - the ids of the tables to replicate
+    :param replicated_table_ids: set<str> - the ids of the tables in the DR config now
+    :param tables_list: list<Table> - the tables of the source universe
+    :return: dict - the ids to add and remove, and the full set of ids to send to set_tables
+    """
+    listed_table_ids = {table.table_id for table in tables_list}
+    main_table_ids = {table.table_id for table in tables_list if not table.is_index}
+    replicated_main_table_ids = replicated_table_ids & main_table_ids
+    unlisted_table_ids = replicated_table_ids - listed_table_ids
+
+    return {
+        "add": desired_table_ids - replicated_main_table_ids,
+        "remove": replicated_main_table_ids - desired_table_ids,
+        "tables": desired_table_ids | unlisted_table_ids,
+    }
+
+
+def plan_dr_pair(customer_uuid: str, dr_pair: dict, live=False) -> dict:
+    """
+    Compares the desired replication of one DR pair with its DR config.
+
+    :param customer_uuid: str - the customer uuid
+    :param dr_pair: dict - the source universe name and the desired databases
+    :param live: bool - read the source's DR role from YBA, not the topology index (for a plan about to be applied); default False
+    :return: dict - the DR config, the changes to make, and any problems found
+    """
+    source_universe_name = dr_pair["source"]
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        dr_config_future = pool.submit(
+            get_source_xcluster_dr_config,
+            customer_uuid,
+            source_universe_name,
+            "all",
+            live,
+        )
+        tables_future = pool.submit(
+            lambda: parse_tables(
+                _get_all_ysql_tables_list(
+                    customer_uuid,
+                    get_universe_uuid_by_name(customer_uuid, source_universe_name),
+                )
+            )
+        )
+        dr_config = DrConfig.from_json(dr_config_future.result())
+        tables_list = tables_future.result()
+
+    desired_table_ids, missing = resolve_desired_tables(
+        dr_pair["databases"], tables_list
+    )
+    changes = compute_table_changes(
+        desired_table_ids, set(dr_config.tables), tables_list
+    )
+
+    tables_by_id = {table.table_id: table for table in tables_list}
+    return {
+        "source": source_universe_name,
+        "drConfigUuid": dr_config.uuid,
+        "storageConfigUuid": dr_config.storage_config_uuid,
+        "add": sorted(
+            (tables_by_id[table_id] for table_id in changes["add"]),
+            key=lambda t: (t.keyspace, t.schema, t.name),
+        ),
+        "remove": sorted(
+            (tables_by_id[table_id] for table_id in changes["remove"]),
+            key=lambda t: (t.keyspace, t.schema, t.name),
+        ),
+        "tables": sorted(changes["tables"]),
+        "problems": [f"not found: {name}" for name in missing],
+    }
+
+
+def plan_dr(customer_uuid: str, dr_pairs: list, concurrency=4, live=False) -> list:
+    """
+    Plans every DR pair of a desired state, reading the pairs concurrently.
+
+    :param customer_uuid: str - the customer uuid
+    :param dr_pairs: list<dict> - the result of load_desired_state
+    :param concurrency: int - the maximum number of DR pairs read at once; default 4
+    :param live: bool - read the DR roles from YBA, not the topology index (for plans about to be applied); default False
+    :return: list<dict> - one plan per DR pair
+    """
+
+    def plan_or_error(dr_pair):
+        try:
+            return plan_dr_pair(customer_uuid, dr_pair, live)
+        except Exception as e:
+            return {
+                "source": dr_pair["source"],
+                "add": [],
+                "remove": [],
+                "problems": [f"could not be planned: {e}"],
+            }
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        return list(pool.map(plan_or_error, dr_pairs))
+
+
+def has_changes(plan: dict) -> bool:
+    return bool(plan["add"] or plan["remove"])
+
+
+def is_plan_applicable(plan: dict) -> bool:
+    return not plan["problems"]
+
+
+def format_dr_plan(plans: list) -> str:
+    """
+    Formats the result of plan_dr as a table of changes, grouped by DR pair and keyspace.
+    """
+    rows = []
+    for plan in plans:
+        for action in ("add", "remove"):
+            for table in plan[action]:
+                rows.append(
+                    [
+                        plan["source"],
+                        action,
+                        table.keyspace,
+                        table.schema,
+                        table.name,
+                        table.size_bytes,
+                        table.table_id,
+                    ]
+                )
+        for problem in plan["problems"]:
+            rows.append([plan["source"], "ERROR", "", "", problem, "", ""])
+
+    calls = sum(1 for plan in plans if is_plan_applicable(plan) and has_changes(plan))
+    summary = (
+        f"{calls} DR config(s) to update, with one set_tables call each."
+        if calls
+        else "No changes: replication matches the desired state."
+    )
+    if not rows:
+        return summary
+
+    return (
+        tabulate.tabulate(
+            rows,
+            headers=(
+                "source",
+                "action",
+                "keyspace",
+                "schema",
+                "table",
+                "size (bytes)",
+                "id",
+            ),
+            tablefmt="rounded_grid",
+            floatfmt=".0f",
+            showindex=False,
+        )
+        + "\n"
+        + summary
+    )
+
+
+def apply_dr_plan(customer_uuid: str, plans: list) -> list:
+    """
+    Applies the changes of each DR pair's plan with a single set_tables call. The call takes the full set of tables, so additions and removals go together, and all new tables of a keyspace are added at once. Plans with problems are skipped.
+
+    Tables added with data trigger a backup/restore bootstrap of the target; see get-tables.
+
+    :param customer_uuid: str - the customer uuid
+    :param plans: list<dict> - the result of plan_dr
+    :return: list<json<CustomerTaskData>> - the final status of each set_tables task
+    :raises RuntimeError: if any plan has problems (after the others are applied) or a task fails
+    """
+    task_statuses = []
+    skipped = []
+    for plan in plans:
+        if not is_plan_applicable(plan):
+            skipped.append(plan["source"])
+            continue
+        if not has_changes(plan):
+            continue
+
+        _, task_status = run_journaled_task(
+            customer_uuid,
+            "set-tables",
+            plan["drConfigUuid"],
+            lambda plan=plan: _set_tables_in_dr_config(
+                customer_uuid,
+                plan["drConfigUuid"],
+                plan["storageConfigUuid"],
+                plan["tables"],
+            ),
+            f"Set tables in xCluster DR ({plan['source']})",
+            plan["drConfigUuid"],
+        )
+        task_statuses.append(task_status)
+
+    if skipped:
+        raise RuntimeError(
+            f"ERROR: these DR pairs were not changed because of problems in their plan: {', '.join(skipped)}"
+        )
+    return task_statuses
@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from datetime import datetime
+
+from core.models import Table, XClusterTable
+
+# The records the observability and management functions return. They carry
+# values, not text: the CLI formats them (see xclusterdr.render), and scripts,
+# tests and other front ends can use them as they are.
+
+
+@dataclass(slots=True, frozen=True)
+class DrPair:
+    dr_config_uuid: str
+    source: str
+    target: str
+
+
+@dataclass(slots=True, frozen=True)
+class SafetimeRow:
+    namespace_id: str
+    namespace_name: str
+    safetime: datetime
+    lag_ms: float
+    skew_ms: float
+    estimated_data_loss_ms: float
+    # how fast the safetime advances against the clock; None until two reads
+    apply_rate: float = None
+    # None when there is no rate yet, or the replica is not catching up
+    catch_up_seconds: float = None
+
+
+@dataclass(slots=True, frozen=True)
+class DrTableRow:
+    table: Table
+    replicated: bool
+
+
+@dataclass(slots=True, frozen=True)
+class TableReplicationRow:
+    health: str
+    keyspace: str
+    name: str
+    table: XClusterTable
+    problems: tuple
+
+
+@dataclass(slots=True, frozen=True)
+class ChunkMismatch:
+    # the range [lower, upper) of the key, the primary key or its hash; None is open-ended
+    key: str
+    lower: tuple
+    upper: tuple
+    source_rows: int
+    target_rows: int
+
+
+@dataclass(slots=True, frozen=True)
+class TableVerification:
+    keyspace: str
+    name: str
+    chunks: int
+    source_rows: int
+    target_rows: int
+    mismatches: tuple
+    # whether both sides were read at the same safetime, or each at its latest
+    at_safetime: bool
+    error: str = None
@@ -0,0 +1,329 @@
+import tabulate
+import yaml
+
+from xclusterdr.apply_rate import format_catch_up_seconds
+from xclusterdr.fleet_lag import get_fleet_lag_status
+from xclusterdr.observability import count_table_health
+
+# Formats the records of the observability and management functions for the
+# CLI. Nothing here calls YBA.
+
+SAFETIME_METRICS_URL = "https://docs.yugabyte.com/v2.20/yugabyte-platform/back-up-restore-universes/disaster-recovery/disaster-recovery-setup/#metrics"
+
+
+def format_safetimes(rows: list, samples=1) -> str:
+    """
+    :param rows: list<SafetimeRow> - as returned by get_xcluster_dr_safetimes
+    :param samples: int - the number of reads the rows come from; the apply rate is explained when there were several; default 1
+    :return: str - a table by keyspace, after a note on the metrics
+    """
+    notes = [f"See the following for details on these metrics: {SAFETIME_METRICS_URL}"]
+    if samples > 1:
+        notes.append(
+            "The apply rate is how fast the safetime advances against the clock (smoothed over the reads); over 1 the replica is catching up."
+        )
+    table = tabulate.tabulate(
+        [
+            [
+                row.namespace_name,
+                row.safetime,
+                row.lag_ms,
+                row.skew_ms,
+                row.estimated_data_loss_ms,
+                row.apply_rate,
+                format_catch_up_seconds(row.apply_rate, row.catch_up_seconds),
+            ]
+            for row in rows
+        ],
+        headers=(
+            "keyspace",
+            "safetime (UTC)",
+            "safetime lag (ms)",
+            "safetime skew (ms)",
+            "est failover loss (ms)",
+            "apply rate",
+            "catch-up ETA (s)",
+        ),
+        tablefmt="rounded_grid",
+        floatfmt=".3f",
+        showindex=False,
+    )
+    return "\n".join(notes + [table])
+
+
+def format_status(dr_config, status_file="config/status.yaml") -> str:
+    """
+    :param dr_config: DrConfig - as returned by get_status
+    :param status_file: str - the YAML file explaining each value; default config/status.yaml
+    :return: str - each status field, its value and what it means
+    """
+    with open(status_file, "r") as file:
+        status_tooltips = yaml.safe_load(file)
+
+    def explain(group, value):
+        return status_tooltips.get(group, {}).get(
+            value, "this is a new status that is undefined"
+        )
+
+    return "\n".join(
+        [
+            f"configuration: {dr_config.state} - {explain('configuration', dr_config.state)}",
+            f"replication: {dr_config.status} - {explain('replication', dr_config.status)}",
+            f"paused? {dr_config.paused} - {explain('paused', dr_config.paused)}",
+            f"source: {dr_config.primary_universe_state} - {explain('source', dr_config.primary_universe_state)}",
+            f"target: {dr_config.dr_replica_universe_state} - {explain('target', dr_config.dr_replica_universe_state)}",
+            "Please see the README file for further notes on these status fields.",
+        ]
+    )
+
+
+def format_dr_pairs(pairs: list) -> str:
+    """
+    :param pairs: list<DrPair> - as returned by get_all_clusters
+    :return: str - a table of the source and target of each pair
+    """
+    return tabulate.tabulate(
+        [[pair.source, pair.target] for pair in pairs],
+        headers=(
+            "source",
+            "target",
+        ),
+        tablefmt="rounded_grid",
+        showindex=False,
+    )
+
+
+def format_xcluster_tables(rows: list) -> str:
+    """
+    :param rows: list<DrTableRow> - as returned by get_xcluster_tables
+    :return: str - notes on adding tables, and a table of the tables
+    """
+    return "\n".join(
+        [
+            "You can use the do-add-tables-to-dr command to add these to the xCluster DR configuration by table id.",
+            "NOTE 1: Be sure that the table definition exists on the source and target, and that the table is empty.",
+            "NOTE 2: When adding tables, all new tables within a keyspace must be added at once.",
+            tabulate.tabulate(
+                [
+                    [
+                        "Yes" if row.replicated else "",
+                        row.table.schema,
+                        row.table.keyspace,
+                        row.table.name,
+                        row.table.size_bytes,
+                        row.table.table_id,
+                    ]
+                    for row in rows
+                ],
+                headers=(
+                    "replicated?",
+                    "schema",
+                    "keyspace",
+                    "table",
+                    "size (bytes)",
+                    "id",
+                ),
+                tablefmt="rounded_grid",
+                floatfmt=".0f",
+                showindex=False,
+            ),
+        ]
+    )
+
+
+def format_table_status(rows: list, show_all=False) -> str:
+    """
+    :param rows: list<TableReplicationRow> - as returned by get_xcluster_table_status
+    :param show_all: bool - also list the Running tables (they are always counted); default False
+    :return: str - a summary table by keyspace, and a table of the tables
+    """
+    summary = tabulate.tabulate(
+        [
+            [
+                keyspace,
+                counts["tables"],
+                counts["unhealthy"],
+                counts["pending"],
+                counts["running"],
+            ]
+            for keyspace, counts in count_table_health(rows).items()
+        ],
+        headers=("keyspace", "tables", "unhealthy", "pending", "running"),
+        tablefmt="rounded_grid",
+        showindex=False,
+    )
+
+    listed = [row for row in rows if show_all or row.health != "running"]
+    if not listed:
+        return f"{summary}\nAll {len(rows)} replicated table(s) are Running."
+
+    details = tabulate.tabulate(
+        [
+            [
+                row.health.upper(),
+                row.keyspace,
+                row.name,
+                row.table.status,
+                "; ".join(row.problems),
+                row.table.table_id,
+            ]
+            for row in listed
+        ],
+        headers=("health", "keyspace", "table", "status", "problems", "table id"),
+        tablefmt="rounded_grid",
+        showindex=False,
+    )
+    return f"{summary}\n{details}"
+
+
+def format_fleet_lag(rows: list) -> str:
+    """
+    Formats the rows of a fleet sample as one table.
+    """
+    return tabulate.tabulate(
+        [
+            [
+                get_fleet_lag_status(row),
+                row["source"],
+                row["target"],
+                row["maxLagMs"],
+                row["worstNamespace"],
+                row["maxSkewMs"],
+                row["estimatedDataLossMs"],
+                row["applyRate"],
+                row["catchUp"],
+                row["samples"],
+                row["errors"],
+                row["lastError"] or "",
+            ]
+            for row in rows
+        ],
+        headers=(
+            "",
+            "source",
+            "target",
+            "max lag (ms)",
+            "worst keyspace",
+            "max skew (ms)",
+            "est failover loss (ms)",
+            "apply rate",
+            "catch-up ETA (s)",
+            "samples",
+            "errors",
+            "last error",
+        ),
+        tablefmt="rounded_grid",
+        floatfmt=".3f",
+        showindex=False,
+    )
+
+
+def format_ddl_result(result: dict) -> str:
+    """
+    :param result: dict - as returned by run_ddl_on_dr_pair
+    :return: str - what changed in the DR config
+    """
+    lines = ["The DDL ran on the source and target, and their schemas match."]
+    if result["removedTables"]:
+        lines.append(
+            f"Removed from the xCluster DR config: {', '.join(result['removedTables'])}"
+        )
+    if result["addedTables"]:
+        lines.append(
+            f"Added to the xCluster DR config: {', '.join(result['addedTables'])}"
+        )
+    return "\n".join(lines)
+
+
+def _format_key(bound: tuple) -> str:
+    return "" if bound is None else ", ".join(str(value) for value in bound)
+
+
+def format_verification(results: list) -> str:
+    """
+    :param results: list<TableVerification> - as returned by verify_dr_tables
+    :return: str - a table of the tables, those that differ first, a table of the key ranges that differ, and a conclusion
+    """
+    status_order = {"MISMATCH": 0, "ERROR": 1, "OK": 2}
+
+    def get_status(result):
+        if result.mismatches:
+            return "MISMATCH"
+        return "ERROR" if result.error else "OK"
+
+    results = sorted(results, key=lambda result: status_order[get_status(result)])
+    lines = [
+        tabulate.tabulate(
+            [
+                [
+                    get_status(result),
+                    result.keyspace,
+                    result.name,
+                    result.chunks,
+                    result.source_rows,
+                    result.target_rows,
+                    len(result.mismatches),
+                    "safetime" if result.at_safetime else "latest",
+                    result.error or "",
+                ]
+                for result in results
+            ],
+            headers=(
+                "",
+                "keyspace",
+                "table",
+                "chunks",
+                "source rows",
+                "target rows",
+                "mismatched chunks",
+                "read at",
+                "error",
+            ),
+            tablefmt="rounded_grid",
+            showindex=False,
+        )
+    ]
+
+    mismatches = [
+        [
+            result.keyspace,
+            result.name,
+            mismatch.key,
+            _format_key(mismatch.lower),
+            _format_key(mismatch.upper),
+            mismatch.source_rows,
+            mismatch.target_rows,
+        ]
+        for result in results
+        for mismatch in result.mismatches
+    ]
+    if mismatches:
+        lines.append(
+            tabulate.tabulate(
+                mismatches,
+                headers=(
+                    "keyspace",
+                    "table",
+                    "key",
+                    "from",
+                    "to (excluded)",
+                    "source rows",
+                    "target rows",
+                ),
+                tablefmt="rounded_grid",
+                showindex=False,
+            )
+        )
+
+    differing = sum(1 for result in results if get_status(result) != "OK")
+    if differing:
+        lines.append(
+            f"{differing} of {len(results)} replicated table(s) differ or could not be verified."
+        )
+    else:
+        lines.append(f"All {len(results)} replicated table(s) match.")
+    if not all(result.at_safetime for result in results):
+        lines.append(
+            "Tables read at their latest, rather than at a common safetime, can differ by the writes still being replicated; verify them again to confirm."
+        )
+    return "\n".join(lines)
@@ -0,0 +1,351 @@
+import math
+import threading
+import time
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from core.internal_rest_apis import (
+    _get_all_ysql_tables_list,
+    _get_universe_by_uuid,
+    _get_xcluster_dr_safetime,
+)
+from core.models import DrConfig, Universe, parse_tables
+from core.ysql import get_ysql_pool, quote_identifier
+from includes.structured_logging import get_logger
+from xclusterdr.common import get_source_xcluster_dr_config
+from xclusterdr.records import ChunkMismatch, TableVerification
+
+logger = get_logger("verify")
+
+# Compares the rows of the replicated tables on the source and the target,
+# chunk by chunk: each chunk is a range of the primary key (or, for a hash
+# sharded key, of its hash), and each side returns only its row count and the
+# sum of a hash of each row, so no rows cross the network. Both sides of a
+# chunk are read at the same time, at the same safetime of its database where
+# YSQL allows it.
+
+# the hash codes of YSQL hash sharded keys are in [0, 65536)
+HASH_CODES = 65536
+
+# the hash option of a primary key column in pg_index.indoption (YSQL only)
+_INDOPTION_HASH = 4
+
+COLUMNS_QUERY = """
+SELECT attname FROM pg_attribute
+WHERE attrelid = %s::regclass AND attnum > 0 AND NOT attisdropped
+ORDER BY attnum
+"""
+
+PRIMARY_KEY_QUERY = f"""
+SELECT a.attname, (i.indoption[k.n - 1] & {_INDOPTION_HASH}) <> 0
+FROM pg_index i
+CROSS JOIN LATERAL unnest(i.indkey::int2[]) WITH ORDINALITY AS k(attnum, n)
+JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = k.attnum
+WHERE i.indrelid = %s::regclass AND i.indisprimary
+ORDER BY k.n
+"""
+
+
+class SafetimeClock:
+    """
+    The safetime of each database of a DR config, read again when it is older than refresh_seconds. Each chunk is read at the latest one, so a long verification never reads further back than the history YSQL keeps.
+    """
+
+    def __init__(self, customer_uuid: str, dr_config_uuid: str, refresh_seconds=10.0):
+        self.customer_uuid = customer_uuid
+        self.dr_config_uuid = dr_config_uuid
+        self.refresh_seconds = refresh_seconds
+        self._safetimes = {}
+        self._read_at = None
+        self._lock = threading.Lock()
+
+    def get(self, database: str):
+        """
+        :return: int - the safetime of a database in microseconds since the epoch, or None if there is none
+        """
+        with self._lock:
+            if (
+                self._read_at is None
+                or time.monotonic() - self._read_at > self.refresh_seconds
+            ):
+                try:
+                    self._safetimes = {
+                        entry["namespaceName"]: int(entry["safetimeEpochUs"])
+                        for entry in _get_xcluster_dr_safetime(
+                            self.customer_uuid, self.dr_config_uuid
+                        )["safetimes"]
+                    }
+                except Exception as e:
+                    logger.warning(
+                        "safetime read failed", extra={"fields": {"error": str(e)}}
+                    )
+                self._read_at = time.monotonic()
+            return self._safetimes.get(database)
+
+
+def _set_read_time(cursor, read_time):
+    if read_time is not None:
+        cursor.execute("SET yb_read_time TO %s", (read_time,))
+
+
+def _reset_read_time(cursor, read_time):
+    if read_time is not None:
+        cursor.execute("RESET yb_read_time")
+
+
+def supports_read_time(pools: list, read_time) -> bool:
+    """
+    :param pools: list<YsqlPool> - the pools of a database on each side
+    :param read_time: int - a safetime to read at
+    :return: bool - whether every side can read at that time (YSQL's yb_read_time; not PostgreSQL)
+    """
+    if read_time is None:
+        return False
+    for pool in pools:
+        try:
+            with pool.connection() as connection, connection.cursor() as cursor:
+                _set_read_time(cursor, read_time)
+                _reset_read_time(cursor, read_time)
+        except Exception as e:
+            logger.info(
+                "no read at safetime", extra={"fields": {"error": str(e).strip()}}
+            )
+            return False
+    return True
+
+
+def get_chunk_predicate(key_columns: list, lower, upper, by_hash=False) -> tuple:
+    """
+    :param key_columns: list<str> - the quoted columns of the key
+    :param lower: tuple - the first key of the chunk, or None from the start
+    :param upper: tuple - the first key after the chunk, or None to the end
+    :param by_hash: bool - whether the bounds are of yb_hash_code of the columns; default False
+    :return: tuple<str, list> - the SQL condition and its parameters
+    """
+    columns = ", ".join(key_columns)
+    key = f"yb_hash_code({columns})" if by_hash else f"({columns})"
+    conditions = []
+    params = []
+    for bound, operator in ((lower, ">="), (upper, "<")):
+        if bound is None:
+            continue
+        conditions.append(f"{key} {operator} ({', '.join(['%s'] * len(bound))})")
+        params.extend(bound)
+    return " AND ".join(conditions) or "TRUE", params
+
+
+def _plan_table(pool, table, chunk_rows: int) -> dict:
+    relation = f"{quote_identifier(table.schema)}.{quote_identifier(table.name)}"
+    columns = [
+        quote_identifier(column) for (column,) in pool.query(COLUMNS_QUERY, [relation])
+    ]
+    primary_key = pool.query(PRIMARY_KEY_QUERY, [relation])
+    hash_columns = [
+        quote_identifier(column) for column, is_hash in primary_key if is_hash
+    ]
+    key_columns = [quote_identifier(column) for column, _ in primary_key]
+
+    bounds = []
+    if hash_columns:
+        # hash ranges need no reads to find; only their number depends on the table's size
+        (rows,) = pool.query(
+            "SELECT reltuples FROM pg_class WHERE oid = %s::regclass", [relation]
+        )[0]
+        if rows <= 0:
+            (rows,) = pool.query(f"SELECT count(*) FROM {relation}")[0]
+        chunks = max(1, math.ceil(rows / chunk_rows))
+        bounds = [(HASH_CODES * i // chunks,) for i in range(1, chunks)]
+        key_columns = hash_columns
+    elif key_columns:
+        # each bound is the key chunk_rows keys after the one before
+        order = ", ".join(key_columns)
+        while True:
+            where = (
+                f"WHERE ({order}) >= ({', '.join(['%s'] * len(key_columns))})"
+                if bounds
+                else ""
+            )
+            row = pool.query(
+                f"SELECT {order} FROM {relation} {where} ORDER BY {order} OFFSET %s LIMIT 1",
+                [*(bounds[-1] if bounds else ()), chunk_rows],
+            )
+            if not row:
+                break
+            bounds.append(tuple(row[0]))
+
+    return {
+        "relation": relation,
+        "columns": columns,
+        "key_columns": key_columns,
+        "by_hash": bool(hash_columns),
+        "ranges": list(zip([None] + bounds, bounds + [None])),
+    }
+
+
+def _checksum(pool, statement: str, params: list, read_time) -> tuple:
+    with pool.connection() as connection, connection.cursor() as cursor:
+        _set_read_time(cursor, read_time)
+        try:
+            cursor.execute(statement, params)
+            return tuple(cursor.fetchone())
+        finally:
+            if not connection.closed:
+                _reset_read_time(cursor, read_time)
+
+
+def verify_dr_tables(
+    customer_uuid: str,
+    source_universe_name: str,
+    databases=None,
+    chunk_rows=10000,
+    workers=8,
+) -> list:
+    """
+    Compares the rows of each table replicated by the DR config of a universe on its source and target.
+
+    Tables are split into chunks of about chunk_rows rows; the chunks of all tables are checked on `workers` connections to each side, both sides of a chunk at once. Where YSQL allows it, both sides of a chunk are read at the same, recent safetime of its database, so writes still being replicated do not show as differences; elsewhere, each side is read at its latest.
+
+    :param customer_uuid: str - the customer UUID
+    :param source_universe_name: str - the name of the DR primary
+    :param databases: list<str> - only verify the tables of these databases (optional)
+    :param chunk_rows: int - the rows in a chunk; default 10000
+    :param workers: int - the chunks checked at once; default 8
+    :return: list<TableVerification> - the result of each table
+    :raises RuntimeError: if there is no replicated table to verify
+    """
+    dr_config = DrConfig.from_json(
+        get_source_xcluster_dr_config(customer_uuid, source_universe_name, "all")
+    )
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        source_universe, target_universe = pool.map(
+            lambda universe_uuid: Universe.from_json(
+                _get_universe_by_uuid(customer_uuid, universe_uuid)
+            ),
+            (dr_config.primary_universe_uuid, dr_config.dr_replica_universe_uuid),
+        )
+
+    replicated = set(dr_config.tables)
+    tables = sorted(
+        (
+            table
+            for table in parse_tables(
+                _get_all_ysql_tables_list(customer_uuid, source_universe.universe_uuid)
+            )
+            if table.table_id in replicated
+            and not table.is_index
+            and (not databases or table.keyspace in databases)
+        ),
+        key=lambda table: (table.keyspace, table.schema, table.name),
+    )
+    if not tables:
+        raise RuntimeError(
+            f"ERROR: the DR config of '{source_universe_name}' replicates no table to verify."
+        )
+
+    pools = {
+        database: (
+            get_ysql_pool(source_universe, database, workers),
+            get_ysql_pool(target_universe, database, workers),
+        )
+        for database in {table.keyspace for table in tables}
+    }
+    clock = SafetimeClock(customer_uuid, dr_config.uuid)
+    at_safetime = {
+        database: supports_read_time(side_pools, clock.get(database))
+        for database, side_pools in pools.items()
+    }
+
+    plans = {}
+    checks = {table: [] for table in tables}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        plan_futures = {
+            pool.submit(_plan_table, pools[table.keyspace][0], table, chunk_rows): table
+            for table in tables
+        }
+        # the chunks of a table are queued as soon as it is split, behind those of the tables before it
+        for future in as_completed(plan_futures):
+            table = plan_futures[future]
+            try:
+                plan = plans[table] = future.result()
+            except Exception as e:
+                plans[table] = {"error": str(e).strip()}
+                continue
+            source_pool, target_pool = pools[table.keyspace]
+            for lower, upper in plan["ranges"]:
+                predicate, params = get_chunk_predicate(
+                    plan["key_columns"], lower, upper, plan["by_hash"]
+                )
+                statement = (
+                    "SELECT count(*), coalesce(sum(('x' || substr(md5("
+                    f"ROW({', '.join(plan['columns'])})::text), 1, 16))::bit(64)::bigint), 0) "
+                    f"FROM {plan['relation']} WHERE {predicate}"
+                )
+                read_time = (
+                    clock.get(table.keyspace) if at_safetime[table.keyspace] else None
+                )
+                checks[table].append(
+                    (
+                        lower,
+                        upper,
+                        pool.submit(
+                            _checksum, source_pool, statement, params, read_time
+                        ),
+                        pool.submit(
+                            _checksum, target_pool, statement, params, read_time
+                        ),
+                    )
+                )
+
+        results = []
+        for table in tables:
+            plan = plans[table]
+            source_rows = target_rows = 0
+            mismatches = []
+            error = plan.get("error")
+            for lower, upper, source_future, target_future in checks[table]:
+                try:
+                    source_checksum = source_future.result()
+                    target_checksum = target_future.result()
+                except Exception as e:
+                    error = error or str(e).strip()
+                    continue
+                source_rows += source_checksum[0]
+                target_rows += target_checksum[0]
+                if source_checksum != target_checksum:
+                    mismatches.append(
+                        ChunkMismatch(
+                            key=(
+                                f"yb_hash_code({', '.join(plan['key_columns'])})"
+                                if plan["by_hash"]
+                                else f"({', '.join(plan['key_columns'])})"
+                            ),
+                            lower=lower,
+                            upper=upper,
+                            source_rows=source_checksum[0],
+                            target_rows=target_checksum[0],
+                        )
+                    )
+            result = TableVerification(
+                keyspace=table.keyspace,
+                name=table.qualified_name,
+                chunks=len(checks[table]),
+                source_rows=source_rows,
+                target_rows=target_rows,
+                mismatches=tuple(mismatches),
+                at_safetime=at_safetime[table.keyspace],
+                error=error,
+            )
+            logger.info(
+                "table verified",
+                extra={
+                    "fields": {
+                        "dr_config_uuid": dr_config.uuid,
+                        "table": f"{table.keyspace}.{table.qualified_name}",
+                        "chunks": result.chunks,
+                        "mismatches": len(mismatches),
+                        "error": error,
+                    }
+                },
+            )
+            results.append(result)
+    return results